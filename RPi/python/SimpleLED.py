@@ -6,7 +6,7 @@
 # various animations on a strip of NeoPixels.
 
 import time
-import neopixel
+from sidekick_gpio import Color  # wie neopixel.Color, ohne rpi_ws281x zu laden
 import argparse
 
 # LED strip configuration:
@@ -21,32 +21,30 @@ LED_CHANNEL    = 0       # set to '1' for GPIOs 13, 19, 41, 45 or 53
 
 
 
+# MODE -> (Meldung, Farbe)
+MODE_COLORS = {
+    0: ("CLEAR MODE", Color(0,0,0)),
+    1: ("RED MODE", Color(255,0,0)),
+    2: ("GREEN MODE", Color(0,255,0)),
+    3: ("YELLOW MODE", Color(255,255,0)),
+}
+
+
 def ChangeColor(strip, MODE, BOX):
+    if MODE not in MODE_COLORS:
+        return
     LED_COUNT_START      = LED_COUNT * BOX
     LED_COUNT_END        = LED_COUNT_START + LED_COUNT
 
-    if MODE == 0:
-        print("CLEAR MODE")
-        for i in range(LED_COUNT_START, LED_COUNT_END):
-            strip.setPixelColor(i, neopixel.Color(0,0,0))
-        strip.show()
-    if MODE == 1:
-        print("RED MODE")
-        for i in range(LED_COUNT_START, LED_COUNT_END):
-            strip.setPixelColor(i, neopixel.Color(255,0,0))
-        strip.show()
-
-    if MODE == 2:
-        print("GREEN MODE")
-        for i in range(LED_COUNT_START, LED_COUNT_END):
-            strip.setPixelColor(i, neopixel.Color(0,255,0))
-        strip.show()
-
-    if MODE == 3:
-        print("YELLOW MODE")
+    name, color = MODE_COLORS[MODE]
+    print(name)
+    if hasattr(strip, 'fill'):
+        # sidekick_leds.LEDController: ganzer Bereich auf einmal, show() fordert nur einen Frame an
+        strip.fill(LED_COUNT_START, LED_COUNT_END, color)
+    else:
         for i in range(LED_COUNT_START, LED_COUNT_END):
-            strip.setPixelColor(i, neopixel.Color(255,255,0))
-        strip.show()
+            strip.setPixelColor(i, color)
+    strip.show()
 
 #if __name__ == "__main__":
  #   strip = Adafruit_NeoPixel(24, 18, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LED_CHANNEL)
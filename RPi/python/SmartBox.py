@@ -1,55 +1,110 @@
 from __future__ import print_function
 import time
-import RPi.GPIO as GPIO
 import SimpleLED
-import neopixel
-import os
-import paho.mqtt.client as mqtt
+from sidekick_gpio import get_backend, EchoTimer, Scenario
+# LED-Befehle aus MQTT liegen in sidekick_leds (auch vom Hub genutzt), die Namen bleiben hier erreichbar
+from sidekick_leds import (LEDController, apply_led_command, parse_color, parse_animation,
+                           set_led_color, set_led_colors, set_led_animation)
+from sidekick_pins import GPIO_US_TRIGGER, BOX_PINS, BOX_TRIGGER_PINS, BUTTON_PINS, LED_STRIP_PIN
+from sidekick_telemetry import Telemetry
+from sidekick_detect import HandFilter
+from sidekick_scheduler import MeasureScheduler, MIN_TRIGGER_PERIOD
+
+# Hardware-Backend: RPi.GPIO + rpi_ws281x auf dem Pi, sonst simuliert (SIDEKICK_BACKEND=pi|sim).
+# Austauschbar per use_backend() bzw. use_gpio(), z.B. für Benchmarks.
+BACKEND = get_backend()
+GPIO = BACKEND.gpio
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
 
 TEMPERATURE = 20
 SPEED_OF_SOUND = 33100 + (0.6 * TEMPERATURE)
-AVERAGE_DELTA = 6
-GPIO_US_TRIGGER = 25
+AVERAGE_DELTA = 6  # cm unter dem Initialwert (Leerwert), ab denen eine Hand erkannt wird
+MEASURE_WINDOW = 0.05  # Sekunden pro Messzyklus (Echo eines HC-SR04 dauert max. ~25 ms)
+
+# Echo-Zeitmessung:
+# "edge" - Flanken-Callbacks stempeln Beginn/Ende des Echos (perf_counter_ns), die Schleife schläft
+# "poll" - bisherige Abfrage-Schleife (zwei GPIO.input pro Box und Durchlauf, 100 % CPU)
+ECHO_TIMING = "edge"
+
+# Messablauf:
+# "adaptive" - sidekick_scheduler.MeasureScheduler: Zeitschlitze pro Trigger-Pin, Hör-Fenster nach
+#              erwarteter Distanz, nur aktive Boxen
+# "fixed"    - alle Boxen zusammen auslösen und MEASURE_WINDOW abwarten
+# Beide lösen einen Sensor höchstens alle MIN_TRIGGER_PERIOD (60 ms, HC-SR04) aus, also höchstens
+# ~16,7 Messungen/s pro Box - auch mit weniger aktiven Boxen. "adaptive" bringt keine höhere Rate,
+# nur getrennte Zeitschlitze für Nachbarboxen an eigenen Trigger-Pins (BOX_TRIGGER_PINS), und ist
+# noch nicht auf dem Pi vermessen.
+MEASURE_SCHEDULING = "fixed"
+
+# Hand-Erkennung:
+# "filter" - Median + Hysterese gegen den laufend nachgeführten Leerwert (sidekick_detect.HandFilter)
+# "fixed"  - bisherige feste Schwelle (15 cm) mit 3 / 15 Messungen zum Erkennen / Freigeben
+HAND_DETECTION = "filter"
+# Schwellen pro Box (Parameter von HandFilter), z.B. {3: {'enter_delta': 8, 'release_samples': 6}}
+BOX_DETECTION = {}
 
 console_timer = 0
+last_trigger = 0.0  # time.monotonic() der letzten Auslösung in measure_cycle (MIN_TRIGGER_PERIOD)
+
+# Pin-Belegung (Echo/Box/LED-Meldung, Trigger, Taster, LED-Streifen): sidekick_pins.py
 
 # MQTT Konfiguration
 MQTT_BROKER = "localhost"  # Ändere dies zur IP/Hostname deines MQTT-Brokers
 MQTT_PORT = 1883
-MQTT_TOPIC_BOX = "sidekick/box"      # Topic-Format: sidekick/box/{box_nr}/hand und sidekick/box/{box_nr}/led
+MQTT_TOPIC_BOX = "sidekick/box"      # Topic-Format: sidekick/box/{box_nr}/hand, sidekick/box/{box_nr}/led und sidekick/box/{box_nr}/led/anim
 MQTT_TOPIC_BUTTON = "sidekick/button"  # Topic-Format: sidekick/button/{button_nr}/state
 MQTT_ENABLED = True  # Setze auf False, um MQTT zu deaktivieren
 
-# Button GPIO-Pin Zuordnung (aus SIDEKICK-extension.js)
-# Button 1 = GPIO 4, Button 2 = GPIO 17, Button 3 = GPIO 27, Button 4 = GPIO 22
-BUTTON_PINS = {
-    1: 4,
-    2: 17,
-    3: 27,
-    4: 22
-}
+# Telemetrie (siehe sidekick_telemetry.py): JSON unter http://localhost:TELEMETRY_PORT/telemetry
+TELEMETRY_ENABLED = True
+TELEMETRY_PORT = 8602
+TELEMETRY_MQTT_INTERVAL = 0  # Sekunden zwischen Meldungen auf sidekick/telemetry, 0 = aus
 
-# Globaler MQTT-Client und LED-Strip (für MQTT-Callbacks)
+# Globaler MQTT-Client und LED-Strip (für MQTT-Callbacks; led_strip ist ein sidekick_leds.LEDController)
 mqtt_client = None
 led_strip = None
 smartboxes_global = None
 
+# Messwerte der Sensor-Schleife (Ringpuffer)
+telemetry = Telemetry()
+
 # Button-Zustände (für Erkennung von Zustandsänderungen)
 button_states = {1: False, 2: False, 3: False, 4: False}
 
 
+def use_backend(backend):
+    """Setzt das Hardware-Backend (sidekick_gpio.PiBackend / SimulatedBackend)."""
+    global BACKEND, GPIO
+    BACKEND = backend
+    GPIO = backend.gpio
+
+
+def use_gpio(gpio):
+    """Setzt das GPIO-Backend (Schnittstelle wie RPi.GPIO), z.B. für Simulation und Benchmarks."""
+    global GPIO
+    GPIO = gpio
+
+
 def init_mqtt():
     """Initialisiert die MQTT-Verbindung."""
     global mqtt_client
     if not MQTT_ENABLED:
         print("MQTT ist deaktiviert.")
         return None
+    if mqtt is None:
+        print("paho-mqtt nicht installiert - fahre ohne MQTT fort...")
+        return None
     
     try:
         mqtt_client = mqtt.Client()
         mqtt_client.on_connect = on_mqtt_connect
         mqtt_client.on_disconnect = on_mqtt_disconnect
         mqtt_client.on_message = on_mqtt_message  # Callback für eingehende Nachrichten
+        mqtt_client.on_publish = on_mqtt_publish  # Für die Publish-Latenz in der Telemetrie
         mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
         mqtt_client.loop_start()  # Startet Background-Thread für MQTT
         print(f"MQTT-Verbindung zu {MQTT_BROKER}:{MQTT_PORT} wird hergestellt...")
@@ -64,14 +119,12 @@ def on_mqtt_connect(client, userdata, flags, rc):
     """Callback bei erfolgreicher MQTT-Verbindung."""
     if rc == 0:
         print("MQTT-Verbindung erfolgreich hergestellt!")
-        # Subscribe zu LED-Steuerungs-Topics für alle Boxen (1-9)
-        for box_nr in range(1, 10):
-            topic = f"{MQTT_TOPIC_BOX}/{box_nr}/led"
-            client.subscribe(topic)
-            print(f"MQTT: Subscribed to {topic}")
-        # Subscribe auch zu "all" für alle LEDs gleichzeitig
-        client.subscribe(f"{MQTT_TOPIC_BOX}/all/led")
-        print(f"MQTT: Subscribed to {MQTT_TOPIC_BOX}/all/led")
+        # Subscribe zu LED-Steuerungs- und Animations-Topics für alle Boxen (1-9)
+        # und zu "all" für alle LEDs gleichzeitig
+        for box_id in [str(box_nr) for box_nr in range(1, 10)] + ['all']:
+            for topic in (f"{MQTT_TOPIC_BOX}/{box_id}/led", f"{MQTT_TOPIC_BOX}/{box_id}/led/anim"):
+                client.subscribe(topic)
+                print(f"MQTT: Subscribed to {topic}")
     else:
         print(f"MQTT-Verbindung fehlgeschlagen mit Code: {rc}")
 
@@ -81,98 +134,48 @@ def on_mqtt_disconnect(client, userdata, rc):
     print("MQTT-Verbindung getrennt.")
 
 
+def on_mqtt_publish(client, userdata, mid):
+    """Callback, sobald eine Nachricht an den Broker geschrieben wurde."""
+    telemetry.publish_done(mid)
+
+
 def on_mqtt_message(client, userdata, msg):
-    """Callback für eingehende MQTT-Nachrichten (LED-Steuerung)."""
-    global led_strip
-    
+    """
+    Callback für eingehende MQTT-Nachrichten (LED-Steuerung).
+
+    Läuft im Netzwerk-Thread von paho: Hier wird nur das Topic zerlegt und
+    der Befehl pro Box an den LED-Render-Thread übergeben (led_strip.submit).
+    Dekodieren, Parsen und Ausgeben passieren dort; ältere, noch nicht
+    ausgeführte Befehle für dieselbe Box werden ersetzt.
+    """
     try:
-        topic = msg.topic
-        payload = msg.payload.decode('utf-8')
-        print(f"MQTT empfangen: {topic} -> {payload}")
-        
         # Topic-Format: sidekick/box/{box_nr}/led oder sidekick/box/all/led
-        parts = topic.split('/')
-        if len(parts) >= 4 and parts[3] == 'led':
-            box_id = parts[2]  # box_nr oder "all"
-            
-            # Payload kann sein: "off", "red", "green", "blue", "yellow", oder "#RRGGBB"
-            r, g, b = parse_color(payload)
-            
-            if led_strip is not None:
-                if box_id == 'all':
-                    # Alle Boxen setzen
-                    for box_nr in range(1, 10):
-                        set_led_color(led_strip, box_nr, r, g, b)
-                else:
-                    box_nr = int(box_id)
-                    set_led_color(led_strip, box_nr, r, g, b)
+        #               (Animationen: .../led/anim)
+        parts = msg.topic.split('/')
+        if len(parts) < 4 or parts[3] != 'led' or led_strip is None:
+            return
+        animation = len(parts) == 5 and parts[4] == 'anim'
+        box_id = parts[2]  # box_nr oder "all"
+        box_nrs = range(1, 10) if box_id == 'all' else [int(box_id)]
+        payload = msg.payload
+        strip = led_strip
+        for box_nr in box_nrs:
+            if not strip.submit(box_nr, lambda box_nr=box_nr: apply_led_command(strip, box_nr, payload, animation)):
+                print(f"LED-Befehl für Box {box_nr} verworfen (Warteschlange voll)")
                     
     except Exception as e:
         print(f"Fehler beim Verarbeiten der MQTT-Nachricht: {e}")
 
 
-def parse_color(color_str):
-    """Parst einen Farb-String und gibt (R, G, B) zurück."""
-    color_str = color_str.lower().strip()
-    
-    # Vordefinierte Farben
-    colors = {
-        'off': (0, 0, 0),
-        'black': (0, 0, 0),
-        'red': (255, 0, 0),
-        'green': (0, 255, 0),
-        'blue': (0, 0, 255),
-        'yellow': (255, 255, 0),
-        'white': (255, 255, 255),
-        'orange': (255, 165, 0),
-        'purple': (128, 0, 128),
-        'cyan': (0, 255, 255),
-        'pink': (255, 192, 203),
-    }
-    
-    if color_str in colors:
-        return colors[color_str]
-    
-    # Hex-Format: #RRGGBB oder RRGGBB
-    if color_str.startswith('#'):
-        color_str = color_str[1:]
-    
-    if len(color_str) == 6:
-        try:
-            r = int(color_str[0:2], 16)
-            g = int(color_str[2:4], 16)
-            b = int(color_str[4:6], 16)
-            return (r, g, b)
-        except ValueError:
-            pass
-    
-    # Fallback: aus
-    print(f"Unbekannte Farbe: {color_str}, verwende 'off'")
-    return (0, 0, 0)
-
-
-def set_led_color(strip, box_nr, r, g, b):
-    """Setzt die LED-Farbe für eine bestimmte Box."""
-    LED_COUNT = 7  # LEDs pro Box (aus SimpleLED.py)
-    LED_COUNT_START = LED_COUNT * (box_nr - 1)
-    LED_COUNT_END = LED_COUNT_START + LED_COUNT
-    
-    print(f"LED Box {box_nr}: RGB({r}, {g}, {b})")
-    
-    for i in range(LED_COUNT_START, LED_COUNT_END):
-        # strip.setPixelColor(i, neopixel.Color(r, g, b))
-        # Die aktuell eingesetzte LED-Streifen-Variante dieser WS2812B-LED hat eine andere Farbreihenfolge (GRB statt RGB):
-        strip.setPixelColor(i, neopixel.Color(g, r, b))
-    strip.show()
-
-
 def publish_hand_detected(box_nr):
     """Sendet eine MQTT-Nachricht, wenn eine Hand erkannt wurde."""
     global mqtt_client
     if mqtt_client is not None and MQTT_ENABLED:
         topic = f"{MQTT_TOPIC_BOX}/{box_nr}/hand"
         try:
-            mqtt_client.publish(topic, "detected")
+            info = mqtt_client.publish(topic, "detected")
+            if info is not None:
+                telemetry.publish_started(info.mid)
             print(f"MQTT: Hand erkannt an Box {box_nr} -> Topic: {topic}")
         except Exception as e:
             print(f"MQTT-Publish fehlgeschlagen: {e}")
@@ -217,6 +220,7 @@ class SmartBox:
         self.GPIO_LED_MESSAGEPIN = GPIO_LED_MESSAGEPIN
         self.GPIO_US_ECHO = GPIO_US_ECHO
         self.box_nr = box_nr
+        self.trigger_pin = BOX_TRIGGER_PINS.get(box_nr, GPIO_US_TRIGGER)
         self.startTime = 0
         self.endTime = 0
         self.elapsed = 0
@@ -226,19 +230,25 @@ class SmartBox:
         self.notDetectedCounter = 0
         self.detectedCounter = 0
         self.valueChanged = False
+        self.echo_timer = None
         self.init_GPIO()
         self.inactive = False
         print("Initalisiere SmartBox " + str(self.box_nr) + "...")
         self.averageUltra = self.measure_average()
         print("Initialwert von Box " + str(self.box_nr) + ": " + str(self.averageUltra) + "\n")
+        self.hand_filter = None
+        if HAND_DETECTION == "filter":
+            options = dict(enter_delta=AVERAGE_DELTA)
+            options.update(BOX_DETECTION.get(self.box_nr, {}))
+            self.hand_filter = HandFilter(self.averageUltra, **options)
 
     # Sets ultrasonic trigger to true for 10us.
     @staticmethod
-    def trigger_ultrasonic():
-        GPIO.output(GPIO_US_TRIGGER, True)
+    def trigger_ultrasonic(pin=GPIO_US_TRIGGER):
+        GPIO.output(pin, True)
         # Wait 10us
         time.sleep(0.00001)
-        GPIO.output(GPIO_US_TRIGGER, False)
+        GPIO.output(pin, False)
 
     def time_ultrasonic(self):
 
@@ -259,30 +269,51 @@ class SmartBox:
         self.elapsed = self.endTime - self.startTime
         self.distance = (self.elapsed * SPEED_OF_SOUND) / 2
 
+    def arm_echo(self):
+        # Vor jedem Trigger: Flanken-Reihenfolge zurücksetzen (siehe EchoTimer.arm)
+        if self.echo_timer is not None:
+            self.echo_timer.arm()
+
     def measure_ultrasonic(self):
+        if self.echo_timer is not None:
+            time.sleep(MEASURE_WINDOW)
+            self.consume_echo()
+            return
+
         currentTime = time.time()
         elapsedTime = 0
 
-        while elapsedTime <= 0.05:
+        while elapsedTime <= MEASURE_WINDOW:
             self.time_ultrasonic()
             elapsedTime = time.time() - currentTime
         # print("calculate distance")
         self.calculate_distance()
 
+    def consume_echo(self):
+        # Übernimmt die neueste fertige Messung aus dem Ringpuffer.
+        # Ohne neues Echo bleibt - wie in der Abfrage-Schleife - der letzte Wert stehen.
+        result = self.echo_timer.pop()
+        if result is not None:
+            self.elapsed = result.duration_ns / 1e9
+            self.distance = result.distance
+
     def measure_average(self):
         # This function takes 3 measurements and
         # returns the average.
-        self.trigger_ultrasonic()
+        self.arm_echo()
+        self.trigger_ultrasonic(self.trigger_pin)
         self.measure_ultrasonic()
         distance1 = self.distance
         time.sleep(0.1)
 
-        self.trigger_ultrasonic()
+        self.arm_echo()
+        self.trigger_ultrasonic(self.trigger_pin)
         self.measure_ultrasonic()
         distance2 = self.distance
         time.sleep(0.1)
 
-        self.trigger_ultrasonic()
+        self.arm_echo()
+        self.trigger_ultrasonic(self.trigger_pin)
         self.measure_ultrasonic()
         distance3 = self.distance
         time.sleep(0.1)
@@ -301,16 +332,20 @@ class SmartBox:
         # print("Ultrasonic Measurement")
 
         # Set pins as output and input
-        GPIO.setup(GPIO_US_TRIGGER, GPIO.OUT)  # Trigger
+        GPIO.setup(self.trigger_pin, GPIO.OUT)  # Trigger
         GPIO.setup(self.GPIO_US_ECHO, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)  # Echo
         GPIO.setup(self.GPIO_LED_MESSAGEPIN, GPIO.IN)
+        if ECHO_TIMING == "edge":
+            self.echo_timer = EchoTimer(GPIO, self.GPIO_US_ECHO)
         # Set trigger to False (Low)
-        GPIO.output(GPIO_US_TRIGGER, False)
+        GPIO.output(self.trigger_pin, False)
         # Allow module to settle
         time.sleep(0.5)
 
     # Main routine of the smartbox.
     def LED_control(self, strip):
+        if strip is None:
+            return
         if GPIO.input(self.GPIO_LED_MESSAGEPIN) == True and self.valueChanged == False:
             SimpleLED.ChangeColor(strip, 1, self.box_nr - 1)
             self.valueChanged = True
@@ -346,6 +381,25 @@ class SmartBox:
     # ~ handDetected, notDetectedCounter, detectedCounter = self.handDetection(handDetected, notDetectedCounter, detectedCounter)
 
     def handDetection(self):
+        if self.hand_filter is None:
+            self.handDetection_fixed()
+            return
+        event = self.hand_filter.update(self.distance)
+        if event == 'detected':
+            self.handDetected = True
+            telemetry.record_event(self.box_nr, 'detected')
+        elif event == 'removed':
+            # MQTT-Nachricht senden
+            publish_hand_detected(self.box_nr)
+            self.handDetected = False
+            telemetry.record_event(self.box_nr, 'removed')
+            print("Hand rausgenommen.")
+        elif event == 'recalibrated':
+            # Etwas liegt dauerhaft in der Box - neuer Leerwert, kein Griff
+            self.handDetected = False
+            telemetry.record_event(self.box_nr, 'recalibrated')
+
+    def handDetection_fixed(self):
         # print(str(self.GPIO_US_MESSAGEPIN) + " " + str(distance))
 
         # If the distance value is between the spceified bounds.
@@ -364,6 +418,7 @@ class SmartBox:
                     publish_hand_detected(self.box_nr)
                     
                     self.handDetected = False
+                    telemetry.record_event(self.box_nr, 'removed')
                     print("Hand rausgenommen.")
                     self.notDetectedCounter = 0
             # else:
@@ -374,25 +429,14 @@ class SmartBox:
             self.detectedCounter += 1
             if self.detectedCounter == 3:
                 self.handDetected = True
+                telemetry.record_event(self.box_nr, 'detected')
                 # time.sleep(0.5)
             self.notDetectedCounter = 0
 
 
 def initSmartBoxes():
     
-    smartbox_1 = SmartBox(18, 1, 7)
-    smartbox_2 = SmartBox(23, 2, 8)
-    smartbox_3 = SmartBox(24, 3, 14)
-    smartbox_4 = SmartBox(5, 4, 16)
-    smartbox_5 = SmartBox(11, 5, 20)
-    smartbox_6 = SmartBox(9, 6, 21)
-    smartbox_7 = SmartBox(6, 7, 15)
-    smartbox_8 = SmartBox(13, 8, 2)
-    smartbox_9 = SmartBox(19, 9, 3)
-
-    smartboxes = []
-    smartboxes.extend(
-        [smartbox_1, smartbox_2, smartbox_3, smartbox_4, smartbox_5, smartbox_6, smartbox_7, smartbox_8, smartbox_9])
+    smartboxes = [SmartBox(echo, box_nr, led_message) for echo, box_nr, led_message in BOX_PINS]
 
     smartboxes = checkSmartBoxes(smartboxes)
     return smartboxes
@@ -407,54 +451,124 @@ def checkSmartBoxes(smartboxes):
     return filteredSmartboxes
 
 
+def measure_cycle(smartboxes):
+    """
+    Ein Messzyklus für alle Boxen: Trigger auslösen, Echos auswerten. Returns: Startzeit (time.time())
+
+    Zwischen zwei Auslösungen liegen mindestens MIN_TRIGGER_PERIOD Sekunden
+    (MEASURE_WINDOW allein wäre kürzer als der Messzyklus des HC-SR04).
+    """
+    global last_trigger
+    wait = last_trigger + MIN_TRIGGER_PERIOD - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    last_trigger = time.monotonic()
+    start = time.time()
+    for smartbox in smartboxes:
+        smartbox.arm_echo()
+    for pin in sorted({smartbox.trigger_pin for smartbox in smartboxes}):
+        SmartBox.trigger_ultrasonic(pin)
+    if all(smartbox.echo_timer is not None for smartbox in smartboxes):
+        # Echos werden per Flanken-Callback gestempelt - bis zum Ende des Messfensters schlafen
+        time.sleep(max(0.0, MEASURE_WINDOW - (time.time() - start)))
+        for smartbox in smartboxes:
+            smartbox.consume_echo()
+    else:
+        elapsed = 0
+        while (elapsed <= MEASURE_WINDOW):
+            for smartbox in smartboxes:
+                smartbox.time_ultrasonic()
+            elapsed = time.time() - start
+        for smartbox in smartboxes:
+            smartbox.calculate_distance()
+    return start
+
+
+def set_detection_rate(smartboxes, rate):
+    """Passt die Hand-Erkennung an die Messrate (Messungen/s pro Box) an"""
+    for smartbox in smartboxes:
+        if smartbox.hand_filter is not None:
+            smartbox.hand_filter.set_rate(rate)
+
+
+def create_scheduler(smartboxes):
+    """MeasureScheduler für die aktiven Boxen; passt die Hand-Erkennung an dessen Messrate an"""
+    scheduler = MeasureScheduler(smartboxes, trigger=SmartBox.trigger_ultrasonic)
+    rate = scheduler.expected_rate()
+    set_detection_rate(smartboxes, rate)
+    print(f"Messung: {len(scheduler.slots)} Zeitschlitz(e), mind. {rate:.0f} Messungen/s pro Box")
+    return scheduler
+
+
+def run_cycle(smartboxes, strip, scheduler=None):
+    """
+    Ein Durchlauf der Hauptschleife: messen, Hand erkennen, LEDs, Buttons. Returns: Startzeit
+
+    Mit scheduler wird pro Durchlauf ein Zeitschlitz gemessen, sonst alle Boxen auf einmal.
+    """
+    if scheduler is None:
+        start = measure_cycle(smartboxes)
+        measured = smartboxes
+    else:
+        start, measured = scheduler.run_slot()
+
+    for smartbox in measured:
+        smartbox.handDetection()
+    for smartbox in smartboxes:
+        smartbox.LED_control(strip)
+
+    # Buttons überprüfen
+    check_buttons()
+    # Nur Zahlen in die Ringpuffer - angezeigt/verschickt wird in den Telemetrie-Threads
+    telemetry.record_cycle(start, measured)
+    return start
+
+
 def runBoxes():
     global led_strip  # Wichtig! Damit der MQTT-Callback auf den Strip zugreifen kann
     
     GPIO.cleanup()
+
+    if BACKEND.name == 'sim' and BACKEND.scenario is None:
+        # Simulation ohne Szenario: alle Boxen leer, Buttons nicht gedrückt
+        BACKEND.play(Scenario(), {box_nr: BOX_TRIGGER_PINS.get(box_nr, GPIO_US_TRIGGER) for _, box_nr, _ in BOX_PINS},
+                     {box_nr: echo for echo, box_nr, _ in BOX_PINS}, BUTTON_PINS)
     
     # MQTT initialisieren
     init_mqtt()
     
     # Echo, BoxNr, LED_Message
     smartboxes = initSmartBoxes()
+    if MEASURE_SCHEDULING == "adaptive":
+        scheduler = create_scheduler(smartboxes)
+    else:
+        scheduler = None
+        set_detection_rate(smartboxes, 1.0 / max(MEASURE_WINDOW, MIN_TRIGGER_PERIOD))
     
     # Buttons initialisieren
     init_buttons()
     
-    strip = neopixel.Adafruit_NeoPixel(70, 12, SimpleLED.LED_FREQ_HZ, SimpleLED.LED_DMA, SimpleLED.LED_INVERT,
+    strip = BACKEND.led_strip(70, LED_STRIP_PIN, SimpleLED.LED_FREQ_HZ, SimpleLED.LED_DMA, SimpleLED.LED_INVERT,
                               SimpleLED.LED_BRIGHTNESS, SimpleLED.LED_CHANNEL)
-    strip.begin()
+    if strip is not None:
+        # Frame-Puffer: Änderungen aus Schleife und MQTT werden gesammelt und höchstens einmal pro Frame ausgegeben
+        strip = LEDController(strip, leds_per_box=SimpleLED.LED_COUNT).start()
     
     # Globale Variable setzen für MQTT-Callback
     led_strip = strip
-    
-    endtime = time.time() + 1
+
+    if TELEMETRY_ENABLED:
+        if strip is not None:
+            telemetry.add_source('led_commands', strip.commands.stats)
+        telemetry.serve_http(port=TELEMETRY_PORT)
+        telemetry.publish_mqtt(mqtt_client, TELEMETRY_MQTT_INTERVAL)
+    # Statusanzeige im Terminal (einmal pro Sekunde, nicht als Dienst)
+    telemetry.console()
 
     while 1:
         try:
 
-            start = time.time()
-            elapsed = 0
-            statusString = ""
-            SmartBox.trigger_ultrasonic()
-            while (elapsed <= 0.05):
-                for smartbox in smartboxes:
-                    smartbox.time_ultrasonic()
-                elapsed = time.time() - start
-                
-            for smartbox in smartboxes:
-                smartbox.calculate_distance()
-                smartbox.handDetection()
-                smartbox.LED_control(strip)
-                statusString += "SmartBox " + str(smartbox.box_nr) + " Messwert: " + str(round(smartbox.distance,2)) + "\n"
-            
-            # Buttons überprüfen
-            check_buttons()
-            
-            if start >= endtime:
-                os.system("clear")
-                print(statusString)
-                endtime = time.time() + 1
+            run_cycle(smartboxes, strip, scheduler)
 
         except KeyboardInterrupt:
             # MQTT sauber beenden
@@ -462,4 +576,6 @@ def runBoxes():
                 mqtt_client.loop_stop()
                 mqtt_client.disconnect()
                 print("MQTT-Verbindung beendet.")
+            if strip is not None:
+                strip.stop()
             GPIO.cleanup()
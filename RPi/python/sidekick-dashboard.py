@@ -10,41 +10,73 @@ Ein einfacher Webserver für:
 - Display/Kiosk-Steuerung via MQTT
 
 Startet auf Port 5000 (Scratch läuft auf 8601)
+Requests werden parallel in einem begrenzten Thread-Pool abgearbeitet,
+damit ein laufender Upload die anderen Tablets nicht blockiert.
 
 Verwendung:
     python3 sidekick-dashboard.py
+    python3 sidekick-dashboard.py --workers 16 --port 5000
 """
 
 import os
 import sys
 import json
+import argparse
+import gzip
+import hashlib
+import base64
+import time
+import mimetypes
 import html as html_module
 import re
+import threading
 import urllib.parse
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 import io
 
+from sidekick_upload import (
+    parse_multipart_stream,
+    cleanup_stale_uploads,
+    MultipartError,
+    ResumableUploadStore,
+    UploadSessionError,
+    MAX_FIELD_SIZE,
+    RESUMABLE_CLEANUP_INTERVAL,
+)
+from sidekick_import import IMPORT_STATUS_NAME, HashManifest, HASH_ALGORITHM
+
 # Importiere gemeinsame Funktionen
 try:
     from sidekick_files import (
         setup_paths as _setup_paths, 
-        update_video_list, 
-        update_project_list,
+        get_video_index,
+        get_project_index,
+        get_dir_lock,
+        MediaWatcher,
         VIDEO_EXTENSIONS,
         PROJECT_EXTENSIONS
     )
 except ImportError:
-    # Fallback falls Import fehlschlägt
-    VIDEO_EXTENSIONS = {'.mp4', '.webm', '.ogg', '.ogv', '.mov', '.avi', '.mkv'}
-    PROJECT_EXTENSIONS = {'.sb3'}
-    _setup_paths = None
+    print("FEHLER: sidekick_files.py nicht gefunden!")
+    print("Stelle sicher, dass das Script im gleichen Ordner liegt.")
+    sys.exit(1)
 
 # Konfiguration
 DASHBOARD_PORT = 5000
 SCRATCH_PORT = 8601
 KIOSK_PORT = 8601  # Kiosk läuft auf dem gleichen Port wie Scratch
+DASHBOARD_WORKERS = 8  # Anzahl paralleler Request-Threads
+REQUEST_TIMEOUT = 60  # Sekunden ohne Daten, bevor eine Verbindung getrennt wird
+STATIC_MAX_AGE = 31536000  # 1 Jahr - die URLs der Assets enthalten einen Inhalts-Hash
+DASHBOARD_PAGE_SIZE = 50  # Einträge pro Liste, die direkt in der Seite stehen
+API_PAGE_SIZE = 100  # Standard-Seitengröße der JSON-API
+API_MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024  # Blockgröße beim Schreiben der Dashboard-Seite
+SENDFILE_BLOCK = 8 * 1024 * 1024  # Maximale Bytes pro sendfile()-Aufruf bei Videos/Projekten
+IMPORT_STALE_AFTER = 30  # Sekunden ohne Fortschrittsmeldung, bis ein Import als hängend gilt
 
 # Pfade (werden beim Start gesetzt)
 SIDEKICK_DIR = None
@@ -57,54 +89,65 @@ def setup_paths():
     """Initialisiert die Pfade basierend auf dem Home-Verzeichnis"""
     global SIDEKICK_DIR, VIDEOS_DIR, PROJECTS_DIR, SCRATCH_DIR
     
-    # Nutze gemeinsame Funktion falls verfügbar
-    if _setup_paths is not None:
-        SIDEKICK_DIR, VIDEOS_DIR, PROJECTS_DIR, SCRATCH_DIR = _setup_paths()
-    else:
-        # Fallback
-        home = Path.home()
-        SIDEKICK_DIR = home / "Sidekick"
-        SCRATCH_DIR = SIDEKICK_DIR / "sidekick"
-        VIDEOS_DIR = SCRATCH_DIR / "videos"
-        PROJECTS_DIR = SCRATCH_DIR / "projects"
-        
-        VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
-        PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    SIDEKICK_DIR, VIDEOS_DIR, PROJECTS_DIR, SCRATCH_DIR = _setup_paths()
     
     print(f"SIDEKICK Directory: {SIDEKICK_DIR}")
     print(f"Videos Directory: {VIDEOS_DIR}")
     print(f"Projects Directory: {PROJECTS_DIR}")
 
 
-# Hinweis: update_video_list() und update_project_list() werden aus sidekick_files importiert
-# Falls der Import fehlschlägt, sind hier Fallback-Implementierungen:
-if _setup_paths is None:
-    def update_video_list():
-        """Fallback: Aktualisiert video-list.json"""
-        video_files = []
-        for f in sorted(VIDEOS_DIR.iterdir()):
-            if f.suffix.lower() in VIDEO_EXTENSIONS:
-                video_files.append(f.name)
-        
-        list_file = VIDEOS_DIR / "video-list.json"
-        with open(list_file, 'w', encoding='utf-8') as f:
-            json.dump(video_files, f, indent=2, ensure_ascii=False)
-        
-        return video_files
+def get_index(file_type):
+    """Gibt den Medien-Index für 'video' oder 'project' zurück"""
+    if file_type == 'video':
+        return get_video_index(VIDEOS_DIR)
+    return get_project_index(PROJECTS_DIR)
 
 
-    def update_project_list():
-        """Fallback: Aktualisiert project-list.json"""
-        project_files = []
-        for f in sorted(PROJECTS_DIR.iterdir()):
-            if f.suffix.lower() in PROJECT_EXTENSIONS:
-                project_files.append(f.name)
-        
-        list_file = PROJECTS_DIR / "project-list.json"
-        with open(list_file, 'w', encoding='utf-8') as f:
-            json.dump(project_files, f, indent=2, ensure_ascii=False)
-        
-        return project_files
+# Fortsetzbare Uploads pro Typ (Teildaten in <Ordner>/.uploads/)
+_upload_stores = {}
+
+
+def get_upload_store(file_type):
+    """Gibt den Speicher für fortsetzbare Uploads von 'video' oder 'project' zurück"""
+    store = _upload_stores.get(file_type)
+    if store is None:
+        target_dir = VIDEOS_DIR if file_type == 'video' else PROJECTS_DIR
+        store = _upload_stores.setdefault(file_type, ResumableUploadStore(target_dir))
+    return store
+
+
+def cleanup_upload_stores():
+    """Entfernt abgelaufene fortsetzbare Uploads - läuft alle RESUMABLE_CLEANUP_INTERVAL Sekunden"""
+    while True:
+        for file_type in ('video', 'project'):
+            try:
+                get_upload_store(file_type).cleanup()
+            except OSError as e:
+                print(f"Upload-Aufräumen ({file_type}) fehlgeschlagen: {e}")
+        time.sleep(RESUMABLE_CLEANUP_INTERVAL)
+
+
+def find_upload(upload_id):
+    """Sucht eine Upload-Session - Returns: (Typ, Session) oder (None, None)"""
+    for file_type in ('video', 'project'):
+        upload = get_upload_store(file_type).get(upload_id)
+        if upload is not None:
+            return file_type, upload
+    return None, None
+
+
+def upload_target_name(filename, custom_name=''):
+    """Endgültiger Dateiname eines Uploads (optional mit eigenem Namen)"""
+    filename = os.path.basename(filename)
+    ext = os.path.splitext(filename)[1].lower()
+    custom_name = custom_name.strip()
+    if custom_name:
+        # Sanitize custom name (remove path separators and dangerous chars)
+        custom_name = re.sub(r'[<>:"/\\|?*]', '', custom_name)
+        custom_name = custom_name.strip()
+        if custom_name:
+            filename = custom_name + ext
+    return filename
 
 
 def get_file_size_str(size_bytes):
@@ -126,193 +169,8 @@ HTML_HEADER = """<!DOCTYPE html>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>SIDEKICK-Dashboard</title>
-    <style>
-        * { box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-            min-height: 100vh;
-            color: #eee;
-        }
-        .container { max-width: 1200px; margin: 0 auto; }
-        h1 {
-            color: #0E9D59;
-            text-align: center;
-            margin-bottom: 30px;
-            font-size: 2.5em;
-        }
-        h2 {
-            color: #0E9D59;
-            border-bottom: 2px solid #0E9D59;
-            padding-bottom: 10px;
-        }
-        .card {
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-            padding: 25px;
-            margin-bottom: 25px;
-            backdrop-filter: blur(10px);
-        }
-        .grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
-        .upload-form {
-            display: flex;
-            flex-direction: column;
-            gap: 15px;
-        }
-        input[type="file"] {
-            padding: 15px;
-            border: 2px dashed #0E9D59;
-            border-radius: 10px;
-            background: rgba(14, 157, 89, 0.1);
-            color: #eee;
-            cursor: pointer;
-        }
-        input[type="file"]:hover {
-            background: rgba(14, 157, 89, 0.2);
-        }
-        button, .btn {
-            background: #0E9D59;
-            color: white;
-            border: none;
-            padding: 15px 25px;
-            border-radius: 10px;
-            cursor: pointer;
-            font-size: 1em;
-            font-weight: bold;
-            text-decoration: none;
-            display: inline-block;
-            text-align: center;
-            transition: all 0.3s;
-        }
-        button:hover, .btn:hover {
-            background: #0c8a4e;
-            transform: translateY(-2px);
-        }
-        .btn-danger { background: #e74c3c; }
-        .btn-danger:hover { background: #c0392b; }
-        .btn-secondary { background: #3498db; }
-        .btn-secondary:hover { background: #2980b9; }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 15px;
-        }
-        th, td {
-            padding: 12px 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(255,255,255,0.1);
-        }
-        th { color: #0E9D59; font-weight: bold; }
-        tr:hover { background: rgba(255,255,255,0.05); }
-        .actions { display: flex; gap: 10px; }
-        .status { padding: 15px; border-radius: 10px; margin-bottom: 20px; }
-        .status-success { background: rgba(14, 157, 89, 0.3); border: 1px solid #0E9D59; }
-        .status-error { background: rgba(231, 76, 60, 0.3); border: 1px solid #e74c3c; }
-        .scratch-link {
-            display: block;
-            text-align: center;
-            padding: 20px;
-            background: linear-gradient(135deg, #0E9D59, #0c8a4e);
-            border-radius: 15px;
-            color: white;
-            text-decoration: none;
-            font-size: 1.3em;
-            font-weight: bold;
-            margin-bottom: 25px;
-            transition: all 0.3s;
-        }
-        .scratch-link:hover {
-            transform: scale(1.02);
-            box-shadow: 0 10px 30px rgba(14, 157, 89, 0.4);
-        }
-        .empty-state {
-            text-align: center;
-            padding: 40px;
-            color: #888;
-        }
-        /* Display Control Styles */
-        .display-control {
-            display: flex;
-            flex-direction: column;
-            gap: 15px;
-        }
-        .display-status {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            padding: 15px;
-            background: rgba(0,0,0,0.3);
-            border-radius: 10px;
-        }
-        .status-dot {
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-            background: #888;
-        }
-        .status-dot.connected { background: #4CAF50; box-shadow: 0 0 10px #4CAF50; }
-        .status-dot.disconnected { background: #ff9800; animation: pulse 1.5s infinite; }
-        .control-buttons {
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-        }
-        .btn-start { background: #4CAF50; }
-        .btn-start:hover { background: #45a049; }
-        .btn-stop { background: #f44336; }
-        .btn-stop:hover { background: #da190b; }
-        .btn-display { background: #9c27b0; }
-        .btn-display:hover { background: #7b1fa2; }
-        .project-select {
-            padding: 12px;
-            border-radius: 10px;
-            border: 2px solid #0E9D59;
-            background: rgba(14, 157, 89, 0.1);
-            color: #eee;
-            font-size: 1em;
-            cursor: pointer;
-        }
-        .project-select option { background: #1a1a2e; }
-        /* Rename input styling */
-        .rename-row {
-            display: none;
-            align-items: center;
-            gap: 10px;
-            margin-top: 10px;
-            padding: 10px;
-            background: rgba(14, 157, 89, 0.15);
-            border-radius: 8px;
-        }
-        .rename-row.visible { display: flex; }
-        .rename-row label { color: #0E9D59; font-weight: bold; white-space: nowrap; }
-        .rename-input {
-            flex: 1;
-            padding: 10px;
-            border: 2px solid #0E9D59;
-            border-radius: 8px;
-            background: rgba(0,0,0,0.3);
-            color: #eee;
-            font-size: 1em;
-        }
-        .rename-input:focus { outline: none; box-shadow: 0 0 10px rgba(14, 157, 89, 0.5); }
-        .extension-label { color: #888; font-weight: bold; }
-        .btn-rename {
-            background: #f39c12;
-            padding: 8px 12px !important;
-            font-size: 0.9em;
-        }
-        .btn-rename:hover { background: #d68910; }
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-        @media (max-width: 600px) {
-            .grid { grid-template-columns: 1fr; }
-            h1 { font-size: 1.8em; }
-        }
-    </style>
+    <link rel="stylesheet" href="{css_url}">
+    <script src="{js_url}" defer></script>
 </head>
 <body>
 <div class="container">
@@ -324,331 +182,38 @@ HTML_FOOTER = """
 </html>
 """
 
-
-class DashboardHandler(BaseHTTPRequestHandler):
-    """HTTP Request Handler für das SIDEKICK Dashboard"""
-    
-    def log_message(self, format, *args):
-        """Überschreibt das Standard-Logging"""
-        print(f"[Dashboard] {args[0]}")
-    
-    def send_html(self, content, status=200):
-        """Sendet HTML-Antwort"""
-        self.send_response(status)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(content.encode('utf-8'))
-    
-    def send_redirect(self, location):
-        """Sendet Redirect"""
-        self.send_response(302)
-        self.send_header('Location', location)
-        self.end_headers()
-    
-    def do_GET(self):
-        """Handle GET requests"""
-        parsed = urllib.parse.urlparse(self.path)
-        path = parsed.path
-        query = urllib.parse.parse_qs(parsed.query)
-        
-        status_msg = query.get('status', [None])[0]
-        
-        if path == '/' or path == '/index.html':
-            self.serve_dashboard(status_msg)
-        elif path == '/delete-video':
-            filename = query.get('file', [None])[0]
-            if filename:
-                self.delete_video(filename)
-            else:
-                self.send_redirect('/?status=error_no_file')
-        elif path == '/delete-project':
-            filename = query.get('file', [None])[0]
-            if filename:
-                self.delete_project(filename)
-            else:
-                self.send_redirect('/?status=error_no_file')
-        elif path == '/rename-video':
-            old_name = query.get('old', [None])[0]
-            new_name = query.get('new', [None])[0]
-            if old_name and new_name:
-                self.rename_file(VIDEOS_DIR, old_name, new_name, 'video', VIDEO_EXTENSIONS)
-            else:
-                self.send_redirect('/?status=error_no_file')
-        elif path == '/rename-project':
-            old_name = query.get('old', [None])[0]
-            new_name = query.get('new', [None])[0]
-            if old_name and new_name:
-                self.rename_file(PROJECTS_DIR, old_name, new_name, 'project', PROJECT_EXTENSIONS)
-            else:
-                self.send_redirect('/?status=error_no_file')
-        else:
-            self.send_error(404, 'Not Found')
-    
-    def do_POST(self):
-        """Handle POST requests (file uploads)"""
-        if self.path == '/upload-video':
-            self.handle_upload(VIDEOS_DIR, 'video', VIDEO_EXTENSIONS)
-        elif self.path == '/upload-project':
-            self.handle_upload(PROJECTS_DIR, 'project', PROJECT_EXTENSIONS)
-        else:
-            self.send_error(404, 'Not Found')
-    
-    def handle_upload(self, target_dir, file_type, allowed_extensions):
-        """Handles file upload - without deprecated cgi module"""
-        try:
-            content_type = self.headers.get('Content-Type', '')
-            if not content_type or 'multipart/form-data' not in content_type:
-                self.send_redirect(f'/?status=error_invalid_content')
-                return
-            
-            # Extract boundary from content-type
-            boundary_match = re.search(r'boundary=([^\s;]+)', content_type)
-            if not boundary_match:
-                self.send_redirect(f'/?status=error_invalid_content')
-                return
-            
-            boundary = boundary_match.group(1).encode()
-            
-            # Read the entire body
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-            
-            # Parse multipart data manually
-            filename, file_data, custom_name = self.parse_multipart(body, boundary)
-            
-            if not filename or not file_data:
-                self.send_redirect(f'/?status=error_no_file')
-                return
-            
-            filename = os.path.basename(filename)
-            ext = os.path.splitext(filename)[1].lower()
-            
-            if ext not in allowed_extensions:
-                self.send_redirect(f'/?status=error_invalid_type')
-                return
-            
-            # Use custom name if provided
-            if custom_name:
-                # Sanitize custom name (remove path separators and dangerous chars)
-                custom_name = re.sub(r'[<>:"/\\|?*]', '', custom_name)
-                custom_name = custom_name.strip()
-                if custom_name:
-                    filename = custom_name + ext
-            
-            # Save file
-            filepath = target_dir / filename
-            with open(filepath, 'wb') as f:
-                f.write(file_data)
-            
-            # Update list based on file type
-            if file_type == 'video':
-                update_video_list()
-            elif file_type == 'project':
-                update_project_list()
-            
-            self.send_redirect(f'/?status=success_{file_type}')
-            
-        except Exception as e:
-            print(f"Upload error: {e}")
-            import traceback
-            traceback.print_exc()
-            self.send_redirect(f'/?status=error_upload')
-    
-    def parse_multipart(self, body, boundary):
-        """Parse multipart form data and extract file and custom name"""
-        # Split by boundary
-        parts = body.split(b'--' + boundary)
-        
-        filename = None
-        file_data = None
-        custom_name = None
-        
-        for part in parts:
-            if b'Content-Disposition' not in part:
-                continue
-            
-            # Check if this is the customName field
-            if b'name="customName"' in part and b'filename=' not in part:
-                header_end = part.find(b'\r\n\r\n')
-                if header_end == -1:
-                    header_end = part.find(b'\n\n')
-                    if header_end == -1:
-                        continue
-                    content_start = header_end + 2
-                else:
-                    content_start = header_end + 4
-                
-                value = part[content_start:].strip()
-                if value.endswith(b'\r\n'):
-                    value = value[:-2]
-                if value:
-                    custom_name = value.decode('utf-8').strip()
-                continue
-            
-            # Check if this part has a filename (it's a file upload)
-            if b'filename="' not in part:
-                continue
-            
-            # Extract filename
-            filename_match = re.search(rb'filename="([^"]*)"', part)
-            if not filename_match:
-                continue
-            
-            filename = filename_match.group(1).decode('utf-8')
-            if not filename:
-                continue
-            
-            # Find where headers end and content begins (double newline)
-            header_end = part.find(b'\r\n\r\n')
-            if header_end == -1:
-                header_end = part.find(b'\n\n')
-                if header_end == -1:
-                    continue
-                content_start = header_end + 2
-            else:
-                content_start = header_end + 4
-            
-            # Extract file content (remove trailing boundary markers)
-            file_data = part[content_start:]
-            # Remove trailing \r\n or \n before next boundary
-            if file_data.endswith(b'\r\n'):
-                file_data = file_data[:-2]
-            elif file_data.endswith(b'\n'):
-                file_data = file_data[:-1]
-            # Also handle the case where there's a trailing --
-            if file_data.endswith(b'--'):
-                file_data = file_data[:-2]
-                if file_data.endswith(b'\r\n'):
-                    file_data = file_data[:-2]
-        
-        return filename, file_data, custom_name
-    
-    def delete_video(self, filename):
-        """Löscht ein Video"""
-        try:
-            filepath = VIDEOS_DIR / filename
-            if filepath.exists() and filepath.suffix.lower() in VIDEO_EXTENSIONS:
-                filepath.unlink()
-                update_video_list()
-                self.send_redirect('/?status=deleted_video')
-            else:
-                self.send_redirect('/?status=error_not_found')
-        except Exception as e:
-            print(f"Delete error: {e}")
-            self.send_redirect('/?status=error_delete')
-    
-    def delete_project(self, filename):
-        """Löscht ein Projekt"""
-        try:
-            filepath = PROJECTS_DIR / filename
-            if filepath.exists() and filepath.suffix.lower() in PROJECT_EXTENSIONS:
-                filepath.unlink()
-                update_project_list()
-                self.send_redirect('/?status=deleted_project')
-            else:
-                self.send_redirect('/?status=error_not_found')
-        except Exception as e:
-            print(f"Delete error: {e}")
-            self.send_redirect('/?status=error_delete')
-    
-    def rename_file(self, target_dir, old_name, new_name, file_type, allowed_extensions):
-        """Benennt eine Datei um"""
-        try:
-            old_path = target_dir / old_name
-            new_path = target_dir / new_name
-            
-            # Validierung
-            if not old_path.exists():
-                self.send_redirect('/?status=error_not_found')
-                return
-            if old_path.suffix.lower() not in allowed_extensions:
-                self.send_redirect('/?status=error_invalid_type')
-                return
-            if new_path.suffix.lower() not in allowed_extensions:
-                self.send_redirect('/?status=error_invalid_type')
-                return
-            if new_path.exists() and new_path != old_path:
-                self.send_redirect('/?status=error_exists')
-                return
-            
-            # Umbenennen
-            old_path.rename(new_path)
-            
-            # Listen aktualisieren
-            if file_type == 'video':
-                update_video_list()
-            else:
-                update_project_list()
-            
-            self.send_redirect(f'/?status=renamed_{file_type}')
-        except Exception as e:
-            print(f"Rename error: {e}")
-            self.send_redirect('/?status=error_rename')
-    
-    def serve_dashboard(self, status_msg=None):
-        """Rendert die Dashboard-Seite"""
-        html = HTML_HEADER
-        
-        # SIDEKICK Logo als inline SVG (grüner Blitz)
-        sidekick_logo_svg = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1024 1024" style="height: 1.5em; vertical-align: middle; margin-right: 10px;"><g transform="matrix(1.163134, 0, 0, 1.163081, -9.026044, -35.353489)"><g transform="matrix(0.832517, 0, 0, 0.832517, 75.024178, 82.846268)"><path d="M 0 348.179 L 337.63 761.13 L 382.994 761.13 L 403.081 786.592 L 460.382 786.592 L 484.09 761.13 L 535.023 761.13 L 896 348.179 L 895.567 320.246 L -0.1 319.935 L 0 348.179 Z" style="stroke-linecap: round; stroke-linejoin: round; stroke-width: 30px; stroke: rgb(146, 170, 121); fill: rgb(182, 213, 151);"></path><path d="M 1.148 319.517 L 337.913 731.409 L 383.161 731.409 L 403.196 756.806 L 460.35 756.806 L 483.997 731.409 L 534.8 731.409 L 894.852 319.517 L 729.435 144.945 L 169.763 144.945 L 1.148 319.517 Z" style="stroke-linecap: round; stroke-linejoin: round; stroke-width: 30px; fill: rgb(182, 213, 151); stroke: rgb(197, 221, 172);"></path></g><g transform="matrix(0.931649, 0, 0, 0.931649, 246.421875, 139.795685)"><path d="M 213.06900024414062 205.85000610351562 L 165.85699462890625 323.68701171875 L 242.62399291992188 274.6409912109375 L 225.3730010986328 366.1409912109375 L 137.7790069580078 452.10400390625 L 129 504.6759948730469 L 142.96299743652344 456.16400146484375 L 240.5070037841797 385.26300048828125 L 297.4649963378906 208.58200073242188 L 208.36099243164062 273.3800048828125 L 231.46200561523438 216.98800659179688 L 318.29998779296875 133.9759979248047 Z" style="fill-rule: nonzero; paint-order: stroke; stroke: rgb(197, 221, 172); stroke-width: 150.381px; stroke-linejoin: round; fill: rgb(197, 221, 172);"></path><path d="M 213.06900024414062 205.85000610351562 L 165.85699462890625 323.68701171875 L 242.62399291992188 274.6409912109375 L 225.3730010986328 366.1409912109375 L 137.7790069580078 452.10400390625 L 129 504.6759948730469 L 142.96299743652344 456.16400146484375 L 240.5070037841797 385.26300048828125 L 297.4649963378906 208.58200073242188 L 208.36099243164062 273.3800048828125 L 231.46200561523438 216.98800659179688 L 318.29998779296875 133.9759979248047 Z" style="fill-rule: nonzero; paint-order: stroke; stroke: rgb(255, 255, 255); stroke-width: 75.1906px; stroke-linejoin: round; fill: rgb(255, 255, 255);"></path><polygon style="fill-rule: nonzero; paint-order: stroke; fill: rgb(182, 213, 151); stroke-width: 75.1906px; stroke-linejoin: round;" points="213.069 205.85 165.857 323.687 242.624 274.641 225.373 366.141 137.779 452.104 129 504.676 142.963 456.164 240.507 385.263 297.465 208.582 208.361 273.38 231.462 216.988 318.3 133.976"></polygon></g></g></svg>'''
-        
-        html += f'<h1>{sidekick_logo_svg}SIDEKICK Dashboard</h1>'
-        
-        # Scratch Link - dynamisch basierend auf aktuellem Host
-        # Scratch Cat Emoji (einfach und funktioniert überall)
-        scratch_icon = '🐱'
-        
-        html += f'''
-        <script>
-            // Scratch-Link und Kiosk-Link dynamisch setzen beim Laden
-            document.addEventListener('DOMContentLoaded', function() {{
-                const host = window.location.hostname;
-                const scratchLink = document.getElementById('scratchLink');
-                if (scratchLink) {{
-                    scratchLink.href = 'http://' + host + ':{SCRATCH_PORT}/';
-                }}
-                const kioskLinkTop = document.getElementById('kioskLinkTop');
-                if (kioskLinkTop) {{
-                    kioskLinkTop.href = 'http://' + host + ':{KIOSK_PORT}/kiosk.html';
-                }}
-            }});
-        </script>
-        <a href="http://10.42.0.1:{SCRATCH_PORT}/" id="scratchLink" class="scratch-link" target="_blank">
-            {scratch_icon} Scratch-Editor öffnen
+# Dashboard-Seite - statische Teile werden von build_page_segments() einmalig
+# zu Bytes kodiert, nur Status, Listen und Projekt-Auswahl entstehen pro Aufruf
+DASHBOARD_TOP_TEMPLATE = """<h1><img src="{logo_url}" alt="" style="height: 1.5em; vertical-align: middle; margin-right: 10px;">SIDEKICK Dashboard</h1>
+        <a href="http://10.42.0.1:{scratch_port}/" id="scratchLink" class="scratch-link" target="_blank">
+            🐱 Scratch-Editor öffnen
         </a>
         <div style="text-align: center; margin-bottom: 20px;">
             <a href="#" id="kioskLinkTop" target="_blank" style="color: #888; text-decoration: none; font-size: 0.9em;">
                 🖥️ Kiosk-Display öffnen <span style="color: #666; font-size: 0.85em;">(bspw. für 2. Monitor)</span>
             </a>
         </div>
-        '''
-        
-        # Status Message
-        if status_msg:
-            status_class = 'status-success' if 'success' in status_msg or 'deleted' in status_msg else 'status-error'
-            messages = {
-                'success_video': '✅ Video erfolgreich hochgeladen!',
-                'success_project': '✅ Projekt erfolgreich hochgeladen!',
-                'deleted_video': '✅ Video gelöscht!',
-                'deleted_project': '✅ Projekt gelöscht!',
-                'error_no_file': '❌ Keine Datei ausgewählt!',
-                'error_invalid_type': '❌ Ungültiger Dateityp!',
-                'error_upload': '❌ Fehler beim Hochladen!',
-                'error_delete': '❌ Fehler beim Löschen!',
-                'error_not_found': '❌ Datei nicht gefunden!',
-                'renamed_video': '✅ Video umbenannt!',
-                'renamed_project': '✅ Projekt umbenannt!',
-                'error_rename': '❌ Fehler beim Umbenennen!',
-                'error_exists': '❌ Eine Datei mit diesem Namen existiert bereits!'
-            }
-            msg = messages.get(status_msg, status_msg)
-            html += f'<div class="status {status_class}">{msg}</div>'
-        
-        # Display Control Card (Kiosk-Steuerung)
-        projects = sorted([f.name for f in PROJECTS_DIR.iterdir() if f.suffix.lower() in PROJECT_EXTENSIONS])
-        project_options = ''.join([f'<option value="{html_module.escape(p)}">{html_module.escape(p)}</option>' for p in projects])
-        
-        html += f'''
+        <div id="importStatus" class="status import-status" style="display: none;"></div>
+"""
+
+STATUS_MESSAGES = {
+    'success_video': '✅ Video erfolgreich hochgeladen!',
+    'success_project': '✅ Projekt erfolgreich hochgeladen!',
+    'deleted_video': '✅ Video gelöscht!',
+    'deleted_project': '✅ Projekt gelöscht!',
+    'error_no_file': '❌ Keine Datei ausgewählt!',
+    'error_invalid_type': '❌ Ungültiger Dateityp!',
+    'error_upload': '❌ Fehler beim Hochladen!',
+    'error_delete': '❌ Fehler beim Löschen!',
+    'error_not_found': '❌ Datei nicht gefunden!',
+    'renamed_video': '✅ Video umbenannt!',
+    'renamed_project': '✅ Projekt umbenannt!',
+    'error_rename': '❌ Fehler beim Umbenennen!',
+    'error_exists': '❌ Eine Datei mit diesem Namen existiert bereits!'
+}
+
+# Display Control Card (Kiosk-Steuerung) - die Projekt-Optionen kommen dazwischen
+DISPLAY_CARD_START = """
         <div class="card">
             <h2>🖥️ Display-Steuerung (Kiosk-Modus)</h2>
             <div class="display-control">
@@ -660,7 +225,9 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 <div style="display: flex; gap: 15px; align-items: center; flex-wrap: wrap;">
                     <select class="project-select" id="projectSelect" style="flex: 1; min-width: 200px;">
                         <option value="">-- Projekt auswählen --</option>
-                        {project_options}
+                        """
+
+DISPLAY_CARD_END = """
                     </select>
                     <button class="btn btn-display" onclick="loadProjectOnDisplay()">📤 Auf Display laden</button>
                 </div>
@@ -677,177 +244,10 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 </div>
             </div>
         </div>
-        
-        <!-- MQTT.js vom Scratch-Server laden (lokal, funktioniert offline!) -->
-        <script>
-            // Warte auf mqtt.js und initialisiere dann
-            function loadMqttAndInit() {{
-                const script = document.createElement('script');
-                script.src = 'http://' + window.location.hostname + ':8601/sidekick-thirdparty-libraries/mqtt/mqtt.min.js';
-                script.onload = function() {{
-                    console.log('MQTT.js geladen');
-                    initDashboard();
-                }};
-                script.onerror = function() {{
-                    console.error('MQTT.js konnte nicht geladen werden');
-                    document.getElementById('mqttStatusText').textContent = 'MQTT nicht verfügbar';
-                }};
-                document.head.appendChild(script);
-            }}
-            window.onload = loadMqttAndInit;
-        </script>
-        <script>
-            // Dynamische Host-Erkennung - funktioniert mit LAN und Hotspot!
-            const SIDEKICK_HOST = window.location.hostname;
-            const SCRATCH_PORT = {SCRATCH_PORT};
-            const KIOSK_PORT = {KIOSK_PORT};
-            const MQTT_PORT = 9001;
-            
-            let mqttClient = null;
-            
-            // Kiosk-Link wird oben beim Scratch-Link gesetzt
-            
-            function initDashboard() {{
-                connectMQTT();
-            }}
-            
-            function connectMQTT() {{
-                const statusDot = document.getElementById('mqttStatusDot');
-                const statusText = document.getElementById('mqttStatusText');
-                
-                // Dynamische MQTT-URL basierend auf aktuellem Host
-                const mqttUrl = 'ws://' + SIDEKICK_HOST + ':' + MQTT_PORT;
-                console.log('MQTT verbinden zu:', mqttUrl);
-                
-                mqttClient = mqtt.connect(mqttUrl, {{
-                    clientId: 'dashboard-' + Math.random().toString(16).substr(2, 8),
-                    clean: true,
-                    reconnectPeriod: 5000
-                }});
-                
-                mqttClient.on('connect', function() {{
-                    console.log('MQTT verbunden');
-                    statusDot.className = 'status-dot connected';
-                    statusText.textContent = 'Verbunden';
-                    
-                    // Status-Topic abonnieren
-                    mqttClient.subscribe('sidekick/display/state');
-                    
-                    // Status anfragen
-                    mqttClient.publish('sidekick/display/status', '');
-                }});
-                
-                mqttClient.on('error', function(err) {{
-                    console.error('MQTT Fehler:', err);
-                    statusDot.className = 'status-dot disconnected';
-                    statusText.textContent = 'Kein Kiosk-Display (MQTT nicht erreichbar)';
-                }});
-                
-                mqttClient.on('close', function() {{
-                    statusDot.className = 'status-dot disconnected';
-                    statusText.textContent = 'Kein Kiosk-Display verbunden';
-                }});
-                
-                mqttClient.on('message', function(topic, message) {{
-                    if (topic === 'sidekick/display/state') {{
-                        try {{
-                            const state = JSON.parse(message.toString());
-                            document.getElementById('currentProject').textContent = state.project || '-';
-                            document.getElementById('projectStatus').textContent = state.status || '-';
-                        }} catch(e) {{
-                            console.error('Status parse error:', e);
-                        }}
-                    }}
-                }});
-            }}
-            
-            function loadProjectOnDisplay() {{
-                const select = document.getElementById('projectSelect');
-                const projectName = select.value;
-                if (!projectName) {{
-                    alert('Bitte wähle ein Projekt aus!');
-                    return;
-                }}
-                if (mqttClient && mqttClient.connected) {{
-                    mqttClient.publish('sidekick/display/load', projectName);
-                    console.log('Lade Projekt:', projectName);
-                }} else {{
-                    alert('Nicht mit MQTT verbunden!');
-                }}
-            }}
-            
-            function startProject() {{
-                if (mqttClient && mqttClient.connected) {{
-                    mqttClient.publish('sidekick/display/start', '');
-                    console.log('Start gesendet');
-                }} else {{
-                    alert('Nicht mit MQTT verbunden!');
-                }}
-            }}
-            
-            function stopProject() {{
-                if (mqttClient && mqttClient.connected) {{
-                    mqttClient.publish('sidekick/display/stop', '');
-                    console.log('Stop gesendet');
-                }} else {{
-                    alert('Nicht mit MQTT verbunden!');
-                }}
-            }}
-            
-            function toggleFullscreen() {{
-                if (mqttClient && mqttClient.connected) {{
-                    mqttClient.publish('sidekick/display/fullscreen', 'toggle');
-                    console.log('Fullscreen-Toggle gesendet');
-                }} else {{
-                    alert('Nicht mit MQTT verbunden!');
-                }}
-            }}
-            
-            // MQTT wird jetzt über initDashboard() gestartet (nach mqtt.js Laden)
-            
-            // Rename field functions
-            function showRenameField(type) {{
-                const fileInput = document.getElementById(type + 'FileInput');
-                const renameRow = document.getElementById(type + 'RenameRow');
-                const nameInput = document.getElementById(type + 'NameInput');
-                
-                if (fileInput.files.length > 0) {{
-                    const fullName = fileInput.files[0].name;
-                    const lastDot = fullName.lastIndexOf('.');
-                    const baseName = lastDot > 0 ? fullName.substring(0, lastDot) : fullName;
-                    const ext = lastDot > 0 ? fullName.substring(lastDot) : '';
-                    
-                    nameInput.value = baseName;
-                    renameRow.classList.add('visible');
-                    
-                    // Update extension label for videos
-                    if (type === 'video') {{
-                        document.getElementById('videoExtLabel').textContent = ext;
-                    }}
-                }} else {{
-                    renameRow.classList.remove('visible');
-                }}
-            }}
-            
-            // Rename existing file
-            function renameFile(type, oldName) {{
-                const lastDot = oldName.lastIndexOf('.');
-                const baseName = lastDot > 0 ? oldName.substring(0, lastDot) : oldName;
-                const ext = lastDot > 0 ? oldName.substring(lastDot) : '';
-                
-                const newBaseName = prompt('Neuer Name für "' + oldName + '":', baseName);
-                if (newBaseName && newBaseName !== baseName) {{
-                    const newName = newBaseName + ext;
-                    window.location.href = '/rename-' + type + '?old=' + encodeURIComponent(oldName) + '&new=' + encodeURIComponent(newName);
-                }}
-            }}
-        </script>
-        '''
-        
-        html += '<div class="grid">'
-        
-        # Video Upload Card mit Codec-Warnung
-        html += '''
+        """
+
+# Upload-Karten (Video mit Codec-Warnung, Projekt)
+UPLOAD_CARDS = """<div class="grid">
         <div class="card">
             <h2>🎞️ Video hochladen</h2>
             <form class="upload-form" action="/upload-video" method="post" enctype="multipart/form-data" id="videoUploadForm">
@@ -881,135 +281,6 @@ class DashboardHandler(BaseHTTPRequestHandler):
             </p>
         </div>
         
-        <style>
-            .video-warning {
-                display: flex;
-                gap: 15px;
-                padding: 15px;
-                background: rgba(231, 76, 60, 0.2);
-                border: 2px solid #e74c3c;
-                border-radius: 10px;
-                color: #ff6b6b;
-            }
-            .video-warning .warning-icon { font-size: 2em; }
-            .video-warning .warning-text { flex: 1; }
-            .video-info {
-                padding: 15px;
-                background: rgba(52, 152, 219, 0.2);
-                border: 1px solid #3498db;
-                border-radius: 10px;
-                color: #5dade2;
-                font-size: 0.9em;
-            }
-            .video-ok {
-                background: rgba(14, 157, 89, 0.2) !important;
-                border-color: #0E9D59 !important;
-                color: #0E9D59 !important;
-            }
-        </style>
-        
-        <script>
-            async function checkVideoFile() {
-                const fileInput = document.getElementById('videoFileInput');
-                const warningDiv = document.getElementById('videoWarning');
-                const warningMsg = document.getElementById('warningMessage');
-                const infoDiv = document.getElementById('videoInfo');
-                const detailsSpan = document.getElementById('videoDetails');
-                const submitBtn = document.getElementById('videoSubmitBtn');
-                
-                // Reset
-                warningDiv.style.display = 'none';
-                infoDiv.style.display = 'none';
-                submitBtn.textContent = 'Video hochladen';
-                
-                if (!fileInput.files.length) return;
-                
-                const file = fileInput.files[0];
-                showRenameField('video');
-                
-                // Dateigroesse pruefen
-                const sizeMB = file.size / (1024 * 1024);
-                const warnings = [];
-                const infos = [];
-                
-                infos.push('Datei: ' + file.name);
-                infos.push('Größe: ' + sizeMB.toFixed(1) + ' MB');
-                
-                if (sizeMB > 100) {
-                    warnings.push('⚠️ Datei ist sehr groß (' + sizeMB.toFixed(0) + ' MB). Empfohlen: max. 50MB');
-                } else if (sizeMB > 50) {
-                    warnings.push('⚠️ Datei ist relativ groß (' + sizeMB.toFixed(0) + ' MB). Empfohlen: max. 50MB');
-                }
-                
-                // Video in temporaeres Element laden um Metadaten zu pruefen
-                try {
-                    const videoUrl = URL.createObjectURL(file);
-                    const video = document.createElement('video');
-                    video.preload = 'metadata';
-                    
-                    await new Promise((resolve, reject) => {
-                        video.onloadedmetadata = resolve;
-                        video.onerror = () => reject(new Error('Video konnte nicht geladen werden'));
-                        setTimeout(() => reject(new Error('Timeout')), 10000);
-                        video.src = videoUrl;
-                    });
-                    
-                    const width = video.videoWidth;
-                    const height = video.videoHeight;
-                    const duration = video.duration;
-                    
-                    infos.push('Auflösung: ' + width + 'x' + height);
-                    infos.push('Länge: ' + Math.floor(duration/60) + ':' + String(Math.floor(duration%60)).padStart(2,'0'));
-                    
-                    // Aufloesung pruefen
-                    if (width > 1920 || height > 1080) {
-                        warnings.push('⚠️ Auflösung (' + width + 'x' + height + ') ist höher als 1080p. Kann ruckeln!');
-                    }
-                    
-                    // Codec-Erkennung (leider eingeschränkt in JavaScript)
-                    // Wir können nur pruefen ob der Browser es abspielen kann
-                    const canPlay = video.canPlayType(file.type);
-                    
-                    // HEVC-Warnung basierend auf Dateiendung und typischen Merkmalen
-                    const ext = file.name.split('.').pop().toLowerCase();
-                    if (ext === 'mkv' || ext === 'mov') {
-                        warnings.push('⚠️ ' + ext.toUpperCase() + '-Dateien können HEVC-kodiert sein. Falls das Video nicht abspielt, bitte zu H.264 konvertieren.');
-                    }
-                    
-                    URL.revokeObjectURL(videoUrl);
-                    
-                } catch (e) {
-                    warnings.push('⚠️ Video-Metadaten konnten nicht gelesen werden. Möglicherweise inkompatibles Format!');
-                    console.error('Video check error:', e);
-                }
-                
-                // Info anzeigen
-                if (infos.length > 0) {
-                    detailsSpan.innerHTML = infos.join('<br>');
-                    infoDiv.style.display = 'block';
-                    if (warnings.length === 0) {
-                        infoDiv.classList.add('video-ok');
-                        detailsSpan.innerHTML += '<br>✅ Video sieht kompatibel aus!';
-                    } else {
-                        infoDiv.classList.remove('video-ok');
-                    }
-                }
-                
-                // Warnungen anzeigen
-                if (warnings.length > 0) {
-                    warningMsg.innerHTML = warnings.join('<br><br>');
-                    warningDiv.style.display = 'flex';
-                    submitBtn.textContent = '⚠️ Trotzdem hochladen';
-                    
-                    // HEVC-Konvertierungstipp hinzufuegen
-                    warningMsg.innerHTML += '<br><br><small style="color: #aaa;">💡 Tipp: Mit ffmpeg konvertieren:<br><code style="background: rgba(0,0,0,0.3); padding: 5px; border-radius: 4px; font-size: 0.8em;">ffmpeg -i video.mp4 -c:v libx264 -crf 23 -vf "scale=1920:1080" video_h264.mp4</code></small>';
-                }
-            }
-        </script>
-        '''
-        
-        # Project Upload Card
-        html += '''
         <div class="card">
             <h2>📁 Projekt hochladen</h2>
             <form class="upload-form" action="/upload-project" method="post" enctype="multipart/form-data" id="projectUploadForm">
@@ -1025,84 +296,34 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 Unterstützte Formate: SB3 (Scratch 3.0 Projekte)
             </p>
         </div>
-        '''
-        
-        html += '</div>'  # End grid
-        
-        # Videos List
-        html += '<div class="card">'
-        html += '<h2>🎞️ Video-Liste</h2>'
-        
-        videos = update_video_list()
-        if videos:
-            html += '<table><tr><th>Dateiname</th><th>Größe</th><th>Aktionen</th></tr>'
-            for video in videos:
-                filepath = VIDEOS_DIR / video
-                size = get_file_size_str(filepath.stat().st_size) if filepath.exists() else '?'
-                escaped_name = html_module.escape(video)
-                url_name = urllib.parse.quote(video)
-                # Verwende data-path für dynamische URL-Generierung
-                html += f'''<tr>
-                    <td>{escaped_name}</td>
+        </div>"""
+
+TABLE_START = '<table><thead><tr><th>Dateiname</th><th>Größe</th><th>Aktionen</th></tr></thead><tbody id="{file_type}Rows">'
+
+VIDEO_ROW_TEMPLATE = """<tr>
+                    <td>{name}</td>
                     <td>{size}</td>
                     <td class="actions">
-                        <button class="btn btn-rename" onclick="renameFile('video', '{escaped_name}')" title="Umbenennen">✏️</button>
+                        <button class="btn btn-rename" onclick="renameFile('video', '{name}')" title="Umbenennen">✏️</button>
                         <a href="#" onclick="openVideoLink('{url_name}'); return false;" class="btn btn-secondary" style="padding: 8px 15px;">▶️ Abspielen</a>
                         <a href="/delete-video?file={url_name}" class="btn btn-danger" style="padding: 8px 15px;" onclick="return confirm('Wirklich löschen?')">🗑️ Löschen</a>
                     </td>
-                </tr>'''
-            html += '</table>'
-            html += f'''
-            <script>
-                function openVideoLink(filename) {{
-                    const url = 'http://' + window.location.hostname + ':{SCRATCH_PORT}/videos/' + filename;
-                    window.open(url, '_blank');
-                }}
-            </script>
-            '''
-        else:
-            html += '<div class="empty-state">Keine Videos vorhanden.<br>Lade ein Video hoch um zu beginnen!</div>'
-        
-        html += '</div>'
-        
-        # Projects List
-        html += '<div class="card">'
-        html += '<h2>📁 Projekt-Liste</h2>'
-        
-        projects = sorted([f.name for f in PROJECTS_DIR.iterdir() if f.suffix.lower() in PROJECT_EXTENSIONS])
-        if projects:
-            html += '<table><tr><th>Dateiname</th><th>Größe</th><th>Aktionen</th></tr>'
-            for project in projects:
-                filepath = PROJECTS_DIR / project
-                size = get_file_size_str(filepath.stat().st_size) if filepath.exists() else '?'
-                escaped_name = html_module.escape(project)
-                url_name = urllib.parse.quote(project)
-                # Verwende onclick für dynamische URL
-                html += f'''<tr>
-                    <td>{escaped_name}</td>
+                </tr>"""
+
+PROJECT_ROW_TEMPLATE = """<tr>
+                    <td>{name}</td>
                     <td>{size}</td>
                     <td class="actions">
-                        <button class="btn btn-rename" onclick="renameFile('project', '{escaped_name}')" title="Umbenennen">✏️</button>
+                        <button class="btn btn-rename" onclick="renameFile('project', '{name}')" title="Umbenennen">✏️</button>
                         <a href="#" onclick="downloadProject('{url_name}'); return false;" class="btn btn-secondary" style="padding: 8px 15px;">💾 Download</a>
                         <a href="/delete-project?file={url_name}" class="btn btn-danger" style="padding: 8px 15px;" onclick="return confirm('Wirklich löschen?')">🗑️ Löschen</a>
                     </td>
-                </tr>'''
-            html += '</table>'
-            html += f'''
-            <script>
-                function downloadProject(filename) {{
-                    const url = 'http://' + window.location.hostname + ':{SCRATCH_PORT}/projects/' + filename;
-                    window.location.href = url;
-                }}
-            </script>
-            '''
-        else:
-            html += '<div class="empty-state">Keine Projekte vorhanden.<br>Lade ein Scratch-Projekt (.sb3) hoch!</div>'
-        
-        html += '</div>'
-        
-        # Info Card - dynamisch
-        html += f'''
+                </tr>"""
+
+LOAD_MORE_TEMPLATE = '<button class="btn btn-secondary load-more" id="{file_type}More" data-cursor="{cursor}" onclick="loadMore(\'{file_type}\')">⬇️ {label}</button>'
+
+# Info Card - Links werden per JS an den aktuellen Host angepasst
+INFO_CARD_TEMPLATE = """
         <div class="card">
             <h2>ℹ️ Verbindung</h2>
             <p style="color: #0E9D59; margin-bottom: 15px;">
@@ -1114,38 +335,1542 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 <tr><td><strong>Kiosk-Display:</strong></td><td><a href="#" id="infoKioskLink" target="_blank">...</a></td></tr>
                 <tr><td><strong>SIDEKICK-Dashboard:</strong></td><td><span id="infoDashboardLink">...</span></td></tr>
                 <tr><td><strong>MQTT-Broker:</strong></td><td><span id="infoMqttLink">...</span></td></tr>
-                <tr><td><strong>Videos-Ordner:</strong></td><td>{VIDEOS_DIR}</td></tr>
-                <tr><td><strong>Projekte-Ordner:</strong></td><td>{PROJECTS_DIR}</td></tr>
+                <tr><td><strong>Videos-Ordner:</strong></td><td>{videos_dir}</td></tr>
+                <tr><td><strong>Projekte-Ordner:</strong></td><td>{projects_dir}</td></tr>
             </table>
         </div>
         
-        <script>
-            // Info-Card Links dynamisch setzen
-            document.addEventListener('DOMContentLoaded', function() {{
-                const host = window.location.hostname;
-                document.getElementById('currentHost').textContent = host;
-                
-                const scratchUrl = 'http://' + host + ':{SCRATCH_PORT}/';
-                document.getElementById('infoScratchLink').href = scratchUrl;
-                document.getElementById('infoScratchLink').textContent = scratchUrl;
-                
-                const kioskUrl = 'http://' + host + ':{KIOSK_PORT}/kiosk.html';
-                document.getElementById('infoKioskLink').href = kioskUrl;
-                document.getElementById('infoKioskLink').textContent = kioskUrl;
-                
-                document.getElementById('infoDashboardLink').textContent = 'http://' + host + ':{DASHBOARD_PORT}/';
-                document.getElementById('infoMqttLink').textContent = 'ws://' + host + ':9001';
+        """
+
+# Statische Assets - werden einmalig erzeugt und mit langer max-age ausgeliefert
+# (siehe build_static_assets()). Die URLs enthalten einen Inhalts-Hash, damit
+# Browser nach einem Update trotzdem die neue Version laden.
+DASHBOARD_CSS = """* { box-sizing: border-box; }
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    margin: 0;
+    padding: 20px;
+    background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+    min-height: 100vh;
+    color: #eee;
+}
+.container { max-width: 1200px; margin: 0 auto; }
+h1 {
+    color: #0E9D59;
+    text-align: center;
+    margin-bottom: 30px;
+    font-size: 2.5em;
+}
+h2 {
+    color: #0E9D59;
+    border-bottom: 2px solid #0E9D59;
+    padding-bottom: 10px;
+}
+.card {
+    background: rgba(255,255,255,0.1);
+    border-radius: 15px;
+    padding: 25px;
+    margin-bottom: 25px;
+    backdrop-filter: blur(10px);
+}
+.grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
+.upload-form {
+    display: flex;
+    flex-direction: column;
+    gap: 15px;
+}
+input[type="file"] {
+    padding: 15px;
+    border: 2px dashed #0E9D59;
+    border-radius: 10px;
+    background: rgba(14, 157, 89, 0.1);
+    color: #eee;
+    cursor: pointer;
+}
+input[type="file"]:hover {
+    background: rgba(14, 157, 89, 0.2);
+}
+button, .btn {
+    background: #0E9D59;
+    color: white;
+    border: none;
+    padding: 15px 25px;
+    border-radius: 10px;
+    cursor: pointer;
+    font-size: 1em;
+    font-weight: bold;
+    text-decoration: none;
+    display: inline-block;
+    text-align: center;
+    transition: all 0.3s;
+}
+button:hover, .btn:hover {
+    background: #0c8a4e;
+    transform: translateY(-2px);
+}
+.btn-danger { background: #e74c3c; }
+.btn-danger:hover { background: #c0392b; }
+.btn-secondary { background: #3498db; }
+.btn-secondary:hover { background: #2980b9; }
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin-top: 15px;
+}
+th, td {
+    padding: 12px 15px;
+    text-align: left;
+    border-bottom: 1px solid rgba(255,255,255,0.1);
+}
+th { color: #0E9D59; font-weight: bold; }
+tr:hover { background: rgba(255,255,255,0.05); }
+.actions { display: flex; gap: 10px; }
+.load-more { display: block; margin: 15px auto 0; }
+.status { padding: 15px; border-radius: 10px; margin-bottom: 20px; }
+.status-success { background: rgba(14, 157, 89, 0.3); border: 1px solid #0E9D59; }
+.status-error { background: rgba(231, 76, 60, 0.3); border: 1px solid #e74c3c; }
+.import-status { background: rgba(52, 152, 219, 0.3); border: 1px solid #3498db; }
+.scratch-link {
+    display: block;
+    text-align: center;
+    padding: 20px;
+    background: linear-gradient(135deg, #0E9D59, #0c8a4e);
+    border-radius: 15px;
+    color: white;
+    text-decoration: none;
+    font-size: 1.3em;
+    font-weight: bold;
+    margin-bottom: 25px;
+    transition: all 0.3s;
+}
+.scratch-link:hover {
+    transform: scale(1.02);
+    box-shadow: 0 10px 30px rgba(14, 157, 89, 0.4);
+}
+.empty-state {
+    text-align: center;
+    padding: 40px;
+    color: #888;
+}
+/* Display Control Styles */
+.display-control {
+    display: flex;
+    flex-direction: column;
+    gap: 15px;
+}
+.display-status {
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    padding: 15px;
+    background: rgba(0,0,0,0.3);
+    border-radius: 10px;
+}
+.status-dot {
+    width: 12px;
+    height: 12px;
+    border-radius: 50%;
+    background: #888;
+}
+.status-dot.connected { background: #4CAF50; box-shadow: 0 0 10px #4CAF50; }
+.status-dot.disconnected { background: #ff9800; animation: pulse 1.5s infinite; }
+.control-buttons {
+    display: flex;
+    gap: 10px;
+    flex-wrap: wrap;
+}
+.btn-start { background: #4CAF50; }
+.btn-start:hover { background: #45a049; }
+.btn-stop { background: #f44336; }
+.btn-stop:hover { background: #da190b; }
+.btn-display { background: #9c27b0; }
+.btn-display:hover { background: #7b1fa2; }
+.project-select {
+    padding: 12px;
+    border-radius: 10px;
+    border: 2px solid #0E9D59;
+    background: rgba(14, 157, 89, 0.1);
+    color: #eee;
+    font-size: 1em;
+    cursor: pointer;
+}
+.project-select option { background: #1a1a2e; }
+/* Rename input styling */
+.rename-row {
+    display: none;
+    align-items: center;
+    gap: 10px;
+    margin-top: 10px;
+    padding: 10px;
+    background: rgba(14, 157, 89, 0.15);
+    border-radius: 8px;
+}
+.rename-row.visible { display: flex; }
+.rename-row label { color: #0E9D59; font-weight: bold; white-space: nowrap; }
+.rename-input {
+    flex: 1;
+    padding: 10px;
+    border: 2px solid #0E9D59;
+    border-radius: 8px;
+    background: rgba(0,0,0,0.3);
+    color: #eee;
+    font-size: 1em;
+}
+.rename-input:focus { outline: none; box-shadow: 0 0 10px rgba(14, 157, 89, 0.5); }
+.extension-label { color: #888; font-weight: bold; }
+.btn-rename {
+    background: #f39c12;
+    padding: 8px 12px !important;
+    font-size: 0.9em;
+}
+.btn-rename:hover { background: #d68910; }
+@keyframes pulse {
+    0%, 100% { opacity: 1; }
+    50% { opacity: 0.5; }
+}
+@media (max-width: 600px) {
+    .grid { grid-template-columns: 1fr; }
+    h1 { font-size: 1.8em; }
+}
+.video-warning {
+    display: flex;
+    gap: 15px;
+    padding: 15px;
+    background: rgba(231, 76, 60, 0.2);
+    border: 2px solid #e74c3c;
+    border-radius: 10px;
+    color: #ff6b6b;
+}
+.video-warning .warning-icon { font-size: 2em; }
+.video-warning .warning-text { flex: 1; }
+.video-info {
+    padding: 15px;
+    background: rgba(52, 152, 219, 0.2);
+    border: 1px solid #3498db;
+    border-radius: 10px;
+    color: #5dade2;
+    font-size: 0.9em;
+}
+.video-ok {
+    background: rgba(14, 157, 89, 0.2) !important;
+    border-color: #0E9D59 !important;
+    color: #0E9D59 !important;
+}
+"""
+
+# Die Ports ({SCRATCH_PORT}, ...) werden per str.format() eingesetzt,
+# geschweifte Klammern im JavaScript sind deshalb verdoppelt
+DASHBOARD_JS_TEMPLATE = """// Scratch-Link und Kiosk-Link dynamisch setzen beim Laden
+document.addEventListener('DOMContentLoaded', function() {{
+    const host = window.location.hostname;
+    const scratchLink = document.getElementById('scratchLink');
+    if (scratchLink) {{
+        scratchLink.href = 'http://' + host + ':{SCRATCH_PORT}/';
+    }}
+    const kioskLinkTop = document.getElementById('kioskLinkTop');
+    if (kioskLinkTop) {{
+        kioskLinkTop.href = 'http://' + host + ':{KIOSK_PORT}/kiosk.html';
+    }}
+}});
+
+// Warte auf mqtt.js und initialisiere dann
+function loadMqttAndInit() {{
+    const script = document.createElement('script');
+    script.src = 'http://' + window.location.hostname + ':8601/sidekick-thirdparty-libraries/mqtt/mqtt.min.js';
+    script.onload = function() {{
+        console.log('MQTT.js geladen');
+        initDashboard();
+    }};
+    script.onerror = function() {{
+        console.error('MQTT.js konnte nicht geladen werden');
+        document.getElementById('mqttStatusText').textContent = 'MQTT nicht verfügbar';
+    }};
+    document.head.appendChild(script);
+}}
+window.onload = loadMqttAndInit;
+
+// Dynamische Host-Erkennung - funktioniert mit LAN und Hotspot!
+const SIDEKICK_HOST = window.location.hostname;
+const SCRATCH_PORT = {SCRATCH_PORT};
+const KIOSK_PORT = {KIOSK_PORT};
+const MQTT_PORT = 9001;
+
+let mqttClient = null;
+
+// Kiosk-Link wird oben beim Scratch-Link gesetzt
+
+function initDashboard() {{
+    connectMQTT();
+}}
+
+function connectMQTT() {{
+    const statusDot = document.getElementById('mqttStatusDot');
+    const statusText = document.getElementById('mqttStatusText');
+
+    // Dynamische MQTT-URL basierend auf aktuellem Host
+    const mqttUrl = 'ws://' + SIDEKICK_HOST + ':' + MQTT_PORT;
+    console.log('MQTT verbinden zu:', mqttUrl);
+
+    mqttClient = mqtt.connect(mqttUrl, {{
+        clientId: 'dashboard-' + Math.random().toString(16).substr(2, 8),
+        clean: true,
+        reconnectPeriod: 5000
+    }});
+
+    mqttClient.on('connect', function() {{
+        console.log('MQTT verbunden');
+        statusDot.className = 'status-dot connected';
+        statusText.textContent = 'Verbunden';
+
+        // Status-Topic abonnieren
+        mqttClient.subscribe('sidekick/display/state');
+        mqttClient.subscribe('sidekick/import/progress');
+
+        // Status anfragen
+        mqttClient.publish('sidekick/display/status', '');
+    }});
+
+    mqttClient.on('error', function(err) {{
+        console.error('MQTT Fehler:', err);
+        statusDot.className = 'status-dot disconnected';
+        statusText.textContent = 'Kein Kiosk-Display (MQTT nicht erreichbar)';
+    }});
+
+    mqttClient.on('close', function() {{
+        statusDot.className = 'status-dot disconnected';
+        statusText.textContent = 'Kein Kiosk-Display verbunden';
+    }});
+
+    mqttClient.on('message', function(topic, message) {{
+        if (topic === 'sidekick/import/progress') {{
+            try {{
+                showImportProgress(JSON.parse(message.toString()));
+            }} catch(e) {{
+                console.error('Import-Status parse error:', e);
+            }}
+        }} else if (topic === 'sidekick/display/state') {{
+            try {{
+                const state = JSON.parse(message.toString());
+                document.getElementById('currentProject').textContent = state.project || '-';
+                document.getElementById('projectStatus').textContent = state.status || '-';
+            }} catch(e) {{
+                console.error('Status parse error:', e);
+            }}
+        }}
+    }});
+}}
+
+function loadProjectOnDisplay() {{
+    const select = document.getElementById('projectSelect');
+    const projectName = select.value;
+    if (!projectName) {{
+        alert('Bitte wähle ein Projekt aus!');
+        return;
+    }}
+    if (mqttClient && mqttClient.connected) {{
+        mqttClient.publish('sidekick/display/load', projectName);
+        console.log('Lade Projekt:', projectName);
+    }} else {{
+        alert('Nicht mit MQTT verbunden!');
+    }}
+}}
+
+function startProject() {{
+    if (mqttClient && mqttClient.connected) {{
+        mqttClient.publish('sidekick/display/start', '');
+        console.log('Start gesendet');
+    }} else {{
+        alert('Nicht mit MQTT verbunden!');
+    }}
+}}
+
+function stopProject() {{
+    if (mqttClient && mqttClient.connected) {{
+        mqttClient.publish('sidekick/display/stop', '');
+        console.log('Stop gesendet');
+    }} else {{
+        alert('Nicht mit MQTT verbunden!');
+    }}
+}}
+
+function toggleFullscreen() {{
+    if (mqttClient && mqttClient.connected) {{
+        mqttClient.publish('sidekick/display/fullscreen', 'toggle');
+        console.log('Fullscreen-Toggle gesendet');
+    }} else {{
+        alert('Nicht mit MQTT verbunden!');
+    }}
+}}
+
+// MQTT wird jetzt über initDashboard() gestartet (nach mqtt.js Laden)
+
+// Rename field functions
+function showRenameField(type) {{
+    const fileInput = document.getElementById(type + 'FileInput');
+    const renameRow = document.getElementById(type + 'RenameRow');
+    const nameInput = document.getElementById(type + 'NameInput');
+
+    if (fileInput.files.length > 0) {{
+        const fullName = fileInput.files[0].name;
+        const lastDot = fullName.lastIndexOf('.');
+        const baseName = lastDot > 0 ? fullName.substring(0, lastDot) : fullName;
+        const ext = lastDot > 0 ? fullName.substring(lastDot) : '';
+
+        nameInput.value = baseName;
+        renameRow.classList.add('visible');
+
+        // Update extension label for videos
+        if (type === 'video') {{
+            document.getElementById('videoExtLabel').textContent = ext;
+        }}
+    }} else {{
+        renameRow.classList.remove('visible');
+    }}
+}}
+
+// Rename existing file
+function renameFile(type, oldName) {{
+    const lastDot = oldName.lastIndexOf('.');
+    const baseName = lastDot > 0 ? oldName.substring(0, lastDot) : oldName;
+    const ext = lastDot > 0 ? oldName.substring(lastDot) : '';
+
+    const newBaseName = prompt('Neuer Name für "' + oldName + '":', baseName);
+    if (newBaseName && newBaseName !== baseName) {{
+        const newName = newBaseName + ext;
+        window.location.href = '/rename-' + type + '?old=' + encodeURIComponent(oldName) + '&new=' + encodeURIComponent(newName);
+    }}
+}}
+
+async function checkVideoFile() {{
+    const fileInput = document.getElementById('videoFileInput');
+    const warningDiv = document.getElementById('videoWarning');
+    const warningMsg = document.getElementById('warningMessage');
+    const infoDiv = document.getElementById('videoInfo');
+    const detailsSpan = document.getElementById('videoDetails');
+    const submitBtn = document.getElementById('videoSubmitBtn');
+
+    // Reset
+    warningDiv.style.display = 'none';
+    infoDiv.style.display = 'none';
+    submitBtn.textContent = 'Video hochladen';
+
+    if (!fileInput.files.length) return;
+
+    const file = fileInput.files[0];
+    showRenameField('video');
+
+    // Dateigroesse pruefen
+    const sizeMB = file.size / (1024 * 1024);
+    const warnings = [];
+    const infos = [];
+
+    infos.push('Datei: ' + file.name);
+    infos.push('Größe: ' + sizeMB.toFixed(1) + ' MB');
+
+    if (sizeMB > 100) {{
+        warnings.push('⚠️ Datei ist sehr groß (' + sizeMB.toFixed(0) + ' MB). Empfohlen: max. 50MB');
+    }} else if (sizeMB > 50) {{
+        warnings.push('⚠️ Datei ist relativ groß (' + sizeMB.toFixed(0) + ' MB). Empfohlen: max. 50MB');
+    }}
+
+    // Video in temporaeres Element laden um Metadaten zu pruefen
+    try {{
+        const videoUrl = URL.createObjectURL(file);
+        const video = document.createElement('video');
+        video.preload = 'metadata';
+
+        await new Promise((resolve, reject) => {{
+            video.onloadedmetadata = resolve;
+            video.onerror = () => reject(new Error('Video konnte nicht geladen werden'));
+            setTimeout(() => reject(new Error('Timeout')), 10000);
+            video.src = videoUrl;
+        }});
+
+        const width = video.videoWidth;
+        const height = video.videoHeight;
+        const duration = video.duration;
+
+        infos.push('Auflösung: ' + width + 'x' + height);
+        infos.push('Länge: ' + Math.floor(duration/60) + ':' + String(Math.floor(duration%60)).padStart(2,'0'));
+
+        // Aufloesung pruefen
+        if (width > 1920 || height > 1080) {{
+            warnings.push('⚠️ Auflösung (' + width + 'x' + height + ') ist höher als 1080p. Kann ruckeln!');
+        }}
+
+        // Codec-Erkennung (leider eingeschränkt in JavaScript)
+        // Wir können nur pruefen ob der Browser es abspielen kann
+        const canPlay = video.canPlayType(file.type);
+
+        // HEVC-Warnung basierend auf Dateiendung und typischen Merkmalen
+        const ext = file.name.split('.').pop().toLowerCase();
+        if (ext === 'mkv' || ext === 'mov') {{
+            warnings.push('⚠️ ' + ext.toUpperCase() + '-Dateien können HEVC-kodiert sein. Falls das Video nicht abspielt, bitte zu H.264 konvertieren.');
+        }}
+
+        URL.revokeObjectURL(videoUrl);
+
+    }} catch (e) {{
+        warnings.push('⚠️ Video-Metadaten konnten nicht gelesen werden. Möglicherweise inkompatibles Format!');
+        console.error('Video check error:', e);
+    }}
+
+    // Info anzeigen
+    if (infos.length > 0) {{
+        detailsSpan.innerHTML = infos.join('<br>');
+        infoDiv.style.display = 'block';
+        if (warnings.length === 0) {{
+            infoDiv.classList.add('video-ok');
+            detailsSpan.innerHTML += '<br>✅ Video sieht kompatibel aus!';
+        }} else {{
+            infoDiv.classList.remove('video-ok');
+        }}
+    }}
+
+    // Warnungen anzeigen
+    if (warnings.length > 0) {{
+        warningMsg.innerHTML = warnings.join('<br><br>');
+        warningDiv.style.display = 'flex';
+        submitBtn.textContent = '⚠️ Trotzdem hochladen';
+
+        // HEVC-Konvertierungstipp hinzufuegen
+        warningMsg.innerHTML += '<br><br><small style="color: #aaa;">💡 Tipp: Mit ffmpeg konvertieren:<br><code style="background: rgba(0,0,0,0.3); padding: 5px; border-radius: 4px; font-size: 0.8em;">ffmpeg -i video.mp4 -c:v libx264 -crf 23 -vf "scale=1920:1080" video_h264.mp4</code></small>';
+    }}
+}}
+
+// Videos und Projekte liefert das Dashboard selbst aus (mit Range-Unterstützung)
+function openVideoLink(filename) {{
+    window.open('/videos/' + filename, '_blank');
+}}
+
+function downloadProject(filename) {{
+    window.location.href = '/projects/' + filename;
+}}
+
+// Fortsetzbarer Upload für große Dateien: Teile mit Offset senden, nach
+// einem Abbruch nur die fehlenden Bereiche erneut übertragen
+const RESUMABLE_MIN_SIZE = 8 * 1024 * 1024;
+const RESUMABLE_CHUNK_SIZE = 4 * 1024 * 1024;
+
+function sleep(ms) {{
+    return new Promise(resolve => setTimeout(resolve, ms));
+}}
+
+async function uploadJson(method, url, body) {{
+    const response = await fetch(url, {{
+        method: method,
+        headers: body ? {{'Content-Type': 'application/json'}} : {{}},
+        body: body ? JSON.stringify(body) : undefined
+    }});
+    const data = await response.json();
+    if (!response.ok) {{
+        const err = new Error(data.error || ('HTTP ' + response.status));
+        err.status = response.status;
+        err.data = data;
+        throw err;
+    }}
+    return data;
+}}
+
+async function resumableUpload(type, form) {{
+    const file = form.querySelector('input[type=file]').files[0];
+    const button = form.querySelector('button[type=submit]');
+    const customName = form.querySelector('input[name=customName]').value;
+    // Session-ID merken, damit auch ein Neuladen der Seite fortsetzen kann
+    const key = 'sidekick-upload:' + type + ':' + file.name + ':' + file.size + ':' + file.lastModified;
+
+    let session = null;
+    const savedId = localStorage.getItem(key);
+    if (savedId) {{
+        try {{
+            session = await uploadJson('GET', '/api/uploads/' + savedId);
+        }} catch (err) {{
+            session = null;
+        }}
+    }}
+    if (!session) {{
+        session = await uploadJson('POST', '/api/uploads',
+            {{type: type, filename: file.name, size: file.size, customName: customName}});
+        localStorage.setItem(key, session.id);
+    }}
+
+    let failures = 0;
+    while (session.missing.length) {{
+        const start = session.missing[0][0];
+        const end = Math.min(session.missing[0][1], start + RESUMABLE_CHUNK_SIZE);
+        button.textContent = 'Hochladen... ' + Math.floor(session.received * 100 / file.size) + '%';
+        try {{
+            const response = await fetch('/api/uploads/' + session.id, {{
+                method: 'PUT',
+                headers: {{'Content-Range': 'bytes ' + start + '-' + (end - 1) + '/' + file.size}},
+                body: file.slice(start, end)
+            }});
+            if (response.status === 404) throw new Error('Upload-Session nicht gefunden');
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            session = await response.json();
+            failures = 0;
+        }} catch (err) {{
+            if (err.message === 'Upload-Session nicht gefunden' || ++failures > 30) {{
+                localStorage.removeItem(key);
+                throw err;
+            }}
+            button.textContent = 'Verbindung unterbrochen - neuer Versuch...';
+            await sleep(Math.min(1000 * failures, 10000));
+            try {{
+                session = await uploadJson('GET', '/api/uploads/' + session.id);
+            }} catch (statusErr) {{
+                // Weiter mit dem bekannten Stand
+            }}
+        }}
+    }}
+
+    const result = await uploadJson('POST', '/api/uploads/' + session.id + '/finalize');
+    localStorage.removeItem(key);
+    return result.status;
+}}
+
+function initResumableForm(type) {{
+    const form = document.getElementById(type + 'UploadForm');
+    if (!form || !window.fetch || !window.localStorage) return;
+    form.addEventListener('submit', function(event) {{
+        const file = form.querySelector('input[type=file]').files[0];
+        if (!file || file.size < RESUMABLE_MIN_SIZE) return;  // Kleine Dateien wie bisher
+        event.preventDefault();
+        const button = form.querySelector('button[type=submit]');
+        button.disabled = true;
+        resumableUpload(type, form)
+            .then(status => {{ window.location.href = '/?status=' + status; }})
+            .catch(err => {{
+                console.error('Upload fehlgeschlagen:', err);
+                const status = (err.data && err.data.status) || 'error_upload';
+                window.location.href = '/?status=' + status;
             }});
-        </script>
-        '''
+    }});
+}}
+
+document.addEventListener('DOMContentLoaded', function() {{
+    initResumableForm('video');
+    initResumableForm('project');
+}});
+
+// Weitere Listeneinträge über die JSON-API nachladen
+function formatSize(bytes) {{
+    if (bytes < 1024) return bytes + ' B';
+    if (bytes < 1024 * 1024) return (bytes / 1024).toFixed(1) + ' KB';
+    if (bytes < 1024 * 1024 * 1024) return (bytes / (1024 * 1024)).toFixed(1) + ' MB';
+    return (bytes / (1024 * 1024 * 1024)).toFixed(2) + ' GB';
+}}
+
+function buildRow(type, item) {{
+    const row = document.createElement('tr');
+    const nameCell = document.createElement('td');
+    nameCell.textContent = item.name;
+    const sizeCell = document.createElement('td');
+    sizeCell.textContent = formatSize(item.size);
+    const actions = document.createElement('td');
+    actions.className = 'actions';
+
+    const renameBtn = document.createElement('button');
+    renameBtn.className = 'btn btn-rename';
+    renameBtn.title = 'Umbenennen';
+    renameBtn.textContent = '✏️';
+    renameBtn.onclick = () => renameFile(type, item.name);
+
+    const urlName = encodeURIComponent(item.name);
+    const openLink = document.createElement('a');
+    openLink.href = '#';
+    openLink.className = 'btn btn-secondary';
+    openLink.style.padding = '8px 15px';
+    if (type === 'video') {{
+        openLink.textContent = '▶️ Abspielen';
+        openLink.onclick = () => {{ openVideoLink(urlName); return false; }};
+    }} else {{
+        openLink.textContent = '💾 Download';
+        openLink.onclick = () => {{ downloadProject(urlName); return false; }};
+    }}
+
+    const deleteLink = document.createElement('a');
+    deleteLink.href = '/delete-' + type + '?file=' + urlName;
+    deleteLink.className = 'btn btn-danger';
+    deleteLink.style.padding = '8px 15px';
+    deleteLink.textContent = '🗑️ Löschen';
+    deleteLink.onclick = () => confirm('Wirklich löschen?');
+
+    actions.append(renameBtn, openLink, deleteLink);
+    row.append(nameCell, sizeCell, actions);
+    return row;
+}}
+
+function loadMore(type) {{
+    const button = document.getElementById(type + 'More');
+    const rows = document.getElementById(type + 'Rows');
+    button.disabled = true;
+    fetch('/api/' + type + 's?cursor=' + encodeURIComponent(button.dataset.cursor))
+        .then(response => {{
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            return response.json();
+        }})
+        .then(data => {{
+            data.items.forEach(item => rows.appendChild(buildRow(type, item)));
+            if (data.next_cursor) {{
+                button.dataset.cursor = data.next_cursor;
+                button.disabled = false;
+            }} else {{
+                button.remove();
+            }}
+        }})
+        .catch(err => {{
+            console.error('Nachladen fehlgeschlagen:', err);
+            button.disabled = false;
+        }});
+}}
+
+// USB-Import-Fortschritt (MQTT sidekick/import/progress bzw. /api/import)
+function formatDuration(seconds) {{
+    const minutes = Math.floor(seconds / 60);
+    return minutes + ':' + String(Math.floor(seconds % 60)).padStart(2, '0') + ' min';
+}}
+
+function showImportProgress(progress) {{
+    const box = document.getElementById('importStatus');
+    if (!box) return;
+    const recent = progress.updated && (Date.now() / 1000 - progress.updated) < 60;
+    let text = null;
+    box.className = 'status import-status';
+    if (progress.state === 'planning') {{
+        text = '📥 USB-Import: Prüfe Dateien auf dem USB-Stick … Stick nicht abziehen!';
+    }} else if (progress.state === 'copying') {{
+        const percent = progress.bytes_total ? Math.floor(progress.bytes_done * 100 / progress.bytes_total) : 0;
+        text = '📥 USB-Import läuft: ' + percent + ' % (' + formatSize(progress.bytes_done) + ' von ' + formatSize(progress.bytes_total) + ')';
+        if (progress.current && progress.current.length) text += ' – ' + progress.current.join(', ');
+        if (progress.throughput) text += ' – ' + formatSize(progress.throughput) + '/s';
+        if (progress.eta !== null && progress.eta !== undefined) text += ' – noch ' + formatDuration(progress.eta);
+        text += '. Stick nicht abziehen!';
+    }} else if (progress.state === 'done' && recent) {{
+        text = '✅ USB-Import abgeschlossen (' + progress.files_done + ' Dateien). Der Stick kann abgezogen werden.';
+        box.className = 'status status-success';
+    }} else if (progress.state === 'failed' && recent) {{
+        text = '❌ USB-Import mit Fehlern beendet – Details in IMPORT-ERGEBNIS.txt auf dem Stick.';
+        box.className = 'status status-error';
+    }}
+    box.textContent = text || '';
+    box.style.display = text ? 'block' : 'none';
+}}
+
+document.addEventListener('DOMContentLoaded', function() {{
+    fetch('/api/import')
+        .then(response => response.json())
+        .then(showImportProgress)
+        .catch(err => console.error('Import-Status nicht verfügbar:', err));
+}});
+
+// Info-Card Links dynamisch setzen
+document.addEventListener('DOMContentLoaded', function() {{
+    const host = window.location.hostname;
+    document.getElementById('currentHost').textContent = host;
+
+    const scratchUrl = 'http://' + host + ':{SCRATCH_PORT}/';
+    document.getElementById('infoScratchLink').href = scratchUrl;
+    document.getElementById('infoScratchLink').textContent = scratchUrl;
+
+    const kioskUrl = 'http://' + host + ':{KIOSK_PORT}/kiosk.html';
+    document.getElementById('infoKioskLink').href = kioskUrl;
+    document.getElementById('infoKioskLink').textContent = kioskUrl;
+
+    document.getElementById('infoDashboardLink').textContent = 'http://' + host + ':{DASHBOARD_PORT}/';
+    document.getElementById('infoMqttLink').textContent = 'ws://' + host + ':9001';
+}});
+"""
+
+# SIDEKICK Logo (grüner Blitz)
+SIDEKICK_LOGO_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1024 1024"><g transform="matrix(1.163134, 0, 0, 1.163081, -9.026044, -35.353489)"><g transform="matrix(0.832517, 0, 0, 0.832517, 75.024178, 82.846268)"><path d="M 0 348.179 L 337.63 761.13 L 382.994 761.13 L 403.081 786.592 L 460.382 786.592 L 484.09 761.13 L 535.023 761.13 L 896 348.179 L 895.567 320.246 L -0.1 319.935 L 0 348.179 Z" style="stroke-linecap: round; stroke-linejoin: round; stroke-width: 30px; stroke: rgb(146, 170, 121); fill: rgb(182, 213, 151);"></path><path d="M 1.148 319.517 L 337.913 731.409 L 383.161 731.409 L 403.196 756.806 L 460.35 756.806 L 483.997 731.409 L 534.8 731.409 L 894.852 319.517 L 729.435 144.945 L 169.763 144.945 L 1.148 319.517 Z" style="stroke-linecap: round; stroke-linejoin: round; stroke-width: 30px; fill: rgb(182, 213, 151); stroke: rgb(197, 221, 172);"></path></g><g transform="matrix(0.931649, 0, 0, 0.931649, 246.421875, 139.795685)"><path d="M 213.06900024414062 205.85000610351562 L 165.85699462890625 323.68701171875 L 242.62399291992188 274.6409912109375 L 225.3730010986328 366.1409912109375 L 137.7790069580078 452.10400390625 L 129 504.6759948730469 L 142.96299743652344 456.16400146484375 L 240.5070037841797 385.26300048828125 L 297.4649963378906 208.58200073242188 L 208.36099243164062 273.3800048828125 L 231.46200561523438 216.98800659179688 L 318.29998779296875 133.9759979248047 Z" style="fill-rule: nonzero; paint-order: stroke; stroke: rgb(197, 221, 172); stroke-width: 150.381px; stroke-linejoin: round; fill: rgb(197, 221, 172);"></path><path d="M 213.06900024414062 205.85000610351562 L 165.85699462890625 323.68701171875 L 242.62399291992188 274.6409912109375 L 225.3730010986328 366.1409912109375 L 137.7790069580078 452.10400390625 L 129 504.6759948730469 L 142.96299743652344 456.16400146484375 L 240.5070037841797 385.26300048828125 L 297.4649963378906 208.58200073242188 L 208.36099243164062 273.3800048828125 L 231.46200561523438 216.98800659179688 L 318.29998779296875 133.9759979248047 Z" style="fill-rule: nonzero; paint-order: stroke; stroke: rgb(255, 255, 255); stroke-width: 75.1906px; stroke-linejoin: round; fill: rgb(255, 255, 255);"></path><polygon style="fill-rule: nonzero; paint-order: stroke; fill: rgb(182, 213, 151); stroke-width: 75.1906px; stroke-linejoin: round;" points="213.069 205.85 165.857 323.687 242.624 274.641 225.373 366.141 137.779 452.104 129 504.676 142.963 456.164 240.507 385.263 297.465 208.582 208.361 273.38 231.462 216.988 318.3 133.976"></polygon></g></g></svg>'''
+
+
+# Erzeugte Assets: URL-Pfad -> (Inhalt, gzip-Inhalt, Content-Type, ETag)
+STATIC_ASSETS = {}
+# Versionierte URLs: 'css' / 'js' / 'logo' -> '/static/...?v=<hash>'
+STATIC_URLS = {}
+# Vorkodierte Byte-Segmente der Dashboard-Seite (siehe build_page_segments())
+PAGE_SEGMENTS = {}
+# Kennung dieses Server-Prozesses - die Index-Generationen beginnen nach
+# einem Neustart wieder bei 0 und dürfen keine alten ETags treffen
+SERVER_INSTANCE = os.urandom(4).hex()
+
+
+def build_static_assets():
+    """Erzeugt CSS, JS und Logo einmalig (nach dem Setzen der Ports)"""
+    js = DASHBOARD_JS_TEMPLATE.format(SCRATCH_PORT=SCRATCH_PORT, KIOSK_PORT=KIOSK_PORT,
+                                      DASHBOARD_PORT=DASHBOARD_PORT)
+    assets = (
+        ('css', '/static/dashboard.css', DASHBOARD_CSS, 'text/css; charset=utf-8'),
+        ('js', '/static/dashboard.js', js, 'application/javascript; charset=utf-8'),
+        ('logo', '/static/sidekick-logo.svg', SIDEKICK_LOGO_SVG, 'image/svg+xml'),
+    )
+    for key, path, content, content_type in assets:
+        data = content.encode('utf-8')
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        STATIC_ASSETS[path] = (data, gzip.compress(data), content_type, f'"{digest}"')
+        STATIC_URLS[key] = f'{path}?v={digest}'
+    # Die Seite verweist auf die versionierten URLs
+    build_page_segments()
+
+
+def static_url(key):
+    """Versionierte URL eines Assets"""
+    if not STATIC_URLS:
+        build_static_assets()
+    return STATIC_URLS[key]
+
+
+def page_etag(status_msg=None):
+    """ETag der Dashboard-Seite aus den Generationen der Medien-Indizes"""
+    key = '|'.join([SERVER_INSTANCE, static_url('js'), static_url('css'),
+                    str(get_index('video').generation), str(get_index('project').generation),
+                    status_msg or ''])
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '"'
+
+def build_page_segments():
+    """Kodiert die statischen Teile der Dashboard-Seite einmalig zu Bytes"""
+    top = HTML_HEADER.format(css_url=static_url('css'), js_url=static_url('js'))
+    top += DASHBOARD_TOP_TEMPLATE.format(logo_url=static_url('logo'), scratch_port=SCRATCH_PORT)
+    PAGE_SEGMENTS['top'] = top.encode('utf-8')
+    PAGE_SEGMENTS['display_start'] = DISPLAY_CARD_START.encode('utf-8')
+    PAGE_SEGMENTS['display_end'] = (DISPLAY_CARD_END + UPLOAD_CARDS).encode('utf-8')
+    PAGE_SEGMENTS['bottom'] = (INFO_CARD_TEMPLATE.format(videos_dir=VIDEOS_DIR, projects_dir=PROJECTS_DIR)
+                               + HTML_FOOTER).encode('utf-8')
+
+
+def render_media_list(file_type, title, empty_text, row_template, more_label):
+    """Erzeugt die Karte mit der ersten Seite einer Medien-Liste als Byte-Fragmente"""
+    entries, cursor, total = get_index(file_type).page(DASHBOARD_PAGE_SIZE)
+    yield f'<div class="card"><h2>{title} ({total})</h2>'.encode('utf-8')
+    if not entries:
+        yield f'<div class="empty-state">{empty_text}</div></div>'.encode('utf-8')
+        return
+    yield TABLE_START.format(file_type=file_type).encode('utf-8')
+    for entry in entries:
+        yield row_template.format(name=html_module.escape(entry.name),
+                                  size=get_file_size_str(entry.size),
+                                  url_name=urllib.parse.quote(entry.name)).encode('utf-8')
+    yield b'</tbody></table>'
+    if cursor:
+        yield LOAD_MORE_TEMPLATE.format(file_type=file_type, cursor=encode_cursor(cursor),
+                                        label=more_label).encode('utf-8')
+    yield b'</div>'
+
+
+def render_dashboard(status_msg=None):
+    """
+    Erzeugt die Dashboard-Seite als Folge von Byte-Fragmenten.
+    
+    Statische Teile kommen vorkodiert aus PAGE_SEGMENTS, nur Status,
+    Projekt-Auswahl und Listen werden pro Aufruf erzeugt.
+    """
+    if not PAGE_SEGMENTS:
+        build_page_segments()
+    yield PAGE_SEGMENTS['top']
+    
+    if status_msg:
+        status_class = 'status-success' if 'success' in status_msg or 'deleted' in status_msg else 'status-error'
+        msg = STATUS_MESSAGES.get(status_msg) or html_module.escape(status_msg)
+        yield f'<div class="status {status_class}">{msg}</div>'.encode('utf-8')
+    
+    # Listen kommen aus dem Medien-Index - kein Festplattenzugriff beim Seitenaufbau
+    yield PAGE_SEGMENTS['display_start']
+    for name in get_index('project').names():
+        escaped = html_module.escape(name)
+        yield f'<option value="{escaped}">{escaped}</option>'.encode('utf-8')
+    yield PAGE_SEGMENTS['display_end']
+    
+    # Tabellen zeigen nur die erste Seite, der Rest wird über /api/... nachgeladen
+    yield from render_media_list('video', '🎞️ Video-Liste',
+                                 'Keine Videos vorhanden.<br>Lade ein Video hoch um zu beginnen!',
+                                 VIDEO_ROW_TEMPLATE, 'Weitere Videos laden')
+    yield from render_media_list('project', '📁 Projekt-Liste',
+                                 'Keine Projekte vorhanden.<br>Lade ein Scratch-Projekt (.sb3) hoch!',
+                                 PROJECT_ROW_TEMPLATE, 'Weitere Projekte laden')
+    
+    yield PAGE_SEGMENTS['bottom']
+
+
+
+def encode_cursor(key):
+    """Sortierschlüssel (Wert, Name) als URL-tauglicher Cursor"""
+    raw = json.dumps(list(key), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Gegenstück zu encode_cursor() - ValueError bei ungültigem Cursor"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Ungültiger Cursor')
+    if not isinstance(key, list) or len(key) != 2 or not isinstance(key[1], str):
+        raise ValueError('Ungültiger Cursor')
+    return key
+
+
+def media_type(name):
+    """MIME-Typ einer Mediendatei (für die JSON-API)"""
+    if name.lower().endswith('.sb3'):
+        return 'application/x.scratch.sb3'
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer, der jede Verbindung in einem begrenzten Thread-Pool abarbeitet"""
+    
+    # Viele Tablets verbinden sich gleichzeitig - größere Listen-Queue als der Standard (5)
+    request_queue_size = 64
+    
+    def __init__(self, server_address, handler_class, workers=DASHBOARD_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard')
+    
+    def process_request(self, request, client_address):
+        """Übergibt die Verbindung an den Pool statt sie selbst abzuarbeiten"""
+        self.executor.submit(self.process_request_pooled, request, client_address)
+    
+    def process_request_pooled(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """HTTP Request Handler für das SIDEKICK Dashboard"""
+    
+    # Hängende Clients sollen keinen Worker dauerhaft blockieren
+    timeout = REQUEST_TIMEOUT
+    
+    def log_message(self, format, *args):
+        """Überschreibt das Standard-Logging"""
+        print(f"[Dashboard] {args[0]}")
+    
+    def write_stream(self, fragments):
+        """
+        Schreibt Byte-Fragmente gebündelt in Blöcken von STREAM_CHUNK_SIZE,
+        damit der Browser die ersten Bytes erhält, bevor die Seite fertig ist
+        """
+        buf = bytearray()
+        for fragment in fragments:
+            buf += fragment
+            if len(buf) >= STREAM_CHUNK_SIZE:
+                self.wfile.write(buf)
+                buf.clear()
+        if buf:
+            self.wfile.write(buf)
+    
+    def send_json(self, data, status=200, etag=None):
+        """Sendet JSON-Antwort"""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def check_not_modified(self, etag, cache_control='no-cache'):
+        """Sendet 304, falls der Browser die aktuelle Version schon hat"""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        tags = [t.strip() for t in if_none_match.split(',')]
+        if etag not in tags and '*' not in tags:
+            return False
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        return True
+    
+    def serve_static(self, path):
+        """Liefert CSS/JS/Logo mit langer max-age aus (gzip falls möglich)"""
+        if not STATIC_ASSETS:
+            build_static_assets()
+        asset = STATIC_ASSETS.get(path)
+        if asset is None:
+            self.send_error(404, 'Not Found')
+            return
+        data, gzipped, content_type, etag = asset
+        cache_control = f'public, max-age={STATIC_MAX_AGE}, immutable'
+        if self.check_not_modified(etag, cache_control):
+            return
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = gzipped if use_gzip else data
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def serve_media_list(self, file_type, raw_query, query):
+        """
+        JSON-Liste der Videos bzw. Projekte aus dem Medien-Index.
+        
+        Query-Parameter:
+            limit   Einträge pro Seite (Standard API_PAGE_SIZE)
+            cursor  next_cursor der vorherigen Antwort
+            sort    name | size | mtime
+            order   asc | desc
+            prefix  Nur Dateinamen mit diesem Anfang
+        """
+        index = get_index(file_type)
+        # Generation vor dem Lesen - bei gleichzeitiger Änderung ist das ETag höchstens zu alt
+        etag = '"' + hashlib.sha1(f'{SERVER_INSTANCE}|{index.generation}|{raw_query}'.encode('utf-8')).hexdigest()[:16] + '"'
+        if self.check_not_modified(etag):
+            return
+        try:
+            limit = int(query.get('limit', [API_PAGE_SIZE])[0])
+            limit = max(1, min(limit, API_MAX_PAGE_SIZE))
+            sort = query.get('sort', ['name'])[0]
+            descending = query.get('order', ['asc'])[0] == 'desc'
+            prefix = query.get('prefix', [''])[0]
+            cursor = decode_cursor(query.get('cursor', [None])[0])
+            entries, next_key, total = index.page(limit, cursor, sort, descending, prefix)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, status=400)
+            return
+        self.send_json({
+            'items': [{'name': e.name, 'size': e.size, 'mtime': e.mtime, 'type': media_type(e.name)}
+                      for e in entries],
+            'next_cursor': encode_cursor(next_key) if next_key else None,
+            'total': total,
+        }, etag=etag)
+    
+    def serve_import_status(self):
+        """Fortschritt des laufenden (oder letzten) USB-Imports"""
+        try:
+            with open(SIDEKICK_DIR / IMPORT_STATUS_NAME, encoding='utf-8') as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            status = {'state': 'idle'}
+        # Import-Prozess abgebrochen? Dann kommen keine Meldungen mehr
+        if (status.get('state') in ('planning', 'copying')
+                and time.time() - status.get('updated', 0) > IMPORT_STALE_AFTER):
+            status['state'] = 'stale'
+        self.send_json(status)
+    
+    def parse_range(self, size, etag):
+        """
+        Wertet den Range-Header aus (nur ein Bereich, wie ihn Browser beim Spulen senden).
         
-        html += HTML_FOOTER
-        self.send_html(html)
+        Returns:
+            (start, end) inklusive end, None für die ganze Datei
+            oder 'invalid', falls der Bereich nicht erfüllbar ist
+        """
+        header = self.headers.get('Range')
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None
+        # If-Range: Bereich nur liefern, wenn die Datei unverändert ist
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range != etag:
+            return None
+        first, _, last = header[len('bytes='):].strip().partition('-')
+        try:
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:
+                # Suffix-Bereich: die letzten n Bytes
+                length = int(last)
+                if length <= 0:
+                    return 'invalid'
+                start, end = max(0, size - length), size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return 'invalid'
+        return start, end
+    
+    def serve_media(self, directory, filename, allowed_extensions, head=False):
+        """
+        Liefert ein Video oder Projekt aus - mit Range-Unterstützung zum Spulen
+        und sendfile(), damit die Daten nicht durch Python-Puffer laufen.
+        """
+        filepath = directory / filename
+        if (not filename or '/' in filename or filename.startswith('.')
+                or filepath.suffix.lower() not in allowed_extensions):
+            self.send_error(404, 'Not Found')
+            return
+        try:
+            f = open(filepath, 'rb')
+        except OSError:
+            self.send_error(404, 'Not Found')
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+            if self.check_not_modified(etag):
+                return
+            byte_range = self.parse_range(size, etag)
+            if byte_range == 'invalid':
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range is None:
+                start, length = 0, size
+                self.send_response(200)
+            else:
+                start, length = byte_range[0], byte_range[1] - byte_range[0] + 1
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {byte_range[0]}-{byte_range[1]}/{size}')
+            self.send_header('Content-Type', media_type(filename))
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', self.date_time_string(int(st.st_mtime)))
+            self.send_header('Cache-Control', 'no-cache')
+            if filepath.suffix.lower() in PROJECT_EXTENSIONS:
+                self.send_header('Content-Disposition',
+                                 f"attachment; filename*=UTF-8''{urllib.parse.quote(filename)}")
+            self.end_headers()
+            if head or length == 0:
+                return
+            try:
+                # socket.sendfile() nutzt os.sendfile() und kommt mit dem Socket-Timeout klar
+                while length > 0:
+                    sent = self.connection.sendfile(f, start, min(length, SENDFILE_BLOCK))
+                    if sent == 0:
+                        break
+                    start += sent
+                    length -= sent
+            except (BrokenPipeError, ConnectionResetError):
+                # Browser bricht beim Spulen laufende Requests ab - kein Fehler
+                self.close_connection = True
+    
+    def send_redirect(self, location):
+        """Sendet Redirect"""
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.end_headers()
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        query = urllib.parse.parse_qs(parsed.query)
+        
+        status_msg = query.get('status', [None])[0]
+        
+        if path == '/' or path == '/index.html':
+            self.serve_dashboard(status_msg)
+        elif path.startswith('/static/'):
+            self.serve_static(path)
+        elif path == '/api/videos':
+            self.serve_media_list('video', parsed.query, query)
+        elif path == '/api/projects':
+            self.serve_media_list('project', parsed.query, query)
+        elif path.startswith('/api/uploads/'):
+            self.upload_status(path[len('/api/uploads/'):])
+        elif path == '/api/import':
+            self.serve_import_status()
+        elif path.startswith('/videos/'):
+            self.serve_media(VIDEOS_DIR, urllib.parse.unquote(path[len('/videos/'):]), VIDEO_EXTENSIONS)
+        elif path.startswith('/projects/'):
+            self.serve_media(PROJECTS_DIR, urllib.parse.unquote(path[len('/projects/'):]), PROJECT_EXTENSIONS)
+        elif path == '/delete-video':
+            filename = query.get('file', [None])[0]
+            if filename:
+                self.delete_video(filename)
+            else:
+                self.send_redirect('/?status=error_no_file')
+        elif path == '/delete-project':
+            filename = query.get('file', [None])[0]
+            if filename:
+                self.delete_project(filename)
+            else:
+                self.send_redirect('/?status=error_no_file')
+        elif path == '/rename-video':
+            old_name = query.get('old', [None])[0]
+            new_name = query.get('new', [None])[0]
+            if old_name and new_name:
+                self.rename_file(VIDEOS_DIR, old_name, new_name, 'video', VIDEO_EXTENSIONS)
+            else:
+                self.send_redirect('/?status=error_no_file')
+        elif path == '/rename-project':
+            old_name = query.get('old', [None])[0]
+            new_name = query.get('new', [None])[0]
+            if old_name and new_name:
+                self.rename_file(PROJECTS_DIR, old_name, new_name, 'project', PROJECT_EXTENSIONS)
+            else:
+                self.send_redirect('/?status=error_no_file')
+        else:
+            self.send_error(404, 'Not Found')
+    
+    def do_HEAD(self):
+        """Handle HEAD requests (nur für Videos/Projekte, z.B. Größe vor dem Abspielen)"""
+        path = urllib.parse.urlparse(self.path).path
+        if path.startswith('/videos/'):
+            self.serve_media(VIDEOS_DIR, urllib.parse.unquote(path[len('/videos/'):]), VIDEO_EXTENSIONS, head=True)
+        elif path.startswith('/projects/'):
+            self.serve_media(PROJECTS_DIR, urllib.parse.unquote(path[len('/projects/'):]), PROJECT_EXTENSIONS, head=True)
+        else:
+            self.send_error(404, 'Not Found')
+    
+    def do_POST(self):
+        """Handle POST requests (file uploads)"""
+        if self.path == '/upload-video':
+            self.handle_upload(VIDEOS_DIR, 'video', VIDEO_EXTENSIONS)
+        elif self.path == '/upload-project':
+            self.handle_upload(PROJECTS_DIR, 'project', PROJECT_EXTENSIONS)
+        elif self.path == '/api/uploads':
+            self.create_upload()
+        elif self.path.startswith('/api/uploads/') and self.path.endswith('/finalize'):
+            self.finalize_upload(self.path[len('/api/uploads/'):-len('/finalize')])
+        elif self.path == '/api/manifest':
+            self.compare_manifest()
+        else:
+            self.send_error(404, 'Not Found')
+    
+    def do_PUT(self):
+        """Handle PUT requests (Teile fortsetzbarer Uploads)"""
+        if self.path.startswith('/api/uploads/'):
+            self.receive_upload_chunk(self.path[len('/api/uploads/'):])
+        else:
+            self.send_error(404, 'Not Found')
+    
+    def do_DELETE(self):
+        """Handle DELETE requests (fortsetzbaren Upload abbrechen)"""
+        if self.path.startswith('/api/uploads/'):
+            self.abort_upload(self.path[len('/api/uploads/'):])
+        else:
+            self.send_error(404, 'Not Found')
+    
+    def compare_manifest(self):
+        """
+        Abgleich für den Master-Import (sidekick_fanout.py).
+        
+        Body (JSON): {"type": "video"|"project", "files": [{"name": ..., "size": ...}]}
+        Antwort: Größe jeder vorhandenen Datei, bei gleicher Größe auch ihr
+        Inhalts-Hash - nur diese Dateien müssen gelesen werden.
+        """
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            if not 0 < content_length <= MAX_FIELD_SIZE:
+                raise ValueError('Ungültige Anfrage')
+            request = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            file_type = request.get('type', 'video')
+            if file_type not in ('video', 'project'):
+                raise ValueError('Unbekannter Typ')
+            candidates = [(os.path.basename(str(item['name'])), int(item['size'])) for item in request['files']]
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            self.send_json({'error': str(e)}, status=400)
+            return
+        
+        target_dir = VIDEOS_DIR if file_type == 'video' else PROJECTS_DIR
+        manifest = HashManifest(target_dir)
+        files = {}
+        for name, size in candidates:
+            if not name or name.startswith('.'):
+                continue
+            path = target_dir / name
+            try:
+                st = path.stat()
+                entry = {'size': st.st_size}
+                if st.st_size == size:
+                    entry['hash'] = manifest.target_hash(path)
+            except OSError:
+                continue
+            files[name] = entry
+        try:
+            manifest.save()
+        except OSError as e:
+            print(f"Hash-Manifest nicht gespeichert: {e}")
+        self.send_json({'algorithm': HASH_ALGORITHM, 'files': files})
+    
+    def create_upload(self):
+        """
+        Legt eine fortsetzbare Upload-Session an.
+        
+        Body (JSON): {"type": "video"|"project", "filename": ..., "size": ..., "customName": ...}
+        """
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            if not 0 < content_length <= MAX_FIELD_SIZE:
+                raise UploadSessionError('Ungültige Anfrage')
+            request = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            file_type = request.get('type', 'video')
+            filename = str(request.get('filename', ''))
+            size = int(request.get('size', -1))
+            if file_type not in ('video', 'project'):
+                raise UploadSessionError('Unbekannter Typ')
+            allowed_extensions = VIDEO_EXTENSIONS if file_type == 'video' else PROJECT_EXTENSIONS
+            if os.path.splitext(filename)[1].lower() not in allowed_extensions:
+                self.send_json({'error': 'Ungültiger Dateityp', 'status': 'error_invalid_type'}, status=400)
+                return
+            if size <= 0:
+                raise UploadSessionError('Ungültige Dateigröße')
+        except (ValueError, TypeError, AttributeError) as e:
+            self.send_json({'error': str(e)}, status=400)
+            return
+        
+        store = get_upload_store(file_type)
+        if shutil.disk_usage(store.directory).free < size:
+            self.send_json({'error': 'Nicht genug Speicherplatz', 'status': 'error_upload'}, status=507)
+            return
+        target = upload_target_name(filename, str(request.get('customName', '')))
+        upload = store.create(filename, size, {'type': file_type, 'target': target})
+        self.send_json(upload.to_dict(), status=201)
+    
+    def receive_upload_chunk(self, upload_id):
+        """Schreibt einen Teil (Header Content-Range: bytes start-end/size) in die Session"""
+        file_type, upload = find_upload(upload_id)
+        if upload is None:
+            self.send_json({'error': 'Unbekannter Upload'}, status=404)
+            return
+        content_length = int(self.headers.get('Content-Length', 0))
+        match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', self.headers.get('Content-Range', '').strip())
+        if (match is None or int(match.group(2)) - int(match.group(1)) + 1 != content_length
+                or match.group(3) not in ('*', str(upload.size))):
+            self.close_connection = True
+            self.send_json({'error': 'Ungültiger Content-Range'}, status=400)
+            return
+        try:
+            upload.write(self.rfile, int(match.group(1)), content_length)
+        except UploadSessionError as e:
+            self.close_connection = True
+            self.send_json({'error': str(e)}, status=400)
+            return
+        except MultipartError as e:
+            # Verbindung abgebrochen - der empfangene Teil ist vermerkt
+            print(f"Upload {upload_id}: {e} ({upload.received}/{upload.size} Bytes)")
+            self.close_connection = True
+            return
+        self.send_json(upload.to_dict())
+    
+    def upload_status(self, upload_id):
+        """Empfangene und fehlende Bereiche einer Session"""
+        file_type, upload = find_upload(upload_id)
+        if upload is None:
+            self.send_json({'error': 'Unbekannter Upload'}, status=404)
+            return
+        self.send_json(upload.to_dict())
+    
+    def finalize_upload(self, upload_id):
+        """Schließt einen vollständigen Upload ab und übernimmt die Datei"""
+        file_type, upload = find_upload(upload_id)
+        if upload is None:
+            self.send_json({'error': 'Unbekannter Upload'}, status=404)
+            return
+        if not upload.complete:
+            self.send_json(dict(upload.to_dict(), error='Upload ist noch nicht vollständig'), status=409)
+            return
+        target_dir = VIDEOS_DIR if file_type == 'video' else PROJECTS_DIR
+        filename = upload.fields.get('target') or upload_target_name(upload.filename)
+        try:
+            with get_dir_lock(target_dir):
+                upload.commit(target_dir / filename)
+                # Index (und JSON-Liste) erst jetzt aktualisieren
+                get_index(file_type).refresh(filename)
+        except (UploadSessionError, OSError) as e:
+            print(f"Upload error: {e}")
+            self.send_json({'error': str(e), 'status': 'error_upload'}, status=409)
+            return
+        get_upload_store(file_type).remove(upload_id)
+        self.send_json({'name': filename, 'status': f'success_{file_type}'})
+    
+    def abort_upload(self, upload_id):
+        """Verwirft eine Session samt Teildaten"""
+        file_type, upload = find_upload(upload_id)
+        if upload is None:
+            self.send_json({'error': 'Unbekannter Upload'}, status=404)
+            return
+        upload.discard()
+        get_upload_store(file_type).remove(upload_id)
+        self.send_json({'id': upload_id, 'status': 'aborted'})
+    
+    def handle_upload(self, target_dir, file_type, allowed_extensions):
+        """Handles file upload - streamt den Body blockweise in eine Temp-Datei"""
+        files = []
+        try:
+            content_type = self.headers.get('Content-Type', '')
+            if not content_type or 'multipart/form-data' not in content_type:
+                self.send_redirect(f'/?status=error_invalid_content')
+                return
+            
+            # Extract boundary from content-type
+            boundary_match = re.search(r'boundary=([^\s;]+)', content_type)
+            if not boundary_match:
+                self.send_redirect(f'/?status=error_invalid_content')
+                return
+            
+            boundary = boundary_match.group(1).strip('"').encode()
+            content_length = int(self.headers.get('Content-Length', 0))
+            
+            # Body streamen - Datei-Teile landen direkt als Temp-Datei im Zielordner
+            fields, files = parse_multipart_stream(self.rfile, content_length, boundary, target_dir)
+            
+            upload = files[0] if files else None
+            if upload is None or upload.size == 0:
+                self.send_redirect(f'/?status=error_no_file')
+                return
+            
+            ext = os.path.splitext(upload.filename)[1].lower()
+            
+            if ext not in allowed_extensions:
+                self.send_redirect(f'/?status=error_invalid_type')
+                return
+            
+            # Use custom name if provided
+            filename = upload_target_name(upload.filename, fields.get('customName', ''))
+            
+            # Temp-Datei atomar an den endgültigen Platz verschieben
+            with get_dir_lock(target_dir):
+                upload.commit(target_dir / filename)
+                # Index (und JSON-Liste) nur für diese eine Datei aktualisieren
+                get_index(file_type).refresh(filename)
+            
+            self.send_redirect(f'/?status=success_{file_type}')
+            
+        except MultipartError as e:
+            print(f"Upload error: {e}")
+            self.close_connection = True
+            self.send_redirect(f'/?status=error_upload')
+        except Exception as e:
+            print(f"Upload error: {e}")
+            import traceback
+            traceback.print_exc()
+            self.send_redirect(f'/?status=error_upload')
+        finally:
+            for uploaded in files:
+                uploaded.discard()
+    
+    def delete_video(self, filename):
+        """Löscht ein Video"""
+        try:
+            filepath = VIDEOS_DIR / filename
+            with get_dir_lock(VIDEOS_DIR):
+                if filepath.exists() and filepath.suffix.lower() in VIDEO_EXTENSIONS:
+                    filepath.unlink()
+                    get_index('video').refresh(filename)
+                    deleted = True
+                else:
+                    deleted = False
+            if deleted:
+                self.send_redirect('/?status=deleted_video')
+            else:
+                self.send_redirect('/?status=error_not_found')
+        except Exception as e:
+            print(f"Delete error: {e}")
+            self.send_redirect('/?status=error_delete')
+    
+    def delete_project(self, filename):
+        """Löscht ein Projekt"""
+        try:
+            filepath = PROJECTS_DIR / filename
+            with get_dir_lock(PROJECTS_DIR):
+                if filepath.exists() and filepath.suffix.lower() in PROJECT_EXTENSIONS:
+                    filepath.unlink()
+                    get_index('project').refresh(filename)
+                    deleted = True
+                else:
+                    deleted = False
+            if deleted:
+                self.send_redirect('/?status=deleted_project')
+            else:
+                self.send_redirect('/?status=error_not_found')
+        except Exception as e:
+            print(f"Delete error: {e}")
+            self.send_redirect('/?status=error_delete')
+    
+    def rename_file(self, target_dir, old_name, new_name, file_type, allowed_extensions):
+        """Benennt eine Datei um"""
+        try:
+            old_path = target_dir / old_name
+            new_path = target_dir / new_name
+            
+            # Prüfen und Umbenennen unter dem Ordner-Lock, damit parallele
+            # Requests nicht zwischen Prüfung und rename() dazwischenfunken
+            with get_dir_lock(target_dir):
+                # Validierung
+                if not old_path.exists():
+                    status = 'error_not_found'
+                elif old_path.suffix.lower() not in allowed_extensions:
+                    status = 'error_invalid_type'
+                elif new_path.suffix.lower() not in allowed_extensions:
+                    status = 'error_invalid_type'
+                elif new_path.exists() and new_path != old_path:
+                    status = 'error_exists'
+                else:
+                    # Umbenennen
+                    old_path.rename(new_path)
+                    
+                    # Index und Liste aktualisieren
+                    get_index(file_type).rename(old_name, new_name)
+                    status = f'renamed_{file_type}'
+            
+            self.send_redirect(f'/?status={status}')
+        except Exception as e:
+            print(f"Rename error: {e}")
+            self.send_redirect('/?status=error_rename')
+    
+    def serve_dashboard(self, status_msg=None):
+        """Rendert die Dashboard-Seite und schreibt sie fragmentweise"""
+        # Unveränderte Seite? Dann reicht ein 304 ohne Body
+        etag = page_etag(status_msg)
+        if self.check_not_modified(etag):
+            return
+        
+        # HTTP/1.0 ohne Content-Length - das Ende markiert das Schließen der Verbindung
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.write_stream(render_dashboard(status_msg))
 
 
 def main():
+    global DASHBOARD_PORT
+    
+    parser = argparse.ArgumentParser(description='SIDEKICK Dashboard Server')
+    parser.add_argument('--port', type=int, default=DASHBOARD_PORT,
+                        help=f'Port des Dashboards (Standard: {DASHBOARD_PORT})')
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('SIDEKICK_DASHBOARD_WORKERS', DASHBOARD_WORKERS)),
+                        help=f'Anzahl paralleler Request-Threads (Standard: {DASHBOARD_WORKERS})')
+    args = parser.parse_args()
+    DASHBOARD_PORT = args.port
+    
     setup_paths()
     
+    # Reste abgebrochener Uploads aufräumen; fortsetzbare erst nach RESUMABLE_MAX_AGE,
+    # dafür laufend im Hintergrund (nicht nur beim Start)
+    for folder in (VIDEOS_DIR, PROJECTS_DIR):
+        cleanup_stale_uploads(folder)
+    threading.Thread(target=cleanup_upload_stores, name='upload-cleanup', daemon=True).start()
+    
+    # Assets mit den endgültigen Ports erzeugen
+    build_static_assets()
+    
+    # Medien-Index einmalig aufbauen und per Watcher aktuell halten
+    # (erkennt auch Änderungen durch USB-Import oder andere Prozesse)
+    watcher = MediaWatcher([get_index('video'), get_index('project')])
+    watcher.start()
+    
     print(f"\n{'='*50}")
     print(f"  SIDEKICK Dashboard")
     print(f"{'='*50}")
@@ -1153,9 +1878,10 @@ def main():
     print(f"  (Im Hotspot: http://10.42.0.1:{DASHBOARD_PORT}/)")
     print(f"\n  Scratch: http://0.0.0.0:{SCRATCH_PORT}/")
     print(f"  (Im Hotspot: http://10.42.0.1:{SCRATCH_PORT}/)")
+    print(f"\n  Worker-Threads: {args.workers}")
     print(f"\n{'='*50}\n")
     
-    server = HTTPServer(('0.0.0.0', DASHBOARD_PORT), DashboardHandler)
+    server = PooledHTTPServer(('0.0.0.0', DASHBOARD_PORT), DashboardHandler, workers=args.workers)
     
     try:
         server.serve_forever()
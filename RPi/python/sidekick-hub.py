@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Sensor-Hub
+
+Ein Prozess für alle Sensoren (sidekick_hub.py): Ultraschall in den Boxen,
+Taster und Waagen melden sich bei einem Hub, der die Ereignisse an MQTT,
+Scratch, die Telemetrie und die Konsole weitergibt; die Senke led steuert
+den LED-Streifen (MQTT-Befehle und LED-Meldepins wie SmartBox.py). Ersetzt
+das gleichzeitige Starten von SmartBox.py, HandDetection.py, Scale.py,
+ButtonExample.py und sidekick-scale-daemon.py.
+
+Pins, Broker usw. stehen in sidekick-hub.json. Die Waage ist dort auf
+GPIO 26 (DOUT) und 10 (PD_SCK) gelegt - die einzigen Pins, die Boxen
+(Echo und LED-Meldung, siehe sidekick_pins.BOX_PINS), Taster, Trigger 25 und
+LED-Streifen (GPIO 12) frei lassen; 5/6 wie in Scale.py sind Echo-Pins der
+Boxen 4 und 7. Sie ist ausgeschaltet ("enabled": false), bis sie
+angeschlossen ist.
+
+Verwendung:
+    python3 sidekick-hub.py
+    python3 sidekick-hub.py --config /etc/sidekick/hub.json
+    SIDEKICK_BACKEND=sim python3 sidekick-hub.py   # simulierte Sensoren
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+
+from sidekick_hub import Hub, load_config
+from sidekick_gpio import get_backend
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sidekick-hub.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SIDEKICK Sensor-Hub')
+    parser.add_argument('--config', default=DEFAULT_CONFIG)
+    parser.add_argument('--backend', choices=['pi', 'sim'], help='Vorgabe: SIDEKICK_BACKEND bzw. automatisch')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        sys.exit(f"Konfiguration {args.config} nicht gefunden (Vorlage: sidekick-hub.json aus dem Release)")
+    config = load_config(args.config)
+    hub = Hub.from_config(config, get_backend(args.backend or config.get('backend')))
+    print(f"Sensor-Hub: {', '.join(source.type for source in hub.sources)} -> "
+          f"{', '.join(sink.type for sink in hub.sinks)}")
+    hub.start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            time.sleep(1)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        hub.stop()
+
+
+if __name__ == '__main__':
+    main()
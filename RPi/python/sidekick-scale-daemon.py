@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Waagen-Daemon
+
+Zählt Teile auf einer oder mehreren Waagen (HX711) und meldet Anzahl und
+Gewicht per MQTT (sidekick_scale.py) - ersetzt testing/Scale.py, das
+Tastendrücke an Scratch geschickt hat.
+
+Die Waagen stehen in SCALES (Nummer, HX711-Pins, Referenzeinheit,
+Teilegewicht). Ohne Teilegewicht wird beim Start kalibriert: ein Teil
+auflegen, das erste stabile Gewicht gilt als Teilegewicht.
+
+Die Waage liegt auf GPIO 26 (DOUT) und 10 (PD_SCK), den einzigen Pins, die
+SmartBox.py nicht belegt (5/6 wie in Scale.py sind Echo-Pins der Boxen 4
+und 7). Pins aus sidekick_pins.used_pins() werden beim Start abgelehnt.
+
+Verwendung:
+    python3 sidekick-scale-daemon.py
+    python3 sidekick-scale-daemon.py --broker 192.168.0.10
+    SIDEKICK_BACKEND=sim python3 sidekick-scale-daemon.py   # simulierte Waagen
+"""
+
+import sys
+import time
+import signal
+import argparse
+
+from sidekick_gpio import get_backend
+from sidekick_pins import SCALE_PINS, used_pins
+from sidekick_hx711 import HX711Reader, SimulatedHX711
+from sidekick_scale import ScaleService, MQTT_TOPIC_SCALE
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+
+# Nummer, DOUT, PD_SCK, Referenzeinheit, Teilegewicht (None = beim Start kalibrieren;
+# fest eingetragen mit dem Vorzeichen der Gewichte - die Wägezelle aus Scale.py misst negativ)
+# Nur Pins, die SmartBox.py nicht belegt (siehe check_pins)
+SCALES = [
+    {'nr': 1, 'dout': SCALE_PINS[0], 'pd_sck': SCALE_PINS[1], 'reference_unit': 5, 'part_weight': None},
+]
+
+
+def connect_mqtt(broker, port):
+    if mqtt is None:
+        print("paho-mqtt nicht installiert - fahre ohne MQTT fort...")
+        return None
+    try:
+        client = mqtt.Client()
+        client.connect(broker, port, 60)
+        client.loop_start()
+        print(f"MQTT-Verbindung zu {broker}:{port} wird hergestellt...")
+        return client
+    except Exception as e:
+        print(f"MQTT-Verbindung fehlgeschlagen: {e}")
+        print("Fahre ohne MQTT fort...")
+        return None
+
+
+def check_pins(scales):
+    """Bricht ab, wenn eine Waage an einem Pin von SmartBox.py hängt (beide laufen gleichzeitig)"""
+    used = used_pins()
+    for config in scales:
+        clash = sorted({config['dout'], config['pd_sck']} & used)
+        if clash:
+            sys.exit(f"Waage {config['nr']}: GPIO {', '.join(map(str, clash))} belegt SmartBox.py "
+                     f"(Echo, LED-Meldung, Trigger, Taster oder LED-Streifen) - SCALES anpassen")
+
+
+def print_event(nr, event):
+    if event[0] == 'count':
+        print(f"Waage {nr}: Anzahl Teile {event[1]} ({event[2]:+d})")
+    elif event[0] == 'part':
+        print(f"Waage {nr}: Kalibrierung fertig, Teilegewicht {event[1]:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SIDEKICK Waagen-Daemon')
+    parser.add_argument('--broker', default=MQTT_BROKER)
+    parser.add_argument('--port', type=int, default=MQTT_PORT)
+    parser.add_argument('--topic', default=MQTT_TOPIC_SCALE)
+    args = parser.parse_args()
+    check_pins(SCALES)
+
+    backend = get_backend()
+    gpio = backend.gpio
+    gpio.setmode(gpio.BCM)
+    client = connect_mqtt(args.broker, args.port)
+
+    services = []
+    for config in SCALES:
+        if backend.name == 'sim':
+            # Leere Waage mit etwas Rauschen (Gewicht setzen: SimulatedHX711.weight)
+            SimulatedHX711(gpio, config['dout'], config['pd_sck'], reference_unit=config['reference_unit'],
+                           offset=8000, noise=20, rate=80)
+        reader = HX711Reader(gpio, config['dout'], config['pd_sck'], reference_unit=config['reference_unit'])
+        service = ScaleService(config['nr'], reader, client, topic=args.topic, on_event=print_event,
+                               part_weight=config.get('part_weight'))
+        services.append(service.start(timeout=5))
+        if config.get('part_weight') is None:
+            print(f"Waage {config['nr']}: ein Teil zum Kalibrieren auflegen")
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            time.sleep(1)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for service in services:
+            service.stop()
+        if client is not None:
+            client.loop_stop()
+            client.disconnect()
+        gpio.cleanup()
+
+
+if __name__ == '__main__':
+    main()
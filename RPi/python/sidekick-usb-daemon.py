@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK USB Import-Daemon
+
+Ersetzt den udev-Aufruf von sidekick-usb-import.sh (sleep 3 + Suche in
+/media): Der Daemon beobachtet die Mount-Tabelle (sidekick_mounts.py) und
+startet den Import, sobald ein Stick eingehängt ist - typisch wenige
+Millisekunden nach dem Mount statt nach festen 3 Sekunden.
+
+- Nur Mounts unter /media, /mnt, /run/media mit USB-Dateisystem
+- Mehrere Sticks gleichzeitig: pro Gerät eine eigene Warteschlange
+- Beim Start bereits eingehängte Sticks werden ebenfalls importiert
+  (unveränderte Dateien werden per Hash übersprungen)
+
+Verwendung:
+    python3 sidekick-usb-daemon.py
+    python3 sidekick-usb-daemon.py --master --limit-mbit 40
+    python3 sidekick-usb-daemon.py --roots /tmp/usb-test --fstypes ''
+
+    Als systemd-Service: sidekick-usb-import.service (siehe sidekick-setup.sh)
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import importlib.util
+
+from sidekick_mounts import MountWatcher, DeviceQueues, MEDIA_ROOTS, USB_FSTYPES
+
+# sidekick-usb-import.py hat einen Bindestrich im Namen - per Pfad laden
+_spec = importlib.util.spec_from_file_location(
+    'sidekick_usb_import', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sidekick-usb-import.py'))
+usb_import = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(usb_import)
+
+logger = usb_import.logger
+
+
+def make_handler(master=False, rate_limit=None):
+    """Handler für DeviceQueues - importiert einen eingehängten Stick"""
+    def handle(entry, detected):
+        logger.info(f"USB-Stick erkannt: {entry.mount_point} ({entry.source}, {entry.fstype}) - "
+                    f"Import startet {(time.monotonic() - detected) * 1000:.1f} ms nach dem Mount")
+        usb_import.run_usb_import(entry.mount_point, master, rate_limit)
+    return handle
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SIDEKICK USB Import-Daemon')
+    parser.add_argument('--roots', default=','.join(MEDIA_ROOTS),
+                        help='Mount-Wurzeln, kommagetrennt (Standard: %(default)s)')
+    parser.add_argument('--fstypes', default=','.join(USB_FSTYPES),
+                        help="Dateisysteme, kommagetrennt - '' für alle (Standard: %(default)s)")
+    parser.add_argument('--master', action='store_true',
+                        help='Zusätzlich alle rpi-ws*/ Ordner an die anderen Pis verteilen')
+    parser.add_argument('--limit-mbit', type=float, default=None,
+                        help='Bandbreiten-Grenze pro Ziel-Pi in MBit/s (Master-Import)')
+    parser.add_argument('--skip-existing', action='store_true',
+                        help='Beim Start bereits eingehängte Sticks nicht importieren')
+    args = parser.parse_args()
+
+    roots = tuple(r for r in args.roots.split(',') if r)
+    fstypes = tuple(f for f in args.fstypes.split(',') if f)
+    rate_limit = args.limit_mbit * 1000 * 1000 / 8 if args.limit_mbit else None
+
+    watcher = MountWatcher(roots, fstypes)
+    queues = DeviceQueues(make_handler(args.master, rate_limit))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    logger.info(f"USB Import-Daemon gestartet (Wurzeln: {', '.join(roots)}, "
+                f"Dateisysteme: {', '.join(fstypes) or 'alle'})")
+    if not args.skip_existing:
+        for entry in watcher.current():
+            queues.submit(entry)
+
+    try:
+        while True:
+            added, removed = watcher.wait()
+            detected = time.monotonic()
+            for entry in removed:
+                logger.info(f"USB-Stick entfernt: {entry.mount_point}")
+                queues.discard(entry)
+            for entry in added:
+                queues.submit(entry, detected)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,11 +5,18 @@ SIDEKICK USB Import Service
 Importiert Videos und Projekte von USB-Sticks automatisch.
 
 Funktionsweise:
-1. Wird durch udev bei USB-Einstecken getriggert
+1. Wird vom Import-Daemon gestartet, sobald ein USB-Stick gemountet ist
 2. Sucht auf dem Stick nach Ordner mit eigenem Hostname
 3. Kopiert videos/ und projects/ in die SIDEKICK-Ordner
+   (nur neue/geänderte Dateien - Abgleich per Größe + Inhalts-Hash,
+   siehe sidekick_import.py)
 4. Aktualisiert die JSON-Listen
 
+Während des Kopierens wird der Fortschritt (Bytes, aktuelle Datei,
+Durchsatz, Restzeit) etwa einmal pro Sekunde gemeldet:
+- MQTT: sidekick/import/progress (JSON, retained) - Kiosk und Dashboard
+- Datei: ~/Sidekick/import-status.json - Dashboard-Endpunkt /api/import
+
 USB-Stick Struktur:
     USB-Stick/
     ├── rpi-ws1/           (Hostname des Ziel-Pi)
@@ -20,17 +27,29 @@ USB-Stick Struktur:
     ├── rpi-ws2/
     │   └── ...
 
+Master-Import:
+    Ist der Pi als Master eingerichtet (--master oder Datei
+    ~/Sidekick/MASTER), importiert er seinen eigenen Ordner und verteilt
+    alle übrigen rpi-ws*/ Ordner über das LAN an die jeweiligen Pis
+    (Dashboard-API, nur fehlende Dateien, siehe sidekick_fanout.py).
+    ~/Sidekick/MASTER kann abweichende Adressen enthalten:
+        rpi-ws3 = http://10.0.0.13:5000
+
 Verwendung:
     python3 sidekick-usb-import.py /media/pi/USB-STICK
+    python3 sidekick-usb-import.py --master --limit-mbit 40 /media/pi/USB-STICK
     
-    Oder automatisch via udev/systemd.
+    Oder automatisch über den Import-Daemon (sidekick-usb-daemon.py),
+    der neue Mounts sofort erkennt.
 """
 
 import os
 import sys
+import json
 import socket
-import shutil
 import logging
+import argparse
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -43,11 +62,34 @@ try:
         VIDEO_EXTENSIONS,
         PROJECT_EXTENSIONS
     )
+    from sidekick_import import (
+        run_import,
+        cleanup_stale_imports,
+        ImportProgress,
+        status_file_sink,
+        IMPORT_STATUS_NAME
+    )
+    from sidekick_fanout import fan_out, load_host_overrides
 except ImportError:
-    print("FEHLER: sidekick_files.py nicht gefunden!")
+    print("FEHLER: sidekick_files.py / sidekick_import.py / sidekick_fanout.py nicht gefunden!")
     print("Stelle sicher, dass das Script im gleichen Ordner liegt.")
     sys.exit(1)
 
+# MQTT ist optional - ohne paho gibt es den Fortschritt nur im Dashboard
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+MQTT_BROKER = "localhost"
+MQTT_PORT = 1883
+MQTT_TOPIC_IMPORT = "sidekick/import"  # Topic-Format: sidekick/import/progress
+
+# Master-Import: Marker-Datei (optional mit Host-Adressen)
+MASTER_FILE = Path.home() / "Sidekick" / "MASTER"
+
+_import_lock = threading.Lock()  # Nur ein Import gleichzeitig (siehe import_from_usb)
+
 # Logging einrichten
 LOG_FILE = Path.home() / "Sidekick" / "logs" / "usb-import.log"
 LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -122,41 +164,50 @@ def find_usb_folder(usb_mount_path):
     return None
 
 
-def copy_files(source_dir, target_dir, extensions):
+def connect_mqtt():
+    """
+    Verbindet sich mit dem MQTT-Broker für Fortschrittsmeldungen.
+    
+    Returns:
+        MQTT-Client oder None (ohne paho oder Broker)
+    """
+    if mqtt is None:
+        logger.info("paho-mqtt nicht installiert - Fortschritt nur im Dashboard")
+        return None
+    try:
+        client = mqtt.Client()
+        client.connect(MQTT_BROKER, MQTT_PORT, 60)
+        client.loop_start()
+        return client
+    except Exception as e:
+        logger.warning(f"MQTT-Verbindung fehlgeschlagen: {e}")
+        return None
+
+
+def mqtt_progress_sink(client):
+    """Sink für ImportProgress - veröffentlicht den Stand als retained JSON"""
+    def publish(snapshot):
+        client.publish(f"{MQTT_TOPIC_IMPORT}/progress", json.dumps(snapshot), retain=True)
+    return publish
+
+
+def copy_files(source_dir, target_dir, extensions, progress=None):
     """
-    Kopiert Dateien mit bestimmten Erweiterungen.
+    Kopiert neue oder geänderte Dateien mit bestimmten Erweiterungen.
+    
+    Ob eine Datei kopiert werden muss, entscheiden Größe und Inhalts-Hash -
+    nicht die mtime, die auf FAT32-Sticks ungenau und zeitzonenverschoben ist.
     
     Returns:
-        Liste der kopierten Dateinamen
+        ImportReport (kopierte/übersprungene Dateien, gesparte Bytes)
     """
-    copied = []
-    source_path = Path(source_dir)
-    target_path = Path(target_dir)
-    
-    if not source_path.exists():
-        return copied
-    
-    target_path.mkdir(parents=True, exist_ok=True)
-    
-    for file in source_path.iterdir():
-        if file.is_file() and file.suffix.lower() in extensions:
-            target_file = target_path / file.name
-            
-            # Prüfe ob Datei schon existiert
-            if target_file.exists():
-                # Überschreiben wenn neuer
-                if file.stat().st_mtime > target_file.stat().st_mtime:
-                    logger.info(f"Aktualisiere: {file.name}")
-                    shutil.copy2(file, target_file)
-                    copied.append(file.name)
-                else:
-                    logger.info(f"Überspringe (nicht neuer): {file.name}")
-            else:
-                logger.info(f"Kopiere: {file.name}")
-                shutil.copy2(file, target_file)
-                copied.append(file.name)
-    
-    return copied
+    cleanup_stale_imports(target_dir)
+    report = run_import(source_dir, target_dir, extensions, log=logger, progress=progress)
+    if report.results:
+        logger.info(f"{source_dir}: {len(report.copied)} kopiert, {len(report.skipped)} identisch, "
+                    f"{len(report.failed)} Fehler - {report.bytes_copied / (1024 * 1024):.1f} MB in "
+                    f"{report.seconds:.1f} s, {report.bytes_saved / (1024 * 1024):.1f} MB gespart")
+    return report
 
 
 def import_from_usb(usb_mount_path):
@@ -181,13 +232,42 @@ def import_from_usb(usb_mount_path):
         logger.info("Kein Import nötig - kein passender Ordner gefunden.")
         return None, None
     
-    # Videos kopieren
-    usb_videos = usb_folder / "videos"
-    videos_copied = copy_files(usb_videos, videos_dir, VIDEO_EXTENSIONS)
-    
-    # Projekte kopieren
-    usb_projects = usb_folder / "projects"
-    projects_copied = copy_files(usb_projects, projects_dir, PROJECT_EXTENSIONS)
+    # Ein Import nach dem anderen: Status-Datei, MQTT-Fortschritt und Zielordner
+    # gehören immer genau einem Stick (die Erkennung läuft weiter pro Gerät)
+    if not _import_lock.acquire(blocking=False):
+        logger.info("Anderer Import läuft - warte...")
+        _import_lock.acquire()
+    try:
+        # Fortschritt melden (MQTT + Status-Datei für das Dashboard)
+        mqtt_client = connect_mqtt()
+        progress = ImportProgress(
+            sinks=[status_file_sink(sidekick_dir / IMPORT_STATUS_NAME),
+                   mqtt_progress_sink(mqtt_client) if mqtt_client else None],
+            source=usb_folder)
+        progress.start()
+        state = 'failed'
+        try:
+            # Videos kopieren
+            usb_videos = usb_folder / "videos"
+            video_report = copy_files(usb_videos, videos_dir, VIDEO_EXTENSIONS, progress)
+            videos_copied = video_report.copied
+        
+            # Projekte kopieren
+            usb_projects = usb_folder / "projects"
+            project_report = copy_files(usb_projects, projects_dir, PROJECT_EXTENSIONS, progress)
+            projects_copied = project_report.copied
+        
+            bytes_saved = video_report.bytes_saved + project_report.bytes_saved
+            failed = video_report.failed + project_report.failed
+            state = 'failed' if failed else 'done'
+        finally:
+            progress.finish(state)
+            if mqtt_client is not None:
+                # Erst trennen (sendet noch ausstehende Meldungen), dann den Loop-Thread beenden
+                mqtt_client.disconnect()
+                mqtt_client.loop_stop()
+    finally:
+        _import_lock.release()
     
     # JSON-Listen aktualisieren
     if videos_copied:
@@ -202,6 +282,9 @@ def import_from_usb(usb_mount_path):
     logger.info(f"=== Import abgeschlossen ===")
     logger.info(f"Videos kopiert: {len(videos_copied)}")
     logger.info(f"Projekte kopiert: {len(projects_copied)}")
+    logger.info(f"Identisch (übersprungen): {bytes_saved / (1024 * 1024):.1f} MB gespart")
+    if failed:
+        logger.warning(f"Fehlgeschlagen: {len(failed)}")
     
     # Ergebnis-Datei auf USB schreiben (optional)
     try:
@@ -217,6 +300,11 @@ def import_from_usb(usb_mount_path):
             f.write(f"\nProjekte kopiert: {len(projects_copied)}\n")
             for p in projects_copied:
                 f.write(f"  - {p}\n")
+            f.write(f"\nUnverändert übersprungen: {bytes_saved / (1024 * 1024):.1f} MB nicht erneut kopiert\n")
+            if failed:
+                f.write(f"\nFehler: {len(failed)}\n")
+                for result in failed:
+                    f.write(f"  - {result.name}: {result.error}\n")
         logger.info(f"Ergebnis gespeichert: {result_file}")
     except Exception as e:
         logger.warning(f"Konnte Ergebnis-Datei nicht schreiben: {e}")
@@ -224,15 +312,80 @@ def import_from_usb(usb_mount_path):
     return videos_copied, projects_copied
 
 
+def master_import(usb_mount_path, rate_limit=None):
+    """
+    Verteilt alle übrigen rpi-ws*/ Ordner des Sticks an die jeweiligen Pis.
+    
+    Args:
+        usb_mount_path: Pfad zum gemounteten USB-Stick
+        rate_limit: Bytes/s pro Ziel-Pi (None = unbegrenzt)
+        
+    Returns:
+        Liste von HostResult
+    """
+    logger.info(f"=== Master-Import gestartet: {usb_mount_path} ===")
+    results = fan_out(usb_mount_path, overrides=load_host_overrides(MASTER_FILE),
+                      exclude=get_all_possible_hostnames(), rate_limit=rate_limit, log=logger)
+    
+    for result in results:
+        status = f"FEHLER: {result.error}" if result.error else "OK"
+        logger.info(f"{result.host}: {len(result.copied)} übertragen, {len(result.skipped)} identisch, "
+                    f"{result.bytes_sent / (1024 * 1024):.1f} MB in {result.seconds:.1f} s - {status}")
+    
+    # Ergebnis-Datei auf USB schreiben (optional)
+    try:
+        result_file = Path(usb_mount_path) / "MASTER-ERGEBNIS.txt"
+        with open(result_file, 'w', encoding='utf-8') as f:
+            f.write(f"SIDEKICK Master-Import\n")
+            f.write(f"======================\n\n")
+            f.write(f"Zeitpunkt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Master: {socket.gethostname()}\n\n")
+            for result in results:
+                f.write(f"{result.host} ({result.url}): ")
+                f.write(f"FEHLER - {result.error}\n" if result.error else "OK\n")
+                f.write(f"  Übertragen: {len(result.copied)}, identisch: {len(result.skipped)} "
+                        f"({result.bytes_saved / (1024 * 1024):.1f} MB nicht erneut gesendet)\n")
+                for name in result.copied:
+                    f.write(f"  - {name}\n")
+        logger.info(f"Ergebnis gespeichert: {result_file}")
+    except Exception as e:
+        logger.warning(f"Konnte Ergebnis-Datei nicht schreiben: {e}")
+    
+    return results
+
+
+def run_usb_import(usb_path, master=False, rate_limit=None):
+    """
+    Import vom Stick und - als Master - Verteilung an die anderen Pis.
+    Wird von main() und vom Import-Daemon (sidekick-usb-daemon.py) genutzt.
+    
+    Returns:
+        Tuple (videos_copied, projects_copied) wie import_from_usb()
+    """
+    videos, projects = import_from_usb(usb_path)
+    
+    if master or MASTER_FILE.exists():
+        results = master_import(usb_path, rate_limit)
+        if results:
+            failed = [r.host for r in results if r.error]
+            print(f"\nMaster-Import: {len(results) - len(failed)} von {len(results)} Pis aktuell"
+                  + (f" (Fehler: {', '.join(failed)})" if failed else ""))
+    
+    return videos, projects
+
+
 def main():
     """Haupteinsprungpunkt"""
-    if len(sys.argv) < 2:
-        print("Verwendung: python3 sidekick-usb-import.py <USB-MOUNT-PFAD>")
-        print("Beispiel:   python3 sidekick-usb-import.py /media/pi/USB-STICK")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='SIDEKICK USB Import')
+    parser.add_argument('usb_path', help='Pfad zum gemounteten USB-Stick, z.B. /media/pi/USB-STICK')
+    parser.add_argument('--master', action='store_true',
+                        help=f'Alle rpi-ws*/ Ordner an die anderen Pis verteilen (Standard, wenn {MASTER_FILE} existiert)')
+    parser.add_argument('--limit-mbit', type=float, default=None,
+                        help='Bandbreiten-Grenze pro Ziel-Pi in MBit/s')
+    args = parser.parse_args()
     
-    usb_path = sys.argv[1]
-    videos, projects = import_from_usb(usb_path)
+    rate_limit = args.limit_mbit * 1000 * 1000 / 8 if args.limit_mbit else None
+    videos, projects = run_usb_import(args.usb_path, args.master, rate_limit)
     
     if videos is None and projects is None:
         sys.exit(0)  # Kein Fehler, nur nichts zu tun
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Hand-Erkennung pro Box
+
+Streaming-Filter für die Ultraschall-Distanzen einer Box:
+- Ungültige Messungen (kein Echo = 0, außerhalb des Messbereichs) werden
+  verworfen statt als "Hand" gezählt
+- Median über die letzten MEDIAN_WINDOW Werte filtert einzelne Ausreißer
+- Hysterese: Hand erkannt unter Leerwert - enter_delta, wieder frei erst
+  über Leerwert - release_delta (dazwischen bleibt der Zustand)
+- Der Leerwert (Distanz der leeren Box) startet mit der Kalibrierung beim
+  Einschalten und wird laufend nachgeführt, solange die Box leer ist.
+  Liegt sehr lange etwas in der Box, wird es zum neuen Leerwert - das
+  meldet update() als 'recalibrated', nicht als 'removed' (nichts wurde
+  entnommen, es darf nicht als Griff zählen).
+
+Alle Schwellen sind pro Box einstellbar (SmartBox.BOX_DETECTION). Die
+Anzahl Messungen gilt für REFERENCE_RATE; misst der Scheduler schneller,
+rechnet set_rate() sie auf die gleichen Zeiten um.
+
+Wird verwendet von:
+- SmartBox.py
+- testing/bench_hand_detection.py
+"""
+
+import bisect
+from collections import deque
+
+MEDIAN_WINDOW = 3
+ENTER_DELTA = 6.0          # cm unter dem Leerwert: Hand erkannt
+RELEASE_DELTA = 3.0        # cm unter dem Leerwert: Hand wieder raus (Hysterese)
+ENTER_SAMPLES = 2          # Messungen in Folge unter der Schwelle
+RELEASE_SAMPLES = 4        # Messungen in Folge über der Schwelle
+BASELINE_ALPHA = 0.02      # Nachführen des Leerwerts pro Messung (bei 20 Hz: ~2.5 s Zeitkonstante)
+RECALIBRATE_SAMPLES = 600  # Messungen "Hand" am Stück, bis der Inhalt als neuer Leerwert gilt (~30 s)
+MIN_DISTANCE = 2.0         # cm, kürzere Werte sind Messfehler (HC-SR04: ab ~2 cm)
+MAX_DISTANCE = 400.0       # cm, längere Werte sind Messfehler
+REFERENCE_RATE = 20.0      # Messungen/s, für die die Werte oben gelten (MEASURE_WINDOW = 50 ms)
+
+
+class HandFilter:
+    """
+    Erkennt Hand rein / Hand raus aus einem Strom von Distanzen.
+
+    Beispiel:
+        hand = HandFilter(baseline=30.0)
+        for distance in messungen:
+            event = hand.update(distance)   # 'detected', 'removed', 'recalibrated' oder None
+    """
+
+    def __init__(self, baseline, enter_delta=ENTER_DELTA, release_delta=RELEASE_DELTA,
+                 enter_samples=ENTER_SAMPLES, release_samples=RELEASE_SAMPLES,
+                 window=MEDIAN_WINDOW, alpha=BASELINE_ALPHA, recalibrate_samples=RECALIBRATE_SAMPLES):
+        self.baseline = baseline
+        self.enter_delta = enter_delta
+        self.release_delta = min(release_delta, enter_delta)
+        self.enter_samples = enter_samples
+        self.release_samples = release_samples
+        self.alpha = alpha
+        self.recalibrate_samples = recalibrate_samples
+        self._reference = (enter_samples, release_samples, alpha, recalibrate_samples)
+        self.detected = False
+        self.value = baseline        # Gefilterter Wert (Median)
+        self._window = deque(maxlen=window)
+        self._sorted = []
+        self._count = 0              # Messungen in Folge, die auf einen Zustandswechsel hindeuten
+        self._held = 0               # Messungen am Stück im Zustand "Hand"
+
+    def _median(self, distance):
+        if len(self._window) == self._window.maxlen:
+            del self._sorted[bisect.bisect_left(self._sorted, self._window[0])]
+        self._window.append(distance)
+        bisect.insort(self._sorted, distance)
+        return self._sorted[len(self._sorted) // 2]
+
+    def set_rate(self, rate):
+        """Messrate in Messungen/s: Zähler und Nachführung so umrechnen, dass die Zeiten gleich bleiben"""
+        if rate <= 0:
+            return
+        scale = rate / REFERENCE_RATE
+        enter_samples, release_samples, alpha, recalibrate_samples = self._reference
+        self.enter_samples = max(1, round(enter_samples * scale))
+        self.release_samples = max(1, round(release_samples * scale))
+        self.recalibrate_samples = max(1, round(recalibrate_samples * scale))
+        self.alpha = 1 - (1 - alpha) ** (1 / scale)
+
+    def update(self, distance):
+        """Neue Messung. Returns: 'detected', 'removed', 'recalibrated' (neuer Leerwert) oder None"""
+        if not MIN_DISTANCE <= distance <= MAX_DISTANCE:
+            return None
+        value = self.value = self._median(distance)
+
+        if not self.detected:
+            if value < self.baseline - self.enter_delta:
+                self._count += 1
+                if self._count >= self.enter_samples:
+                    self.detected = True
+                    self._count = 0
+                    self._held = 0
+                    return 'detected'
+            else:
+                self._count = 0
+                # Leere Box: Leerwert langsam nachführen (Temperatur, verschobene Box)
+                self.baseline += self.alpha * (value - self.baseline)
+            return None
+
+        self._held += 1
+        if value > self.baseline - self.release_delta:
+            self._count += 1
+            if self._count >= self.release_samples:
+                return self._release()
+        else:
+            self._count = 0
+            if self._held >= self.recalibrate_samples:
+                # Liegt dauerhaft etwas in der Box: das ist der neue Leerwert
+                self.baseline = value
+                self._release()
+                return 'recalibrated'
+        return None
+
+    def _release(self):
+        self.detected = False
+        self._count = 0
+        return 'removed'
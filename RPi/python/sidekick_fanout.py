@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Master-Import (Fan-out)
+
+Ein Pi liest alle rpi-ws*/ Ordner eines USB-Sticks und verteilt deren
+videos/ und projects/ über das LAN an die jeweiligen Pis:
+- Abgleich wie beim lokalen Import über Größe + Inhalts-Hash - der
+  Ziel-Pi liefert Hashes nur für Dateien gleicher Größe (POST /api/manifest)
+- Übertragung über die fortsetzbare Upload-API des Dashboards
+  (/api/uploads), nach Abbrüchen werden nur fehlende Bereiche gesendet
+- Mehrere Pis parallel, pro Pi mit optionaler Bandbreiten-Grenze
+
+Wird verwendet von:
+- sidekick-usb-import.py (--master bzw. ~/Sidekick/MASTER)
+"""
+
+import json
+import time
+import logging
+import threading
+import http.client
+import urllib.parse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sidekick_files import VIDEO_EXTENSIONS, PROJECT_EXTENSIONS
+from sidekick_import import file_hash, HASH_ALGORITHM
+
+# Konfiguration
+FANOUT_PATTERN = 'rpi-ws*'          # Ordner auf dem Stick, je einer pro Ziel-Pi
+FANOUT_PORT = 5000                  # Dashboard-Port der Ziel-Pis
+FANOUT_PARALLEL_HOSTS = 4           # So viele Pis werden gleichzeitig beliefert
+FANOUT_CHUNK_SIZE = 4 * 1024 * 1024 # Größe eines PUT-Teils
+FANOUT_SEND_BLOCK = 64 * 1024       # Blockgröße beim Senden (Takt der Bandbreiten-Grenze)
+FANOUT_TIMEOUT = 600                # Sekunden - Hash-Abgleich auf dem Ziel kann dauern
+FANOUT_RETRIES = 5                  # Wiederholungen pro Teil nach Verbindungsfehlern
+
+FOLDERS = (('videos', 'video', VIDEO_EXTENSIONS), ('projects', 'project', PROJECT_EXTENSIONS))
+
+# Ergebnis pro Ziel-Pi
+HostResult = namedtuple('HostResult', ['host', 'url', 'copied', 'skipped', 'bytes_sent',
+                                       'bytes_saved', 'seconds', 'error'])
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutError(Exception):
+    """Fehler bei der Übertragung an einen Ziel-Pi"""
+
+
+class RateLimiter:
+    """
+    Token-Bucket - begrenzt den Durchsatz auf rate Bytes/s (None = unbegrenzt).
+    Der Eimer startet leer und fasst höchstens 1/10 s, damit auch kurze
+    Übertragungen die Grenze nicht per Anfangs-Burst überschreiten.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or (rate or 0) / 10
+        self.tokens = 0
+        self.last = time.monotonic()
+
+    def wait(self, size):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= size
+        if self.tokens < 0:
+            time.sleep(-self.tokens / self.rate)
+
+
+class SourceHashes:
+    """Hashes der Stick-Dateien - jede Datei wird pro Lauf höchstens einmal gelesen"""
+
+    def __init__(self):
+        self._hashes = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, path):
+        st = path.stat()
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._hashes:
+                self._hashes[key] = file_hash(path)
+            return self._hashes[key]
+
+
+class HostClient:
+    """Spricht mit dem Dashboard eines Ziel-Pis"""
+
+    def __init__(self, url, limiter=None, timeout=FANOUT_TIMEOUT):
+        parsed = urllib.parse.urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or FANOUT_PORT
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+        self.bytes_sent = 0
+
+    def request(self, method, path, body=None, headers=None):
+        """Sendet einen Request und gibt (Status, JSON) zurück"""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, json.loads(data) if data else None
+        finally:
+            conn.close()
+
+    def request_json(self, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        status, data = self.request(method, path, body, headers)
+        if status >= 400:
+            raise FanoutError(f'{method} {path}: HTTP {status} {data}')
+        return data
+
+    def compare(self, file_type, files):
+        """Größe (und bei gleicher Größe Hash) der Dateien auf dem Ziel"""
+        data = self.request_json('POST', '/api/manifest', {
+            'type': file_type,
+            'files': [{'name': path.name, 'size': size} for path, size in files],
+        })
+        if data.get('algorithm') != HASH_ALGORITHM:
+            raise FanoutError(f"Ziel nutzt anderen Hash ({data.get('algorithm')})")
+        return data.get('files', {})
+
+    def _body(self, f, start, length):
+        """Liest den Teil blockweise und hält dabei die Bandbreiten-Grenze ein"""
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(FANOUT_SEND_BLOCK, remaining))
+            if not block:
+                raise FanoutError('Quelldatei ist kürzer geworden')
+            self.limiter.wait(len(block))
+            remaining -= len(block)
+            self.bytes_sent += len(block)
+            yield block
+
+    def upload(self, file_type, path, size):
+        """Überträgt eine Datei über die fortsetzbare Upload-API"""
+        session = self.request_json('POST', '/api/uploads',
+                                    {'type': file_type, 'filename': path.name, 'size': size})
+        failures = 0
+        with open(path, 'rb') as f:
+            while session['missing']:
+                start = session['missing'][0][0]
+                end = min(session['missing'][0][1], start + FANOUT_CHUNK_SIZE)
+                headers = {'Content-Range': f'bytes {start}-{end - 1}/{size}',
+                           'Content-Length': str(end - start)}
+                try:
+                    status, data = self.request('PUT', f"/api/uploads/{session['id']}",
+                                                self._body(f, start, end - start), headers)
+                    if status >= 400:
+                        raise FanoutError(f'PUT: HTTP {status} {data}')
+                    session = data
+                    failures = 0
+                except (OSError, http.client.HTTPException, FanoutError) as e:
+                    failures += 1
+                    if failures > FANOUT_RETRIES:
+                        raise FanoutError(f'{path.name}: {e}')
+                    time.sleep(min(2 ** failures, 30))
+                    session = self.request_json('GET', f"/api/uploads/{session['id']}")
+        self.request_json('POST', f"/api/uploads/{session['id']}/finalize")
+
+
+def find_host_folders(usb_mount_path, pattern=FANOUT_PATTERN):
+    """Alle Ziel-Ordner auf dem Stick (Ordnername = Hostname)"""
+    return [folder for folder in sorted(Path(usb_mount_path).glob(pattern)) if folder.is_dir()]
+
+
+def host_url(host, overrides=None):
+    """URL des Dashboards eines Ziel-Pis (Standard: http://<host>.local:5000)"""
+    if overrides and host in overrides:
+        return overrides[host]
+    return f'http://{host}.local:{FANOUT_PORT}'
+
+
+def push_host(folder, url, hashes, rate_limit=None, log=None):
+    """
+    Gleicht einen Stick-Ordner mit einem Ziel-Pi ab und überträgt,
+    was dort fehlt oder anders ist.
+
+    Returns:
+        HostResult
+    """
+    log = log or logger
+    start = time.perf_counter()
+    client = HostClient(url, RateLimiter(rate_limit))
+    copied, skipped, bytes_saved = [], [], 0
+    try:
+        for folder_name, file_type, extensions in FOLDERS:
+            source_dir = folder / folder_name
+            if not source_dir.is_dir():
+                continue
+            files = [(path, path.stat().st_size) for path in sorted(source_dir.iterdir())
+                     if path.is_file() and not path.name.startswith('.')
+                     and path.suffix.lower() in extensions]
+            if not files:
+                continue
+            remote = client.compare(file_type, files)
+            for path, size in files:
+                entry = remote.get(path.name)
+                if entry and entry.get('size') == size and entry.get('hash') == hashes.get(path):
+                    skipped.append(path.name)
+                    bytes_saved += size
+                    continue
+                file_start = time.perf_counter()
+                client.upload(file_type, path, size)
+                seconds = time.perf_counter() - file_start
+                copied.append(path.name)
+                log.info(f"{folder.name}: {path.name} übertragen ({size / (1024 * 1024):.1f} MB, "
+                         f"{size / max(seconds, 1e-6) / (1024 * 1024):.1f} MB/s)")
+        error = None
+    except (OSError, http.client.HTTPException, ValueError, FanoutError) as e:
+        error = str(e)
+        log.error(f"{folder.name}: {error}")
+    return HostResult(folder.name, url, copied, skipped, client.bytes_sent, bytes_saved,
+                      time.perf_counter() - start, error)
+
+
+def fan_out(usb_mount_path, overrides=None, exclude=(), rate_limit=None,
+            parallel=FANOUT_PARALLEL_HOSTS, log=None):
+    """
+    Verteilt alle rpi-ws*/ Ordner des Sticks an die jeweiligen Pis.
+
+    Args:
+        usb_mount_path: Pfad zum gemounteten USB-Stick
+        overrides: {Host: URL} statt http://<host>.local:5000
+        exclude: Hosts, die nicht beliefert werden (z.B. der Master selbst)
+        rate_limit: Bytes/s pro Ziel-Pi (None = unbegrenzt)
+        parallel: Anzahl gleichzeitig belieferter Pis
+
+    Returns:
+        Liste von HostResult
+    """
+    log = log or logger
+    folders = [f for f in find_host_folders(usb_mount_path) if f.name not in exclude]
+    if not folders:
+        return []
+    hashes = SourceHashes()
+    with ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix='fanout') as executor:
+        futures = [executor.submit(push_host, folder, host_url(folder.name, overrides), hashes, rate_limit, log)
+                   for folder in folders]
+        return [future.result() for future in futures]
+
+
+def load_host_overrides(path):
+    """
+    Liest Host-Adressen aus einer Datei (eine Zeile pro Pi):
+        rpi-ws3 = http://10.0.0.13:5000
+    Leere Zeilen und Zeilen mit # werden ignoriert.
+    """
+    overrides = {}
+    try:
+        lines = Path(path).read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return overrides
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        host, url = (part.strip() for part in line.split('=', 1))
+        overrides[host] = url
+    return overrides
@@ -6,18 +6,39 @@ Gemeinsame Funktionen für Datei-Management:
 - Video-Liste aktualisieren
 - Projekt-Liste aktualisieren
 - Pfad-Konfiguration
+- Locks pro Ordner (für parallele Requests im Dashboard)
+- Medien-Index im Speicher (Dateiname -> Größe/mtime), inkrementell
+  aktualisiert und per inotify-Watcher mit dem Ordner synchron gehalten
+- Atomares, gebündeltes Schreiben der JSON-Listen (Temp-Datei + rename)
 
 Wird verwendet von:
 - sidekick-dashboard.py (Web-Upload)
 - sidekick-usb-import.py (USB-Import)
 """
 
+import os
 import json
+import bisect
+import hashlib
+import tempfile
+import struct
+import select
+import ctypes
+import ctypes.util
+import threading
+import time
+from collections import namedtuple
 from pathlib import Path
 
 # Konfiguration
 VIDEO_EXTENSIONS = {'.mp4', '.webm', '.ogg', '.ogv', '.mov', '.avi', '.mkv'}
 PROJECT_EXTENSIONS = {'.sb3'}
+VIDEO_LIST_NAME = "video-list.json"
+PROJECT_LIST_NAME = "project-list.json"
+LIST_WRITE_DELAY = 0.5     # Sekunden, in denen Änderungen zu einem Schreibvorgang gebündelt werden
+LIST_WRITE_MAX_DELAY = 2.0 # Spätestens nach dieser Zeit wird auch bei Dauer-Änderungen geschrieben
+SORT_FIELDS = ('name', 'size', 'mtime')  # Erlaubte Sortierungen für MediaIndex.page()
+WATCH_POLL_INTERVAL = 2.0  # Sekunden (nur falls inotify nicht verfügbar ist)
 
 # Pfade (werden durch setup_paths() gesetzt)
 SIDEKICK_DIR = None
@@ -25,6 +46,21 @@ VIDEOS_DIR = None
 PROJECTS_DIR = None
 SCRATCH_DIR = None
 
+# Ein Lock pro Ordner - verhindert, dass parallele Requests die JSON-Listen
+# gleichzeitig schreiben oder sich beim Umbenennen/Löschen in die Quere kommen
+_dir_locks = {}
+_dir_locks_guard = threading.Lock()
+
+
+def get_dir_lock(directory):
+    """Gibt das (wiedereintrittsfähige) Lock für einen Ordner zurück"""
+    key = str(Path(directory).resolve())
+    with _dir_locks_guard:
+        lock = _dir_locks.get(key)
+        if lock is None:
+            lock = _dir_locks[key] = threading.RLock()
+        return lock
+
 
 def setup_paths():
     """Initialisiert die Pfade basierend auf dem Home-Verzeichnis"""
@@ -53,58 +89,440 @@ def get_paths():
     return SIDEKICK_DIR, VIDEOS_DIR, PROJECTS_DIR, SCRATCH_DIR
 
 
+def atomic_write_json(path, data):
+    """
+    Schreibt JSON atomar: erst in eine Temp-Datei im gleichen Ordner,
+    dann per os.replace() an den Zielnamen. Leser (Scratch-Extension, Kiosk)
+    sehen dadurch immer entweder die alte oder die neue, vollständige Datei.
+    
+    Returns:
+        Die geschriebenen Bytes
+    """
+    path = Path(path)
+    content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return content
+
+
+class ListWriter:
+    """
+    Schreibt eine JSON-Liste atomar und gebündelt.
+    
+    submit() merkt sich nur den neuen Inhalt; geschrieben wird erst nach
+    `delay` Sekunden ohne weitere Änderung, bei Dauer-Änderungen spätestens
+    nach `max_delay` Sekunden, oder sofort bei flush().
+    Ein Schwall von Änderungen (z.B. USB-Import) ergibt so einen einzigen
+    Schreibvorgang. Unveränderte Inhalte werden gar nicht geschrieben.
+    
+    generation wird bei jedem Schreibvorgang hochgezählt, etag ist ein
+    Hash über den zuletzt geschriebenen Inhalt.
+    """
+    
+    def __init__(self, path, delay=LIST_WRITE_DELAY, max_delay=LIST_WRITE_MAX_DELAY):
+        self.path = Path(path)
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self.generation = 0
+        self.etag = None
+        self._written = None
+        self._pending = None
+        self._pending_since = None
+        self._timer = None
+        self._lock = threading.Lock()
+        # Mit der vorhandenen Datei vergleichen, damit ein Neustart nichts neu schreibt
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self._written = json.load(f)
+            self.etag = self._make_etag(self.path.read_bytes())
+        except (OSError, ValueError):
+            pass
+    
+    @staticmethod
+    def _make_etag(content):
+        return '"' + hashlib.sha1(content).hexdigest()[:16] + '"'
+    
+    def submit(self, data):
+        """Merkt neuen Inhalt vor; schreibt nach `delay` Sekunden ohne weitere Änderung"""
+        with self._lock:
+            if self._pending is None and data == self._written:
+                return False
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            self._pending = data
+            waited = now - self._pending_since
+            if self.delay <= 0 or waited >= self.max_delay:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._write_pending()
+                return True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(min(self.delay, self.max_delay - waited), self.flush)
+            self._timer.daemon = False  # Beim Beenden noch ausstehende Änderungen schreiben
+            self._timer.start()
+            return True
+    
+    def flush(self):
+        """Schreibt ausstehende Änderungen sofort"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is not None:
+                self._write_pending()
+        return self.generation
+    
+    def _write_pending(self):
+        data, self._pending = self._pending, None
+        self._pending_since = None
+        if data == self._written:
+            return
+        content = atomic_write_json(self.path, data)
+        self._written = data
+        self.generation += 1
+        self.etag = self._make_etag(content)
+
+
+MediaEntry = namedtuple('MediaEntry', ['name', 'size', 'mtime'])
+
+
+class MediaIndex:
+    """
+    Index eines Medien-Ordners im Speicher (Dateiname -> MediaEntry).
+    
+    Statt bei jedem Aufruf den Ordner komplett einzulesen, wird der Index
+    einmal aufgebaut und danach nur für einzelne Dateien aktualisiert
+    (Upload/Löschen/Umbenennen oder Watcher-Events). Die JSON-Liste wird über
+    einen ListWriter nur geschrieben, wenn sich die Dateinamen tatsächlich
+    geändert haben - atomar und gebündelt.
+    """
+    
+    def __init__(self, directory, extensions, list_name, write_delay=LIST_WRITE_DELAY):
+        self.directory = Path(directory)
+        self.extensions = extensions
+        self.list_file = self.directory / list_name
+        self.writer = ListWriter(self.list_file, write_delay)
+        self.generation = 0          # Wird bei jeder Änderung hochgezählt
+        self._entries = {}
+        self._sorted = None          # Cache der sortierten Einträge
+        self._sorted_views = {}      # Cache pro Sortierfeld: (Einträge, Sortierschlüssel)
+        self._lock = get_dir_lock(self.directory)
+    
+    def _matches(self, name):
+        return os.path.splitext(name)[1].lower() in self.extensions
+    
+    def _changed(self):
+        self.generation += 1
+        self._sorted = None
+        self._sorted_views = {}
+    
+    def rescan(self):
+        """Liest den kompletten Ordner neu ein (Start, Watcher-Überlauf)"""
+        with self._lock:
+            entries = {}
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if self._matches(e.name) and e.is_file():
+                        st = e.stat()
+                        entries[e.name] = MediaEntry(e.name, st.st_size, st.st_mtime)
+            if entries != self._entries:
+                self._entries = entries
+                self._changed()
+            self.write_list()
+            return self.generation
+    
+    def _update_entry(self, name):
+        """Gleicht einen Eintrag mit der Datei ab, gibt True bei Änderung zurück"""
+        try:
+            st = os.stat(self.directory / name)
+            entry = MediaEntry(name, st.st_size, st.st_mtime)
+        except FileNotFoundError:
+            entry = None
+        if entry is None:
+            return self._entries.pop(name, None) is not None
+        if self._entries.get(name) != entry:
+            self._entries[name] = entry
+            return True
+        return False
+    
+    def refresh(self, *names):
+        """Aktualisiert die Einträge einzelner Dateien (neu, geändert oder gelöscht)"""
+        with self._lock:
+            changed = False
+            for name in names:
+                if self._matches(name) and self._update_entry(name):
+                    changed = True
+            if changed:
+                self._changed()
+                self.write_list()
+            return self.generation
+    
+    def rename(self, old_name, new_name):
+        """Überträgt einen Eintrag nach dem Umbenennen"""
+        return self.refresh(old_name, new_name)
+    
+    def entries(self):
+        """Sortierte Liste aller Einträge (ohne Festplattenzugriff)"""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = [self._entries[n] for n in sorted(self._entries)]
+            return self._sorted
+    
+    def names(self):
+        """Sortierte Liste aller Dateinamen"""
+        return [e.name for e in self.entries()]
+    
+    def get(self, name):
+        return self._entries.get(name)
+    
+    def _sorted_by(self, sort):
+        """Einträge aufsteigend nach (Feld, Name), gecacht bis zur nächsten Änderung"""
+        with self._lock:
+            view = self._sorted_views.get(sort)
+            if view is None:
+                entries = sorted(self.entries(), key=lambda e: (getattr(e, sort), e.name))
+                keys = [(getattr(e, sort), e.name) for e in entries]
+                view = self._sorted_views[sort] = (entries, keys)
+            return view
+    
+    def page(self, limit, cursor=None, sort='name', descending=False, prefix=''):
+        """
+        Eine Seite der Einträge (für die JSON-API des Dashboards).
+        
+        Args:
+            limit: Maximale Anzahl Einträge
+            cursor: Sortierschlüssel (Wert, Name) des letzten Eintrags der
+                    vorherigen Seite oder None für die erste Seite
+            sort: 'name', 'size' oder 'mtime'
+            descending: Absteigend sortieren
+            prefix: Nur Dateinamen mit diesem Anfang (ohne Groß-/Kleinschreibung)
+        
+        Returns:
+            Tuple (Einträge, Cursor der nächsten Seite oder None, Gesamtanzahl)
+        
+        Raises:
+            ValueError bei unbekannter Sortierung oder ungültigem Cursor
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f'Unbekannte Sortierung: {sort}')
+        entries, keys = self._sorted_by(sort)
+        try:
+            cursor = tuple(cursor) if cursor is not None else None
+            if descending:
+                start = bisect.bisect_left(keys, cursor) if cursor else len(keys)
+                positions = range(start - 1, -1, -1)
+            else:
+                start = bisect.bisect_right(keys, cursor) if cursor else 0
+                positions = range(start, len(keys))
+        except TypeError:
+            raise ValueError('Ungültiger Cursor')
+        
+        prefix = prefix.casefold()
+        if prefix:
+            total = sum(1 for e in entries if e.name.casefold().startswith(prefix))
+        else:
+            total = len(entries)
+        
+        items = []
+        next_cursor = None
+        for pos in positions:
+            if prefix and not entries[pos].name.casefold().startswith(prefix):
+                continue
+            if len(items) == limit:
+                next_cursor = keys[last_pos]
+                break
+            items.append(entries[pos])
+            last_pos = pos
+        return items, next_cursor, total
+    
+    def write_list(self):
+        """Gibt die aktuelle Namensliste an den ListWriter (schreibt nur bei Änderung)"""
+        with self._lock:
+            return self.writer.submit(self.names())
+    
+    def flush(self):
+        """Schreibt eine noch ausstehende JSON-Liste sofort"""
+        return self.writer.flush()
+
+
+# Ein Index pro Ordner und Prozess
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_media_index(directory, extensions, list_name):
+    """Gibt den (einmalig aufgebauten) Index für einen Ordner zurück"""
+    key = str(Path(directory).resolve())
+    with _indexes_guard:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = MediaIndex(directory, extensions, list_name)
+            index.rescan()
+        return index
+
+
+def get_video_index(videos_dir=None):
+    """Index des Videos-Ordners"""
+    if videos_dir is None:
+        _, videos_dir, _, _ = get_paths()
+    return get_media_index(videos_dir, VIDEO_EXTENSIONS, VIDEO_LIST_NAME)
+
+
+def get_project_index(projects_dir=None):
+    """Index des Projects-Ordners"""
+    if projects_dir is None:
+        _, _, projects_dir, _ = get_paths()
+    return get_media_index(projects_dir, PROJECT_EXTENSIONS, PROJECT_LIST_NAME)
+
+
 def update_video_list(videos_dir=None):
     """
     Aktualisiert video-list.json basierend auf den Dateien im Videos-Ordner
     
+    Liest den Ordner komplett neu ein. Für einzelne Dateien ist
+    get_video_index().refresh(name) deutlich günstiger.
+    
     Args:
         videos_dir: Optional - Pfad zum Videos-Ordner. Falls None, wird VIDEOS_DIR verwendet.
     
     Returns:
         Liste der Video-Dateinamen
     """
-    if videos_dir is None:
-        _, videos_dir, _, _ = get_paths()
-    
-    videos_dir = Path(videos_dir)
-    
-    video_files = []
-    for f in sorted(videos_dir.iterdir()):
-        if f.suffix.lower() in VIDEO_EXTENSIONS:
-            video_files.append(f.name)
-    
-    list_file = videos_dir / "video-list.json"
-    with open(list_file, 'w', encoding='utf-8') as f:
-        json.dump(video_files, f, indent=2, ensure_ascii=False)
-    
-    return video_files
+    index = get_video_index(videos_dir)
+    index.rescan()
+    index.flush()
+    return index.names()
 
 
 def update_project_list(projects_dir=None):
     """
     Aktualisiert project-list.json basierend auf den Dateien im Projects-Ordner
     
+    Liest den Ordner komplett neu ein. Für einzelne Dateien ist
+    get_project_index().refresh(name) deutlich günstiger.
+    
     Args:
         projects_dir: Optional - Pfad zum Projects-Ordner. Falls None, wird PROJECTS_DIR verwendet.
     
     Returns:
         Liste der Projekt-Dateinamen
     """
-    if projects_dir is None:
-        _, _, projects_dir, _ = get_paths()
+    index = get_project_index(projects_dir)
+    index.rescan()
+    index.flush()
+    return index.names()
+
+
+# inotify-Konstanten (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+_WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class MediaWatcher(threading.Thread):
+    """
+    Hält einen oder mehrere MediaIndex mit dem Dateisystem synchron.
+    
+    Nutzt inotify (Linux), damit auch Änderungen anderer Prozesse
+    (USB-Import, scp, ...) sofort im Index landen. Ohne inotify wird
+    alle WATCH_POLL_INTERVAL Sekunden die mtime der Ordner geprüft.
+    """
+    
+    def __init__(self, indexes, poll_interval=WATCH_POLL_INTERVAL):
+        super().__init__(name='media-watcher', daemon=True)
+        self.indexes = list(indexes)
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        self._stop_event.set()
     
-    projects_dir = Path(projects_dir)
+    def run(self):
+        fd, watches = self._init_inotify()
+        if fd is None:
+            self._run_polling()
+            return
+        try:
+            self._run_inotify(fd, watches)
+        finally:
+            os.close(fd)
     
-    project_files = []
-    for f in sorted(projects_dir.iterdir()):
-        if f.suffix.lower() in PROJECT_EXTENSIONS:
-            project_files.append(f.name)
+    def _init_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        except (OSError, AttributeError):
+            return None, None
+        if fd < 0:
+            return None, None
+        watches = {}
+        for index in self.indexes:
+            wd = libc.inotify_add_watch(fd, os.fsencode(index.directory), _WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                return None, None
+            watches[wd] = index
+        return fd, watches
     
-    list_file = projects_dir / "project-list.json"
-    with open(list_file, 'w', encoding='utf-8') as f:
-        json.dump(project_files, f, indent=2, ensure_ascii=False)
+    def _run_inotify(self, fd, watches):
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed = {}
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    for index in self.indexes:
+                        index.rescan()
+                    changed.clear()
+                    continue
+                index = watches.get(wd)
+                if index is not None and name:
+                    changed.setdefault(index, set()).add(name)
+            for index, names in changed.items():
+                index.refresh(*names)
     
-    return project_files
+    def _run_polling(self):
+        last_mtimes = {}
+        while not self._stop_event.wait(self.poll_interval):
+            for index in self.indexes:
+                try:
+                    mtime = os.stat(index.directory).st_mtime_ns
+                except OSError:
+                    continue
+                if last_mtimes.get(index) != mtime:
+                    last_mtimes[index] = mtime
+                    index.rescan()
 
 
 def update_all_lists():
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK GPIO-Backends und Echo-Zeitmessung
+
+- get_backend(): Hardware-Backend für GPIO und LED-Streifen
+  - PiBackend: RPi.GPIO und rpi_ws281x (neopixel.py), nur auf dem Pi
+  - SimulatedBackend: SimulatedGPIO und SimulatedLEDStrip, läuft auf jedem Linux
+  Auswahl per Umgebungsvariable SIDEKICK_BACKEND=pi|sim (Standard: pi auf einem
+  Raspberry Pi, sonst sim)
+- get_gpio(): RPi.GPIO auf dem Pi, sonst None
+- SimulatedGPIO: gleiche Schnittstelle wie RPi.GPIO (setup, input, output,
+  add_event_detect ...), Pegel werden per Software gesetzt. Simuliert auf
+  Wunsch Ultraschall-Sensoren (HC-SR04): nach jedem Trigger-Puls erzeugt
+  jeder Echo-Pin einen Puls, dessen Länge der eingestellten Distanz entspricht.
+- SimulatedLEDStrip: gleiche Schnittstelle wie neopixel.Adafruit_NeoPixel,
+  merkt sich Pixel und die Zeitpunkte von show()
+- Scenario: Zeitplan für die Simulation, z.B. "Hand greift bei t=1.2s in Box 3"
+- EchoTimer: misst Echo-Pulse per Flanken-Callback statt per Abfrage-Schleife.
+  Steigende und fallende Flanke werden mit time.perf_counter_ns() gestempelt,
+  fertige Messungen landen in einem Ringpuffer pro Pin. Welche Flanke es
+  war, ergibt sich aus der Reihenfolge (arm() vor jedem Trigger), nicht
+  aus dem Pegel beim Callback.
+
+Wird verwendet von:
+- SmartBox.py (ECHO_TIMING = "edge")
+- testing/bench_echo_timing.py
+- testing/bench_smartbox.py
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque, namedtuple
+
+TEMPERATURE = 20
+SPEED_OF_SOUND = 33100 + (0.6 * TEMPERATURE)  # cm/s
+ECHO_RING_SIZE = 32            # Messungen pro Pin im Ringpuffer
+ECHO_START_DELAY = 0.0005      # Sekunden vom Trigger bis zur steigenden Echo-Flanke (HC-SR04: 8 Bursts à 40 kHz)
+ECHO_TIMEOUT_NS = 38_000_000   # Längere Pulse meldet der HC-SR04 bei "kein Echo"
+EMPTY_DISTANCE = 30.0          # cm, simulierte Distanz einer leeren Box
+HAND_DISTANCE = 5.0            # cm, simulierte Distanz mit Hand in der Box
+PI_MODEL_FILE = '/proc/device-tree/model'
+
+# Eine fertige Messung: Zeitstempel der fallenden Flanke, Pulsdauer, Distanz in cm
+EchoResult = namedtuple('EchoResult', ['timestamp_ns', 'duration_ns', 'distance'])
+
+
+def get_gpio():
+    """RPi.GPIO-Modul oder None (nicht auf einem Pi)"""
+    try:
+        import RPi.GPIO as GPIO
+    except (ImportError, RuntimeError):
+        return None
+    return GPIO
+
+
+def Color(red, green, blue, white=0):
+    """24-Bit-Farbwert wie neopixel.Color (ohne rpi_ws281x importieren zu müssen)"""
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+def get_backend(name=None):
+    """
+    Hardware-Backend nach Name ("pi" / "sim") oder SIDEKICK_BACKEND.
+
+    Ohne Angabe: auf einem Raspberry Pi immer der Pi - fehlt dort RPi.GPIO
+    oder /dev/gpiomem, gibt es einen Fehler statt einer Simulation, die nur
+    so aussieht, als liefe alles. Die Simulation gibt es ohne Angabe nur
+    auf Rechnern, die erkennbar kein Pi sind.
+    """
+    name = name or os.environ.get('SIDEKICK_BACKEND')
+    if name == 'sim':
+        return SimulatedBackend()
+    if name == 'pi':
+        return PiBackend()
+    if name:
+        raise ValueError(f"Unbekanntes Backend: {name} (erwartet: pi, sim)")
+    if is_raspberry_pi():
+        return PiBackend()
+    print("Kein Raspberry Pi - verwende simulierte Hardware")
+    return SimulatedBackend()
+
+
+def is_raspberry_pi():
+    """True, wenn der Device-Tree einen Raspberry Pi meldet"""
+    try:
+        with open(PI_MODEL_FILE, encoding='utf-8', errors='replace') as f:
+            return 'Raspberry Pi' in f.read()
+    except OSError:
+        return False
+
+
+def pulse_to_distance(duration_ns):
+    """Pulsdauer (Hin- und Rückweg) in Distanz in cm"""
+    return duration_ns * SPEED_OF_SOUND / 2e9
+
+
+def distance_to_pulse(distance):
+    """Distanz in cm in Pulsdauer in Sekunden"""
+    return distance * 2 / SPEED_OF_SOUND
+
+
+class EchoTimer:
+    """
+    Misst Echo-Pulse eines Pins über Flanken-Callbacks.
+
+    Der Callback läuft im Event-Thread des Backends und macht nur das
+    Nötigste: Zeitstempel nehmen, bei fallender Flanke die Messung in den
+    Ringpuffer legen. Den Pin liest er dafür nicht: RPi.GPIO ruft Callbacks
+    verzögert auf, bei einer Hand in der Box (Puls 0,3-0,6 ms) ist der Pegel
+    dann oft schon wieder LOW. Stattdessen wechseln sich steigende und
+    fallende Flanke ab; arm() vor jedem Trigger setzt auf "steigend" zurück. Die Hauptschleife holt fertige Messungen mit pop().
+    Optional wird listener(echo_timer) nach jeder fertigen Messung
+    aufgerufen (z.B. vom Mess-Scheduler, um nicht länger als nötig zu warten).
+    """
+
+    def __init__(self, gpio, pin, ring_size=ECHO_RING_SIZE):
+        self.gpio = gpio
+        self.pin = pin
+        self.results = deque(maxlen=ring_size)
+        self.count = 0
+        self.listener = None
+        self._rise_ns = None
+        self._consumed = 0
+        gpio.add_event_detect(pin, gpio.BOTH, callback=self._on_edge)
+
+    def arm(self):
+        """Vor dem Trigger aufrufen: die nächste Flanke ist die steigende"""
+        self._rise_ns = None
+
+    def _on_edge(self, channel):
+        now = time.perf_counter_ns()
+        rise = self._rise_ns
+        if rise is None or now - rise >= ECHO_TIMEOUT_NS:
+            # Steigende Flanke - oder die fallende zur letzten ging verloren, dann neu anfangen
+            self._rise_ns = now
+            return
+        self._rise_ns = None
+        duration = now - rise
+        # deque.append ist threadsicher - kein Lock im Callback nötig
+        self.results.append(EchoResult(now, duration, pulse_to_distance(duration)))
+        self.count += 1
+        if self.listener is not None:
+            self.listener(self)
+
+    def pop(self):
+        """Neueste Messung seit dem letzten Aufruf oder None"""
+        if self.count == self._consumed:
+            return None
+        self._consumed = self.count
+        try:
+            return self.results[-1]
+        except IndexError:
+            return None
+
+    def recent(self, n=None):
+        """Die letzten n Messungen (älteste zuerst)"""
+        results = list(self.results)
+        return results if n is None else results[-n:]
+
+    def close(self):
+        self.gpio.remove_event_detect(self.pin)
+
+
+class PiBackend:
+    """Echte Hardware: RPi.GPIO und LED-Streifen über rpi_ws281x"""
+
+    name = 'pi'
+
+    def __init__(self):
+        try:
+            import RPi.GPIO as GPIO
+        except (ImportError, RuntimeError) as e:
+            raise RuntimeError(f"RPi.GPIO nicht verfügbar ({e}) - "
+                               f"ohne Hardware mit SIDEKICK_BACKEND=sim starten") from e
+        self.gpio = GPIO
+
+    def led_strip(self, num, pin, freq_hz=800000, dma=10, invert=False, brightness=255, channel=0):
+        """Initialisierter neopixel.Adafruit_NeoPixel oder None ohne rpi_ws281x"""
+        try:
+            import neopixel
+        except ImportError:
+            print("rpi_ws281x nicht installiert - fahre ohne LED-Streifen fort...")
+            return None
+        strip = neopixel.Adafruit_NeoPixel(num, pin, freq_hz, dma, invert, brightness, channel)
+        strip.begin()
+        return strip
+
+
+class SimulatedBackend:
+    """
+    Simulierte Hardware für Tests und Benchmarks.
+
+    Beispiel:
+        backend = SimulatedBackend()
+        scenario = Scenario().hand_enters(3, at=1.2).hand_leaves(3, at=2.0)
+        backend.play(scenario, trigger_pin=25, echo_pins={3: 24})
+        SmartBox.use_backend(backend)
+    """
+
+    name = 'sim'
+
+    def __init__(self, jitter=0.0, seed=None):
+        self.gpio = SimulatedGPIO(jitter=jitter, seed=seed)
+        self.strips = []
+        self.scenario = None
+
+    def led_strip(self, num, pin, freq_hz=800000, dma=10, invert=False, brightness=255, channel=0):
+        strip = SimulatedLEDStrip(num, brightness)
+        strip.begin()
+        self.strips.append(strip)
+        return strip
+
+    def play(self, scenario, trigger_pin, echo_pins, button_pins=None):
+        """
+        Verbindet ein Szenario mit den simulierten Sensoren und startet es.
+
+        trigger_pin: gemeinsamer Trigger-Pin oder {BoxNr: Trigger-Pin}
+        echo_pins: {BoxNr: Echo-Pin}, button_pins: {ButtonNr: Pin}
+        """
+        trigger_pins = trigger_pin if isinstance(trigger_pin, dict) else {box: trigger_pin for box in echo_pins}
+        groups = {}
+        for box, pin in echo_pins.items():
+            groups.setdefault(trigger_pins[box], {})[pin] = (lambda box=box: scenario.distance(box))
+        for trigger, pins in groups.items():
+            self.gpio.attach_ultrasonic(trigger, pins)
+        scenario.start(self.gpio, button_pins or {})
+        self.scenario = scenario
+        return scenario
+
+
+class Scenario:
+    """
+    Zeitplan für die Simulation, t in Sekunden ab start().
+
+    Distanzen sind eine reine Funktion der Szenario-Zeit, gleiche Szenarien
+    liefern also (ohne Jitter) gleiche Messwerte.
+
+    Beispiel:
+        Scenario().hand_enters(3, at=1.2).hand_leaves(3, at=2.0).button_press(1, at=0.5)
+    """
+
+    def __init__(self, empty_distance=EMPTY_DISTANCE, hand_distance=HAND_DISTANCE):
+        self.empty_distance = empty_distance
+        self.hand_distance = hand_distance
+        self.distances = {}  # BoxNr -> [(t, Distanz)], sortiert
+        self.pins = []       # [(t, Pin oder ('button', Nr), Pegel)]
+        self.started = None
+        self._thread = None
+
+    # --- Aufbau ---
+
+    def set_distance(self, box, distance, at):
+        """Ab t=at misst Box box die Distanz distance (None = kein Echo)"""
+        self.distances.setdefault(box, []).append((at, distance))
+        self.distances[box].sort(key=lambda entry: entry[0])
+        return self
+
+    def hand_enters(self, box, at):
+        return self.set_distance(box, self.hand_distance, at)
+
+    def hand_leaves(self, box, at):
+        return self.set_distance(box, self.empty_distance, at)
+
+    def button_press(self, button, at, duration=0.2):
+        # Buttons sind mit Pull-Up verdrahtet: gedrückt = LOW
+        self.pins.append((at, ('button', button), SimulatedGPIO.LOW))
+        self.pins.append((at + duration, ('button', button), SimulatedGPIO.HIGH))
+        return self
+
+    def set_pin(self, pin, level, at):
+        """Setzt einen beliebigen Eingang (z.B. LED-Message-Pin) bei t=at"""
+        self.pins.append((at, pin, level))
+        return self
+
+    def events(self):
+        """Alle Ereignisse als sortierte Liste (t, Art, Ziel, Wert)"""
+        events = [(t, 'distance', box, d) for box, entries in self.distances.items() for t, d in entries]
+        events += [(t, 'pin', pin, level) for t, pin, level in self.pins]
+        return sorted(events, key=lambda event: event[0])
+
+    # --- Ablauf ---
+
+    def time(self):
+        """Sekunden seit start() (0 vor dem Start)"""
+        return 0.0 if self.started is None else time.perf_counter() - self.started
+
+    def distance(self, box, t=None):
+        t = self.time() if t is None else t
+        distance = self.empty_distance
+        for at, value in self.distances.get(box, ()):
+            if at > t:
+                break
+            distance = value
+        return distance
+
+    def start(self, gpio, button_pins):
+        self.started = time.perf_counter()
+        pins = sorted(self.pins, key=lambda entry: entry[0])
+
+        def run():
+            for at, pin, level in pins:
+                if isinstance(pin, tuple):
+                    pin = button_pins.get(pin[1])
+                    if pin is None:
+                        continue
+                delay = at - self.time()
+                if delay > 0:
+                    time.sleep(delay)
+                gpio.set_input(pin, level)
+
+        if pins:
+            self._thread = threading.Thread(target=run, daemon=True, name='sim-scenario')
+            self._thread.start()
+
+
+class SimulatedLEDStrip:
+    """
+    LED-Streifen mit der Schnittstelle von neopixel.Adafruit_NeoPixel.
+
+    pixels enthält den Puffer, shown den zuletzt mit show() ausgegebenen
+    Stand; show_times die Zeitpunkte (perf_counter) aller show()-Aufrufe.
+    """
+
+    def __init__(self, num, brightness=255):
+        self.pixels = [0] * num
+        self.shown = [0] * num
+        self.brightness = brightness
+        self.show_times = []
+
+    def begin(self):
+        pass
+
+    def show(self):
+        self.shown = list(self.pixels)
+        self.show_times.append(time.perf_counter())
+
+    def setPixelColor(self, n, color):
+        self.pixels[n] = color
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        self.setPixelColor(n, Color(red, green, blue, white))
+
+    def getPixelColor(self, n):
+        return self.pixels[n]
+
+    def getPixels(self):
+        return self.pixels
+
+    def numPixels(self):
+        return len(self.pixels)
+
+    def setBrightness(self, brightness):
+        self.brightness = brightness
+
+    def getBrightness(self):
+        return self.brightness
+
+
+class SimulatedGPIO:
+    """
+    Software-GPIO mit der Schnittstelle von RPi.GPIO.
+
+    Beispiel:
+        gpio = SimulatedGPIO()
+        gpio.attach_ultrasonic(trigger_pin=25, echo_pins={18: 30.0, 23: 12.5})
+        SmartBox.use_gpio(gpio)
+    """
+
+    BCM = 11
+    BOARD = 10
+    IN = 1
+    OUT = 0
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, jitter=0.0, seed=None):
+        self.levels = {}
+        self.modes = {}
+        self.callbacks = {}
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._triggers = {}  # Trigger-Pin -> {Echo-Pin: Distanz}
+        self._output_watchers = {}  # Ausgang -> [callback(pin, level)]
+        self._echo_queue = deque()
+        self._echo_event = threading.Event()
+        self._echo_thread = None
+
+    # --- RPi.GPIO-Schnittstelle ---
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, mode, pull_up_down=PUD_OFF, initial=None):
+        self.modes[pin] = mode
+        if pin not in self.levels:
+            self.levels[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+        if initial is not None:
+            self.levels[pin] = initial
+
+    def input(self, pin):
+        return self.levels.get(pin, self.LOW)
+
+    def output(self, pin, value):
+        old = self.levels.get(pin, self.LOW)
+        level = self.levels[pin] = int(bool(value))
+        if pin in self._triggers and old and not value:
+            self._start_echoes(self._triggers[pin])
+        if old != level and pin in self._output_watchers:
+            for callback in self._output_watchers[pin]:
+                callback(pin, level)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self._lock:
+            self.callbacks[pin] = (edge, [callback] if callback else [])
+
+    def add_event_callback(self, pin, callback):
+        with self._lock:
+            self.callbacks[pin][1].append(callback)
+
+    def remove_event_detect(self, pin):
+        with self._lock:
+            self.callbacks.pop(pin, None)
+
+    def cleanup(self, pins=None):
+        with self._lock:
+            for pin in ([pins] if isinstance(pins, int) else pins or list(self.callbacks)):
+                self.callbacks.pop(pin, None)
+
+    # --- Simulation ---
+
+    def set_input(self, pin, level):
+        """Setzt einen Eingangspegel und löst passende Flanken-Callbacks aus"""
+        level = int(bool(level))
+        old = self.levels.get(pin, self.LOW)
+        self.levels[pin] = level
+        if old == level:
+            return
+        with self._lock:
+            edge, callbacks = self.callbacks.get(pin, (None, ()))
+            callbacks = list(callbacks)
+        if edge == self.BOTH or edge == (self.RISING if level else self.FALLING):
+            for callback in callbacks:
+                callback(pin)
+
+    def watch_output(self, pin, callback):
+        """callback(pin, level) bei jeder Pegeländerung eines Ausgangs (für simulierte Bausteine, z.B. HX711)"""
+        self._output_watchers.setdefault(pin, []).append(callback)
+
+    def attach_ultrasonic(self, trigger_pin, echo_pins):
+        """
+        Simuliert Ultraschall-Sensoren an einem gemeinsamen Trigger-Pin.
+        Mehrfach aufrufbar für Sensoren an verschiedenen Trigger-Pins.
+
+        echo_pins: {Pin: Distanz in cm oder Funktion() -> Distanz; None = kein Echo}
+        """
+        for pins in self._triggers.values():
+            for pin in echo_pins:
+                pins.pop(pin, None)
+        self._triggers[trigger_pin] = dict(echo_pins)
+        if self._echo_thread is None:
+            self._echo_thread = threading.Thread(target=self._echo_loop, daemon=True, name='sim-echo')
+            self._echo_thread.start()
+
+    def set_distance(self, pin, distance):
+        """Ändert die simulierte Distanz eines Echo-Pins"""
+        for pins in self._triggers.values():
+            if pin in pins:
+                pins[pin] = distance
+
+    def _start_echoes(self, echo_pins):
+        start = time.perf_counter() + ECHO_START_DELAY
+        for pin, distance in list(echo_pins.items()):
+            if callable(distance):
+                distance = distance()
+            if distance is None:
+                continue
+            width = distance_to_pulse(distance) * (1 + self.random.gauss(0, self.jitter))
+            self._echo_queue.append((start, pin, 1))
+            self._echo_queue.append((start + max(width, 0.0), pin, 0))
+        self._echo_event.set()
+
+    def _echo_loop(self):
+        """Setzt die Echo-Pegel zu den geplanten Zeitpunkten"""
+        while True:
+            self._echo_event.wait()
+            self._echo_event.clear()
+            events = []
+            while self._echo_queue:
+                events.append(self._echo_queue.popleft())
+            events.sort()
+            # Wacht der Thread zu spät auf, startet der ganze Puls-Zug später -
+            # sonst würden die ersten (kürzesten) Pulse gestaucht
+            lag = 0.0
+            for index, (at, pin, level) in enumerate(events):
+                at += lag
+                delay = at - time.perf_counter()
+                if delay > 0.0002:
+                    time.sleep(delay - 0.0002)
+                if index == 0:
+                    lag = max(0.0, time.perf_counter() - at)
+                    at += lag
+                while time.perf_counter() < at:
+                    pass
+                self.set_input(pin, level)
@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Sensor-Hub: alle Sensoren in einem Prozess
+
+Statt SmartBox.runBoxes, testing/HandDetection.py (ein Thread pro Sensor),
+testing/Scale.py und ButtonExample.py (je eine eigene while-True-Schleife,
+jedes Skript mit eigenem GPIO und eigenem Ausgabeweg) gibt es einen Hub:
+- Quellen (Source) erzeugen Ereignisse: ultrasonic (Hand in Box),
+  button (Taster), hx711 (Waagen)
+- Senken (Sink) geben Ereignisse weiter: mqtt, scratch, telemetry; die
+  Senke led steuert den LED-Streifen (MQTT-Befehle, LED-Meldepins)
+- Ein Scheduler-Thread führt die periodischen Aufgaben der Quellen aus
+  (z.B. Ultraschall-Zeitschlitze), ein Verteiler-Thread reicht die
+  Ereignisse an die Senken weiter. Taster melden sich per Flanken-Callback,
+  HX711 über ihren Lese-Thread - keine Abfrage-Schleifen.
+- Welche Sensoren an welchen Pins hängen, steht in einer JSON-Datei
+  (sidekick-hub.json) statt in der Pin-Tabelle von initSmartBoxes().
+
+Eigene Quellen/Senken:
+    @register_source('mein_sensor')
+    class MeinSensor(Source):
+        def start(self, hub):
+            hub.every(0.1, self.poll)
+        def poll(self):
+            self.hub.emit(self.type, 'wert', 1, 42)
+
+Ereignisse (HubEvent: time, source, kind, key, value):
+- hand   key = BoxNr,    value = 'detected' / 'removed' / 'recalibrated' (neuer Leerwert, kein Griff)
+- button key = ButtonNr, value = True (gedrückt) / False
+- count  key = WaageNr,  value = (Anzahl, Änderung)
+- weight / part  key = WaageNr, value = Gewicht
+
+Hub und SmartBox.py greifen auf dieselben Pins zu (auch LED-Streifen und
+LED-Meldepins) und laufen nicht gleichzeitig.
+
+Wird verwendet von:
+- sidekick-hub.py
+- testing/bench_hub.py
+"""
+
+import json
+import time
+import heapq
+import queue
+import threading
+from collections import namedtuple
+
+import SimpleLED
+from sidekick_gpio import get_backend, EchoTimer, EMPTY_DISTANCE
+from sidekick_leds import LEDController, apply_led_command
+from sidekick_pins import GPIO_US_TRIGGER, BOX_PINS, LED_STRIP_PIN
+from sidekick_detect import HandFilter
+from sidekick_scheduler import MeasureScheduler
+from sidekick_hx711 import HX711Reader, SimulatedHX711
+from sidekick_scale import ScaleService, MQTT_TOPIC_SCALE
+from sidekick_scratch import ScratchClient
+from sidekick_telemetry import Telemetry, TELEMETRY_PORT, TELEMETRY_MQTT_INTERVAL
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+MQTT_TOPIC_BOX = "sidekick/box"        # wie SmartBox.py
+MQTT_TOPIC_BUTTON = "sidekick/button"
+CALIBRATION_ROUNDS = 3                 # Messungen für den Leerwert einer Box (wie SmartBox.measure_average)
+CALIBRATION_WINDOW = 0.05
+MEASURE_SCHEDULING = "fixed"           # Vorgabe für "scheduling", wie SmartBox.MEASURE_SCHEDULING
+BUTTON_BOUNCE_MS = 20
+BUTTON_RESYNC = 1.0                    # Sekunden: Taster-Pegel nachprüfen, falls eine Flanke verloren ging
+LED_COUNT = 70                         # LEDs am Streifen (wie SmartBox.runBoxes)
+
+HubEvent = namedtuple('HubEvent', ['time', 'source', 'kind', 'key', 'value'])
+
+SOURCES = {}
+SINKS = {}
+
+
+def register_source(name):
+    """Klassen-Dekorator: Quelle unter name für die Konfiguration bekannt machen"""
+    def register(cls):
+        cls.type = name
+        SOURCES[name] = cls
+        return cls
+    return register
+
+
+def register_sink(name):
+    """Klassen-Dekorator: Senke unter name für die Konfiguration bekannt machen"""
+    def register(cls):
+        cls.type = name
+        SINKS[name] = cls
+        return cls
+    return register
+
+
+def load_config(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class Source:
+    """Basis für Quellen. start(hub) richtet die Hardware ein und meldet Aufgaben / Callbacks an."""
+
+    type = None
+
+    def __init__(self, config):
+        self.config = config
+        self.hub = None
+
+    def start(self, hub):
+        self.hub = hub
+
+    def stop(self):
+        pass
+
+    def stats(self):
+        """Für die Telemetrie (JSON-fähig)"""
+        return {}
+
+
+class Sink:
+    """Basis für Senken. handle(event) läuft im Verteiler-Thread und darf nicht blockieren."""
+
+    type = None
+
+    def __init__(self, config):
+        self.config = config
+        self.hub = None
+
+    def start(self, hub):
+        self.hub = hub
+
+    def started(self):
+        """Nachdem alle Quellen laufen"""
+
+    def handle(self, event):
+        pass
+
+    def stop(self):
+        pass
+
+
+class Hub:
+    """
+    Quellen, Senken, ein Scheduler-Thread und ein Verteiler-Thread.
+
+    Beispiel:
+        hub = Hub.from_config(load_config('sidekick-hub.json'))
+        hub.start()
+        ...
+        hub.stop()
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.gpio = self.backend.gpio
+        self.sources = []
+        self.sinks = []
+        self.telemetry = None   # Telemetry, wenn eine telemetry-Senke konfiguriert ist
+        self.events = 0
+        self._jobs = []         # Heap: (fällig, Nr., Intervall, Funktion)
+        self._job_seq = 0
+        self._cond = threading.Condition()
+        self._queue = queue.SimpleQueue()
+        self._running = False
+        self._threads = []
+
+    @classmethod
+    def from_config(cls, config, backend=None):
+        hub = cls(backend or get_backend(config.get('backend')))
+        for entry in config.get('sources', []):
+            if entry.get('enabled', True):
+                hub.add_source(SOURCES[entry['type']](entry))
+        for entry in config.get('sinks', []):
+            if entry.get('enabled', True):
+                hub.add_sink(SINKS[entry['type']](entry))
+        return hub
+
+    def add_source(self, source):
+        self.sources.append(source)
+        return source
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    # --- Für Quellen ---
+
+    def every(self, interval, func):
+        """
+        Führt func im Scheduler-Thread alle interval Sekunden aus.
+
+        Gibt func eine Zahl zurück, ist das die Wartezeit bis zum nächsten Aufruf.
+        """
+        with self._cond:
+            heapq.heappush(self._jobs, (time.monotonic(), self._job_seq, interval, func))
+            self._job_seq += 1
+            self._cond.notify()
+
+    def emit(self, source, kind, key, value):
+        """Ereignis an alle Senken (threadsicher, kehrt sofort zurück)"""
+        self._queue.put(HubEvent(time.time(), source, kind, key, value))
+
+    # --- Ablauf ---
+
+    def start(self):
+        self.gpio.setmode(self.gpio.BCM)
+        self._running = True
+        for sink in self.sinks:
+            sink.start(self)
+        for source in self.sources:
+            source.start(self)
+        for sink in self.sinks:
+            sink.started()
+        for target, name in ((self._schedule, 'hub-scheduler'), (self._dispatch, 'hub-dispatch')):
+            thread = threading.Thread(target=target, daemon=True, name=name)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for source in self.sources:
+            source.stop()
+        for sink in self.sinks:
+            sink.stop()
+        self.gpio.cleanup()
+
+    def _schedule(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._jobs:
+                        delay = self._jobs[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                if not self._running:
+                    return
+                due, seq, interval, func = heapq.heappop(self._jobs)
+            try:
+                delay = func()
+            except Exception as e:
+                print(f"Hub: Aufgabe {getattr(func, '__qualname__', func)} fehlgeschlagen: {e}")
+                delay = None
+            now = time.monotonic()
+            # Feste Rate; wer zu spät dran ist, holt nicht auf
+            due = now + delay if isinstance(delay, (int, float)) else max(due + interval, now)
+            with self._cond:
+                heapq.heappush(self._jobs, (due, seq, interval, func))
+
+    def _dispatch(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            self.events += 1
+            for sink in self.sinks:
+                try:
+                    sink.handle(event)
+                except Exception as e:
+                    print(f"Hub: Senke {sink.type} fehlgeschlagen: {e}")
+
+
+# --- Quellen ---
+
+class UltrasonicBox:
+    """Eine Box für MeasureScheduler: Echo per Flanken-Callback, Hand-Erkennung per HandFilter"""
+
+    def __init__(self, gpio, box_nr, echo_pin, trigger_pin):
+        self.box_nr = box_nr
+        self.trigger_pin = trigger_pin
+        self.GPIO_US_ECHO = echo_pin
+        self.distance = 0
+        self.averageUltra = 0
+        self.hand_filter = None
+        gpio.setup(echo_pin, gpio.IN, pull_up_down=gpio.PUD_DOWN)
+        self.echo_timer = EchoTimer(gpio, echo_pin)
+
+    def consume_echo(self):
+        result = self.echo_timer.pop()
+        if result is not None:
+            self.distance = result.distance
+
+
+@register_source('ultrasonic')
+class UltrasonicSource(Source):
+    """
+    HC-SR04 in den Boxen.
+
+    Konfiguration: {"type": "ultrasonic", "trigger": 25, "scheduling": "fixed",
+                    "boxes": [{"box": 1, "echo": 18, "trigger": 26 (optional)}, ...],
+                    "detection": {"enter_delta": 6, ...}, "box_detection": {"3": {...}}}
+
+    scheduling: "fixed" (alle Boxen zusammen, wie SmartBox.py) oder "adaptive"
+    (Zeitschlitze für Nachbarboxen an eigenen Trigger-Pins), siehe sidekick_scheduler.
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        gpio = hub.gpio
+        trigger = self.config.get('trigger', GPIO_US_TRIGGER)
+        self.boxes = [UltrasonicBox(gpio, entry['box'], entry['echo'], entry.get('trigger', trigger))
+                      for entry in self.config['boxes']]
+        if hub.backend.name == 'sim':
+            for pin in {box.trigger_pin for box in self.boxes}:
+                gpio.attach_ultrasonic(pin, {box.GPIO_US_ECHO: EMPTY_DISTANCE
+                                             for box in self.boxes if box.trigger_pin == pin})
+        for pin in {box.trigger_pin for box in self.boxes}:
+            gpio.setup(pin, gpio.OUT)
+            gpio.output(pin, False)
+
+        self._calibrate()
+        # Boxen ohne Echo sind nicht angeschlossen (wie SmartBox.checkSmartBoxes)
+        self.boxes = [box for box in self.boxes if box.averageUltra > 0]
+        detection = self.config.get('detection', {})
+        box_detection = self.config.get('box_detection', {})
+        for box in self.boxes:
+            options = dict(detection, **box_detection.get(str(box.box_nr), {}))
+            box.hand_filter = HandFilter(box.averageUltra, **options)
+        scheduling = self.config.get('scheduling', MEASURE_SCHEDULING)
+        self.scheduler = MeasureScheduler(self.boxes, trigger=self.trigger, scheduling=scheduling)
+        rate = self.scheduler.expected_rate()
+        for box in self.boxes:
+            box.hand_filter.set_rate(rate)
+        print(f"Ultraschall: {len(self.boxes)} Box(en) aktiv, {scheduling}, {len(self.scheduler.slots)} Zeitschlitz(e)")
+        hub.every(0, self.step)
+
+    def trigger(self, pin):
+        gpio = self.hub.gpio
+        gpio.output(pin, True)
+        time.sleep(0.00001)
+        gpio.output(pin, False)
+
+    def _calibrate(self):
+        sums = {box.box_nr: [] for box in self.boxes}
+        pins = sorted({box.trigger_pin for box in self.boxes})
+        for _ in range(CALIBRATION_ROUNDS):
+            for pin in pins:
+                for box in self.boxes:
+                    if box.trigger_pin == pin:
+                        box.echo_timer.arm()
+                self.trigger(pin)
+                time.sleep(CALIBRATION_WINDOW)
+            for box in self.boxes:
+                result = box.echo_timer.pop()
+                sums[box.box_nr].append(result.distance if result is not None else 0.0)
+        for box in self.boxes:
+            box.averageUltra = sum(sums[box.box_nr]) / CALIBRATION_ROUNDS
+            box.distance = box.averageUltra
+
+    def step(self):
+        start, measured = self.scheduler.run_slot()
+        for box in measured:
+            event = box.hand_filter.update(box.distance)
+            if event is not None:
+                self.hub.emit(self.type, 'hand', box.box_nr, event)
+        if self.hub.telemetry is not None:
+            self.hub.telemetry.record_cycle(start, measured)
+        return 0  # run_slot wartet selbst - gleich weiter mit dem nächsten Zeitschlitz
+
+    def stop(self):
+        for box in getattr(self, 'boxes', ()):
+            box.echo_timer.close()
+
+    def stats(self):
+        return {'boxes': [box.box_nr for box in self.boxes], 'scheduling': self.scheduler.scheduling,
+                'samples': self.scheduler.samples, 'rate': round(self.scheduler.expected_rate(), 1)}
+
+
+@register_source('button')
+class ButtonSource(Source):
+    """
+    Taster mit Pull-Up (gedrückt = LOW), gemeldet per Flanken-Callback.
+
+    Konfiguration: {"type": "button", "buttons": {"1": 4, "2": 17}}
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        gpio = hub.gpio
+        self.buttons = {int(nr): pin for nr, pin in self.config['buttons'].items()}
+        self.states = {}
+        self._lock = threading.Lock()
+        for nr, pin in self.buttons.items():
+            gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_UP)
+            self.states[nr] = gpio.input(pin) == gpio.LOW
+            gpio.add_event_detect(pin, gpio.BOTH, callback=lambda channel, nr=nr: self._check(nr),
+                                  bouncetime=BUTTON_BOUNCE_MS)
+        hub.every(BUTTON_RESYNC, self._resync)
+
+    def _check(self, nr):
+        gpio = self.hub.gpio
+        pressed = gpio.input(self.buttons[nr]) == gpio.LOW
+        with self._lock:
+            if pressed == self.states[nr]:
+                return
+            self.states[nr] = pressed
+        self.hub.emit(self.type, 'button', nr, pressed)
+
+    def _resync(self):
+        for nr in self.buttons:
+            self._check(nr)
+
+    def stop(self):
+        for pin in getattr(self, 'buttons', {}).values():
+            self.hub.gpio.remove_event_detect(pin)
+
+    def stats(self):
+        return {str(nr): pressed for nr, pressed in self.states.items()}
+
+
+@register_source('hx711')
+class ScaleSource(Source):
+    """
+    Waagen an HX711 (sidekick_scale.ScaleService ohne eigenen MQTT-Client).
+
+    Konfiguration: {"type": "hx711", "scales": [{"nr": 1, "dout": 26, "pd_sck": 10,
+                    "reference_unit": 5, "part_weight": null, "sim": {"noise": 20}}]}
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        gpio = hub.gpio
+        self.services = []
+        self.simulated = {}     # Nur im Simulations-Backend: {WaageNr: SimulatedHX711}
+        for entry in self.config['scales']:
+            reference_unit = entry.get('reference_unit', 1)
+            if hub.backend.name == 'sim':
+                self.simulated[entry['nr']] = SimulatedHX711(gpio, entry['dout'], entry['pd_sck'],
+                                                             reference_unit=reference_unit, **entry.get('sim', {}))
+            reader = HX711Reader(gpio, entry['dout'], entry['pd_sck'], reference_unit=reference_unit)
+            service = ScaleService(entry['nr'], reader, on_event=self._on_event, part_weight=entry.get('part_weight'))
+            self.services.append(service.start(timeout=5))
+
+    def _on_event(self, nr, event):
+        self.hub.emit(self.type, event[0], nr, event[1:] if event[0] == 'count' else event[1])
+
+    def stop(self):
+        for service in getattr(self, 'services', ()):
+            service.stop()
+
+    def stats(self):
+        return {str(service.nr): service.state() for service in self.services}
+
+
+# --- Senken ---
+
+@register_sink('mqtt')
+class MqttSink(Sink):
+    """
+    MQTT mit den Topics von SmartBox.py und sidekick_scale.py.
+
+    Konfiguration: {"type": "mqtt", "broker": "localhost", "port": 1883}
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        self.client = None
+        self.subscriptions = []   # (Topic-Filter, Callback(Topic, Payload))
+        if mqtt is None:
+            print("paho-mqtt nicht installiert - fahre ohne MQTT fort...")
+            return
+        broker, port = self.config.get('broker', 'localhost'), self.config.get('port', 1883)
+        try:
+            client = mqtt.Client()
+            client.on_publish = self._on_publish
+            client.on_connect = self._on_connect
+            client.on_message = self._on_message
+            client.connect(broker, port, 60)
+            client.loop_start()
+            self.client = client
+            print(f"MQTT-Verbindung zu {broker}:{port} wird hergestellt...")
+        except Exception as e:
+            print(f"MQTT-Verbindung fehlgeschlagen: {e}")
+            print("Fahre ohne MQTT fort...")
+
+    def subscribe(self, topic, callback):
+        """
+        callback(Topic, Payload) für Nachrichten auf topic (mit + / #), im Netzwerk-Thread von paho.
+
+        Wird nach jedem (Neu-)Verbinden erneut abonniert.
+        """
+        self.subscriptions.append((topic, callback))
+        if self.client is not None:
+            self.client.subscribe(topic)
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            print(f"MQTT-Verbindung fehlgeschlagen mit Code: {rc}")
+            return
+        for topic, _ in list(self.subscriptions):
+            client.subscribe(topic)
+
+    def _on_message(self, client, userdata, msg):
+        for topic, callback in list(self.subscriptions):
+            if mqtt.topic_matches_sub(topic, msg.topic):
+                try:
+                    callback(msg.topic, msg.payload)
+                except Exception as e:
+                    print(f"Fehler beim Verarbeiten der MQTT-Nachricht: {e}")
+
+    def _on_publish(self, client, userdata, mid):
+        if self.hub.telemetry is not None:
+            self.hub.telemetry.publish_done(mid)
+
+    def topic_payload(self, event):
+        """(Topic, Payload, retain) oder None"""
+        if event.kind == 'hand':
+            # Wie SmartBox: gemeldet wird das Rausnehmen der Hand
+            return (f"{MQTT_TOPIC_BOX}/{event.key}/hand", "detected", False) if event.value == 'removed' else None
+        if event.kind == 'button':
+            return f"{MQTT_TOPIC_BUTTON}/{event.key}/state", "pressed" if event.value else "released", False
+        if event.kind == 'count':
+            return f"{MQTT_TOPIC_SCALE}/{event.key}/count", str(event.value[0]), True
+        if event.kind in ('weight', 'part'):
+            return f"{MQTT_TOPIC_SCALE}/{event.key}/{event.kind}", f"{event.value:.1f}", event.kind == 'part'
+        return None
+
+    def handle(self, event):
+        if self.client is None:
+            return
+        message = self.topic_payload(event)
+        if message is None:
+            return
+        info = self.client.publish(message[0], message[1], retain=message[2])
+        if info is not None and self.hub.telemetry is not None:
+            self.hub.telemetry.publish_started(info.mid)
+
+    def stop(self):
+        if self.client is not None:
+            self.client.loop_stop()
+            self.client.disconnect()
+
+
+@register_sink('scratch')
+class ScratchSink(Sink):
+    """
+    Scratch 1.4 Remote-Sensoren (sidekick_scratch.ScratchClient).
+
+    - Hand raus:    broadcast "hand" und "hand{BoxNr}" (wie HandDetection.py)
+    - Taster:       sensor-update "button{Nr}" 1/0, beim Drücken broadcast "button{Nr}"
+    - Anzahl Teile: sensor-update "scale{Nr}" Anzahl, broadcast "scale{Nr}"
+
+    Konfiguration: {"type": "scratch", "host": "localhost", "port": 42001}
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        self.client = ScratchClient(self.config.get('host', 'localhost'), self.config.get('port', 42001)).start()
+
+    def handle(self, event):
+        if event.kind == 'hand' and event.value == 'removed':
+            self.client.broadcast("hand")
+            self.client.broadcast(f"hand{event.key}")
+        elif event.kind == 'button':
+            self.client.sensor_update({f"button{event.key}": int(event.value)})
+            if event.value:
+                self.client.broadcast(f"button{event.key}")
+        elif event.kind == 'count':
+            self.client.sensor_update({f"scale{event.key}": event.value[0]})
+            self.client.broadcast(f"scale{event.key}")
+
+    def stop(self):
+        self.client.close()
+
+
+@register_sink('telemetry')
+class TelemetrySink(Sink):
+    """
+    sidekick_telemetry: Distanzen, Ereignisse, MQTT-Latenz und die stats() aller Quellen.
+
+    Konfiguration: {"type": "telemetry", "port": 8602, "mqtt_interval": 0, "console": false}
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        # Senken starten vor den Quellen (siehe Hub.start) - die Quellen finden hub.telemetry vor
+        self.telemetry = hub.telemetry = Telemetry()
+        for source in hub.sources:
+            self.telemetry.add_source(source.type, source.stats)
+        self.telemetry.serve_http(port=self.config.get('port', TELEMETRY_PORT))
+        if self.config.get('console'):
+            self.telemetry.console()
+
+    def handle(self, event):
+        self.telemetry.record_event(event.key, event.value if event.kind == 'hand' else f"{event.kind} {event.value}")
+
+    def started(self):
+        mqtt_sink = next((sink for sink in self.hub.sinks if isinstance(sink, MqttSink)), None)
+        if mqtt_sink is not None:
+            self.telemetry.publish_mqtt(mqtt_sink.client, self.config.get('mqtt_interval', TELEMETRY_MQTT_INTERVAL))
+
+
+@register_sink('led')
+class LEDSink(Sink):
+    """
+    LED-Streifen der Boxen (sidekick_leds.LEDController), wie in SmartBox.runBoxes.
+
+    - MQTT: sidekick/box/{BoxNr|all}/led und .../led/anim über die mqtt-Senke,
+      ausgeführt mit sidekick_leds.apply_led_command im LED-Render-Thread
+    - LED-Meldepins (SmartBox.LED_control): HIGH färbt die Box rot, LOW
+      wieder grün; gemeldet per Flanken-Callback, nachgeprüft alle
+      BUTTON_RESYNC Sekunden
+
+    Konfiguration: {"type": "led", "pin": 12, "count": 70, "leds_per_box": 7,
+                    "message_pins": {"1": 7, "2": 8}}
+    Ohne pin / message_pins gilt die Belegung aus sidekick_pins.
+    """
+
+    def start(self, hub):
+        super().start(hub)
+        gpio = hub.gpio
+        self.message_pins = {}
+        self.states = {}
+        self._lock = threading.Lock()
+        strip = hub.backend.led_strip(self.config.get('count', LED_COUNT), self.config.get('pin', LED_STRIP_PIN),
+                                      SimpleLED.LED_FREQ_HZ, SimpleLED.LED_DMA, SimpleLED.LED_INVERT,
+                                      SimpleLED.LED_BRIGHTNESS, SimpleLED.LED_CHANNEL)
+        self.strip = None
+        if strip is None:
+            return
+        self.strip = LEDController(strip, leds_per_box=self.config.get('leds_per_box', SimpleLED.LED_COUNT)).start()
+        message_pins = self.config.get('message_pins', {str(box_nr): pin for _, box_nr, pin in BOX_PINS})
+        self.message_pins = {int(nr): pin for nr, pin in message_pins.items()}
+        for nr, pin in self.message_pins.items():
+            gpio.setup(pin, gpio.IN)
+            self.states[nr] = False   # Wie SmartBox.valueChanged: erst eine HIGH-Flanke färbt die Box
+            gpio.add_event_detect(pin, gpio.BOTH, callback=lambda channel, nr=nr: self._check(nr))
+        if self.message_pins:
+            hub.every(BUTTON_RESYNC, self._resync)
+
+    def started(self):
+        if self.strip is None:
+            return
+        if self.hub.telemetry is not None:
+            self.hub.telemetry.add_source('led_commands', self.strip.commands.stats)
+        mqtt_sink = next((sink for sink in self.hub.sinks if isinstance(sink, MqttSink)), None)
+        if mqtt_sink is not None:
+            for topic in (f"{MQTT_TOPIC_BOX}/+/led", f"{MQTT_TOPIC_BOX}/+/led/anim"):
+                mqtt_sink.subscribe(topic, self._on_command)
+
+    def _on_command(self, topic, payload):
+        """Wie SmartBox.on_mqtt_message: pro Box an den LED-Render-Thread übergeben"""
+        parts = topic.split('/')
+        animation = len(parts) == 5
+        box_nrs = range(1, 10) if parts[2] == 'all' else [int(parts[2])]
+        strip = self.strip
+        for box_nr in box_nrs:
+            if not strip.submit(box_nr, lambda box_nr=box_nr: apply_led_command(strip, box_nr, payload, animation)):
+                print(f"LED-Befehl für Box {box_nr} verworfen (Warteschlange voll)")
+
+    def _check(self, nr):
+        gpio = self.hub.gpio
+        high = gpio.input(self.message_pins[nr]) == gpio.HIGH
+        with self._lock:
+            if high == self.states[nr]:
+                return
+            self.states[nr] = high
+        # SimpleLED-Modus 1 = rot, 2 = grün (wie SmartBox.LED_control); fill() ist threadsicher
+        SimpleLED.ChangeColor(self.strip, 1 if high else 2, nr - 1)
+
+    def _resync(self):
+        for nr in self.message_pins:
+            self._check(nr)
+
+    def stop(self):
+        for pin in getattr(self, 'message_pins', {}).values():
+            self.hub.gpio.remove_event_detect(pin)
+        if getattr(self, 'strip', None) is not None:
+            self.strip.stop()
+
+
+@register_sink('log')
+class LogSink(Sink):
+    """Ereignisse auf der Konsole. Konfiguration: {"type": "log", "kinds": ["hand", "button", "count"]}"""
+
+    def handle(self, event):
+        kinds = self.config.get('kinds')
+        if kinds is None or event.kind in kinds:
+            print(f"{time.strftime('%H:%M:%S', time.localtime(event.time))} {event.source}: "
+                  f"{event.kind} {event.key} {event.value}")
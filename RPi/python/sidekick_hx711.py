@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK HX711-Wägezellen-Verstärker
+
+Anders als testing/hx711.py blockiert hier kein Aufrufer:
+- Ein Hintergrund-Thread pro HX711 wartet per Flanken-Callback auf
+  "Daten bereit" (DOUT fällt auf LOW) statt in einer Schleife abzufragen,
+  liest die 24 Bit in einer kompakten Schleife und legt den Rohwert mit
+  Zeitstempel in einen Ringpuffer.
+- get_value()/get_weight() rechnen nur über die letzten Werte im Puffer
+  (Median bzw. getrimmter Mittelwert wie bisher) und kehren sofort zurück.
+- Kein power_down()/power_up() pro Messung: nach jedem Einschalten braucht
+  der HX711 mehrere Wandlungen, bis die Werte stabil sind.
+- Jede HIGH-Phase von PD_SCK wird gestoppt. Wird der Lese-Thread dabei
+  länger als POWER_DOWN_TIME verdrängt (GIL-Wechsel alle 5 ms, andere
+  Threads im Prozess), hat sich der HX711 abgeschaltet: der Wert wird
+  verworfen (dropped) und die nächsten SETTLE_CONVERSIONS Werte auch.
+
+SimulatedHX711 bildet den Baustein auf sidekick_gpio.SimulatedGPIO nach
+(Wandlungsrate, Bit-Ausgabe per PD_SCK, Verstärkung, Power-Down).
+
+Beispiel:
+    scale = HX711Reader(GPIO, dout=5, pd_sck=6, reference_unit=5).start()
+    scale.tare()
+    gewicht = scale.get_weight(5)
+
+Wird verwendet von:
+- sidekick_scale.py
+- testing/Scale.py
+- testing/bench_hx711.py
+"""
+
+import time
+import random
+import threading
+from collections import deque, namedtuple
+
+HX711_RING_SIZE = 64       # Rohwerte im Ringpuffer (bei 80 Wandlungen/s: 0,8 s)
+READY_TIMEOUT = 0.5        # Sekunden, nach denen DOUT auch ohne Flanke erneut geprüft wird
+HX711_RATE = 10            # Wandlungen/s (RATE-Pin LOW: 10, HIGH: 80)
+SETTLE_CONVERSIONS = 4     # Wandlungen nach dem Einschalten, bis die Werte stabil sind
+POWER_DOWN_TIME = 0.00006  # Sekunden PD_SCK HIGH, nach denen der HX711 abschaltet
+GAIN_PULSES = {128: 1, 64: 3, 32: 2}  # Zusätzliche Takte nach den 24 Datenbits: Kanal/Verstärkung der nächsten Wandlung
+
+# Ein Rohwert: Zeitstempel (perf_counter_ns) und vorzeichenbehafteter 24-Bit-Wert
+HX711Sample = namedtuple('HX711Sample', ['timestamp_ns', 'raw'])
+
+
+def filtered(values):
+    """Median bei wenigen Werten, sonst Mittelwert ohne die äußeren 20 % (wie hx711.read_average)"""
+    values = sorted(values)
+    count = len(values)
+    if count < 5:
+        middle = count // 2
+        return values[middle] if count % 2 else (values[middle - 1] + values[middle]) / 2
+    trim = int(count * 0.2)
+    values = values[trim:count - trim]
+    return sum(values) / len(values)
+
+
+class HX711Reader:
+    """
+    Liest einen HX711 im Hintergrund.
+
+    Nur der eigene Thread bedient PD_SCK - set_gain() gilt ab der
+    übernächsten Wandlung, Aufrufer warten nie auf den Baustein
+    (außer ausdrücklich mit wait() bzw. tare()). Optional wird
+    listener(reader, sample) nach jedem Rohwert im Lese-Thread aufgerufen.
+    """
+
+    def __init__(self, gpio, dout, pd_sck, gain=128, reference_unit=1, offset=0, ring_size=HX711_RING_SIZE):
+        if reference_unit == 0:
+            raise ValueError("HX711Reader: reference_unit darf nicht 0 sein")
+        self.gpio = gpio
+        self.dout = dout
+        self.pd_sck = pd_sck
+        self.reference_unit = reference_unit
+        self.offset = offset
+        self.samples = deque(maxlen=ring_size)
+        self.count = 0
+        self.dropped = 0           # Verworfene Werte (PD_SCK zu lange HIGH, Einschwingen danach)
+        self._settle = 0
+        self.listener = None
+        self._gain_pulses = GAIN_PULSES[gain]
+        self._ready = threading.Event()
+        self._new_sample = threading.Condition()
+        self._running = False
+        self._thread = None
+        gpio.setup(pd_sck, gpio.OUT)
+        gpio.setup(dout, gpio.IN)
+        gpio.output(pd_sck, False)
+
+    # --- Ablauf ---
+
+    def start(self):
+        """Startet den Lese-Thread. Returns: self"""
+        if self._thread is None:
+            self._running = True
+            self.gpio.add_event_detect(self.dout, self.gpio.FALLING, callback=self._on_ready)
+            self._thread = threading.Thread(target=self._run, daemon=True, name=f'hx711-{self.dout}')
+            self._thread.start()
+        return self
+
+    def stop(self, power_down=False):
+        """Beendet den Lese-Thread; mit power_down bleibt der HX711 abgeschaltet, bis start() ihn weckt"""
+        if self._thread is None:
+            return
+        self._running = False
+        self._ready.set()
+        self._thread.join()
+        self._thread = None
+        self.gpio.remove_event_detect(self.dout)
+        if power_down:
+            self.gpio.output(self.pd_sck, True)
+
+    def _on_ready(self, channel):
+        self._ready.set()
+
+    def _run(self):
+        output, input_ = self.gpio.output, self.gpio.input
+        clock = time.perf_counter
+        dout, pd_sck = self.dout, self.pd_sck
+        ready, samples, new_sample = self._ready, self.samples, self._new_sample
+        output(pd_sck, False)
+        while self._running:
+            # Beim Auslesen wechselt DOUT mit den Datenbits - solche Flanken
+            # lösen den Callback auch aus, deshalb hier immer den Pegel prüfen
+            ready.clear()
+            if input_(dout):
+                ready.wait(READY_TIMEOUT)
+                continue
+
+            value = 0
+            longest = 0.0
+            for _ in range(24):
+                started = clock()
+                output(pd_sck, True)
+                output(pd_sck, False)
+                longest = max(longest, clock() - started)
+                value = (value << 1) | input_(dout)
+            for _ in range(self._gain_pulses):
+                started = clock()
+                output(pd_sck, True)
+                output(pd_sck, False)
+                longest = max(longest, clock() - started)
+
+            if longest > POWER_DOWN_TIME:
+                # Verdrängt, während PD_SCK HIGH war: der HX711 hat abgeschaltet, der Wert ist Müll
+                self.dropped += 1
+                self._settle = SETTLE_CONVERSIONS
+                continue
+            if self._settle:
+                self._settle -= 1
+                self.dropped += 1
+                continue
+            if value & 0x800000:
+                value -= 0x1000000
+            sample = HX711Sample(time.perf_counter_ns(), value)
+            samples.append(sample)
+            with new_sample:
+                self.count += 1
+                new_sample.notify_all()
+            if self.listener is not None:
+                self.listener(self, sample)
+
+    # --- Einstellungen ---
+
+    def set_gain(self, gain):
+        self._gain_pulses = GAIN_PULSES[gain]
+
+    def set_reference_unit(self, reference_unit):
+        if reference_unit == 0:
+            raise ValueError("HX711Reader: reference_unit darf nicht 0 sein")
+        self.reference_unit = reference_unit
+
+    def set_offset(self, offset):
+        self.offset = offset
+
+    # --- Werte (kehren sofort zurück) ---
+
+    def latest(self):
+        """Neuester Rohwert als HX711Sample oder None"""
+        try:
+            return self.samples[-1]
+        except IndexError:
+            return None
+
+    def recent(self, n=None):
+        """Die letzten n Rohwerte als HX711Sample (älteste zuerst)"""
+        samples = list(self.samples)
+        return samples if n is None else samples[-n:]
+
+    def read(self, times=5):
+        """Gefilterter Rohwert über die letzten times Werte oder None, solange noch keiner da ist"""
+        values = [sample.raw for sample in self.recent(times)]
+        return filtered(values) if values else None
+
+    def get_value(self, times=5):
+        raw = self.read(times)
+        return None if raw is None else raw - self.offset
+
+    def to_weight(self, raw):
+        """Rohwert in Gewicht (Offset und Referenzeinheit)"""
+        return (raw - self.offset) / self.reference_unit
+
+    def get_weight(self, times=5):
+        value = self.get_value(times)
+        return None if value is None else value / self.reference_unit
+
+    def rate(self):
+        """Wandlungen pro Sekunde über den Ringpuffer"""
+        samples = self.recent()
+        if len(samples) < 2:
+            return 0.0
+        return (len(samples) - 1) * 1e9 / (samples[-1].timestamp_ns - samples[0].timestamp_ns)
+
+    # --- Warten auf neue Werte ---
+
+    def wait(self, samples=1, timeout=None):
+        """Wartet, bis samples neue Rohwerte eingetroffen sind. Returns: False bei Zeitüberschreitung"""
+        with self._new_sample:
+            target = self.count + samples
+            return self._new_sample.wait_for(lambda: self.count >= target, timeout)
+
+    def tare(self, times=15, timeout=None):
+        """Nullpunkt aus times frischen Rohwerten. Returns: Offset oder None bei Zeitüberschreitung"""
+        if not self.wait(times, timeout):
+            return None
+        self.offset = self.read(times)
+        return self.offset
+
+
+class SimulatedHX711:
+    """
+    HX711 an einem SimulatedGPIO.
+
+    Alle 1/rate Sekunden liegt eine neue Wandlung an (DOUT fällt), jeder
+    PD_SCK-Takt schiebt ein Bit auf DOUT. Bleibt PD_SCK länger als
+    POWER_DOWN_TIME HIGH, schaltet der Baustein ab; nach dem Einschalten
+    liefert er erst nach SETTLE_CONVERSIONS Wandlungen wieder Werte.
+
+    weight: Gewicht oder Funktion() -> Gewicht, raw = offset + weight * reference_unit + Rauschen
+    """
+
+    def __init__(self, gpio, dout, pd_sck, weight=0.0, reference_unit=1, offset=0,
+                 noise=0.0, rate=HX711_RATE, seed=None):
+        self.gpio = gpio
+        self.dout = dout
+        self.pd_sck = pd_sck
+        self.weight = weight
+        self.reference_unit = reference_unit
+        self.offset = offset
+        self.noise = noise
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.conversions = 0
+        self.power_downs = 0
+        self.powered = True
+        self.gain_pulses = 1
+        self._data = 0
+        self._pulses = None     # Takte seit "Daten bereit", None = keine Daten
+        self._rise = 0.0
+        self._settle = 0
+        gpio.setup(dout, gpio.IN)
+        gpio.set_input(dout, 1)
+        gpio.watch_output(pd_sck, self._on_clock)
+        threading.Thread(target=self._convert_loop, daemon=True, name=f'sim-hx711-{dout}').start()
+
+    def raw(self):
+        weight = self.weight() if callable(self.weight) else self.weight
+        value = int(round(self.offset + weight * self.reference_unit + self.random.gauss(0, self.noise)))
+        return max(-0x800000, min(0x7FFFFF, value))
+
+    def _on_clock(self, pin, level):
+        if level:
+            self._rise = time.perf_counter()
+            if self._pulses is None:
+                return
+            self._pulses += 1
+            pulse = self._pulses
+            if pulse <= 24:
+                self.gpio.set_input(self.dout, (self._data >> (24 - pulse)) & 1)
+            else:
+                if pulse == 25:
+                    self.gpio.set_input(self.dout, 1)
+                self.gain_pulses = pulse - 24
+        elif not self.powered or time.perf_counter() - self._rise > POWER_DOWN_TIME:
+            # War abgeschaltet - Einschalten: Kanal A / 128, die ersten Wandlungen sind unbrauchbar
+            if self.powered:
+                self.power_downs += 1
+            self.powered = True
+            self.gain_pulses = 1
+            self._pulses = None
+            self._settle = SETTLE_CONVERSIONS
+            self.gpio.set_input(self.dout, 1)
+
+    def _convert_loop(self):
+        period = 1.0 / self.rate
+        due = time.perf_counter()
+        while True:
+            due += period
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                due = time.perf_counter()
+            if self.gpio.input(self.pd_sck) and time.perf_counter() - self._rise > POWER_DOWN_TIME:
+                if self.powered:
+                    self.powered = False
+                    self.power_downs += 1
+                    self._pulses = None
+                    self.gpio.set_input(self.dout, 1)
+                continue
+            if not self.powered:
+                continue
+            if self._settle:
+                self._settle -= 1
+                continue
+            # Neue Wandlung: Daten übernehmen, DOUT fällt (war er schon LOW, ist der alte Wert überschrieben)
+            self._data = self.raw() & 0xFFFFFF
+            self._pulses = 0
+            self.conversions += 1
+            self.gpio.set_input(self.dout, 0)
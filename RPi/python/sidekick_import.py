@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Import Engine
+
+Kopiert Videos/Projekte von einem Quellordner (z.B. USB-Stick) in die
+SIDEKICK-Ordner:
+- Plant zuerst anhand von Größe + Inhalts-Hash, was wirklich kopiert
+  werden muss (FAT32-mtimes sind zu ungenau und oft zeitzonenverschoben)
+- Hashes der Zieldateien stehen in einem Manifest im Zielordner und
+  werden nur neu berechnet, wenn sich Größe oder mtime geändert haben
+- Kopiert mit wenigen Worker-Threads und großen Puffern in Temp-Dateien,
+  die nach erfolgreicher Prüfung atomar umbenannt werden
+- Liefert Durchsatz pro Datei und die durch Deduplizierung gesparten Bytes
+- Meldet den Fortschritt (Bytes, aktuelle Datei, Durchsatz, Restzeit)
+  gedrosselt an beliebige Empfänger, z.B. MQTT und eine Status-Datei
+  für das Dashboard (ImportProgress)
+
+Wird verwendet von:
+- sidekick-usb-import.py (USB-Import)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sidekick_files import atomic_write_json
+
+# Konfiguration
+IMPORT_WORKERS = 2                     # USB-Sticks werden mit mehr Threads eher langsamer
+COPY_BUFFER_SIZE = 4 * 1024 * 1024     # Lese-/Schreibpuffer pro Worker
+HASH_ALGORITHM = 'blake2b'             # Auf dem Pi (ohne SHA-Befehle) deutlich schneller als sha256
+HASH_MANIFEST_NAME = '.sidekick-hashes.json'
+TEMP_PREFIX = '.import-'
+TEMP_SUFFIX = '.part'
+STALE_IMPORT_AGE = 60                  # Sekunden ohne Schreibzugriff, bis eine Temp-Datei als verwaist gilt
+PROGRESS_INTERVAL = 1.0                # Sekunden zwischen zwei Fortschrittsmeldungen
+IMPORT_STATUS_NAME = 'import-status.json'  # Status-Datei im SIDEKICK-Ordner (für das Dashboard)
+
+# Geplante Aktion für eine Datei: 'new', 'update' oder 'skip'
+PlannedFile = namedtuple('PlannedFile', ['source', 'target', 'action', 'size', 'digest'])
+# Ergebnis pro Datei - seconds/error nur bei kopierten Dateien
+FileResult = namedtuple('FileResult', ['name', 'action', 'size', 'seconds', 'error'])
+
+logger = logging.getLogger(__name__)
+
+_target_locks = {}
+_target_locks_lock = threading.Lock()
+
+
+def file_hash(path, buffer_size=COPY_BUFFER_SIZE):
+    """Inhalts-Hash einer Datei (hex)"""
+    digest = hashlib.new(HASH_ALGORITHM)
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+class HashManifest:
+    """
+    Zwischenspeicher der Inhalts-Hashes eines Zielordners.
+    
+    Pro Datei: Größe, mtime und Hash der Zieldatei sowie Größe/mtime der
+    Quelldatei, aus der sie zuletzt kopiert bzw. mit der sie verglichen wurde.
+    Stimmt die Quelle damit überein, muss sie nicht erneut gelesen werden.
+    """
+    
+    def __init__(self, directory):
+        self.path = Path(directory) / HASH_MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._changed = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def target_hash(self, target):
+        """Hash der Zieldatei - aus dem Manifest oder neu berechnet"""
+        st = target.stat()
+        with self._lock:
+            entry = self.entries.get(target.name)
+        if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+            return entry['hash']
+        digest = file_hash(target)
+        self.record(target, digest)
+        return digest
+    
+    def source_known(self, name, source_stat):
+        """True, wenn die Quelle seit dem letzten Abgleich unverändert ist"""
+        with self._lock:
+            entry = self.entries.get(name)
+        return bool(entry and entry.get('source') == [source_stat.st_size, source_stat.st_mtime_ns])
+    
+    def record(self, target, digest, source_stat=None):
+        """Vermerkt den Hash einer Zieldatei (und optional die passende Quelle)"""
+        st = target.stat()
+        with self._lock:
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest}
+            if source_stat is not None:
+                entry['source'] = [source_stat.st_size, source_stat.st_mtime_ns]
+            elif target.name in self.entries and self.entries[target.name].get('hash') == digest:
+                entry['source'] = self.entries[target.name].get('source')
+            self.entries[target.name] = entry
+            self._changed = True
+    
+    def save(self):
+        """Schreibt das Manifest (ohne Einträge für gelöschte Dateien)"""
+        with self._lock:
+            existing = {name: entry for name, entry in self.entries.items()
+                        if (self.path.parent / name).exists()}
+            if not self._changed and len(existing) == len(self.entries):
+                return
+            self.entries = existing
+            atomic_write_json(self.path, self.entries)
+            self._changed = False
+
+
+def plan_import(source_dir, target_dir, extensions, manifest):
+    """
+    Ermittelt, welche Dateien kopiert werden müssen.
+    
+    Returns:
+        Liste von PlannedFile (sortiert nach Dateiname)
+    """
+    plan = []
+    source_path = Path(source_dir)
+    target_path = Path(target_dir)
+    if not source_path.is_dir():
+        return plan
+    
+    for source in sorted(source_path.iterdir()):
+        if not source.is_file() or source.name.startswith('.') or source.suffix.lower() not in extensions:
+            continue
+        source_stat = source.stat()
+        target = target_path / source.name
+        try:
+            target_stat = target.stat()
+        except FileNotFoundError:
+            plan.append(PlannedFile(source, target, 'new', source_stat.st_size, None))
+            continue
+        
+        if target_stat.st_size != source_stat.st_size:
+            plan.append(PlannedFile(source, target, 'update', source_stat.st_size, None))
+            continue
+        
+        # Gleiche Größe: Inhalt vergleichen (Quelle nur lesen, wenn sie sich geändert hat)
+        target_digest = manifest.target_hash(target)
+        if manifest.source_known(source.name, source_stat):
+            plan.append(PlannedFile(source, target, 'skip', source_stat.st_size, target_digest))
+            continue
+        source_digest = file_hash(source)
+        if source_digest == target_digest:
+            manifest.record(target, target_digest, source_stat)
+            plan.append(PlannedFile(source, target, 'skip', source_stat.st_size, target_digest))
+        else:
+            plan.append(PlannedFile(source, target, 'update', source_stat.st_size, source_digest))
+    return plan
+
+
+class ImportProgress:
+    """
+    Fortschritt eines Imports.
+    
+    Die Kopier-Threads zählen nur Bytes hoch (advance()), ein eigener Thread
+    erzeugt daraus alle PROGRESS_INTERVAL Sekunden eine Meldung (dict) und
+    übergibt sie an die Sinks - Formatieren und Versenden bremsen das
+    Kopieren dadurch nicht.
+    """
+    
+    def __init__(self, sinks=(), interval=PROGRESS_INTERVAL, source=None):
+        self.sinks = [sink for sink in sinks if sink is not None]
+        self.interval = interval
+        self.source = str(source) if source else None
+        self.state = 'planning'
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.files_done = 0
+        self.files_total = 0
+        self.current = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._rate = None
+        self._last_sample = None
+    
+    def start(self):
+        self._emit()
+        self._thread = threading.Thread(target=self._run, name='import-progress', daemon=True)
+        self._thread.start()
+    
+    def add_total(self, files, size):
+        """Plan eines Ordners steht fest - ab jetzt wird kopiert"""
+        with self._lock:
+            self.files_total += files
+            self.bytes_total += size
+            self.state = 'copying'
+    
+    def file_started(self, name):
+        with self._lock:
+            self.current.append(name)
+    
+    def file_finished(self, name):
+        with self._lock:
+            self.current.remove(name)
+            self.files_done += 1
+    
+    def advance(self, size):
+        with self._lock:
+            self.bytes_done += size
+    
+    def snapshot(self):
+        """Aktueller Stand inkl. geglättetem Durchsatz und Restzeit"""
+        now = time.monotonic()
+        with self._lock:
+            done, total = self.bytes_done, self.bytes_total
+            snapshot = {
+                'state': self.state,
+                'source': self.source,
+                'bytes_done': done,
+                'bytes_total': total,
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'current': list(self.current),
+            }
+        if self._last_sample is not None:
+            last_time, last_done = self._last_sample
+            if now > last_time:
+                rate = (done - last_done) / (now - last_time)
+                self._rate = rate if self._rate is None else 0.3 * rate + 0.7 * self._rate
+        self._last_sample = (now, done)
+        snapshot['throughput'] = round(self._rate or 0.0)
+        snapshot['eta'] = round((total - done) / self._rate) if self._rate else None
+        snapshot['started'] = self.started
+        snapshot['updated'] = time.time()
+        return snapshot
+    
+    def finish(self, state='done'):
+        """Stoppt den Melde-Thread und sendet den Endstand"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self.state = state
+            self.current = []
+        self._emit()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._emit()
+    
+    def _emit(self):
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink(snapshot)
+            except Exception as e:
+                logger.warning(f"Fortschritt konnte nicht gemeldet werden: {e}")
+
+
+def status_file_sink(path):
+    """Sink, der den Fortschritt atomar als JSON-Datei ablegt"""
+    def write(snapshot):
+        atomic_write_json(path, snapshot)
+    return write
+
+
+def copy_file(planned, manifest, buffer_size=COPY_BUFFER_SIZE, progress=None):
+    """
+    Kopiert eine Datei über eine Temp-Datei im Zielordner und benennt sie
+    erst nach erfolgreichem Schreiben (und passendem Hash) atomar um.
+    
+    Returns:
+        FileResult
+    """
+    source, target = planned.source, planned.target
+    temp = None
+    digest = hashlib.new(HASH_ALGORITHM)
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    start = time.perf_counter()
+    if progress is not None:
+        progress.file_started(source.name)
+    try:
+        source_stat = source.stat()
+        # Eindeutiger Name - zwei Importe derselben Datei schreiben nie in dieselbe Temp-Datei
+        fd, temp = tempfile.mkstemp(dir=target.parent, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+        temp = Path(temp)
+        with open(source, 'rb', buffering=0) as src, open(fd, 'wb', buffering=0) as dst:
+            while True:
+                n = src.readinto(buf)
+                if not n:
+                    break
+                digest.update(view[:n])
+                dst.write(view[:n])
+                if progress is not None:
+                    progress.advance(n)
+            os.fsync(dst.fileno())
+        hexdigest = digest.hexdigest()
+        if planned.digest is not None and hexdigest != planned.digest:
+            raise OSError('Prüfsumme stimmt nicht (Quelle während des Kopierens verändert?)')
+        # mtime wie bei shutil.copy2() übernehmen, Rechte wie beim Web-Upload
+        os.utime(temp, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.chmod(temp, 0o644)
+        os.replace(temp, target)
+        manifest.record(target, hexdigest, source_stat)
+        return FileResult(source.name, planned.action, planned.size, time.perf_counter() - start, None)
+    except OSError as e:
+        if temp is not None:
+            try:
+                temp.unlink()
+            except OSError:
+                pass
+        return FileResult(source.name, planned.action, planned.size, time.perf_counter() - start, str(e))
+    finally:
+        if progress is not None:
+            progress.file_finished(source.name)
+
+
+class ImportReport:
+    """Zusammenfassung eines Imports"""
+    
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+    
+    @property
+    def copied(self):
+        return [r.name for r in self.results if r.action != 'skip' and r.error is None]
+    
+    @property
+    def skipped(self):
+        return [r.name for r in self.results if r.action == 'skip']
+    
+    @property
+    def failed(self):
+        return [r for r in self.results if r.error is not None]
+    
+    @property
+    def bytes_copied(self):
+        return sum(r.size for r in self.results if r.action != 'skip' and r.error is None)
+    
+    @property
+    def bytes_saved(self):
+        """Bytes, die dank Hash-Vergleich nicht kopiert werden mussten"""
+        return sum(r.size for r in self.results if r.action == 'skip')
+
+
+def format_throughput(size, seconds):
+    """MB/s als Text"""
+    if seconds <= 0:
+        return '-'
+    return f'{size / seconds / (1024 * 1024):.1f} MB/s'
+
+
+def target_lock(target_dir):
+    """
+    Lock pro Zielordner: zwei Sticks, die in denselben Ordner importieren,
+    planen und kopieren nacheinander (gemeinsames Hash-Manifest).
+    """
+    key = os.path.realpath(target_dir)
+    with _target_locks_lock:
+        return _target_locks.setdefault(key, threading.Lock())
+
+
+def run_import(source_dir, target_dir, extensions, workers=IMPORT_WORKERS, log=None, progress=None):
+    """
+    Importiert alle passenden Dateien aus source_dir nach target_dir.
+    
+    progress: optionales ImportProgress, das über mehrere Ordner hinweg zählt
+    
+    Returns:
+        ImportReport
+    """
+    log = log or logger
+    start = time.perf_counter()
+    target_path = Path(target_dir)
+    if not Path(source_dir).is_dir():
+        return ImportReport([], 0.0)
+    target_path.mkdir(parents=True, exist_ok=True)
+    
+    lock = target_lock(target_path)
+    if not lock.acquire(blocking=False):
+        log.info(f"{target_path}: anderer Import läuft - warte...")
+        lock.acquire()
+    try:
+        return _run_import_locked(source_dir, target_path, extensions, workers, log, progress, start)
+    finally:
+        lock.release()
+
+
+def _run_import_locked(source_dir, target_path, extensions, workers, log, progress, start):
+    # Manifest erst unter dem Lock laden - ein vorheriger Import hat es eventuell gerade gespeichert
+    manifest = HashManifest(target_path)
+    plan = plan_import(source_dir, target_path, extensions, manifest)
+    results = [FileResult(p.source.name, 'skip', p.size, 0.0, None) for p in plan if p.action == 'skip']
+    for result in results:
+        log.info(f"Überspringe (identisch): {result.name}")
+    
+    to_copy = [p for p in plan if p.action != 'skip']
+    if progress is not None:
+        progress.add_total(len(to_copy), sum(p.size for p in to_copy))
+    if to_copy:
+        # Große Dateien zuerst, damit am Ende nicht ein einzelner Worker allein kopiert
+        to_copy.sort(key=lambda p: p.size, reverse=True)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='import') as executor:
+            for result in executor.map(lambda p: copy_file(p, manifest, progress=progress), to_copy):
+                results.append(result)
+                verb = 'Kopiert' if result.action == 'new' else 'Aktualisiert'
+                if result.error:
+                    log.error(f"Fehler bei {result.name}: {result.error}")
+                else:
+                    log.info(f"{verb}: {result.name} ({result.size / (1024 * 1024):.1f} MB, "
+                             f"{format_throughput(result.size, result.seconds)})")
+    
+    manifest.save()
+    results.sort(key=lambda r: r.name)
+    return ImportReport(results, time.perf_counter() - start)
+
+
+def cleanup_stale_imports(target_dir, max_age=STALE_IMPORT_AGE):
+    """
+    Entfernt Temp-Dateien abgebrochener Imports.
+    
+    Nur Dateien, die seit max_age Sekunden nicht mehr geschrieben wurden -
+    ein parallel laufender Import (zweiter Stick) schreibt seine ständig.
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    for f in Path(target_dir).glob(f'{TEMP_PREFIX}*{TEMP_SUFFIX}'):
+        try:
+            if f.stat().st_mtime > cutoff:
+                continue
+            f.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK LED-Steuerung mit Frame-Puffer
+
+Hält den Zustand des ganzen LED-Streifens in einem kompakten Array und
+gibt ihn gebündelt aus:
+- Änderungen (einzelne Pixel, Bereiche, ganze Boxen) landen nur im Puffer
+- show() fordert lediglich einen Frame an; ein Render-Thread gibt höchstens
+  einmal pro Frame-Takt aus, viele Änderungen ergeben also ein einziges
+  ws2811_render (z.B. sidekick/box/all/led: 1 statt 9 Ausgaben)
+- An den Streifen gehen nur Pixel, die sich seit dem letzten Frame
+  geändert haben (jedes setPixelColor ist ein SWIG-Aufruf)
+
+LEDController bietet zusätzlich die Schnittstelle von
+neopixel.Adafruit_NeoPixel (setPixelColor, show, ...) und kann überall
+anstelle eines Streifens übergeben werden.
+
+Befehle aus anderen Threads (z.B. dem MQTT-Netzwerk-Thread) gehen mit
+submit() in eine begrenzte CommandQueue und werden erst im Render-Thread
+ausgeführt. Mehrere Befehle für dieselbe Box fallen dabei zusammen, nur
+der letzte zählt.
+
+Animationen (Blink, Pulse, Chase, Fade, Progress) laufen pro Box im
+selben Render-Thread: Solange eine Animation aktiv ist, wird mit festem
+Takt (FRAME_RATE) gerendert. Helligkeitsverläufe kommen aus vorberechneten
+Tabellen (Gamma + Helligkeit), pro Frame wird nur noch nachgeschlagen.
+
+LED-Befehle aus MQTT (sidekick/box/{n}/led, .../led/anim) wertet
+apply_led_command aus: Farbnamen oder #RRGGBB (parse_color) bzw.
+"<effekt> [farbe] [periode]" (parse_animation).
+
+Wird verwendet von:
+- SmartBox.py
+- sidekick_hub.py
+- SimpleLED.py
+- testing/bench_led_frames.py
+- testing/bench_led_animation.py
+- testing/stress_mqtt_leds.py
+"""
+
+import math
+import time
+import threading
+from array import array
+from collections import deque, OrderedDict
+
+from sidekick_gpio import Color
+
+FRAME_RATE = 50     # Frames pro Sekunde (maximal, bei Animationen fest)
+LEDS_PER_BOX = 7    # LEDs pro Box (wie SimpleLED.LED_COUNT)
+GAMMA = 2.2         # Wahrnehmungs-Korrektur für Helligkeitsverläufe
+FRAME_LOG_SIZE = 1000  # Frames in LEDController.frame_log (für Benchmarks)
+COMMAND_QUEUE_SIZE = 32  # Ausstehende Befehle (nach Zusammenfassen pro Box)
+
+# Sinus-Welle 0..255 in 256 Schritten (für Pulse)
+WAVE = [round(127.5 * (1 - math.cos(2 * math.pi * i / 256))) for i in range(256)]
+
+
+def split_color(color):
+    """24-Bit-Farbwert in (Komponente 1, 2, 3) in Streifen-Reihenfolge"""
+    return (color >> 16) & 0xff, (color >> 8) & 0xff, color & 0xff
+
+
+def join_color(c1, c2, c3):
+    return (c1 << 16) | (c2 << 8) | c3
+
+
+def brightness_curve(brightness=255, gamma=GAMMA):
+    """Helligkeitsstufe 0..255 -> Faktor 0..255 (gamma-korrigiert, mit Maximalhelligkeit)"""
+    return [round(255 * (i / 255) ** gamma * brightness / 255) for i in range(256)]
+
+
+def level_table(color, brightness=255):
+    """256 fertige Farbwerte einer Farbe für die Stufen 0 (aus) bis 255 (volle Farbe)"""
+    c1, c2, c3 = split_color(color)
+    return array('I', [join_color(c1 * f // 255, c2 * f // 255, c3 * f // 255)
+                       for f in brightness_curve(brightness)])
+
+
+class Animation:
+    """
+    Basis für Box-Animationen.
+
+    frame(t, count) liefert die Farben der count LEDs einer Box, t in
+    Sekunden seit Start. finished(t) beendet die Animation; der letzte
+    Frame bleibt dann stehen.
+    """
+
+    def __init__(self, color, period=1.0, brightness=255):
+        self.color = color
+        self.period = max(period, 0.02)
+        self.levels = level_table(color, brightness)
+
+    def setup(self, current, count):
+        """Wird beim Start mit den aktuellen Farben der Box aufgerufen"""
+
+    def frame(self, t, count):
+        raise NotImplementedError
+
+    def finished(self, t):
+        return False
+
+
+class Blink(Animation):
+    """An/aus, je eine halbe Periode"""
+
+    def frame(self, t, count):
+        on = (t % self.period) < self.period / 2
+        return [self.levels[255] if on else 0] * count
+
+
+class Pulse(Animation):
+    """Weiches Ein- und Ausblenden (Sinus)"""
+
+    def frame(self, t, count):
+        return [self.levels[WAVE[int(t / self.period * 256) % 256]]] * count
+
+
+class Chase(Animation):
+    """Ein Lichtpunkt mit Schweif läuft einmal pro Periode durch die Box"""
+
+    TAIL = (255, 96, 32)
+
+    def frame(self, t, count):
+        head = int(t / self.period * count) % count
+        colors = [0] * count
+        for distance, level in enumerate(self.TAIL):
+            colors[(head - distance) % count] = self.levels[level]
+        return colors
+
+
+class Fade(Animation):
+    """Blendet von den aktuellen Farben in period Sekunden zur Zielfarbe über"""
+
+    def setup(self, current, count):
+        target = split_color(self.color)
+        # Pro LED eine Tabelle mit 256 Zwischenfarben
+        self.steps = []
+        for color in current:
+            start = split_color(color)
+            self.steps.append(array('I', [
+                join_color(*(a + (b - a) * i // 255 for a, b in zip(start, target))) for i in range(256)
+            ]))
+
+    def frame(self, t, count):
+        step = min(255, int(t / self.period * 255))
+        return [steps[step] for steps in self.steps]
+
+    def finished(self, t):
+        return t >= self.period
+
+
+class Progress(Animation):
+    """Fortschrittsbalken: percent Prozent der LEDs leuchten"""
+
+    def __init__(self, color, percent, brightness=255):
+        super().__init__(color, brightness=brightness)
+        self.percent = max(0.0, min(100.0, percent))
+
+    def frame(self, t, count):
+        lit = round(self.percent * count / 100)
+        return [self.levels[255]] * lit + [0] * (count - lit)
+
+    def finished(self, t):
+        return True
+
+
+ANIMATIONS = {
+    'blink': Blink,
+    'pulse': Pulse,
+    'chase': Chase,
+    'fade': Fade,
+}
+
+
+class CommandQueue:
+    """
+    Begrenzte Warteschlange für LED-Befehle mit "der letzte gewinnt" pro Schlüssel.
+
+    put() ersetzt einen noch nicht ausgeführten Befehl mit gleichem
+    Schlüssel (z.B. der Box-Nummer); ist die Schlange voll, wird der neue
+    Befehl verworfen. Zähler: submitted, collapsed, dropped, applied, max_depth.
+    """
+
+    def __init__(self, maxsize=COMMAND_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.collapsed = 0
+        self.dropped = 0
+        self.applied = 0
+        self.max_depth = 0
+
+    def put(self, key, command):
+        """Returns: False, wenn der Befehl verworfen wurde"""
+        with self._lock:
+            self.submitted += 1
+            if key in self._pending:
+                self._pending[key] = command
+                self.collapsed += 1
+                return True
+            if len(self._pending) >= self.maxsize:
+                self.dropped += 1
+                return False
+            self._pending[key] = command
+            self.max_depth = max(self.max_depth, len(self._pending))
+            return True
+
+    def drain(self):
+        """Alle ausstehenden Befehle (in Reihenfolge des ersten Eintreffens)"""
+        with self._lock:
+            commands = list(self._pending.values())
+            self._pending.clear()
+            self.applied += len(commands)
+        return commands
+
+    def depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'depth': len(self._pending),
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'collapsed': self.collapsed,
+                'dropped': self.dropped,
+                'applied': self.applied,
+            }
+
+
+class LEDController:
+    """
+    Frame-Puffer vor einem LED-Streifen.
+
+    Beispiel:
+        leds = LEDController(strip)
+        leds.start()
+        leds.set_boxes({box_nr: Color(0, 255, 0) for box_nr in range(1, 10)})
+        leds.show()   # ein Frame, spätestens nach 1/FRAME_RATE s
+        leds.animate(3, Pulse(Color(0, 0, 255), period=2.0))
+        leds.submit(3, lambda: leds.set_box(3, 0))   # aus einem anderen Thread
+    """
+
+    def __init__(self, strip, frame_rate=FRAME_RATE, leds_per_box=LEDS_PER_BOX):
+        self.strip = strip
+        self.size = strip.numPixels()
+        self.leds_per_box = leds_per_box
+        self.interval = 1.0 / frame_rate
+        self.frame = array('I', [0]) * self.size
+        self.renders = 0
+        self._shown = None  # Stand des Streifens nach dem letzten Frame (None = unbekannt)
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._pending = threading.Event()   # Neuer Frame angefordert
+        self._stop = threading.Event()      # Eigenes Event: ein clear() von _pending darf das Stoppen nicht verschlucken
+        self._running = False
+        self._thread = None
+        self._last_render = 0.0
+        self.animations = {}  # box_nr -> (Animation, Startzeit)
+        self.frame_log = deque(maxlen=FRAME_LOG_SIZE)  # (Takt-Zeitpunkt, Dauer für Berechnen + Ausgeben)
+        self.commands = CommandQueue()
+
+    # --- Puffer ---
+
+    def fill(self, start, end, color):
+        """Setzt die Pixel start..end-1 auf color"""
+        start, end = max(0, start), min(self.size, end)
+        if end > start:
+            with self._lock:
+                self.frame[start:end] = array('I', [color]) * (end - start)
+
+    def box_range(self, box_nr):
+        start = self.leds_per_box * (box_nr - 1)
+        return start, start + self.leds_per_box
+
+    def set_box(self, box_nr, color):
+        """Färbt alle LEDs einer Box (box_nr ab 1) und beendet deren Animation"""
+        self.set_boxes({box_nr: color})
+
+    def set_boxes(self, colors):
+        """Färbt mehrere Boxen auf einmal: {box_nr: color}. Laufende Animationen dieser Boxen enden."""
+        with self._lock:
+            for box_nr, color in colors.items():
+                self.animations.pop(box_nr, None)
+                start, end = self.box_range(box_nr)
+                start, end = max(0, start), min(self.size, end)
+                if end > start:
+                    self.frame[start:end] = array('I', [color]) * (end - start)
+
+    # --- Animationen ---
+
+    def animate(self, box_nr, animation):
+        """Startet eine Animation auf einer Box (ersetzt eine laufende). Braucht den Render-Thread (start())."""
+        start, end = self.box_range(box_nr)
+        end = min(self.size, end)
+        if end <= start:
+            return
+        with self._lock:
+            animation.setup(list(self.frame[start:end]), end - start)
+            self.animations[box_nr] = (animation, time.monotonic())
+        self._pending.set()
+
+    def stop_animation(self, box_nr):
+        """Hält die Animation einer Box an, der aktuelle Frame bleibt stehen"""
+        with self._lock:
+            self.animations.pop(box_nr, None)
+
+    def _animate(self, now):
+        with self._lock:
+            for box_nr, (animation, started) in list(self.animations.items()):
+                start, end = self.box_range(box_nr)
+                end = min(self.size, end)
+                t = now - started
+                self.frame[start:end] = array('I', animation.frame(t, end - start))
+                if animation.finished(t):
+                    del self.animations[box_nr]
+
+    # --- Befehle aus anderen Threads ---
+
+    def submit(self, key, command):
+        """
+        Reiht command() zur Ausführung im Render-Thread ein, ein ausstehender
+        Befehl mit gleichem key wird ersetzt. Ohne Render-Thread sofort.
+        Returns: False, wenn die Warteschlange voll war
+        """
+        if not self._running:
+            command()
+            return True
+        accepted = self.commands.put(key, command)
+        self._pending.set()
+        return accepted
+
+    def _apply_commands(self):
+        for command in self.commands.drain():
+            try:
+                command()
+            except Exception as e:
+                print(f"LED-Befehl fehlgeschlagen: {e}")
+
+    # --- Schnittstelle wie neopixel.Adafruit_NeoPixel ---
+
+    def begin(self):
+        pass
+
+    def setPixelColor(self, n, color):
+        self.frame[n] = color
+
+    def getPixelColor(self, n):
+        return self.frame[n]
+
+    def numPixels(self):
+        return self.size
+
+    def show(self):
+        """Fordert einen Frame an. Ohne laufenden Render-Thread wird sofort ausgegeben."""
+        if self._running:
+            self._pending.set()
+        else:
+            self.render()
+
+    # --- Ausgabe ---
+
+    def render(self):
+        """Gibt den aktuellen Puffer aus (nur geänderte Pixel, ein strip.show())"""
+        with self._render_lock:
+            with self._lock:
+                frame = array('I', self.frame)
+            shown = self._shown
+            if shown == frame:
+                return False
+            for n in range(self.size):
+                if shown is None or shown[n] != frame[n]:
+                    self.strip.setPixelColor(n, frame[n])
+            self.strip.show()
+            self._shown = frame
+            self.renders += 1
+            self._last_render = time.monotonic()
+            return True
+
+    def start(self):
+        """Startet den Render-Thread (höchstens FRAME_RATE Ausgaben pro Sekunde, mit Animationen genau FRAME_RATE)"""
+        if self._thread is None:
+            self._running = True
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name='led-render')
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stoppt den Render-Thread und gibt ausstehende Änderungen noch aus"""
+        if self._thread is not None:
+            self._running = False
+            self._stop.set()
+            self._pending.set()
+            self._thread.join()
+            self._thread = None
+        self._apply_commands()
+        self.render()
+
+    def _run(self):
+        next_tick = 0.0
+        while not self._stop.is_set():
+            if not self.animations:
+                self._pending.wait()
+                next_tick = self._last_render + self.interval
+            if self._stop.is_set():
+                return
+            # Bis zum nächsten Frame-Takt warten - alles, was bis dahin kommt, geht in denselben Frame
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # Hinter dem Takt: nicht nachholen, sondern ab jetzt weiterzählen
+                next_tick = time.monotonic()
+            next_tick += self.interval
+            self._pending.clear()
+            tick = time.monotonic()
+            try:
+                self._apply_commands()
+                self._animate(tick)
+                self.render()
+            except Exception as e:
+                print(f"LED-Ausgabe fehlgeschlagen: {e}")
+            self.frame_log.append((tick, time.monotonic() - tick))
+
+
+# --- Befehle aus MQTT ---
+
+def apply_led_command(strip, box_nr, payload, animation=False):
+    """Führt einen LED-Befehl aus MQTT aus (im LED-Render-Thread)."""
+    payload = payload.decode('utf-8')
+    if animation:
+        set_led_animation(strip, [box_nr], payload)
+    else:
+        # Payload kann sein: "off", "red", "green", "blue", "yellow", oder "#RRGGBB"
+        r, g, b = parse_color(payload)
+        set_led_color(strip, box_nr, r, g, b)
+
+
+def parse_color(color_str):
+    """Parst einen Farb-String und gibt (R, G, B) zurück."""
+    color_str = color_str.lower().strip()
+    
+    # Vordefinierte Farben
+    colors = {
+        'off': (0, 0, 0),
+        'black': (0, 0, 0),
+        'red': (255, 0, 0),
+        'green': (0, 255, 0),
+        'blue': (0, 0, 255),
+        'yellow': (255, 255, 0),
+        'white': (255, 255, 255),
+        'orange': (255, 165, 0),
+        'purple': (128, 0, 128),
+        'cyan': (0, 255, 255),
+        'pink': (255, 192, 203),
+    }
+    
+    if color_str in colors:
+        return colors[color_str]
+    
+    # Hex-Format: #RRGGBB oder RRGGBB
+    if color_str.startswith('#'):
+        color_str = color_str[1:]
+    
+    if len(color_str) == 6:
+        try:
+            r = int(color_str[0:2], 16)
+            g = int(color_str[2:4], 16)
+            b = int(color_str[4:6], 16)
+            return (r, g, b)
+        except ValueError:
+            pass
+    
+    # Fallback: aus
+    print(f"Unbekannte Farbe: {color_str}, verwende 'off'")
+    return (0, 0, 0)
+
+
+def set_led_color(strip, box_nr, r, g, b):
+    """Setzt die LED-Farbe für eine bestimmte Box."""
+    set_led_colors(strip, [box_nr], r, g, b)
+
+
+def set_led_colors(strip, box_nrs, r, g, b):
+    """Setzt die LED-Farbe für mehrere Boxen und fordert einen einzigen Frame an."""
+    box_nrs = list(box_nrs)
+    print(f"LED Box {', '.join(str(box_nr) for box_nr in box_nrs)}: RGB({r}, {g}, {b})")
+
+    # strip.set_boxes(..., Color(r, g, b))
+    # Die aktuell eingesetzte LED-Streifen-Variante dieser WS2812B-LED hat eine andere Farbreihenfolge (GRB statt RGB):
+    color = Color(g, r, b)
+    strip.set_boxes({box_nr: color for box_nr in box_nrs})
+    strip.show()
+
+
+def parse_animation(payload):
+    """
+    Parst eine Animation: "<effekt> [farbe] [periode in s]" oder "progress <prozent> [farbe]".
+
+    Effekte: blink, pulse, chase, fade (Periode bzw. Dauer, Standard 1 s), progress.
+    "stop" hält eine Animation an. Returns: Animation oder None (stop)
+    """
+    words = payload.lower().split()
+    if not words or words[0] == 'stop':
+        return None
+    effect, args = words[0], words[1:]
+
+    def color(value):
+        # Farbreihenfolge des Streifens: GRB (siehe set_led_colors)
+        r, g, b = parse_color(value)
+        return Color(g, r, b)
+
+    if effect == 'progress':
+        percent = float(args[0]) if args else 0.0
+        return Progress(color(args[1] if len(args) > 1 else 'green'), percent)
+    if effect not in ANIMATIONS:
+        raise ValueError(f"Unbekannte Animation: {effect}")
+    period = float(args[1]) if len(args) > 1 else 1.0
+    return ANIMATIONS[effect](color(args[0] if args else 'white'), period)
+
+
+def set_led_animation(strip, box_nrs, payload):
+    """Startet (oder stoppt) eine Animation auf mehreren Boxen."""
+    for box_nr in box_nrs:
+        # Jede Box bekommt eine eigene Instanz (Fade merkt sich die Startfarben der Box)
+        animation = parse_animation(payload)
+        if animation is None:
+            strip.stop_animation(box_nr)
+        else:
+            strip.animate(box_nr, animation)
+    print(f"LED-Animation Box {', '.join(str(box_nr) for box_nr in box_nrs)}: {payload}")
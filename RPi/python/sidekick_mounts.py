@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Mount-Erkennung
+
+Beobachtet /proc/self/mountinfo und meldet neue und entfernte Mounts:
+- Der Kernel signalisiert jede Änderung der Mount-Tabelle per POLLPRI auf
+  der geöffneten Datei - kein Schlafen, kein Durchsuchen von /media
+- Gefiltert wird nach Mount-Wurzeln (/media, /mnt, /run/media) und
+  Dateisystemen (vfat, exfat, ntfs ...)
+- Pro Gerät eine Warteschlange mit eigenem Thread: mehrere Sticks werden
+  parallel importiert, erneute Mounts desselben Geräts nacheinander
+
+Wird verwendet von:
+- sidekick-usb-daemon.py
+"""
+
+import time
+import queue
+import select
+import logging
+import threading
+from collections import namedtuple
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+MEDIA_ROOTS = ('/media', '/mnt', '/run/media')
+USB_FSTYPES = ('vfat', 'exfat', 'ntfs', 'ntfs3', 'fuseblk', 'hfsplus', 'ext4')
+RESCAN_INTERVAL = 5.0  # Sekunden - Sicherheitsnetz, falls POLLPRI ausbleibt
+
+# Eine Zeile aus mountinfo; device ist "major:minor", root der eingehängte Pfad im Dateisystem
+MountEntry = namedtuple('MountEntry', ['mount_id', 'device', 'root', 'mount_point', 'fstype', 'source'])
+
+logger = logging.getLogger(__name__)
+
+
+def _unescape(field):
+    """mountinfo kodiert Leerzeichen, Tabs usw. oktal (\\040)"""
+    if '\\' not in field:
+        return field
+    result, i = [], 0
+    while i < len(field):
+        if field[i] == '\\' and field[i + 1:i + 4].isdigit():
+            result.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            result.append(field[i])
+            i += 1
+    return ''.join(result)
+
+
+def parse_mountinfo(text):
+    """
+    Zerlegt den Inhalt von /proc/<pid>/mountinfo.
+
+    Returns:
+        {mount_id: MountEntry}
+    """
+    mounts = {}
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index('-', 6)
+            entry = MountEntry(int(fields[0]), fields[2], _unescape(fields[3]), _unescape(fields[4]),
+                               fields[separator + 1], _unescape(fields[separator + 2]))
+        except (ValueError, IndexError):
+            continue
+        mounts[entry.mount_id] = entry
+    return mounts
+
+
+def is_media_mount(entry, roots=MEDIA_ROOTS, fstypes=USB_FSTYPES):
+    """True für Mounts unterhalb einer Medien-Wurzel mit passendem Dateisystem"""
+    if fstypes and entry.fstype not in fstypes:
+        return False
+    return any(entry.mount_point.startswith(root.rstrip('/') + '/') for root in roots)
+
+
+class MountWatcher:
+    """
+    Meldet Änderungen der Mount-Tabelle.
+
+    Beispiel:
+        watcher = MountWatcher()
+        while True:
+            added, removed = watcher.wait()
+    """
+
+    def __init__(self, roots=MEDIA_ROOTS, fstypes=USB_FSTYPES, path=MOUNTINFO_PATH):
+        self.roots = roots
+        self.fstypes = fstypes
+        self._file = open(path, 'rb', buffering=0)
+        self._poll = select.poll()
+        self._poll.register(self._file, select.POLLPRI | select.POLLERR)
+        self.mounts = self._read()
+
+    def _read(self):
+        self._file.seek(0)
+        chunks = []
+        while True:
+            chunk = self._file.read(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        mounts = parse_mountinfo(b''.join(chunks).decode('utf-8', 'replace'))
+        return {mount_id: entry for mount_id, entry in mounts.items()
+                if is_media_mount(entry, self.roots, self.fstypes)}
+
+    def current(self):
+        """Alle passenden Mounts, die gerade eingehängt sind"""
+        return list(self.mounts.values())
+
+    def wait(self, timeout=RESCAN_INTERVAL):
+        """
+        Blockiert bis zur nächsten Änderung (oder timeout Sekunden).
+
+        Returns:
+            (neue Mounts, entfernte Mounts) als Listen von MountEntry
+        """
+        self._poll.poll(None if timeout is None else timeout * 1000)
+        mounts = self._read()
+        added = [entry for mount_id, entry in mounts.items() if mount_id not in self.mounts]
+        removed = [entry for mount_id, entry in self.mounts.items() if mount_id not in mounts]
+        self.mounts = mounts
+        return added, removed
+
+    def close(self):
+        self._poll.unregister(self._file)
+        self._file.close()
+
+
+class DeviceQueues:
+    """
+    Eine Warteschlange samt Worker-Thread pro Gerät.
+
+    handler(entry, detected) wird für jeden Mount aufgerufen; detected ist
+    der time.monotonic()-Zeitpunkt der Erkennung. Worker beenden sich, wenn
+    ihre Warteschlange idle_timeout Sekunden leer ist.
+    """
+
+    def __init__(self, handler, idle_timeout=30.0):
+        self.handler = handler
+        self.idle_timeout = idle_timeout
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(entry):
+        # Bind-Mounts teilen sich die Gerätenummer - root unterscheidet sie
+        return (entry.device, entry.root)
+
+    def submit(self, entry, detected=None):
+        """Reiht einen Mount in die Warteschlange seines Geräts ein"""
+        key = self.key(entry)
+        with self._lock:
+            q = self._queues.get(key)
+            if q is None:
+                q = self._queues[key] = queue.Queue()
+                threading.Thread(target=self._worker, args=(key, q), daemon=True,
+                                 name=f'usb-{entry.device}').start()
+            q.put((entry, detected or time.monotonic()))
+
+    def discard(self, entry):
+        """Verwirft noch wartende Aufträge eines entfernten Mounts"""
+        with self._lock:
+            q = self._queues.get(self.key(entry))
+        if q is None:
+            return
+        kept = []
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item[0].mount_id != entry.mount_id:
+                kept.append(item)
+        for item in kept:
+            q.put(item)
+
+    def busy(self):
+        """Anzahl Geräte mit aktivem Worker (Import läuft, wartet oder gerade beendet)"""
+        with self._lock:
+            return len(self._queues)
+
+    def _worker(self, key, q):
+        while True:
+            try:
+                entry, detected = q.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if q.empty():
+                        del self._queues[key]
+                        return
+                continue
+            try:
+                self.handler(entry, detected)
+            except Exception as e:
+                logger.exception(f"Import von {entry.mount_point} fehlgeschlagen: {e}")
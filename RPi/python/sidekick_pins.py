@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Pin-Belegung (BCM)
+
+Eine Tabelle für alle Skripte, die an denselben GPIO hängen: SmartBox.py
+misst und schaltet die LEDs, sidekick-scale-daemon.py läuft daneben und
+darf keinen dieser Pins belegen, sidekick_hub.py nimmt sie als Vorgabe.
+Ohne Hardware-Zugriff beim Import (kein Backend, kein RPi.GPIO).
+
+Frei bleiben nur GPIO 26 und 10 (0/1 sind für das ID-EEPROM reserviert) -
+dort hängt die Waage (HX711).
+
+Wird verwendet von:
+- SmartBox.py
+- sidekick_hub.py
+- sidekick-scale-daemon.py
+"""
+
+GPIO_US_TRIGGER = 25  # Gemeinsamer Trigger-Pin der Ultraschall-Sensoren
+
+# Echo, BoxNr, LED_Message
+BOX_PINS = [(18, 1, 7), (23, 2, 8), (24, 3, 14), (5, 4, 16), (11, 5, 20),
+            (9, 6, 21), (6, 7, 15), (13, 8, 2), (19, 9, 3)]
+# Eigene Trigger-Pins pro Box, z.B. {1: 26, 2: 12}; fehlende Boxen hängen an GPIO_US_TRIGGER.
+# Boxen an einem gemeinsamen Trigger feuern immer zusammen, nur getrennte Trigger lassen sich staffeln.
+BOX_TRIGGER_PINS = {}
+
+# Button GPIO-Pin Zuordnung (aus SIDEKICK-extension.js)
+# Button 1 = GPIO 4, Button 2 = GPIO 17, Button 3 = GPIO 27, Button 4 = GPIO 22
+BUTTON_PINS = {
+    1: 4,
+    2: 17,
+    3: 27,
+    4: 22
+}
+
+LED_STRIP_PIN = 12  # Daten-Pin des LED-Streifens (PWM)
+
+# Waage (HX711): DOUT, PD_SCK
+SCALE_PINS = (26, 10)
+
+
+def used_pins():
+    """GPIO-Pins, die SmartBox.py belegt: Echo, LED-Meldung, Trigger, Taster und LED-Streifen"""
+    pins = {GPIO_US_TRIGGER, LED_STRIP_PIN}
+    pins.update(BOX_TRIGGER_PINS.values())
+    pins.update(BUTTON_PINS.values())
+    for echo, _, led_message in BOX_PINS:
+        pins.update((echo, led_message))
+    return pins
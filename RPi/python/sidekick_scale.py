@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Waage: Teile zählen über MQTT
+
+Ersetzt ScaleClass.checkWeight aus testing/Scale.py (Vergleich mit
+CaliValue * (N ± 1) und Tastendrücke per pynput):
+- WeightDetector: wertet jeden HX711-Wert einzeln aus. Stabil ist das
+  Gewicht, wenn die letzten STABLE_SAMPLES Werte höchstens stable_tolerance
+  auseinander liegen; ein stabiler Sprung ändert die Anzahl Teile.
+  Zwischen zwei Anzahlen (Rest über COUNT_TOLERANCE) wird nicht gezählt.
+- Auto-Tara: kleine Abweichungen vom Vielfachen des Teilegewichts
+  (Temperatur, Kriechen der Wägezelle) werden laufend in den Nullpunkt
+  übernommen.
+- Ohne part_weight wird wie in Scale.py kalibriert: das erste stabile
+  Gewicht, das um mehr als calibrate_min vom Nullpunkt abweicht, ist ein
+  Teil. Das Vorzeichen bleibt erhalten - die Wägezelle aus Scale.py
+  liefert negative Gewichte (CaliValue < 0), andere positive. Ein fest
+  eingetragenes part_weight hat dasselbe Vorzeichen wie die Gewichte.
+- ScaleService: HX711Reader + WeightDetector + MQTT für eine Waage; mehrere
+  Waagen laufen nebeneinander im selben Prozess (je ein Lese-Thread).
+
+MQTT-Topics (n = Nummer der Waage):
+- sidekick/scale/{n}/count   Anzahl Teile (retained)
+- sidekick/scale/{n}/weight  stabiles Gewicht ohne Tara
+- sidekick/scale/{n}/part    Teilegewicht nach der Kalibrierung (retained)
+
+Latenz: mit dem RATE-Pin des HX711 auf HIGH (80 Wandlungen/s) braucht
+ein Sprung STABLE_SAMPLES Werte, also ~65 ms bis zur Meldung. Bei 10
+Wandlungen/s sind es ~500 ms.
+
+Wird verwendet von:
+- sidekick-scale-daemon.py
+- testing/bench_scale_detection.py
+"""
+
+import time
+from collections import deque
+
+MQTT_TOPIC_SCALE = "sidekick/scale"
+STABLE_SAMPLES = 5          # Werte im Fenster (bei 80 Wandlungen/s: 62,5 ms)
+STABLE_TOLERANCE = 0.25     # Max. Schwankung im Fenster, Anteil vom Teilegewicht
+COUNT_TOLERANCE = 0.35      # Max. Rest zum nächsten Vielfachen, Anteil vom Teilegewicht
+DRIFT_ALPHA = 0.05          # Nachführen des Nullpunkts pro stabilem Wert
+TARE_SAMPLES = 15           # Rohwerte für die Tara beim Start
+CALIBRATE_MIN = 200         # Mindestgewicht eines Teils bei der Kalibrierung (wie Scale.py)
+
+
+class WeightDetector:
+    """
+    Anzahl Teile aus einem Strom von Gewichten.
+
+    Beispiel:
+        detector = WeightDetector(part_weight=12.5)   # bzw. -12.5 bei negativen Gewichten
+        for weight in gewichte:
+            for event in detector.update(weight):
+                ...   # ('count', Anzahl, Änderung), ('weight', Gewicht), ('part', Teilegewicht)
+    """
+
+    def __init__(self, part_weight=None, stable_samples=STABLE_SAMPLES, stable_tolerance=STABLE_TOLERANCE,
+                 count_tolerance=COUNT_TOLERANCE, alpha=DRIFT_ALPHA, calibrate_min=CALIBRATE_MIN):
+        self.part_weight = part_weight
+        self.stable_tolerance = stable_tolerance
+        self.count_tolerance = count_tolerance
+        self.alpha = alpha
+        self.calibrate_min = calibrate_min
+        self.zero = 0.0          # Nullpunkt (Auto-Tara)
+        self.count = 0
+        self.weight = None       # Zuletzt gemeldetes stabiles Gewicht (ohne Nullpunkt)
+        self._window = deque(maxlen=stable_samples)
+
+    def _tolerance(self):
+        # Vor der Kalibrierung gibt es kein Teilegewicht - dann gilt die Schwelle der Kalibrierung
+        return self.stable_tolerance * abs(self.part_weight or self.calibrate_min)
+
+    def update(self, weight):
+        """Neuer Wert. Returns: Liste von Ereignissen (meist leer)"""
+        window = self._window
+        window.append(weight)
+        if len(window) < window.maxlen:
+            return []
+        tolerance = self._tolerance()
+        if max(window) - min(window) > tolerance:
+            return []
+
+        net = sum(window) / len(window) - self.zero
+        events = []
+        if self.part_weight is None:
+            if abs(net) < self.calibrate_min:
+                self.zero += self.alpha * net
+                return []
+            # Vorzeichen behalten: bei negativen Gewichten ist auch das Teilegewicht negativ
+            self.part_weight = net
+            events.append(('part', net))
+
+        part = abs(self.part_weight)
+        count = max(0, round(net / self.part_weight))
+        residual = net - count * self.part_weight
+        if abs(residual) <= self.count_tolerance * part:
+            if count != self.count:
+                events.append(('count', count, count - self.count))
+                self.count = count
+            elif count == 0 or abs(residual) <= self.stable_tolerance * part:
+                # Gleiche Anzahl, kleiner Rest: Drift der Wägezelle in den Nullpunkt übernehmen
+                self.zero += self.alpha * residual
+                net -= self.alpha * residual
+
+        if self.weight is None or abs(net - self.weight) > tolerance:
+            self.weight = net
+            events.append(('weight', net))
+        return events
+
+
+class ScaleService:
+    """
+    Eine Waage: liest den HX711 im Hintergrund und meldet Änderungen per MQTT.
+
+    Die Auswertung läuft im Lese-Thread des HX711Reader direkt nach jedem
+    Wert; publish() von paho legt die Nachricht nur in die Warteschlange.
+    on_event(nr, event) wird zusätzlich für jedes Ereignis aufgerufen.
+    """
+
+    def __init__(self, nr, reader, client=None, topic=MQTT_TOPIC_SCALE, on_event=None, **detector_options):
+        self.nr = nr
+        self.reader = reader
+        self.client = client
+        self.topic = f"{topic}/{nr}"
+        self.on_event = on_event
+        self.detector = WeightDetector(**detector_options)
+        self.events = 0
+
+    def start(self, tare=True, timeout=None):
+        """Startet den Lese-Thread, tariert und wertet ab dann jeden Wert aus. Returns: self"""
+        self.reader.start()
+        if tare and self.reader.tare(TARE_SAMPLES, timeout) is None:
+            print(f"Waage {self.nr}: keine Werte vom HX711 - Tara übersprungen")
+        self.reader.listener = self._on_sample
+        return self
+
+    def stop(self):
+        self.reader.listener = None
+        self.reader.stop()
+
+    def _on_sample(self, reader, sample):
+        for event in self.detector.update(reader.to_weight(sample.raw)):
+            self.events += 1
+            self.publish(event)
+            if self.on_event is not None:
+                self.on_event(self.nr, event)
+
+    def publish(self, event):
+        if self.client is None:
+            return
+        kind = event[0]
+        try:
+            if kind == 'count':
+                self.client.publish(f"{self.topic}/count", str(event[1]), retain=True)
+            elif kind == 'weight':
+                self.client.publish(f"{self.topic}/weight", f"{event[1]:.1f}")
+            elif kind == 'part':
+                self.client.publish(f"{self.topic}/part", f"{event[1]:.1f}", retain=True)
+        except Exception as e:
+            print(f"MQTT-Publish fehlgeschlagen ({self.topic}): {e}")
+
+    def state(self):
+        """Aktueller Stand für Statusanzeigen"""
+        detector = self.detector
+        return {
+            'count': detector.count,
+            'weight': None if detector.weight is None else round(detector.weight, 1),
+            'part_weight': None if detector.part_weight is None else round(detector.part_weight, 1),
+            'zero': round(detector.zero, 2),
+            'rate': round(self.reader.rate(), 1),
+            'dropped': self.reader.dropped,
+            'events': self.events,
+            'time': time.time(),
+        }
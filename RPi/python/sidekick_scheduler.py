@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Mess-Scheduler für die Ultraschall-Sensoren
+
+Jeder HC-SR04 wird höchstens alle MIN_TRIGGER_PERIOD Sekunden ausgelöst -
+laut Datenblatt braucht er mindestens 60 ms pro Messzyklus, kürzer wird
+Nachhall des vorigen Pings in der kleinen Box als kurze Distanz gemessen
+(SimulatedGPIO bildet Nachhall nicht nach). Damit liegt jede Box bei
+höchstens 1 / MIN_TRIGGER_PERIOD ~ 16,7 Messungen/s, egal wie viele Boxen
+aktiv sind - mehr Rate holt kein Ablauf heraus.
+
+Was der Scheduler gegenüber "alle auslösen, 50 ms warten" bringt:
+- Boxen an eigenen Trigger-Pins (sidekick_pins.BOX_TRIGGER_PINS) werden auf
+  Zeitschlitze verteilt; benachbarte Boxen landen nie im selben Schlitz
+  (kein Übersprechen). Boxen an einem gemeinsamen Trigger-Pin feuern
+  zwangsläufig zusammen - mit der Standard-Verdrahtung gibt es nur einen
+  Schlitz.
+- Das Hör-Fenster richtet sich nach der größten erwarteten Distanz
+  (Leerwert der Box + Reserve) und endet, sobald alle Echos des Schlitzes
+  da sind. So passen mehrere Schlitze in eine MIN_TRIGGER_PERIOD, und die
+  Staffelung kostet keine Rate.
+- Zwischen zwei Schlitzen liegt eine kurze Pause, in der Reflexionen abklingen.
+
+Mit scheduling="fixed" gibt es - wie SmartBox.measure_cycle - nur einen
+Schlitz: alle Trigger-Pins zusammen, Hör-Fenster MAX_WINDOW.
+
+Wird verwendet von:
+- SmartBox.py (MEASURE_SCHEDULING = "adaptive")
+- sidekick_hub.py
+- testing/bench_scheduler.py
+"""
+
+import time
+import threading
+from collections import namedtuple
+
+from sidekick_gpio import ECHO_START_DELAY, distance_to_pulse
+
+MAX_WINDOW = 0.05           # Sekunden, längstes Hör-Fenster (wie bisher)
+RANGE_FACTOR = 1.25         # Reserve auf den Leerwert einer Box
+RANGE_MARGIN = 10.0         # cm zusätzliche Reserve
+WINDOW_MARGIN = 0.001       # Sekunden Reserve auf die Laufzeit
+DEFAULT_RANGE = 100.0       # cm, wenn eine Box keinen Leerwert hat
+ECHO_SETTLE = 0.005         # Sekunden Pause nach einem Schlitz (Nachhall)
+MIN_TRIGGER_PERIOD = 0.06   # Sekunden zwischen zwei Auslösungen desselben Sensors (HC-SR04: mind. 60 ms)
+NEIGHBOUR_RANGE = 1         # Boxen mit |Nr. a - Nr. b| <= NEIGHBOUR_RANGE gelten als benachbart
+
+# Ein Zeitschlitz: Trigger-Pins, die zusammen feuern, ihre Boxen und das Hör-Fenster in Sekunden
+Slot = namedtuple('Slot', ['trigger_pins', 'boxes', 'window'])
+
+
+def listen_window(boxes):
+    """Hör-Fenster für die größte erwartete Distanz der Boxen"""
+    longest = 0.0
+    for box in boxes:
+        baseline = getattr(box, 'averageUltra', 0) or 0
+        expected = baseline * RANGE_FACTOR + RANGE_MARGIN if baseline > 0 else DEFAULT_RANGE
+        longest = max(longest, expected)
+    return min(MAX_WINDOW, ECHO_START_DELAY + distance_to_pulse(longest) + WINDOW_MARGIN)
+
+
+def fixed_slots(boxes):
+    """Ein Schlitz für alle Boxen mit dem vollen Hör-Fenster (SmartBox.measure_cycle)"""
+    if not boxes:
+        return []
+    return [Slot(tuple(sorted({box.trigger_pin for box in boxes})),
+                 tuple(sorted(boxes, key=lambda box: box.box_nr)), MAX_WINDOW)]
+
+
+def neighbours(a, b, neighbour_range=NEIGHBOUR_RANGE):
+    return abs(a - b) <= neighbour_range
+
+
+def plan_slots(boxes, neighbour_range=NEIGHBOUR_RANGE):
+    """
+    Verteilt die Boxen auf Zeitschlitze.
+
+    Boxen mit gleichem trigger_pin bilden eine Gruppe (feuern immer
+    zusammen). Gruppen werden der Größe nach dem ersten Schlitz
+    zugeordnet, in dem keine benachbarte Box liegt.
+    """
+    groups = {}
+    for box in boxes:
+        groups.setdefault(box.trigger_pin, []).append(box)
+
+    slots = []  # [(Trigger-Pins, Boxen)]
+    for pin, members in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])):
+        for pins, slot_boxes in slots:
+            if not any(neighbours(a.box_nr, b.box_nr, neighbour_range) for a in members for b in slot_boxes):
+                pins.append(pin)
+                slot_boxes.extend(members)
+                break
+        else:
+            slots.append(([pin], list(members)))
+
+    return [Slot(tuple(pins), tuple(sorted(slot_boxes, key=lambda box: box.box_nr)), listen_window(slot_boxes))
+            for pins, slot_boxes in slots]
+
+
+class MeasureScheduler:
+    """
+    Misst reihum einen Zeitschlitz pro run_slot().
+
+    Beispiel:
+        scheduler = MeasureScheduler(smartboxes, trigger=SmartBox.trigger_ultrasonic)
+        while True:
+            start, measured = scheduler.run_slot()
+            for box in measured:
+                box.handDetection()
+    """
+
+    def __init__(self, boxes, trigger, neighbour_range=NEIGHBOUR_RANGE,
+                 settle=ECHO_SETTLE, min_trigger_period=MIN_TRIGGER_PERIOD, scheduling="adaptive"):
+        self.trigger = trigger
+        self.settle = settle
+        self.min_trigger_period = min_trigger_period
+        self.scheduling = scheduling
+        self.slots = fixed_slots(boxes) if scheduling == "fixed" else plan_slots(boxes, neighbour_range)
+        self.samples = 0
+        self._next = 0
+        self._last_fired = [0.0] * len(self.slots)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._done = threading.Event()
+
+    def expected_rate(self):
+        """Messungen pro Sekunde und Box im ungünstigsten Fall (volle Hör-Fenster)"""
+        if not self.slots:
+            return 0.0
+        round_trip = sum(slot.window + self.settle for slot in self.slots)
+        return 1.0 / max(round_trip, self.min_trigger_period)
+
+    def _on_echo(self, echo_timer):
+        with self._pending_lock:
+            self._pending -= 1
+            if self._pending <= 0:
+                self._done.set()
+
+    def run_slot(self):
+        """Misst den nächsten Schlitz. Returns: (Startzeit time.time(), gemessene Boxen)"""
+        if not self.slots:
+            time.sleep(MAX_WINDOW)
+            return time.time(), ()
+        index = self._next
+        self._next = (index + 1) % len(self.slots)
+        slot = self.slots[index]
+
+        wait = self._last_fired[index] + self.min_trigger_period - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_fired[index] = time.monotonic()
+
+        start = time.time()
+        edge = all(box.echo_timer is not None for box in slot.boxes)
+        if edge:
+            with self._pending_lock:
+                self._pending = len(slot.boxes)
+                self._done.clear()
+            for box in slot.boxes:
+                box.echo_timer.arm()
+                box.echo_timer.listener = self._on_echo
+            for pin in slot.trigger_pins:
+                self.trigger(pin)
+            # Endet, sobald alle Echos des Schlitzes da sind - spätestens nach dem Hör-Fenster
+            self._done.wait(slot.window)
+            for box in slot.boxes:
+                box.echo_timer.listener = None
+                box.consume_echo()
+        else:
+            for pin in slot.trigger_pins:
+                self.trigger(pin)
+            elapsed = 0
+            while elapsed <= slot.window:
+                for box in slot.boxes:
+                    box.time_ultrasonic()
+                elapsed = time.time() - start
+            for box in slot.boxes:
+                box.calculate_distance()
+
+        self.samples += len(slot.boxes)
+        if self.settle > 0:
+            time.sleep(self.settle)
+        return start, slot.boxes
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Scratch-Verbindung (Remote-Sensor-Protokoll, Port 42001)
+
+Ersetzt die rohe Socket-Verbindung aus testing/ScratchSocket.py:
+- Jede Nachricht wird als ein Block geschrieben (4 Byte Länge + Text),
+  TCP_NODELAY ist gesetzt - kein Warten auf Nagle / verzögerte ACKs.
+- Aufrufer legen Nachrichten nur in eine Warteschlange; ein Sende-Thread
+  schickt alles, was inzwischen aufgelaufen ist, mit einem sendall().
+  Aufeinanderfolgende sensor-update werden zusammengefasst (neuester Wert
+  gewinnt), broadcasts bleiben einzeln und in Reihenfolge.
+- Verbindungsabbruch: automatisch neu verbinden mit wachsender Wartezeit
+  (RECONNECT_MIN .. RECONNECT_MAX, mit Nachrichten in der Warteschlange
+  höchstens RECONNECT_BUSY). Solange keine Verbindung besteht,
+  puffert die Warteschlange bis queue_size Nachrichten, danach fallen die
+  ältesten weg (gezählt in stats()['dropped']). Mit Verbindung wartet ein
+  Aufrufer bei voller Warteschlange kurz (PUT_TIMEOUT), statt zu verwerfen.
+- Ein Block, der beim Verbindungsabbruch nicht sicher angekommen ist,
+  wird nach dem Neuverbinden noch einmal geschickt (mindestens einmal).
+
+Beispiel:
+    scratch = ScratchClient().start()
+    scratch.sensor_update(box3=1)
+    scratch.broadcast("hand")
+
+Wird verwendet von:
+- testing/ScratchSocket.py
+- testing/bench_scratch.py
+"""
+
+import socket
+import random
+import struct
+import threading
+from collections import deque
+
+SCRATCH_HOST = "localhost"
+SCRATCH_PORT = 42001
+SCRATCH_QUEUE_SIZE = 1000     # Nachrichten, die ohne Verbindung gepuffert werden
+MAX_BATCH_BYTES = 64 * 1024   # Höchstens so viel pro sendall()
+RECONNECT_MIN = 0.1           # Sekunden bis zum ersten neuen Verbindungsversuch
+RECONNECT_MAX = 1.0           # Längste Wartezeit zwischen zwei Versuchen
+RECONNECT_BUSY = 0.2          # Längste Wartezeit, solange Nachrichten auf das Senden warten
+CONNECT_TIMEOUT = 2.0
+PUT_TIMEOUT = 0.1             # Sekunden, die ein Aufrufer bei voller Warteschlange (mit Verbindung) wartet
+
+
+def quote(text):
+    """Scratch-String: in Anführungszeichen, " wird verdoppelt"""
+    return '"' + str(text).replace('"', '""') + '"'
+
+
+def frame(message):
+    """Nachricht mit 4-Byte-Längenpräfix (big endian)"""
+    data = message.encode('utf-8')
+    return struct.pack('>I', len(data)) + data
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return quote(value)
+
+
+def sensor_update_message(values):
+    return 'sensor-update ' + ' '.join(f"{quote(name)} {format_value(value)}" for name, value in values.items())
+
+
+def parse_message(message):
+    """
+    Zerlegt eine empfangene Nachricht.
+
+    Returns: ('broadcast', Name), ('sensor-update', {Name: Wert}) oder (Befehl, Rest)
+    """
+    tokens, i = [], 0
+    while i < len(message):
+        if message[i] == ' ':
+            i += 1
+        elif message[i] == '"':
+            j, text = i + 1, []
+            while j < len(message):
+                if message[j] == '"':
+                    if message[j + 1:j + 2] == '"':
+                        text.append('"')
+                        j += 2
+                        continue
+                    break
+                text.append(message[j])
+                j += 1
+            tokens.append(''.join(text))
+            i = j + 1
+        else:
+            j = message.find(' ', i)
+            j = len(message) if j < 0 else j
+            token = message[i:j]
+            try:
+                token = float(token) if '.' in token else int(token)
+            except ValueError:
+                pass
+            tokens.append(token)
+            i = j
+    if not tokens:
+        return '', None
+    command = tokens[0]
+    if command == 'broadcast':
+        return command, tokens[1] if len(tokens) > 1 else ''
+    if command == 'sensor-update':
+        return command, dict(zip(tokens[1::2], tokens[2::2]))
+    return command, tokens[1:]
+
+
+def read_frames(sock, on_message):
+    """Liest Nachrichten bis zum Verbindungsende und ruft on_message(Text) auf"""
+    buffer = b''
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return
+        buffer += data
+        while len(buffer) >= 4:
+            length = struct.unpack('>I', buffer[:4])[0]
+            if len(buffer) < 4 + length:
+                break
+            on_message(buffer[4:4 + length].decode('utf-8', errors='replace'))
+            buffer = buffer[4 + length:]
+
+
+class ScratchClient:
+    """
+    Verbindung zu Scratch mit Warteschlange, Sende-Thread und automatischem Neuverbinden.
+
+    on_message(Befehl, Daten) wird für Nachrichten von Scratch aufgerufen
+    (broadcasts und sensor-updates anderer Teilnehmer), im Lese-Thread.
+    """
+
+    def __init__(self, host=SCRATCH_HOST, port=SCRATCH_PORT, queue_size=SCRATCH_QUEUE_SIZE, on_message=None):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.on_message = on_message
+        self.connected = False
+        self._queue = deque()        # Text (broadcast) oder dict (sensor-update)
+        self._cond = threading.Condition()
+        self._sock = None
+        self._broken = False
+        self._running = False
+        self._thread = None
+        self._stats = {'queued': 0, 'sent': 0, 'batches': 0, 'bytes': 0, 'dropped': 0,
+                       'collapsed': 0, 'connects': 0, 'disconnects': 0, 'resent': 0}
+
+    # --- Senden (kehrt sofort zurück) ---
+
+    def broadcast(self, name):
+        self._put(f"broadcast {quote(name)}")
+
+    def sensor_update(self, values=None, **more):
+        """Sensorwerte setzen, z.B. sensor_update(box3=1) oder sensor_update({'Box 3': 1})"""
+        values = dict(values or {}, **more)
+        with self._cond:
+            if self._queue and isinstance(self._queue[-1], dict):
+                # Direkt aufeinanderfolgende Updates zu einer Nachricht zusammenfassen
+                self._queue[-1].update(values)
+                self._stats['collapsed'] += 1
+                self._stats['queued'] += 1
+                self._cond.notify()
+                return
+        self._put(values)
+
+    def send(self, message):
+        """Beliebige Nachricht im Remote-Sensor-Protokoll"""
+        self._put(message)
+
+    def _put(self, message):
+        with self._cond:
+            if len(self._queue) >= self.queue_size and self.connected:
+                self._cond.wait_for(lambda: len(self._queue) < self.queue_size or not self.connected, PUT_TIMEOUT)
+            if len(self._queue) >= self.queue_size:
+                self._queue.popleft()
+                self._stats['dropped'] += 1
+            self._queue.append(message)
+            self._stats['queued'] += 1
+            self._cond.notify()
+
+    # --- Ablauf ---
+
+    def start(self):
+        """Startet den Sende-Thread (verbindet im Hintergrund). Returns: self"""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name='scratch-sender')
+            self._thread.start()
+        return self
+
+    def wait_connected(self, timeout=None):
+        """Wartet auf die Verbindung. Returns: False bei Zeitüberschreitung"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.connected, timeout)
+
+    def flush(self, timeout=None):
+        """Wartet, bis die Warteschlange leer ist. Returns: False bei Zeitüberschreitung"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue, timeout)
+
+    def close(self, timeout=1.0):
+        """Schickt noch Ausstehendes (bis timeout) und beendet die Verbindung"""
+        if self._thread is not None:
+            if self.connected:
+                self.flush(timeout)
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self._thread.join()
+            self._thread = None
+        self._disconnect()
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, depth=len(self._queue), connected=self.connected)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._cond:
+            self._sock = sock
+            self._broken = False
+            self.connected = True
+            self._stats['connects'] += 1
+            self._cond.notify_all()
+        threading.Thread(target=self._read, args=(sock,), daemon=True, name='scratch-reader').start()
+
+    def _disconnect(self):
+        with self._cond:
+            sock, self._sock = self._sock, None
+            if self.connected:
+                self._stats['disconnects'] += 1
+            self.connected = False
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _read(self, sock):
+        def handle(message):
+            if self.on_message is not None:
+                self.on_message(*parse_message(message))
+        try:
+            read_frames(sock, handle)
+        except OSError:
+            pass
+        with self._cond:
+            if self._sock is sock:
+                # Verbindung weg - den Sende-Thread sofort neu verbinden lassen
+                self._broken = True
+                self._cond.notify_all()
+
+    def _next_batch(self):
+        """Nimmt Nachrichten bis MAX_BATCH_BYTES aus der Warteschlange (Lock gehalten)"""
+        frames, size = [], 0
+        while self._queue and size < MAX_BATCH_BYTES:
+            message = self._queue.popleft()
+            if isinstance(message, dict):
+                message = sensor_update_message(message)
+            data = frame(message)
+            frames.append(data)
+            size += len(data)
+        return frames
+
+    def _run(self):
+        delay = RECONNECT_MIN
+        while self._running:
+            if self._sock is None or self._broken:
+                self._disconnect()
+                try:
+                    self._connect()
+                    delay = RECONNECT_MIN
+                except OSError:
+                    with self._cond:
+                        # Wartende Nachrichten sollen nach einem Scratch-Neustart schnell ankommen
+                        limit = RECONNECT_BUSY if self._queue else RECONNECT_MAX
+                        self._cond.wait_for(lambda: not self._running, min(delay, limit) * random.uniform(0.8, 1.2))
+                    delay = min(RECONNECT_MAX, delay * 2)
+                    continue
+
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._broken or not self._running)
+                if self._broken or not self._running:
+                    continue
+                frames = self._next_batch()
+                sock = self._sock
+                self._cond.notify_all()
+            try:
+                sock.sendall(b''.join(frames))
+            except OSError:
+                with self._cond:
+                    # Nicht sicher angekommen: vorne wieder einreihen, nach dem Neuverbinden erneut senden
+                    for data in reversed(frames):
+                        self._queue.appendleft(data[4:].decode('utf-8'))
+                    self._stats['resent'] += len(frames)
+                    self._broken = True
+                continue
+            with self._cond:
+                self._stats['sent'] += len(frames)
+                self._stats['batches'] += 1
+                self._stats['bytes'] += sum(len(data) for data in frames)
+                self._cond.notify_all()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Telemetrie für die Sensor-Schleife
+
+Die Schleife legt nur Zahlen in Ringpuffer fester Größe ab (kein
+Formatieren, keine Ausgabe). Ausgewertet und verschickt wird in eigenen
+Threads:
+- HTTP/JSON: GET http://localhost:8602/telemetry (nur lokal erreichbar)
+- MQTT: Topic sidekick/telemetry, alle TELEMETRY_MQTT_INTERVAL Sekunden
+- Konsole: Statusanzeige einmal pro Sekunde (nur im Terminal, nicht als Dienst)
+
+Erfasst werden:
+- Distanz pro Box
+- Dauer der Schleifendurchläufe
+- Hand-Ereignisse (erkannt / rausgenommen)
+- MQTT-Publish-Latenz (publish() bis die Nachricht am Socket ist)
+- beliebige weitere Zähler über add_source() (z.B. LED-Warteschlange)
+
+Wird verwendet von:
+- SmartBox.py
+"""
+
+import sys
+import json
+import time
+import threading
+import statistics
+from array import array
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TELEMETRY_SIZE = 600            # Werte pro Ringpuffer (bei 20 Durchläufen/s: 30 s)
+EVENT_SIZE = 200                # Gemerkte Hand-Ereignisse
+TELEMETRY_HOST = '127.0.0.1'
+TELEMETRY_PORT = 8602
+TELEMETRY_MQTT_TOPIC = 'sidekick/telemetry'
+TELEMETRY_MQTT_INTERVAL = 0     # Sekunden zwischen zwei MQTT-Meldungen, 0 = aus
+CONSOLE_INTERVAL = 1.0
+PUBLISH_MATCH_AGE = 1.0         # Sekunden, die ein publish() / on_publish auf sein Gegenstück wartet
+SNAPSHOT_SAMPLES = 20           # Letzte Rohwerte pro Box im Snapshot
+
+
+class Ring:
+    """Ringpuffer fester Größe für Zahlen (array('d'), keine Allokation beim Schreiben)"""
+
+    def __init__(self, size=TELEMETRY_SIZE):
+        self.data = array('d', bytes(8 * size))
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count += 1
+
+    def values(self):
+        """Gespeicherte Werte, älteste zuerst"""
+        if self.count < self.size:
+            return self.data[:self.pos].tolist()
+        return self.data[self.pos:].tolist() + self.data[:self.pos].tolist()
+
+    def last(self):
+        return self.data[self.pos - 1] if self.count else None
+
+    def summary(self, scale=1.0):
+        values = self.values()
+        if not values:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'last': round(values[-1] * scale, 3),
+            'mean': round(statistics.mean(values) * scale, 3),
+            'min': round(min(values) * scale, 3),
+            'max': round(max(values) * scale, 3),
+            'stdev': round(statistics.pstdev(values) * scale, 3),
+        }
+
+
+class Telemetry:
+    """
+    Messwerte der Sensor-Schleife.
+
+    Beispiel:
+        telemetry = Telemetry()
+        telemetry.record_cycle(start, smartboxes)   # in der Schleife
+        telemetry.serve_http()                      # GET /telemetry
+    """
+
+    def __init__(self, size=TELEMETRY_SIZE):
+        self.size = size
+        self.started = time.time()
+        self.distances = {}             # box_nr -> Ring
+        self.loop_period = Ring(size)   # Sekunden zwischen zwei Durchläufen
+        self.publish_latency = Ring(size)
+        self.events = deque(maxlen=EVENT_SIZE)  # (Zeitpunkt, box_nr, Ereignis)
+        self.sources = {}
+        self._last_start = None
+        self._publishing = {}  # mid -> perf_counter beim publish()
+        self._published = {}   # mid -> perf_counter, falls on_publish vor publish() zurückkam
+        self._publish_lock = threading.Lock()
+        self._server = None
+
+    # --- Erfassen (Sensor-Schleife) ---
+
+    def record_cycle(self, start, smartboxes):
+        """Ein Schleifendurchlauf: Startzeit (time.time()) und Distanz der darin gemessenen Boxen"""
+        if self._last_start is not None:
+            self.loop_period.append(start - self._last_start)
+        self._last_start = start
+        for smartbox in smartboxes:
+            ring = self.distances.get(smartbox.box_nr)
+            if ring is None:
+                ring = self.distances[smartbox.box_nr] = Ring(self.size)
+            ring.append(smartbox.distance)
+
+    def record_event(self, box_nr, event):
+        self.events.append((time.time(), box_nr, event))
+
+    def publish_started(self, mid):
+        """Nach mqtt_client.publish(): mid aus dem MQTTMessageInfo"""
+        now = time.perf_counter()
+        with self._publish_lock:
+            self._expire(now)
+            done = self._published.pop(mid, None)
+            if done is None:
+                self._publishing[mid] = now
+                return
+        # on_publish kam schon während publish() - Latenz ist praktisch 0
+        self.publish_latency.append(max(0.0, done - now))
+
+    def publish_done(self, mid):
+        """
+        Aus on_publish (paho-Netzwerk-Thread). Kommt on_publish auch für
+        Nachrichten ohne publish_started() (Buttons, Telemetrie-Snapshots),
+        verfällt der Eintrag nach PUBLISH_MATCH_AGE - sonst wüchse die Tabelle
+        endlos und nach dem Überlauf der mid würden alte Einträge falsch zugeordnet.
+        """
+        now = time.perf_counter()
+        with self._publish_lock:
+            self._expire(now)
+            started = self._publishing.pop(mid, None)
+            if started is None:
+                self._published[mid] = now
+                return
+        self.publish_latency.append(now - started)
+
+    def _expire(self, now):
+        # Dicts sind nach Einfügezeit sortiert - vorne stehen die ältesten (Lock gehalten)
+        cutoff = now - PUBLISH_MATCH_AGE
+        for pending in (self._publishing, self._published):
+            while pending:
+                mid = next(iter(pending))
+                if pending[mid] >= cutoff:
+                    break
+                del pending[mid]
+
+    def add_source(self, name, func):
+        """Weitere Werte im Snapshot: func() -> JSON-fähiges Objekt"""
+        self.sources[name] = func
+
+    # --- Auswerten (eigene Threads) ---
+
+    def snapshot(self):
+        loop = self.loop_period.summary(scale=1000)
+        rate = round(1000 / loop['mean'], 2) if loop.get('mean') else None
+        data = {
+            'time': time.time(),
+            'uptime': round(time.time() - self.started, 1),
+            'loop': {'period_ms': loop, 'rate_hz': rate},
+            'boxes': {
+                str(box_nr): dict(ring.summary(), samples=[round(v, 2) for v in ring.values()[-SNAPSHOT_SAMPLES:]])
+                for box_nr, ring in sorted(self.distances.items())
+            },
+            'events': [{'time': t, 'box': box_nr, 'event': event} for t, box_nr, event in list(self.events)],
+            'mqtt': {'publish_ms': self.publish_latency.summary(scale=1000)},
+        }
+        for name, func in self.sources.items():
+            try:
+                data[name] = func()
+            except Exception as e:
+                data[name] = {'error': str(e)}
+        return data
+
+    def serve_http(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT):
+        """Startet den JSON-Endpunkt (GET /telemetry) in einem Hintergrund-Thread"""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/telemetry'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(telemetry.snapshot()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Telemetrie-Endpunkt nicht verfügbar ({host}:{port}): {e}")
+            return None
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='telemetry-http').start()
+        print(f"Telemetrie: http://{host}:{port}/telemetry")
+        return self._server
+
+    def publish_mqtt(self, client, interval=TELEMETRY_MQTT_INTERVAL, topic=TELEMETRY_MQTT_TOPIC):
+        """Schickt alle interval Sekunden einen Snapshot an topic (interval 0 = aus)"""
+        if not interval or client is None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    client.publish(topic, json.dumps(self.snapshot()))
+                except Exception as e:
+                    print(f"Telemetrie-Publish fehlgeschlagen: {e}")
+
+        threading.Thread(target=run, daemon=True, name='telemetry-mqtt').start()
+
+    def console(self, interval=CONSOLE_INTERVAL, stream=None):
+        """Zeigt die aktuellen Distanzen im Terminal an (statt os.system("clear") in der Schleife)"""
+        stream = stream or sys.stdout
+        if not stream.isatty():
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                lines = ["\033[H\033[J"]  # Cursor nach oben links, Bildschirm leeren
+                for box_nr, ring in sorted(self.distances.items()):
+                    distance = ring.last()
+                    lines.append(f"SmartBox {box_nr} Messwert: {round(distance, 2) if distance is not None else '-'}\n")
+                period = self.loop_period.last()
+                if period:
+                    lines.append(f"\nSchleife: {period * 1000:.1f} ms\n")
+                stream.write(''.join(lines))
+                stream.flush()
+
+        threading.Thread(target=run, daemon=True, name='telemetry-console').start()
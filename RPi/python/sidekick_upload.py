@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+SIDEKICK Upload Utilities
+
+Streaming-Parser für multipart/form-data Uploads:
+- Liest den Request-Body in festen Blöcken (kein Komplett-Einlesen)
+- Schreibt Datei-Teile direkt in eine Temp-Datei im Zielordner
+- Benennt die Temp-Datei erst nach erfolgreichem Upload atomar um
+
+Der Speicherbedarf bleibt dadurch konstant (ca. UPLOAD_CHUNK_SIZE),
+egal ob ein Video 10 MB oder 4 GB groß ist.
+
+Zusätzlich fortsetzbare Uploads (ResumableUpload/ResumableUploadStore):
+- Session anlegen, Teile mit Offset schreiben, empfangene Bereiche abfragen
+- Teildaten und Status liegen in <Zielordner>/.uploads/ und überleben
+  Verbindungsabbrüche und Neustarts des Dashboards
+- Erst beim Abschließen wird die Datei atomar an ihren Platz verschoben
+
+Wird verwendet von:
+- sidekick-dashboard.py (Web-Upload)
+"""
+
+import os
+import re
+import errno
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+from sidekick_files import atomic_write_json
+
+# Konfiguration
+UPLOAD_CHUNK_SIZE = 1024 * 1024     # Blockgröße beim Lesen des Bodys (1 MiB)
+MAX_HEADER_SIZE = 16 * 1024         # Maximale Größe der Header eines Teils
+MAX_FIELD_SIZE = 64 * 1024          # Maximale Größe eines normalen Formularfelds
+TEMP_PREFIX = '.upload-'
+TEMP_SUFFIX = '.part'
+RESUMABLE_DIR_NAME = '.uploads'       # Unterordner für fortsetzbare Uploads
+RESUMABLE_MAX_AGE = 24 * 60 * 60     # Unberührte Sessions werden nach einem Tag entfernt
+RESUMABLE_CLEANUP_INTERVAL = 60 * 60  # So oft sucht das Dashboard nach abgelaufenen Sessions
+
+_NAME_RE = re.compile(rb'(?:^|;)\s*name="([^"]*)"', re.IGNORECASE)
+_FILENAME_RE = re.compile(rb'filename="([^"]*)"', re.IGNORECASE)
+_UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class MultipartError(ValueError):
+    """Fehler beim Parsen eines multipart/form-data Bodys"""
+
+
+class UploadSessionError(ValueError):
+    """Ungültige Anfrage an eine fortsetzbare Upload-Session"""
+
+
+class UploadedFile:
+    """Eine hochgeladene Datei, die als Temp-Datei im Zielordner liegt"""
+
+    def __init__(self, field_name, filename, temp_path):
+        self.field_name = field_name
+        self.filename = filename
+        self.temp_path = Path(temp_path)
+        self.size = 0
+        self.committed = False
+
+    def commit(self, target_path):
+        """Benennt die Temp-Datei atomar in den endgültigen Namen um"""
+        # mkstemp() legt Dateien mit 0600 an - Webserver/Kiosk sollen sie lesen können
+        os.chmod(self.temp_path, 0o644)
+        os.replace(self.temp_path, target_path)
+        self.committed = True
+
+    def discard(self):
+        """Löscht die Temp-Datei (falls sie nicht übernommen wurde)"""
+        if not self.committed:
+            try:
+                self.temp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _read_chunks(stream, content_length, chunk_size):
+    """Liest genau content_length Bytes in Blöcken aus dem Stream"""
+    remaining = content_length
+    while remaining > 0:
+        data = stream.read(min(chunk_size, remaining))
+        if not data:
+            raise MultipartError('Upload unvollständig (Verbindung abgebrochen)')
+        remaining -= len(data)
+        yield data
+
+
+def _parse_part_headers(raw_headers):
+    """Gibt (Feldname, Dateiname oder None) aus den Header-Zeilen eines Teils zurück"""
+    for line in raw_headers.split(b'\r\n'):
+        if not line.lower().startswith(b'content-disposition:'):
+            continue
+        name_match = _NAME_RE.search(line.split(b':', 1)[1])
+        filename_match = _FILENAME_RE.search(line)
+        name = name_match.group(1).decode('utf-8', 'replace') if name_match else None
+        filename = filename_match.group(1).decode('utf-8', 'replace') if filename_match else None
+        return name, filename
+    return None, None
+
+
+def parse_multipart_stream(stream, content_length, boundary, temp_dir, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Parst einen multipart/form-data Body inkrementell.
+
+    Datei-Teile werden blockweise in Temp-Dateien in temp_dir geschrieben,
+    normale Felder (z.B. customName) werden im Speicher gesammelt.
+
+    Args:
+        stream: Datei-ähnliches Objekt mit read() (z.B. self.rfile)
+        content_length: Länge des Bodys in Bytes
+        boundary: Boundary aus dem Content-Type Header (bytes)
+        temp_dir: Ordner für die Temp-Dateien (gleiches Dateisystem wie das Ziel!)
+        chunk_size: Blockgröße beim Lesen
+
+    Returns:
+        Tuple (fields, files) - fields ist ein dict {name: str},
+        files eine Liste von UploadedFile. Der Aufrufer muss für jede Datei
+        commit() oder discard() aufrufen.
+
+    Raises:
+        MultipartError bei ungültigem oder unvollständigem Body
+    """
+    separator = b'\r\n--' + boundary
+    # Der Body beginnt direkt mit '--boundary' - mit vorangestelltem CRLF
+    # lässt sich jede Grenze mit dem gleichen Separator finden.
+    buf = bytearray(b'\r\n')
+    state = 'preamble'
+    fields = {}
+    files = []
+    sink = None          # Aktuelles Ziel: Datei-Objekt, bytearray oder None (verwerfen)
+    current_file = None
+    current_name = None
+    keep = len(separator) - 1
+
+    def write_to_sink(end):
+        nonlocal sink
+        if end <= 0:
+            return
+        if isinstance(sink, bytearray):
+            if len(sink) + end > MAX_FIELD_SIZE:
+                raise MultipartError(f'Formularfeld "{current_name}" zu groß')
+            sink += buf[:end]
+        elif sink is not None:
+            with memoryview(buf) as view:
+                sink.write(view[:end])
+            current_file.size += end
+
+    def finish_part():
+        nonlocal sink, current_file
+        if isinstance(sink, bytearray):
+            if current_name is not None:
+                fields[current_name] = sink.decode('utf-8', 'replace')
+        elif sink is not None:
+            sink.close()
+        sink = None
+        current_file = None
+
+    try:
+        for chunk in _read_chunks(stream, content_length, chunk_size):
+            buf += chunk
+            while True:
+                if state in ('preamble', 'body'):
+                    idx = buf.find(separator)
+                    if idx == -1:
+                        # Alles bis auf ein mögliches angeschnittenes Separator-Ende wegschreiben
+                        flush = len(buf) - keep
+                        if state == 'body':
+                            write_to_sink(flush)
+                        if flush > 0:
+                            del buf[:flush]
+                        break
+                    if state == 'body':
+                        write_to_sink(idx)
+                        finish_part()
+                    del buf[:idx + len(separator)]
+                    state = 'delimiter'
+                elif state == 'delimiter':
+                    if len(buf) < 2:
+                        break
+                    if buf[:2] == b'--':
+                        state = 'epilogue'
+                        continue
+                    if buf[:2] != b'\r\n':
+                        raise MultipartError('Ungültige Boundary im Upload')
+                    del buf[:2]
+                    state = 'headers'
+                elif state == 'headers':
+                    idx = buf.find(b'\r\n\r\n')
+                    if idx == -1:
+                        if len(buf) > MAX_HEADER_SIZE:
+                            raise MultipartError('Header eines Upload-Teils zu groß')
+                        break
+                    current_name, filename = _parse_part_headers(bytes(buf[:idx]))
+                    del buf[:idx + 4]
+                    if filename is not None:
+                        if filename:
+                            fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX, dir=temp_dir)
+                            current_file = UploadedFile(current_name, filename, temp_path)
+                            files.append(current_file)
+                            sink = os.fdopen(fd, 'wb', buffering=0)
+                        else:
+                            # Leeres Datei-Feld (keine Datei ausgewählt) - verwerfen
+                            sink = None
+                    else:
+                        sink = bytearray()
+                    state = 'body'
+                else:  # epilogue
+                    buf.clear()
+                    break
+        if state != 'epilogue':
+            raise MultipartError('Upload unvollständig (Ende-Boundary fehlt)')
+    except BaseException:
+        if sink is not None and not isinstance(sink, bytearray):
+            sink.close()
+        for uploaded in files:
+            uploaded.discard()
+        raise
+
+    return fields, files
+
+
+def cleanup_stale_uploads(target_dir):
+    """Entfernt liegengebliebene Temp-Dateien abgebrochener Uploads"""
+    removed = 0
+    for f in Path(target_dir).glob(f'{TEMP_PREFIX}*{TEMP_SUFFIX}'):
+        try:
+            f.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class ResumableUpload:
+    """
+    Eine fortsetzbare Upload-Session.
+    
+    Die Daten landen per pwrite() an ihrem Offset in <id>.part, die bereits
+    empfangenen Bereiche stehen in <id>.json. Nach einem Abbruch fragt der
+    Client die fehlenden Bereiche ab und sendet nur diese erneut.
+    """
+    
+    def __init__(self, store_dir, upload_id, filename, size, fields=None, ranges=None, created=None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.fields = fields or {}
+        self.ranges = [list(r) for r in (ranges or [])]  # Sortierte, disjunkte [start, end)
+        self.created = created or time.time()
+        self.data_path = Path(store_dir) / f'{upload_id}{TEMP_SUFFIX}'
+        self.meta_path = Path(store_dir) / f'{upload_id}.json'
+        self.lock = threading.Lock()
+        self.closed = False  # Nach commit()/discard() keine Schreibzugriffe mehr
+    
+    @property
+    def received(self):
+        return sum(end - start for start, end in self.ranges)
+    
+    @property
+    def complete(self):
+        return self.ranges == [[0, self.size]] or self.size == 0
+    
+    def missing(self):
+        """Noch fehlende Bereiche als Liste von [start, end)"""
+        gaps = []
+        pos = 0
+        for start, end in self.ranges:
+            if start > pos:
+                gaps.append([pos, start])
+            pos = end
+        if pos < self.size:
+            gaps.append([pos, self.size])
+        return gaps
+    
+    def _add_range(self, start, end):
+        """Fügt einen empfangenen Bereich hinzu und verschmilzt Nachbarn"""
+        if end <= start:
+            return
+        merged = []
+        for r in self.ranges:
+            if r[1] < start or r[0] > end:
+                merged.append(r)
+            else:
+                start, end = min(start, r[0]), max(end, r[1])
+        merged.append([start, end])
+        merged.sort()
+        self.ranges = merged
+    
+    def to_dict(self):
+        return {
+            'id': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'received': self.received,
+            'ranges': self.ranges,
+            'missing': self.missing(),
+            'complete': self.complete,
+        }
+    
+    def save(self):
+        atomic_write_json(self.meta_path, {
+            'filename': self.filename,
+            'size': self.size,
+            'fields': self.fields,
+            'ranges': self.ranges,
+            'created': self.created,
+        })
+    
+    def write(self, stream, offset, length, chunk_size=UPLOAD_CHUNK_SIZE):
+        """
+        Schreibt length Bytes aus dem Stream ab offset in die Teildatei.
+        
+        Bricht die Verbindung ab, werden die bis dahin geschriebenen Bytes
+        trotzdem als empfangen vermerkt. pwrite() darf weniger schreiben als
+        verlangt (z.B. fast volle SD-Karte) - der Rest wird nachgeschrieben,
+        vermerkt werden nur tatsächlich geschriebene Bytes. Das Lock wird nur
+        kurz gehalten - eine hängende alte Verbindung blockiert keinen
+        erneuten Versuch.
+        
+        Raises:
+            UploadSessionError bei Bereichen außerhalb der Datei
+            MultipartError bei abgebrochener Verbindung
+            OSError wenn nicht geschrieben werden kann (z.B. ENOSPC)
+        """
+        if offset < 0 or length < 0 or offset + length > self.size:
+            raise UploadSessionError(f'Bereich {offset}+{length} liegt außerhalb von {self.size} Bytes')
+        with self.lock:
+            if self.closed:
+                raise UploadSessionError('Upload ist bereits abgeschlossen')
+            fd = os.open(self.data_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        written = 0
+        try:
+            for chunk in _read_chunks(stream, length, chunk_size):
+                view = memoryview(chunk)
+                while view:
+                    count = os.pwrite(fd, view, offset + written)
+                    if count <= 0:
+                        raise OSError(errno.ENOSPC, 'pwrite hat nichts geschrieben', str(self.data_path))
+                    written += count
+                    view = view[count:]
+        finally:
+            # Erst auf die Karte, dann im Status vermerken
+            os.fsync(fd)
+            os.close(fd)
+            with self.lock:
+                if not self.closed:
+                    self._add_range(offset, offset + written)
+                    self.save()
+    
+    def commit(self, target_path):
+        """Verschiebt die vollständige Datei atomar an den Zielnamen"""
+        with self.lock:
+            if not self.complete:
+                raise UploadSessionError('Upload ist noch nicht vollständig')
+            if not self.data_path.exists():
+                # Leere Datei - es wurde nie etwas geschrieben
+                self.data_path.touch()
+            os.chmod(self.data_path, 0o644)
+            os.replace(self.data_path, target_path)
+            self.meta_path.unlink(missing_ok=True)
+            self.closed = True
+    
+    def discard(self):
+        with self.lock:
+            self.closed = True
+            self.data_path.unlink(missing_ok=True)
+            self.meta_path.unlink(missing_ok=True)
+
+
+class ResumableUploadStore:
+    """Verwaltet die fortsetzbaren Uploads eines Zielordners (in .uploads/)"""
+    
+    def __init__(self, target_dir):
+        self.directory = Path(target_dir) / RESUMABLE_DIR_NAME
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def create(self, filename, size, fields=None):
+        """Legt eine neue Session an"""
+        if size < 0:
+            raise UploadSessionError('Ungültige Dateigröße')
+        upload = ResumableUpload(self.directory, os.urandom(16).hex(), filename, size, fields)
+        upload.save()
+        with self._lock:
+            self._sessions[upload.upload_id] = upload
+        return upload
+    
+    def get(self, upload_id):
+        """Gibt die Session zurück (auch nach einem Neustart) oder None"""
+        if not _UPLOAD_ID_RE.match(upload_id):
+            return None
+        with self._lock:
+            upload = self._sessions.get(upload_id)
+            if upload is None:
+                try:
+                    with open(self.directory / f'{upload_id}.json', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    return None
+                upload = ResumableUpload(self.directory, upload_id, meta['filename'], meta['size'],
+                                         meta.get('fields'), meta.get('ranges'), meta.get('created'))
+                self._sessions[upload_id] = upload
+            return upload
+    
+    def remove(self, upload_id):
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+    
+    def cleanup(self, max_age=RESUMABLE_MAX_AGE):
+        """Entfernt Sessions, die länger als max_age nicht mehr beschrieben wurden"""
+        removed = 0
+        limit = time.time() - max_age
+        for path in list(self.directory.glob('*.json')) + list(self.directory.glob(f'*{TEMP_SUFFIX}')):
+            try:
+                if path.stat().st_mtime >= limit:
+                    continue
+                path.unlink()
+                self.remove(path.stem)
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -1,21 +1,26 @@
 #! /usr/bin/python2
 
+import os
 import time
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_gpio import get_backend
+from sidekick_hx711 import HX711Reader, SimulatedHX711
+
 EMULATE_HX711=False
 
 referenceUnit = 5
 N = 0
 
-if not EMULATE_HX711:
-    import RPi.GPIO as GPIO
-    from hx711 import HX711
-else:
-    from emulated_hx711 import HX711
+# HX711 wird im Hintergrund gelesen (sidekick_hx711), get_weight() kommt aus dem Ringpuffer
+BACKEND = get_backend('sim' if EMULATE_HX711 else None)
+GPIO = BACKEND.gpio
+if BACKEND.name == 'sim':
+    SimulatedHX711(GPIO, 5, 6, reference_unit=referenceUnit, noise=20)
 
 from pynput.keyboard import Key, Controller
-hx = HX711(5, 6)
+hx = HX711Reader(GPIO, 5, 6, reference_unit=referenceUnit).start()
 
 class ScaleClass:
 
@@ -26,13 +31,13 @@ class ScaleClass:
         self.keyboard = Controller()
     
     def weightTest(self):
-        print(hx.get_units())
+        print(hx.get_weight())
     
     def cleanAndExit(self):
         print("Cleaning...")
 
-        if not EMULATE_HX711:
-            GPIO.cleanup()
+        hx.stop(power_down=True)
+        GPIO.cleanup()
 
         print("Bye!")
         sys.exit()
@@ -40,31 +45,23 @@ class ScaleClass:
     def setup(self):
         self.longTermPlus = 0
         self.longTermMinus = 0
-        hx.set_reading_format("MSB", "MSB")
         hx.set_reference_unit(referenceUnit)
-        hx.reset()
         hx.tare()
         print("Add weight for calibration")
         ZeroWeight = hx.get_weight(5)
-        hx.power_down()
-        hx.power_up()
         CalibrationValue = 0
         while True:     
+            # Neue Werte abwarten (schläft, statt den HX711 abzufragen)
+            hx.wait(5)
             print("Waiting..." + str(hx.get_weight(5)))
             if hx.get_weight(5) >= (ZeroWeight + 200) or hx.get_weight(5) <= (ZeroWeight - 200):
                 print("Weight detected. Calibration in progress...")
                 time.sleep(3)
                 CalibrationValue = hx.get_weight(5)
-                hx.power_down()
-                hx.power_up()
                 time.sleep(1)
                 CalibrationValue = CalibrationValue + hx.get_weight(5)
-                hx.power_down()
-                hx.power_up()
                 time.sleep(1)
                 CalibrationValue = CalibrationValue + hx.get_weight(5)
-                hx.power_down()
-                hx.power_up()
                 CalibrationValue = CalibrationValue / 3
                 self.CaliValue = CalibrationValue
                 print("Calibration done"+str(CalibrationValue))
@@ -80,6 +77,7 @@ class ScaleClass:
         global N
         try:
             print("START")
+            hx.wait(5)
             checkVal = hx.get_weight(5)
             if checkVal <= ((self.CaliValue * (N + 1 ))+ 100):
                 self.longTermPlus = self.longTermPlus + 1
@@ -98,10 +96,8 @@ class ScaleClass:
             else:
                 self.longTermPlus = 0
                 self.longTermMinus = 0
-            hx.power_down()
-            hx.power_up()
         except (KeyboardInterrupt, SystemExit):
-            cleanAndExit()
+            self.cleanAndExit()
 
 if __name__ == '__main__':
     B = ScaleClass()
@@ -1,28 +1,35 @@
-import socket
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_scratch import ScratchClient
+
 
 class ScratchSocket:
+    # Bisherige Schnittstelle, gesendet wird über sidekick_scratch.ScratchClient
+    # (ein Block pro Nachricht, Warteschlange, automatisches Neuverbinden)
 
     def __init__(self):
         self.PORT = 42001
         self.HOST = "localhost"
-        self.scratchSock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.connected = False
+        self.client = None
+
+    @property
+    def connected(self):
+        return self.client is not None and self.client.connected
 
     def connect(self):
         print("Connecting...")
-        self.scratchSock.connect((self.HOST, self.PORT))
-        print("Connected!")
-        self.connected = True
+        self.client = ScratchClient(self.HOST, self.PORT).start()
+        if self.client.wait_connected(timeout=2.0):
+            print("Connected!")
+        else:
+            print("Not connected yet - retrying in background")
 
     def sendScratchCommand(self, cmd):
-        sendString = 'broadcast "{}"'.format(cmd)
-        length = len(sendString)
-        self.scratchSock.send(length.to_bytes(4, 'big'))
-        self.scratchSock.send(bytes(sendString, 'UTF-8'))
+        self.client.broadcast(cmd)
 
     def closeSocket(self):
         print("Closing Socket...")
-        self.scratchSock.close()
+        self.client.close()
         print("Socket closed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Aufbau der Dashboard-Seite
+
+Vergleicht für 10 / 500 / 5.000 gelistete Dateien:
+- Komplett: Seite per += zu einem String zusammensetzen und am Ende
+            komplett kodieren (bisheriges Vorgehen von serve_dashboard())
+- Stream:   vorkodierte Segmente + Fragmente blockweise schreiben
+            (DashboardHandler.write_stream())
+
+Gemessen werden Renderzeit, Zeit bis zum ersten geschriebenen Block und
+Spitzen-Speicher (tracemalloc). Damit alle Dateien in der Seite stehen,
+wird DASHBOARD_PAGE_SIZE auf die Dateianzahl gesetzt.
+
+Verwendung:
+    python3 bench_dashboard_render.py
+    python3 bench_dashboard_render.py 10 100 20000
+"""
+
+import os
+import sys
+import time
+import types
+import tempfile
+import statistics
+import tracemalloc
+import importlib.util
+from pathlib import Path
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, PYTHON_DIR)
+
+DEFAULT_COUNTS = [10, 500, 5000]
+ROUNDS = 20
+
+
+class NullWriter:
+    """Ersatz für wfile - merkt sich nur den Zeitpunkt des ersten Blocks"""
+
+    def __init__(self):
+        self.first_write = None
+        self.written = 0
+
+    def write(self, data):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.written += len(data)
+
+
+def render_concat(dashboard):
+    html = ''
+    for fragment in dashboard.render_dashboard():
+        html += fragment.decode('utf-8')
+    writer = NullWriter()
+    writer.write(html.encode('utf-8'))
+    return writer
+
+
+def render_stream(dashboard):
+    writer = NullWriter()
+    dashboard.DashboardHandler.write_stream(types.SimpleNamespace(wfile=writer), dashboard.render_dashboard())
+    return writer
+
+
+def measure(func, dashboard):
+    times, first = [], []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        writer = func(dashboard)
+        times.append(time.perf_counter() - start)
+        first.append(writer.first_write - start)
+    tracemalloc.start()
+    func(dashboard)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, statistics.median(first) * 1000, peak / 1024, writer.written
+
+
+def run(count):
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='sidekick-bench-')
+    spec = importlib.util.spec_from_file_location('dashboard', os.path.join(PYTHON_DIR, 'sidekick-dashboard.py'))
+    dashboard = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dashboard)
+    dashboard.setup_paths()
+    for i in range(count):
+        (Path(dashboard.VIDEOS_DIR) / f'video-{i:05d}.mp4').touch()
+        (Path(dashboard.PROJECTS_DIR) / f'projekt-{i:05d}.sb3').touch()
+    dashboard.get_index('video').rescan()
+    dashboard.get_index('project').rescan()
+    dashboard.DASHBOARD_PAGE_SIZE = count
+    dashboard.build_static_assets()
+
+    for label, func in (('Komplett', render_concat), ('Stream', render_stream)):
+        total_ms, first_ms, peak_kb, size = measure(func, dashboard)
+        print(f"{count:>8}  {label:<9} {total_ms:>9.2f} ms  {first_ms:>9.3f} ms  {peak_kb:>10.0f} KB  "
+              f"{size / 1024:>8.0f} KB")
+
+
+def main():
+    counts = [int(c) for c in sys.argv[1:]] or DEFAULT_COUNTS
+    print(f"{'Dateien':>8}  {'Modus':<9} {'Render':>12}  {'1. Block':>12}  {'Speicher':>13}  {'Seite':>11}")
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Echo-Zeitmessung per Abfrage-Schleife vs. Flanken-Callbacks
+
+Betreibt SmartBox.py mit sidekick_gpio.SimulatedGPIO: Jeder Echo-Pin liefert
+nach dem Trigger einen Puls passend zu einer festen Distanz. Für 1 / 5 / 9
+Boxen laufen je --cycles Messzyklen (SmartBox.measure_cycle) mit
+- poll: bisherige Schleife, zwei GPIO.input pro Box und Durchlauf
+- edge: EchoTimer stempelt die Flanken, die Schleife schläft
+Gemessen werden CPU-Last des Prozesses (abzüglich des Simulators allein)
+sowie Abweichung und Streuung der gemessenen Distanzen.
+
+Verwendung:
+    python3 bench_echo_timing.py
+    python3 bench_echo_timing.py --boxes 9 --cycles 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_gpio import SimulatedGPIO
+
+# Echo, BoxNr, LED_Message (wie initSmartBoxes)
+BOX_PINS = [(18, 1, 7), (23, 2, 8), (24, 3, 14), (5, 4, 16), (11, 5, 20),
+            (9, 6, 21), (6, 7, 15), (13, 8, 2), (19, 9, 3)]
+
+
+def distance_for(box_nr):
+    return 15.0 + 5.0 * box_nr
+
+
+def cpu_percent(func):
+    wall, cpu = time.perf_counter(), time.process_time()
+    func()
+    return (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+
+
+def run(mode, box_count, cycles):
+    gpio = SimulatedGPIO()
+    pins = BOX_PINS[:box_count]
+    gpio.attach_ultrasonic(SmartBox.GPIO_US_TRIGGER, {echo: distance_for(nr) for echo, nr, _ in pins})
+    SmartBox.use_gpio(gpio)
+    SmartBox.ECHO_TIMING = mode
+    boxes = [SmartBox.SmartBox(echo, nr, led) for echo, nr, led in pins]
+
+    samples = {box.box_nr: [] for box in boxes}
+
+    def loop():
+        for _ in range(cycles):
+            SmartBox.measure_cycle(boxes)
+            for box in boxes:
+                samples[box.box_nr].append(box.distance)
+
+    def simulator_only():
+        # Nur Trigger + simulierte Echos, niemand misst
+        for _ in range(cycles):
+            SmartBox.SmartBox.trigger_ultrasonic()
+            time.sleep(SmartBox.MEASURE_WINDOW)
+
+    for box in boxes:
+        if box.echo_timer is not None:
+            box.echo_timer.close()
+    baseline = cpu_percent(simulator_only)
+    for box in boxes:
+        if box.echo_timer is not None:
+            box.echo_timer = SmartBox.EchoTimer(gpio, box.GPIO_US_ECHO)
+    load = cpu_percent(loop)
+
+    errors, spreads = [], []
+    for nr, values in samples.items():
+        errors.append(abs(statistics.mean(values) - distance_for(nr)))
+        spreads.append(statistics.pstdev(values))
+    return load - baseline, max(errors), max(spreads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Abfrage-Schleife vs. Flanken-Callbacks')
+    parser.add_argument('--boxes', default='1,5,9', help='Box-Anzahlen, kommagetrennt')
+    parser.add_argument('--cycles', type=int, default=100, help='Messzyklen à 50 ms')
+    args = parser.parse_args()
+    # Der Simulator ist ein Python-Thread: Damit er (wie echte Hardware) seine Pegel
+    # pünktlich setzt, muss die Abfrage-Schleife den GIL oft genug abgeben.
+    sys.setswitchinterval(0.00005)
+
+    print(f"{'Boxen':>5}  {'Modus':<5}  {'CPU':>7}  {'max. Abweichung':>16}  {'max. Streuung':>14}")
+    for count in [int(c) for c in args.boxes.split(',')]:
+        for mode in ('poll', 'edge'):
+            load, error, spread = run(mode, count, args.cycles)
+            print(f"{count:>5}  {mode:<5}  {load:>6.1f}%  {error:>13.2f} cm  {spread:>11.2f} cm")
+
+
+if __name__ == '__main__':
+    main()
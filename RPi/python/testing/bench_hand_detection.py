@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Hand-Erkennung auf aufgezeichneten Distanz-Verläufen
+
+Spielt Distanz-Verläufe (20 Messungen/s) durch
+- fixed:  bisherige Erkennung (distance > 15, 3 Messungen rein / 15 raus)
+- filter: sidekick_detect.HandFilter (Median, Hysterese, nachgeführter Leerwert)
+und vergleicht mit den tatsächlichen Hand-Zeiten:
+- Erkennungs- und Freigabe-Latenz
+- Fehlalarme (erkannt, ohne dass eine Hand in der Box war) und verpasste Hände
+
+Ohne --trace werden realistische Verläufe erzeugt: Rauschen, fehlende
+Echos (0), einzelne Ausreißer, langsame Drift des Leerwerts und Hände
+unterschiedlich tief in der Box.
+
+Eigene Aufzeichnungen als CSV (Kopfzeile t,distance,hand; hand = 0/1):
+    python3 bench_hand_detection.py --trace box3.csv --baseline 31.5
+
+Verwendung:
+    python3 bench_hand_detection.py
+    python3 bench_hand_detection.py --traces 50 --seconds 120 --seed 7
+"""
+
+import os
+import sys
+import csv
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_detect import HandFilter
+
+RATE = 20            # Messungen pro Sekunde (SmartBox.MEASURE_WINDOW = 50 ms)
+MATCH_TOLERANCE = 1.0  # s: so lange nach dem Rausnehmen zählt eine Erkennung noch zur Hand
+
+
+class FixedDetector:
+    """Bisherige SmartBox.handDetection"""
+
+    def __init__(self, baseline):
+        self.detected = False
+        self.detectedCounter = 0
+        self.notDetectedCounter = 0
+
+    def update(self, distance):
+        if distance > 15:
+            self.detectedCounter = 0
+            if self.detected:
+                self.notDetectedCounter += 1
+                if self.notDetectedCounter == 15:
+                    self.detected = False
+                    self.notDetectedCounter = 0
+                    return 'removed'
+        else:
+            self.detectedCounter += 1
+            self.notDetectedCounter = 0
+            if self.detectedCounter == 3:
+                self.detected = True
+                return 'detected'
+        return None
+
+
+def make_trace(rng, seconds):
+    """Erzeugter Verlauf: Liste (t, distance, hand), Leerwert"""
+    baseline = rng.uniform(24, 40)
+    drift = rng.uniform(-3, 3)  # cm über die ganze Aufnahme (Temperatur, verrutschte Box)
+    count = int(seconds * RATE)
+    hand = [False] * count
+    depth = [0.0] * count
+    i = int(rng.uniform(1, 3) * RATE)
+    while i < count:
+        length = int(rng.uniform(0.4, 3.0) * RATE)
+        distance = rng.uniform(3, baseline - 8)
+        for j in range(i, min(count, i + length)):
+            hand[j] = True
+            depth[j] = distance
+        i += length + int(rng.uniform(1.5, 6) * RATE)
+
+    trace = []
+    for i in range(count):
+        t = i / RATE
+        empty = baseline + drift * i / count
+        distance = (depth[i] if hand[i] else empty) + rng.gauss(0, 0.4)
+        glitch = rng.random()
+        if glitch < 0.01:
+            distance = 0.0                          # kein Echo
+        elif glitch < 0.015:
+            distance = rng.uniform(2, empty - 8)    # Echo von der Nachbarbox / Kante
+        elif glitch < 0.02:
+            distance = rng.uniform(empty + 20, 300)  # verspätetes Echo
+        trace.append((t, distance, hand[i]))
+    return trace, baseline
+
+
+def load_trace(path):
+    with open(path, newline='') as f:
+        return [(float(row['t']), float(row['distance']), row['hand'] not in ('0', '', 'false'))
+                for row in csv.DictReader(f)]
+
+
+def intervals(trace):
+    """Tatsächliche Hand-Zeiten als [(Start, Ende)]"""
+    result, start = [], None
+    for t, _, hand in trace:
+        if hand and start is None:
+            start = t
+        elif not hand and start is not None:
+            result.append((start, t))
+            start = None
+    if start is not None:
+        result.append((start, trace[-1][0]))
+    return result
+
+
+def replay(detector, trace):
+    """Erkannte Hand-Zeiten als [(Start, Ende)]"""
+    result, start = [], None
+    for t, distance, _ in trace:
+        event = detector.update(distance)
+        if event == 'detected':
+            start = t
+        elif event == 'removed' and start is not None:
+            result.append((start, t))
+            start = None
+    if start is not None:
+        result.append((start, None))
+    return result
+
+
+def score(truth, found):
+    detect, release = [], []
+    false_positives = 0
+    matched = set()
+    for start, end in found:
+        hit = None
+        for index, (true_start, true_end) in enumerate(truth):
+            if index not in matched and true_start <= start <= true_end + MATCH_TOLERANCE:
+                hit = index
+                break
+        if hit is None:
+            false_positives += 1
+            continue
+        matched.add(hit)
+        detect.append(start - truth[hit][0])
+        if end is not None:
+            release.append(end - truth[hit][1])
+    return detect, release, false_positives, len(truth) - len(matched)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hand-Erkennung auf Distanz-Verläufen')
+    parser.add_argument('--trace', action='append', help='CSV-Aufzeichnung (mehrfach möglich)')
+    parser.add_argument('--baseline', type=float, help='Leerwert der Box für --trace (Standard: Median der Werte ohne Hand)')
+    parser.add_argument('--traces', type=int, default=20, help='Anzahl erzeugter Verläufe')
+    parser.add_argument('--seconds', type=float, default=60.0, help='Länge erzeugter Verläufe')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    traces = []
+    if args.trace:
+        for path in args.trace:
+            trace = load_trace(path)
+            baseline = args.baseline or statistics.median(d for _, d, hand in trace if not hand and d > 0)
+            traces.append((trace, baseline))
+    else:
+        rng = random.Random(args.seed)
+        traces = [make_trace(rng, args.seconds) for _ in range(args.traces)]
+
+    hands = sum(len(intervals(trace)) for trace, _ in traces)
+    minutes = sum(trace[-1][0] for trace, _ in traces) / 60
+    print(f"{len(traces)} Verläufe, {minutes:.1f} min, {hands} Hände")
+    print(f"{'Erkennung':<9}  {'rein Ø':>8}  {'rein p95':>8}  {'raus Ø':>8}  {'Fehlalarme':>10}  {'/min':>5}  {'verpasst':>8}")
+    for name, factory in (('fixed', FixedDetector), ('filter', HandFilter)):
+        detect, release, false_positives, missed = [], [], 0, 0
+        for trace, baseline in traces:
+            d, r, fp, m = score(intervals(trace), replay(factory(baseline), trace))
+            detect += d
+            release += r
+            false_positives += fp
+            missed += m
+        detect.sort()
+        p95 = detect[int(len(detect) * 0.95)] if detect else float('nan')
+        print(f"{name:<9}  {statistics.mean(detect) * 1000 if detect else float('nan'):>6.0f}ms  "
+              f"{p95 * 1000:>6.0f}ms  {statistics.mean(release) * 1000 if release else float('nan'):>6.0f}ms  "
+              f"{false_positives:>10}  {false_positives / minutes:>5.2f}  {missed:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Sensor-Hub gegen die einzelnen Skripte, auf simulierter Hardware
+
+Jede Variante läuft in eigenen Prozessen (SIDEKICK_BACKEND=sim), gemessen
+wird die CPU-Zeit pro Sekunde über --seconds nach dem Start:
+- skripte: drei Prozesse gleichzeitig, wie bisher nebeneinander gestartet
+  - smartbox: Messschleife aus SmartBox.runBoxes (run_cycle mit
+    MEASURE_SCHEDULING wie eingestellt, Hand-Erkennung, Buttons per
+    check_buttons), ohne LEDs/MQTT
+  - waage:    sidekick-scale-daemon.py (HX711Reader + ScaleService)
+  - button:   ButtonExample.py (fragt GPIO in einer while-True-Schleife ab)
+- hub: ein Prozess, sidekick-hub.json mit Ultraschall, Tastern und Waage,
+  Senken telemetry (ohne HTTP-Port-Konflikt auf einem freien Port) und
+  eine Zähl-Senke aus diesem Skript (Beispiel für register_sink)
+
+Während der Messung legt das Szenario einmal pro Sekunde eine Hand in
+Box 3, drückt Taster 1 und legt ein Teil auf die Waage; gezählt werden die
+Ereignisse, die beim Hub ankommen.
+
+Verwendung:
+    python3 bench_hub.py
+    python3 bench_hub.py --seconds 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(HERE, '..', 'sidekick-hub.json')
+WARMUP = 1.0           # Sekunden nach dem Start, bevor gemessen wird
+PART_WEIGHT = 50.0
+EMPTY_BOX = 30.0       # cm, wie sidekick_gpio.EMPTY_DISTANCE
+
+
+def measure(seconds, stimulate, result, samples=lambda: 0):
+    """
+    Misst CPU-Zeit des Prozesses über seconds, stimulate(stop) spielt dabei das Szenario.
+    Ergebnis als JSON: result() ergänzt um cpu, threads und Ultraschall-Messungen/s (aus samples())
+    """
+    time.sleep(WARMUP)
+    cpu, start, first = time.process_time(), time.perf_counter(), samples()
+    stop = threading.Event()
+    threading.Thread(target=stimulate, args=(stop,), daemon=True).start()
+    time.sleep(seconds)
+    stop.set()
+    elapsed = time.perf_counter() - start
+    data = dict(result(), cpu=(time.process_time() - cpu) / elapsed, threads=threading.active_count(),
+                rate=(samples() - first) / elapsed)
+    sys.__stdout__.write(json.dumps(data) + '\n')
+    sys.__stdout__.flush()
+
+
+def cycle(stop, steps):
+    """Wiederholt steps = [(Sekunde im Takt, Funktion)] einmal pro Sekunde"""
+    start = time.perf_counter()
+    while not stop.is_set():
+        base = time.perf_counter() - start
+        for at, func in steps:
+            time.sleep(max(0.0, start + base + at - time.perf_counter()))
+            func()
+        time.sleep(max(0.0, start + base + 1.0 - time.perf_counter()))
+
+
+# --- Worker (laufen als eigene Prozesse) ---
+
+def worker_smartbox(seconds):
+    import SmartBox
+    from sidekick_gpio import Scenario, HAND_DISTANCE
+    SmartBox.MQTT_ENABLED = False
+    gpio = SmartBox.GPIO
+    SmartBox.BACKEND.play(Scenario(), SmartBox.GPIO_US_TRIGGER,
+                          {box_nr: echo for echo, box_nr, _ in SmartBox.BOX_PINS}, SmartBox.BUTTON_PINS)
+    boxes = SmartBox.initSmartBoxes()
+    scheduler = SmartBox.create_scheduler(boxes) if SmartBox.MEASURE_SCHEDULING == "adaptive" else None
+    SmartBox.init_buttons()
+    threading.Thread(target=lambda: [SmartBox.run_cycle(boxes, None, scheduler) for _ in iter(int, 1)],
+                     daemon=True).start()
+
+    def stimulate(stop):
+        echo = dict((box_nr, echo) for echo, box_nr, _ in SmartBox.BOX_PINS)[3]
+        cycle(stop, [(0.0, lambda: gpio.set_distance(echo, HAND_DISTANCE)),
+                     (0.1, lambda: gpio.set_input(SmartBox.BUTTON_PINS[1], gpio.LOW)),
+                     (0.3, lambda: gpio.set_distance(echo, EMPTY_BOX)),
+                     (0.3, lambda: gpio.set_input(SmartBox.BUTTON_PINS[1], gpio.HIGH))])
+
+    measure(seconds, stimulate, dict, lambda: sum(box.echo_timer.count for box in boxes))
+
+
+def worker_scale(seconds):
+    from sidekick_gpio import get_backend
+    from sidekick_hx711 import HX711Reader, SimulatedHX711
+    from sidekick_scale import ScaleService
+    scale = scale_config()
+    gpio = get_backend().gpio
+    gpio.setmode(gpio.BCM)
+    sim = SimulatedHX711(gpio, scale['dout'], scale['pd_sck'], reference_unit=scale['reference_unit'], **scale['sim'])
+    reader = HX711Reader(gpio, scale['dout'], scale['pd_sck'], reference_unit=scale['reference_unit'])
+    service = ScaleService(scale['nr'], reader, part_weight=PART_WEIGHT).start(timeout=5)
+
+    def stimulate(stop):
+        cycle(stop, [(0.0, lambda: setattr(sim, 'weight', PART_WEIGHT)), (0.5, lambda: setattr(sim, 'weight', 0.0))])
+
+    measure(seconds, stimulate, lambda: {'events': service.events})
+
+
+def worker_button(seconds):
+    from sidekick_gpio import get_backend
+    gpio = get_backend().gpio
+    gpio.setmode(gpio.BCM)
+    gpio.setup(23, gpio.IN, pull_up_down=gpio.PUD_UP)
+    presses = []
+
+    def loop():
+        # ButtonExample.py
+        while True:
+            button_state = gpio.input(23)
+            if button_state == False:
+                presses.append(time.time())
+                time.sleep(0.2)
+
+    threading.Thread(target=loop, daemon=True).start()
+
+    def stimulate(stop):
+        cycle(stop, [(0.1, lambda: gpio.set_input(23, gpio.LOW)), (0.3, lambda: gpio.set_input(23, gpio.HIGH))])
+
+    measure(seconds, stimulate, lambda: {'events': len(presses)})
+
+
+def worker_hub(seconds):
+    from sidekick_hub import Hub, Sink, register_sink, load_config
+    from sidekick_gpio import HAND_DISTANCE
+
+    @register_sink('count')
+    class CountSink(Sink):
+        def __init__(self, config):
+            super().__init__(config)
+            self.kinds = {}
+
+        def handle(self, event):
+            self.kinds[event.kind] = self.kinds.get(event.kind, 0) + 1
+
+    config = load_config(CONFIG)
+    for source in config['sources']:
+        source['enabled'] = True
+        if source['type'] == 'hx711':
+            for scale in source['scales']:
+                scale['part_weight'] = PART_WEIGHT
+    config['sinks'] = [{'type': 'telemetry', 'port': 0}, {'type': 'count'}]
+    hub = Hub.from_config(config).start()
+    sources = {source.type: source for source in hub.sources}
+    gpio, counter = hub.gpio, hub.sinks[-1]
+    echo = next(box.GPIO_US_ECHO for box in sources['ultrasonic'].boxes if box.box_nr == 3)
+    button = sources['button'].buttons[1]
+    sim = next(iter(sources['hx711'].simulated.values()))
+
+    def stimulate(stop):
+        cycle(stop, [(0.0, lambda: gpio.set_distance(echo, HAND_DISTANCE)),
+                     (0.0, lambda: setattr(sim, 'weight', PART_WEIGHT)),
+                     (0.1, lambda: gpio.set_input(button, gpio.LOW)),
+                     (0.3, lambda: gpio.set_distance(echo, EMPTY_BOX)),
+                     (0.3, lambda: gpio.set_input(button, gpio.HIGH)),
+                     (0.5, lambda: setattr(sim, 'weight', 0.0))])
+
+    measure(seconds, stimulate, lambda: {'events': counter.kinds}, lambda: sources['ultrasonic'].scheduler.samples)
+
+
+WORKERS = {'smartbox': worker_smartbox, 'waage': worker_scale, 'button': worker_button, 'hub': worker_hub}
+
+
+def scale_config():
+    config = load_json(CONFIG)
+    source = next(source for source in config['sources'] if source['type'] == 'hx711')
+    return source['scales'][0]
+
+
+def load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- Steuerung ---
+
+def run(names, seconds):
+    """Startet die Worker gleichzeitig. Returns: {Name: Ergebnis}"""
+    env = dict(os.environ, SIDEKICK_BACKEND='sim')
+    processes = {name: subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', name,
+                                         '--seconds', str(seconds)], stdout=subprocess.PIPE, env=env, text=True)
+                 for name in names}
+    results = {}
+    for name, process in processes.items():
+        output, _ = process.communicate(timeout=seconds + 60)
+        results[name] = json.loads(output.strip().splitlines()[-1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sensor-Hub gegen einzelne Skripte (CPU-Last)')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--worker', choices=sorted(WORKERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.stdout = open(os.devnull, 'w')   # Ausgaben der Skripte; das Ergebnis geht an sys.__stdout__
+        WORKERS[args.worker](args.seconds)
+        os._exit(0)   # Daemon-Threads der Simulation nicht abwarten
+
+    print(f"Simulierte Hardware, {args.seconds:.0f} s Messung pro Variante")
+    print(f"{'Prozess':<10}  {'CPU':>7}  {'Threads':>7}  {'Messungen/s':>11}  Ereignisse")
+    scripts = run(['smartbox', 'waage', 'button'], args.seconds)
+    hub = run(['hub'], args.seconds)
+    for name, result in list(scripts.items()) + list(hub.items()):
+        rate = f"{result['rate']:>11.0f}" if result['rate'] else f"{'-':>11}"
+        print(f"{name:<10}  {result['cpu'] * 100:>6.1f}%  {result['threads']:>7}  {rate}  {result.get('events', '')}")
+
+    total = sum(result['cpu'] for result in scripts.values())
+    without_button = total - scripts['button']['cpu']
+    print(f"\nSkripte gesamt:          {total * 100:6.1f}% CPU in {len(scripts)} Prozessen")
+    print(f"  ohne ButtonExample.py: {without_button * 100:6.1f}% CPU")
+    print(f"Hub:                     {hub['hub']['cpu'] * 100:6.1f}% CPU in 1 Prozess")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HX711 auslesen auf simulierter Hardware
+
+Vergleicht auf einem sidekick_hx711.SimulatedHX711:
+- legacy:         Ablauf von hx711.py / Scale.checkWeight - get_weight(5)
+                  liest 5 Wandlungen per Abfrage-Schleife, danach power_down()/power_up()
+- legacy ohne PD: wie legacy, ohne die Abschaltung nach jeder Messung
+- reader:         sidekick_hx711.HX711Reader, der Aufrufer fragt alle
+                  --poll Sekunden get_weight(5) aus dem Ringpuffer ab
+
+Gemessen werden gelesene Wandlungen pro Sekunde, CPU-Last des Prozesses,
+die Dauer eines get_weight()-Aufrufs und wie viele Gewichte der Aufrufer
+pro Sekunde bekommt.
+
+Verwendung:
+    python3 bench_hx711.py
+    python3 bench_hx711.py --rate 10 --seconds 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_gpio import SimulatedGPIO
+from sidekick_hx711 import HX711Reader, SimulatedHX711, GAIN_PULSES
+
+DOUT, PD_SCK = 5, 6
+REFERENCE_UNIT = 5
+WEIGHT = 250.0
+
+
+class LegacyHX711:
+    """Lese-Pfad von testing/hx711.py (Abfrage-Schleife, Bit für Bit), an ein beliebiges GPIO gebunden"""
+
+    def __init__(self, gpio, dout, pd_sck, gain=128):
+        self.gpio = gpio
+        self.DOUT = dout
+        self.PD_SCK = pd_sck
+        self.GAIN = GAIN_PULSES[gain]
+        self.OFFSET = 0
+        self.REFERENCE_UNIT = 1
+        self.conversions = 0
+        gpio.setup(pd_sck, gpio.OUT)
+        gpio.setup(dout, gpio.IN)
+        gpio.output(pd_sck, False)
+
+    def is_ready(self):
+        return self.gpio.input(self.DOUT) == 0
+
+    def readNextBit(self):
+        self.gpio.output(self.PD_SCK, True)
+        self.gpio.output(self.PD_SCK, False)
+        return int(self.gpio.input(self.DOUT))
+
+    def readNextByte(self):
+        byteValue = 0
+        for x in range(8):
+            byteValue <<= 1
+            byteValue |= self.readNextBit()
+        return byteValue
+
+    def read_long(self):
+        while not self.is_ready():
+            pass
+        dataBytes = [self.readNextByte(), self.readNextByte(), self.readNextByte()]
+        for i in range(self.GAIN):
+            self.readNextBit()
+        self.conversions += 1
+        value = (dataBytes[0] << 16) | (dataBytes[1] << 8) | dataBytes[2]
+        return -(value & 0x800000) + (value & 0x7fffff)
+
+    def get_weight(self, times=5):
+        values = sorted(self.read_long() for _ in range(times))
+        return (values[len(values) // 2] - self.OFFSET) / self.REFERENCE_UNIT
+
+    def power_down(self):
+        self.gpio.output(self.PD_SCK, False)
+        self.gpio.output(self.PD_SCK, True)
+        time.sleep(0.0001)
+
+    def power_up(self):
+        self.gpio.output(self.PD_SCK, False)
+        time.sleep(0.0001)
+
+
+def run_legacy(rate, seconds, power_cycle):
+    gpio = SimulatedGPIO()
+    chip = SimulatedHX711(gpio, DOUT, PD_SCK, weight=WEIGHT, reference_unit=REFERENCE_UNIT, noise=20, rate=rate, seed=1)
+    hx = LegacyHX711(gpio, DOUT, PD_SCK)
+    hx.REFERENCE_UNIT = REFERENCE_UNIT
+    calls, weights = [], []
+    wall, cpu = time.perf_counter(), time.process_time()
+    end = wall + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        weights.append(hx.get_weight(5))
+        calls.append(time.perf_counter() - start)
+        if power_cycle:
+            hx.power_down()
+            hx.power_up()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return hx.conversions / wall, cpu / wall * 100, calls, len(weights) / wall, weights, chip.power_downs
+
+
+def run_reader(rate, seconds, poll):
+    gpio = SimulatedGPIO()
+    chip = SimulatedHX711(gpio, DOUT, PD_SCK, weight=WEIGHT, reference_unit=REFERENCE_UNIT, noise=20, rate=rate, seed=1)
+    hx = HX711Reader(gpio, DOUT, PD_SCK, reference_unit=REFERENCE_UNIT).start()
+    hx.wait(5)
+    count = hx.count
+    calls, weights = [], []
+    wall, cpu = time.perf_counter(), time.process_time()
+    end = wall + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        weights.append(hx.get_weight(5))
+        calls.append(time.perf_counter() - start)
+        time.sleep(poll)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    hx.stop()
+    return (hx.count - count) / wall, cpu / wall * 100, calls, len(weights) / wall, weights, chip.power_downs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HX711 auslesen (simuliert)')
+    parser.add_argument('--rate', type=int, default=80, help='Wandlungen/s des HX711 (10 oder 80)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Messdauer pro Variante')
+    parser.add_argument('--poll', type=float, default=0.01, help='Sekunden zwischen zwei Abfragen (reader)')
+    args = parser.parse_args()
+
+    print(f"HX711 mit {args.rate} Wandlungen/s, Gewicht {WEIGHT}")
+    print(f"{'Variante':<15}  {'Wandl./s':>8}  {'CPU':>5}  {'Aufruf Ø':>10}  {'max':>9}  "
+          f"{'Gewichte/s':>10}  {'Abw. σ':>7}  {'Power-Downs':>11}")
+    variants = (
+        ('legacy', lambda: run_legacy(args.rate, args.seconds, True)),
+        ('legacy ohne PD', lambda: run_legacy(args.rate, args.seconds, False)),
+        ('reader', lambda: run_reader(args.rate, args.seconds, args.poll)),
+    )
+    for name, run in variants:
+        conversions, cpu, calls, weights_per_second, weights, power_downs = run()
+        spread = statistics.pstdev(weights) if len(weights) > 1 else float('nan')
+        print(f"{name:<15}  {conversions:>8.1f}  {cpu:>4.0f}%  {statistics.mean(calls) * 1000:>8.3f}ms  "
+              f"{max(calls) * 1000:>7.1f}ms  {weights_per_second:>10.1f}  {spread:>7.2f}  {power_downs:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Kosten der Fortschrittsmeldungen beim Import
+
+Kopiert einen synthetischen "USB-Stick" (mehrere große Dateien) mit
+run_import() abwechselnd ohne und mit ImportProgress. Der Fortschritt geht
+an eine Status-Datei und an einen Sink, der wie der MQTT-Sink JSON erzeugt.
+Ausgegeben wird der Median der Laufzeiten und der Mehraufwand in Prozent
+(Ziel: < 1 %).
+
+Verwendung:
+    python3 bench_import_progress.py
+    python3 bench_import_progress.py --files 8 --size-mb 128 --rounds 5 --interval 0.1
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_import import run_import, ImportProgress, status_file_sink
+
+EXTENSIONS = {'.mp4'}
+
+
+def json_sink(messages):
+    def publish(snapshot):
+        messages.append(json.dumps(snapshot))
+    return publish
+
+
+def run_once(source, target, with_progress, interval, status_path):
+    shutil.rmtree(target, ignore_errors=True)
+    progress = None
+    messages = []
+    if with_progress:
+        progress = ImportProgress([status_file_sink(status_path), json_sink(messages)], interval=interval)
+        progress.start()
+    report = run_import(source, target, EXTENSIONS, progress=progress)
+    if progress is not None:
+        progress.finish()
+    assert len(report.copied) == len(os.listdir(source)), report.failed
+    return report.seconds, len(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mehraufwand von ImportProgress')
+    parser.add_argument('--files', type=int, default=6)
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--interval', type=float, default=1.0, help='Sekunden zwischen zwei Meldungen')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='sidekick-import-bench-') as temp_dir:
+        source = os.path.join(temp_dir, 'stick')
+        target = os.path.join(temp_dir, 'videos')
+        os.makedirs(source)
+        block = os.urandom(1024 * 1024)
+        for i in range(args.files):
+            with open(os.path.join(source, f'video-{i}.mp4'), 'wb') as f:
+                for _ in range(args.size_mb):
+                    f.write(block)
+
+        status_path = os.path.join(temp_dir, 'import-status.json')
+        plain, tracked, messages = [], [], 0
+        run_once(source, target, False, args.interval, status_path)  # Aufwärmen (Page-Cache)
+        for _ in range(args.rounds):
+            plain.append(run_once(source, target, False, args.interval, status_path)[0])
+            seconds, count = run_once(source, target, True, args.interval, status_path)
+            tracked.append(seconds)
+            messages += count
+
+    total_mb = args.files * args.size_mb
+    base, with_progress = statistics.median(plain), statistics.median(tracked)
+    print(f"Daten:          {args.files} x {args.size_mb} MB, {args.rounds} Durchläufe, Intervall {args.interval} s")
+    print(f"Ohne Fortschritt: {base:.3f} s  ({total_mb / base:.0f} MB/s)")
+    print(f"Mit Fortschritt:  {with_progress:.3f} s  ({total_mb / with_progress:.0f} MB/s), "
+          f"{messages / args.rounds:.0f} Meldungen pro Lauf")
+    print(f"Mehraufwand:      {(with_progress - base) / base * 100:+.2f} %")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LED-Animationen im Render-Thread (sidekick_leds)
+
+Startet per MQTT-Callback (SmartBox.on_mqtt_message) auf allen 9 Boxen
+eine Animation und lässt sie --seconds lang auf dem simulierten Streifen
+aus bench_led_frames.py laufen (mit den Kosten eines echten Streifens).
+Ausgegeben werden:
+- Histogramm der Frame-Abstände (Soll: 1/FRAME_RATE) und der Rechen-/Ausgabezeit pro Frame
+- MQTT-Nachrichten: Animation auf dem Pi vs. Scratch schickt jeden Farbwechsel selbst
+
+Verwendung:
+    python3 bench_led_animation.py
+    python3 bench_led_animation.py --animation "chase blue 0.5" --seconds 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_leds import LEDController, FRAME_RATE
+from bench_led_frames import TimedStrip, LED_COUNT
+
+BUCKETS_MS = [1, 2, 5, 10, 15, 20, 25, 30, 40, 50, 100]
+
+
+class Message:
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload.encode('utf-8')
+
+
+def histogram(title, values_ms):
+    print(f"{title} (n={len(values_ms)}, Ø {statistics.mean(values_ms):.2f} ms, "
+          f"max {max(values_ms):.2f} ms)")
+    lower = 0
+    for upper in BUCKETS_MS + [float('inf')]:
+        count = sum(1 for v in values_ms if lower <= v < upper)
+        if count:
+            label = f"{lower:g}-{upper:g} ms" if upper != float('inf') else f">= {lower:g} ms"
+            print(f"  {label:>12}  {count:>6}  {'#' * max(1, round(count / len(values_ms) * 50))}")
+        lower = upper
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LED-Animationen: Frame-Zeiten und MQTT-Verkehr')
+    parser.add_argument('--animation', default='pulse red 1', help='Payload für sidekick/box/all/led/anim')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Laufzeit')
+    args = parser.parse_args()
+
+    strip = TimedStrip(LED_COUNT)
+    leds = LEDController(strip).start()
+    SmartBox.led_strip = leds
+
+    SmartBox.on_mqtt_message(None, None, Message(f"{SmartBox.MQTT_TOPIC_BOX}/all/led/anim", args.animation))
+    messages = 1
+    time.sleep(args.seconds)
+    leds.stop()
+
+    log = list(leds.frame_log)
+    intervals = [(b[0] - a[0]) * 1000 for a, b in zip(log, log[1:])]
+    work = [duration * 1000 for _, duration in log]
+
+    print()
+    print(f"Animation '{args.animation}' auf 9 Boxen, {args.seconds:g} s, Soll {FRAME_RATE} FPS "
+          f"({1000 / FRAME_RATE:.0f} ms)")
+    print(f"Frames: {leds.renders} ({leds.renders / args.seconds:.1f} FPS)")
+    histogram("Frame-Abstand", intervals)
+    histogram("Rechnen + Ausgabe pro Frame", work)
+    # Ohne Animations-Engine müsste Scratch jede Farbänderung jeder Box einzeln schicken
+    per_box = FRAME_RATE * args.seconds
+    print(f"MQTT-Nachrichten: {messages} (Animation auf dem Pi) vs. {per_box * 9:.0f} "
+          f"(Scratch schickt jeden Frame, 9 Boxen à {FRAME_RATE} FPS)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LED-Ausgabe pro Box vs. Frame-Puffer (sidekick_leds.LEDController)
+
+Simuliert einen Streifen mit 70 LEDs, dessen Aufrufe so viel Zeit kosten
+wie auf dem Pi: jedes setPixelColor ist ein SWIG-Aufruf, jedes show()
+überträgt den ganzen Streifen (30 µs pro LED + 50 µs Reset bei 800 kHz).
+Gemessen wird eine sidekick/box/all/led-Nachricht und eine Folge von
+Einzel-Updates (jede Box einmal, direkt hintereinander):
+- legacy: bisheriges set_led_color (7x setPixelColor + show() pro Box)
+- frame:  SmartBox.set_led_colors über LEDController mit Render-Thread
+Ausgegeben werden Anzahl der Ausgaben (ws2811_render), setPixelColor-Aufrufe
+und die Latenz bis der letzte Frame am Streifen ist.
+
+Verwendung:
+    python3 bench_led_frames.py
+    python3 bench_led_frames.py --rounds 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_gpio import Color, SimulatedLEDStrip
+from sidekick_leds import LEDController
+
+LED_COUNT = 70
+BOXES = range(1, 10)
+SWIG_CALL = 0.000005              # Sekunden pro ws2811_led_set
+RENDER_PER_LED = 0.00003          # 24 Bit bei 800 kHz
+RENDER_RESET = 0.00005
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TimedStrip(SimulatedLEDStrip):
+    """SimulatedLEDStrip mit den Kosten eines echten Streifens"""
+
+    def __init__(self, num):
+        super().__init__(num)
+        self.pixel_calls = 0
+
+    def setPixelColor(self, n, color):
+        busy_wait(SWIG_CALL)
+        self.pixel_calls += 1
+        super().setPixelColor(n, color)
+
+    def show(self):
+        time.sleep(RENDER_PER_LED * len(self.pixels) + RENDER_RESET)
+        super().show()
+
+
+def legacy_set_led_color(strip, box_nr, r, g, b):
+    """set_led_color vor dem Frame-Puffer"""
+    start = SmartBox.SimpleLED.LED_COUNT * (box_nr - 1)
+    for i in range(start, start + SmartBox.SimpleLED.LED_COUNT):
+        strip.setPixelColor(i, Color(g, r, b))
+    strip.show()
+
+
+def measure(mode, scenario, rounds):
+    strip = TimedStrip(LED_COUNT)
+    target = strip if mode == 'legacy' else LEDController(strip).start()
+    latencies = []
+    for round_nr in range(rounds):
+        r, g, b = (255, 0, 0) if round_nr % 2 else (0, 0, 255)
+        shows = len(strip.show_times)
+        start = time.perf_counter()
+        if mode == 'legacy':
+            for box_nr in BOXES:
+                legacy_set_led_color(strip, box_nr, r, g, b)
+        elif scenario == 'all':
+            SmartBox.set_led_colors(target, BOXES, r, g, b)
+        else:
+            for box_nr in BOXES:
+                SmartBox.set_led_color(target, box_nr, r, g, b)
+        # Warten, bis alle Boxen die neue Farbe am Streifen haben
+        expected = Color(g, r, b)
+        last_led = SmartBox.SimpleLED.LED_COUNT * len(BOXES) - 1
+        while strip.shown[last_led] != expected or len(strip.show_times) == shows:
+            time.sleep(0.0001)
+        latencies.append(strip.show_times[-1] - start)
+        time.sleep(0.05)
+    if mode != 'legacy':
+        target.stop()
+    return len(strip.show_times) / rounds, strip.pixel_calls / rounds, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LED-Ausgabe pro Box vs. Frame-Puffer')
+    parser.add_argument('--rounds', type=int, default=20, help='Nachrichten pro Messung')
+    args = parser.parse_args()
+
+    rows = []
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # set_led_color meldet jede Änderung
+    try:
+        for scenario in ('all', 'einzeln'):
+            for mode in ('legacy', 'frame'):
+                rows.append((scenario, mode) + measure(mode, scenario, args.rounds))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(f"{'Update':<8}  {'Modus':<6}  {'Renders':>7}  {'setPixel':>8}  {'Latenz Ø':>9}  {'Latenz max':>10}")
+    for scenario, mode, renders, calls, latencies in rows:
+        print(f"{scenario:<8}  {mode:<6}  {renders:>7.1f}  {calls:>8.0f}  "
+              f"{statistics.mean(latencies) * 1000:>7.2f}ms  {max(latencies) * 1000:>8.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
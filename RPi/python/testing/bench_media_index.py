@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Medien-Index vs. kompletter Ordner-Scan
+
+Legt 10 / 1.000 / 10.000 (leere) Videodateien in einem temporären Ordner an
+und vergleicht pro Seitenaufruf:
+- Scan:  bisheriges Vorgehen (iterdir + sort + json.dump + stat pro Datei)
+- Index: MediaIndex.entries() aus dem Speicher
+Zusätzlich wird die Latenz von GET / gegen ein lokales Dashboard gemessen.
+
+Verwendung:
+    python3 bench_media_index.py
+    python3 bench_media_index.py 10 100 5000
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import statistics
+import http.client
+import importlib.util
+from pathlib import Path
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, PYTHON_DIR)
+
+DEFAULT_COUNTS = [10, 1000, 10000]
+ROUNDS = 20
+
+
+def legacy_scan(videos_dir):
+    """Bisheriger Ablauf in serve_dashboard(): Voll-Scan, JSON schreiben, stat() pro Datei"""
+    names = [f.name for f in sorted(videos_dir.iterdir()) if f.suffix.lower() == '.mp4']
+    with open(videos_dir / 'video-list.json', 'w', encoding='utf-8') as f:
+        json.dump(names, f, indent=2, ensure_ascii=False)
+    return [(name, (videos_dir / name).stat().st_size) for name in names if (videos_dir / name).exists()]
+
+
+def measure(func, rounds=ROUNDS):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def run(count):
+    home = tempfile.mkdtemp(prefix='sidekick-bench-')
+    os.environ['HOME'] = home
+    spec = importlib.util.spec_from_file_location('dashboard', os.path.join(PYTHON_DIR, 'sidekick-dashboard.py'))
+    dashboard = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dashboard)
+    dashboard.setup_paths()
+    videos_dir = Path(dashboard.VIDEOS_DIR)
+    for i in range(count):
+        (videos_dir / f'video-{i:05d}.mp4').touch()
+
+    index = dashboard.get_index('video')
+    index.rescan()
+    scan_ms = measure(lambda: legacy_scan(videos_dir))
+    index_ms = measure(index.entries)
+
+    server = dashboard.PooledHTTPServer(('127.0.0.1', 0), dashboard.DashboardHandler, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get_page():
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+        conn.request('GET', '/')
+        conn.getresponse().read()
+        conn.close()
+
+    dashboard.DashboardHandler.log_message = lambda *args: None
+    page_ms = measure(get_page, rounds=5)
+    server.shutdown()
+    server.server_close()
+    print(f"{count:>8}  {scan_ms:>10.2f} ms  {index_ms:>10.4f} ms  {page_ms:>12.1f} ms")
+
+
+def main():
+    counts = [int(c) for c in sys.argv[1:]] or DEFAULT_COUNTS
+    print(f"{'Dateien':>8}  {'Scan':>13}  {'Index':>13}  {'GET / (Index)':>15}")
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Video-Auslieferung mit sendfile() vs. Python-Puffer
+
+Legt ein Testvideo in einem temporären HOME an und lädt es mehrfach von
+- dem Dashboard (/videos/..., socket.sendfile)
+- python3 -m http.server (bisheriger Server auf 8601, liest in Python-Puffer)
+Gemessen werden Durchsatz und CPU-Zeit des Server-Prozesses (/proc/<pid>/stat)
+sowie die Latenz von Range-Requests (Spulen) beim Dashboard.
+
+Verwendung:
+    python3 bench_media_serving.py
+    python3 bench_media_serving.py --size-mb 500 --rounds 5
+"""
+
+import os
+import sys
+import time
+import random
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+
+from loadtest_dashboard import start_local_dashboard, free_port
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def process_cpu_seconds(pid):
+    """utime + stime eines Prozesses"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def download(port, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.request('GET', path, headers=headers or {})
+    response = conn.getresponse()
+    buf = bytearray(1024 * 1024)
+    total = 0
+    while True:
+        n = response.readinto(buf)
+        if not n:
+            break
+        total += n
+    conn.close()
+    return response.status, total
+
+
+def wait_for_port(port):
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server auf Port {port} startet nicht')
+
+
+def run(label, proc, port, path, size, rounds):
+    cpu_before = process_cpu_seconds(proc.pid)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        status, total = download(port, path)
+        assert status == 200 and total == size, (status, total)
+    elapsed = time.perf_counter() - start
+    cpu = process_cpu_seconds(proc.pid) - cpu_before
+    mb = size * rounds / 1024 ** 2
+    print(f"{label:<22} {mb / elapsed:>9.1f} MB/s   Server-CPU {cpu:>6.2f} s   ({cpu / mb * 1000:.2f} ms/MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sendfile() vs. Python-Puffer')
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--seeks', type=int, default=200, help='Anzahl Range-Requests')
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp(prefix='sidekick-media-')
+    videos_dir = os.path.join(home, 'Sidekick', 'sidekick', 'videos')
+    os.makedirs(videos_dir)
+    size = args.size_mb * 1024 * 1024
+    with open(os.path.join(videos_dir, 'bench.mp4'), 'wb') as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            f.write(block)
+
+    dashboard, url = start_local_dashboard(workers=4, home=home)
+    dashboard_port = int(url.rsplit(':', 1)[1])
+    legacy_port = free_port()
+    legacy = subprocess.Popen([sys.executable, '-m', 'http.server', str(legacy_port), '--bind', '127.0.0.1'],
+                              cwd=os.path.join(home, 'Sidekick', 'sidekick'),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(legacy_port)
+        # Einmal lesen, damit beide aus dem Page-Cache bedienen
+        download(dashboard_port, '/videos/bench.mp4')
+
+        print(f"Datei: {args.size_mb} MB, {args.rounds} Durchläufe")
+        run('http.server (Puffer)', legacy, legacy_port, '/videos/bench.mp4', size, args.rounds)
+        run('Dashboard (sendfile)', dashboard, dashboard_port, '/videos/bench.mp4', size, args.rounds)
+
+        latencies = []
+        for _ in range(args.seeks):
+            offset = random.randrange(size - 1024 * 1024)
+            start = time.perf_counter()
+            status, total = download(dashboard_port, '/videos/bench.mp4',
+                                     {'Range': f'bytes={offset}-{offset + 256 * 1024 - 1}'})
+            latencies.append(time.perf_counter() - start)
+            assert status == 206 and total == 256 * 1024, (status, total)
+        latencies.sort()
+        print(f"Range-Requests (256 KB): p50 {statistics.median(latencies) * 1000:.2f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+    finally:
+        for proc in (dashboard, legacy):
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Teile zählen auf aufgezeichneten Gewichts-Verläufen
+
+Wiedergabe (ohne Hardware, ohne Echtzeit) von Verläufen mit 80 Wandlungen/s:
+- legacy: ScaleClass.checkWeight aus Scale.py - Median aus 5 Wandlungen,
+  danach power_down()/power_up() (4 Wandlungen zum Einschwingen), Schwellen
+  CaliValue * (N ± 1) ± 100 auf das (bei dieser Wägezelle negative) Gewicht
+- detector: sidekick_scale.WeightDetector auf jeder einzelnen Wandlung
+  mit festem Teilegewicht
+- kalibriert: WeightDetector ohne Teilegewicht (Kalibrierung am ersten Teil)
+Ausgewertet werden Latenz bis zur richtigen Anzahl, falsche Zählungen und
+der Zeitanteil mit falscher Anzahl. Jeder erzeugte Verlauf wird in beide
+Richtungen abgespielt: steigend und fallend (negative Gewichte wie bei der
+Wägezelle aus Scale.py).
+
+Ohne --trace werden Verläufe erzeugt: Rauschen, langsame Drift der
+Wägezelle, zuerst ein Teil (zum Kalibrieren), danach Teile einzeln oder
+zu zweit rein/raus mit Nachschwingen,
+gelegentliches kurzes Antippen der Waage (--touches pro Minute). Ein
+Druck von 200 ms sieht für beide Verfahren wie ein Teil aus und wird
+gezählt - bei --touches 0 bleiben nur echte Fehler.
+
+Eigene Aufzeichnungen als CSV (Kopfzeile t,weight,count; weight nach Tara),
+--part-weight mit dem Vorzeichen der Gewichte:
+    python3 bench_scale_detection.py --trace waage1.csv --part-weight -250
+
+Mit --live läuft zusätzlich sidekick_scale.ScaleService auf simulierten
+HX711 (--scales Waagen in einem Prozess) und misst die Zeit vom
+Auflegen bis zum MQTT-Publish von .../count.
+
+Verwendung:
+    python3 bench_scale_detection.py
+    python3 bench_scale_detection.py --traces 50 --live --scales 3
+"""
+
+import os
+import sys
+import csv
+import math
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_gpio import SimulatedGPIO
+from sidekick_hx711 import HX711Reader, SimulatedHX711
+from sidekick_scale import WeightDetector, ScaleService
+
+RATE = 80                # Wandlungen/s (RATE-Pin HIGH)
+PART_WEIGHT = 250.0      # Gewicht eines Teils (Einheiten nach reference_unit, wie Scale.py)
+NOISE = 4.0              # Rauschen einer Wandlung
+REFERENCE_UNIT = 5
+
+
+class LegacyDetector:
+    """ScaleClass.checkWeight: alle 9 Wandlungen ein Median aus 5, Anzahl über feste Schwellen"""
+
+    READS = 5
+    SETTLE = 4  # Wandlungen nach power_up(), die verworfen werden
+
+    def __init__(self, part_weight, sign=1):
+        self.CaliValue = -part_weight  # Die Wägezelle in Scale.py liefert negative Gewichte
+        self.sign = sign               # Richtung des Verlaufs: negative Verläufe passen ohne Umrechnung
+        self.N = 0
+        self.longTermPlus = 0
+        self.longTermMinus = 0
+        self.count = 0
+        self._values = []
+        self._skip = 0
+
+    def update(self, weight):
+        if self._skip:
+            self._skip -= 1
+            return []
+        self._values.append(-self.sign * weight)
+        if len(self._values) < self.READS:
+            return []
+        checkVal = sorted(self._values)[self.READS // 2]
+        self._values = []
+        self._skip = self.SETTLE
+        old = self.N
+        if checkVal <= ((self.CaliValue * (self.N + 1)) + 100):
+            self.longTermPlus = self.longTermPlus + 1
+            if self.longTermPlus >= 1:
+                self.N = self.N + 1
+                self.longTermPlus = 0
+        elif checkVal >= ((self.CaliValue * (self.N - 1)) - 100) and self.N >= 1:
+            self.longTermMinus = self.longTermMinus + 1
+            if self.longTermMinus >= 3:
+                self.N = self.N - 1
+                self.longTermMinus = 1
+        else:
+            self.longTermPlus = 0
+            self.longTermMinus = 0
+        self.count = self.N
+        return [('count', self.N, self.N - old)] if self.N != old else []
+
+
+def make_trace(rng, seconds, touches_per_minute=3):
+    """Erzeugter Verlauf: Liste (t, weight, count)"""
+    count = int(seconds * RATE)
+    drift = rng.uniform(-0.2, 0.2) * PART_WEIGHT
+    changes = []  # (Index, neue Anzahl)
+    parts = 0
+    i = int(rng.uniform(1, 2) * RATE)
+    while i < count:
+        step = 1 if not changes else rng.choice((1, 1, 1, 2)) * (1 if parts == 0 or rng.random() < 0.6 else -1)
+        parts = max(0, parts + step)
+        changes.append((i, parts))
+        i += int(rng.uniform(1.0, 4.0) * RATE)
+    touches = [int(rng.uniform(0, seconds) * RATE) for _ in range(int(seconds / 60 * touches_per_minute))]
+
+    trace = []
+    parts, since, jump = 0, None, 0.0
+    changes = iter(changes + [(count, None)])
+    next_change = next(changes)
+    for i in range(count):
+        if i == next_change[0]:
+            jump = (next_change[1] - parts) * PART_WEIGHT
+            parts, since = next_change[1], i
+            next_change = next(changes)
+        weight = parts * PART_WEIGHT + drift * i / count + rng.gauss(0, NOISE)
+        if since is not None:
+            # Nachschwingen beim Auflegen / Rausnehmen (~100 ms)
+            age = (i - since) / RATE
+            weight += 0.5 * jump * math.exp(-age / 0.03) * math.cos(2 * math.pi * 15 * age)
+        for touch in touches:
+            if 0 <= i - touch < RATE // 5:
+                weight += 0.8 * PART_WEIGHT  # Antippen: 200 ms Druck auf die Waage
+        trace.append((i / RATE, weight, parts))
+    return trace
+
+
+def load_trace(path):
+    with open(path, newline='') as f:
+        return [(float(row['t']), float(row['weight']), int(row['count'])) for row in csv.DictReader(f)]
+
+
+def replay(detector, trace):
+    """Anzahl des Detektors nach jedem Wert und Zeitpunkte der Änderungen"""
+    counts, changes = [], []
+    for t, weight, _ in trace:
+        for event in detector.update(weight):
+            if event[0] == 'count':
+                changes.append(t)
+        counts.append(detector.count)
+    return counts, changes
+
+
+def score(trace, counts, changes):
+    truth = [(t, count) for index, (t, _, count) in enumerate(trace) if index == 0 or count != trace[index - 1][2]]
+    latencies, missed = [], 0
+    for index, (at, count) in enumerate(truth[1:], start=1):
+        until = truth[index + 1][0] if index + 1 < len(truth) else trace[-1][0] + 1
+        hit = next((t for (t, _, _), detected in zip(trace, counts) if at <= t < until and detected == count), None)
+        if hit is None:
+            missed += 1
+        else:
+            latencies.append(hit - at)
+    wrong = sum(1 for (_, _, count), detected in zip(trace, counts) if count != detected) / len(trace)
+    spurious = max(0, len(changes) - (len(truth) - 1 - missed))
+    return latencies, missed, spurious, wrong
+
+
+def run_replay(traces, part_weight, signs=(1, -1)):
+    """traces steigen mit jedem Teil um part_weight (> 0); sign -1 spielt sie fallend ab"""
+    print(f"{'Erkennung':<10}  {'Richtung':<8}  {'Latenz Ø':>8}  {'p95':>6}  {'verpasst':>8}  "
+          f"{'falsch gezählt':>14}  {'Zeit falsch':>11}")
+    for sign in signs:
+        signed = [[(t, sign * weight, count) for t, weight, count in trace] for trace in traces]
+        for name, factory in (('legacy', lambda: LegacyDetector(part_weight, sign)),
+                              ('detector', lambda: WeightDetector(part_weight=sign * part_weight)),
+                              ('kalibriert', lambda: WeightDetector())):
+            replay_detector(name, 'steigend' if sign > 0 else 'fallend', factory, signed)
+
+
+def replay_detector(name, direction, factory, traces):
+    latencies, missed, spurious, wrong = [], 0, 0, []
+    for trace in traces:
+        counts, changes = replay(factory(), trace)
+        l, m, s, w = score(trace, counts, changes)
+        latencies += l
+        missed += m
+        spurious += s
+        wrong.append(w)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float('nan')
+    mean = statistics.mean(latencies) * 1000 if latencies else float('nan')
+    print(f"{name:<10}  {direction:<8}  {mean:>6.0f}ms  {p95:>4.0f}ms  {missed:>8}  {spurious:>14}  "
+          f"{statistics.mean(wrong) * 100:>10.1f}%")
+
+
+class RecordingClient:
+    """Ersatz für paho.mqtt.client.Client: merkt sich jeden Publish mit Zeitstempel"""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append((time.perf_counter(), topic, payload))
+
+
+def run_live(scale_count, steps, seed):
+    rng = random.Random(seed)
+    gpio = SimulatedGPIO()
+    client = RecordingClient()
+    chips, services = [], []
+    for nr in range(1, scale_count + 1):
+        dout, pd_sck = 100 + 2 * nr, 101 + 2 * nr  # Nur in der Simulation vorhanden
+        chips.append(SimulatedHX711(gpio, dout, pd_sck, reference_unit=REFERENCE_UNIT, offset=8000,
+                                    noise=NOISE * REFERENCE_UNIT, rate=RATE, seed=nr))
+        reader = HX711Reader(gpio, dout, pd_sck, reference_unit=REFERENCE_UNIT)
+        services.append(ScaleService(nr, reader, client, part_weight=PART_WEIGHT).start(timeout=5))
+
+    latencies = []
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(steps):
+        time.sleep(rng.uniform(0.3, 0.6))
+        index = rng.randrange(scale_count)
+        service, chip = services[index], chips[index]
+        parts = service.detector.count + (1 if service.detector.count == 0 or rng.random() < 0.6 else -1)
+        published = len(client.published)
+        chip.weight = parts * PART_WEIGHT
+        changed = time.perf_counter()
+        topic, payload = f"{service.topic}/count", str(parts)
+        deadline = changed + 1.0
+        while time.perf_counter() < deadline:
+            hits = [t for t, published_topic, value in client.published[published:]
+                    if published_topic == topic and value == payload]
+            if hits:
+                latencies.append(hits[0] - changed)
+                break
+            time.sleep(0.002)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    for service in services:
+        service.stop()
+
+    latencies.sort()
+    print(f"\nLive: {scale_count} Waage(n), {steps} Änderungen, {len(latencies)} gemeldet, CPU {cpu / wall * 100:.0f}%")
+    if latencies:
+        print(f"Auflegen -> Publish: Ø {statistics.mean(latencies) * 1000:.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teile zählen auf Gewichts-Verläufen')
+    parser.add_argument('--trace', action='append', help='CSV-Aufzeichnung (mehrfach möglich)')
+    parser.add_argument('--part-weight', type=float, default=PART_WEIGHT, help='Teilegewicht für --trace')
+    parser.add_argument('--traces', type=int, default=20, help='Anzahl erzeugter Verläufe')
+    parser.add_argument('--seconds', type=float, default=60.0, help='Länge erzeugter Verläufe')
+    parser.add_argument('--touches', type=float, default=3, help='Antippen pro Minute in erzeugten Verläufen')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--live', action='store_true', help='Zusätzlich ScaleService auf simulierten HX711')
+    parser.add_argument('--scales', type=int, default=2, help='Waagen im Live-Test')
+    parser.add_argument('--steps', type=int, default=20, help='Änderungen im Live-Test')
+    args = parser.parse_args()
+
+    signs = (1, -1)
+    if args.trace:
+        # Aufzeichnungen laufen in eine Richtung - für run_replay steigend machen
+        sign = 1 if args.part_weight > 0 else -1
+        traces = [[(t, sign * weight, count) for t, weight, count in load_trace(path)] for path in args.trace]
+        signs = (sign,)
+    else:
+        rng = random.Random(args.seed)
+        traces = [make_trace(rng, args.seconds, args.touches) for _ in range(args.traces)]
+    changes = sum(sum(1 for a, b in zip(trace, trace[1:]) if a[2] != b[2]) for trace in traces)
+    print(f"{len(traces)} Verläufe, {sum(trace[-1][0] for trace in traces) / 60:.1f} min, {changes} Änderungen")
+    run_replay(traces, abs(args.part_weight), signs)
+    if args.live:
+        run_live(args.scales, args.steps, args.seed)
+
+
+if __name__ == '__main__':
+    main()
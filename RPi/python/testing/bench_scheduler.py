@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Messablauf der Ultraschall-Sensoren auf simulierter Hardware
+
+Vergleicht für 9, 5 und 2 aktive Boxen (die übrigen liefern kein Echo und
+werden von SmartBox.checkSmartBoxes aussortiert):
+- fixed:    alle Boxen auslösen, MEASURE_WINDOW (50 ms) abwarten, nächste
+            Auslösung frühestens nach MIN_TRIGGER_PERIOD
+- adaptive: sidekick_scheduler.MeasureScheduler mit dem gemeinsamen Trigger-Pin 25
+- adaptive, eigene Trigger: wie adaptive, jede Box an einem eigenen
+  (simulierten) Trigger-Pin, benachbarte Boxen in getrennten Zeitschlitzen
+
+Gemessen werden empfangene Echos pro Sekunde (gesamt und pro Box), die
+mittlere Abweichung der gemessenen von der simulierten Distanz und die
+CPU-Last. Alle Varianten sollten bei 1 / MIN_TRIGGER_PERIOD pro Box
+liegen, unabhängig von der Zahl aktiver Boxen. Übersprechen zwischen
+Nachbarboxen und Nachhall in der Box simuliert SimulatedGPIO nicht - wie
+kurz MIN_TRIGGER_PERIOD auf echter Hardware sein darf, lässt sich hier
+nicht ablesen (--min-period nur zum Vergleich, gilt für alle Varianten).
+
+Jede Box wird wie in SmartBox.py beim Start kalibriert (~1 s pro Box).
+
+Verwendung:
+    python3 bench_scheduler.py
+    python3 bench_scheduler.py --active 9 3 --seconds 5
+    python3 bench_scheduler.py --min-period 0.01
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_gpio import SimulatedBackend, Scenario
+from sidekick_scheduler import MeasureScheduler, MIN_TRIGGER_PERIOD
+
+OWN_TRIGGER_PINS = {nr: 40 + nr for nr in range(1, 10)}  # Nur in der Simulation vorhanden
+
+
+def setup(active, trigger_pins, seed):
+    """Kalibriert alle 9 Boxen; Boxen über active liefern kein Echo. Returns: Backend, Szenario, aktive Boxen"""
+    rng = random.Random(seed)
+    scenario = Scenario()
+    for nr in range(1, 10):
+        scenario.set_distance(nr, round(rng.uniform(22, 40), 1) if nr <= active else None, 0)
+    backend = SimulatedBackend()
+    SmartBox.BOX_TRIGGER_PINS = dict(trigger_pins)
+    backend.play(scenario, {nr: trigger_pins.get(nr, SmartBox.GPIO_US_TRIGGER) for nr in range(1, 10)},
+                 {nr: echo for echo, nr, _ in SmartBox.BOX_PINS}, SmartBox.BUTTON_PINS)
+    SmartBox.use_backend(backend)
+    SmartBox.ECHO_TIMING = "edge"
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        boxes = SmartBox.initSmartBoxes()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return backend, scenario, boxes
+
+
+def run(scenario, boxes, scheduler, seconds):
+    counts = {box.box_nr: box.echo_timer.count for box in boxes}
+    errors = []
+    wall, cpu = time.perf_counter(), time.process_time()
+    end = wall + seconds
+    while time.perf_counter() < end:
+        if scheduler is None:
+            SmartBox.measure_cycle(boxes)
+            measured = boxes
+        else:
+            _, measured = scheduler.run_slot()
+        for box in measured:
+            errors.append(abs(box.distance - scenario.distance(box.box_nr)))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    rates = [(box.echo_timer.count - counts[box.box_nr]) / wall for box in boxes]
+    return sum(rates), rates, statistics.mean(errors) if errors else float('nan'), cpu / wall * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Messablauf der Ultraschall-Sensoren (simuliert)')
+    parser.add_argument('--active', type=int, nargs='+', default=[9, 5, 2], help='Anzahl aktiver Boxen')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Messdauer pro Variante')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--min-period', type=float, default=MIN_TRIGGER_PERIOD,
+                        help='Mindestabstand zweier Auslösungen eines Sensors in Sekunden')
+    args = parser.parse_args()
+    SmartBox.MIN_TRIGGER_PERIOD = args.min_period
+    sys.setswitchinterval(0.00005)  # Echo-Thread der Simulation nicht durch die Schleife ausbremsen
+
+    print(f"Höchstens {1 / args.min_period:.1f} Messungen/s pro Box (MIN_TRIGGER_PERIOD {args.min_period * 1000:.0f} ms)")
+    print(f"{'aktiv':>5}  {'Ablauf':<26}  {'Schlitze':>8}  {'Echos/s':>8}  {'pro Box':>12}  {'Fehler':>7}  {'CPU':>5}")
+    for active in args.active:
+        shared = setup(active, {}, args.seed)
+        own = setup(active, OWN_TRIGGER_PINS, args.seed)
+        variants = (
+            ('fixed', shared, None),
+            ('adaptive', shared, MeasureScheduler(shared[2], SmartBox.SmartBox.trigger_ultrasonic,
+                                                  min_trigger_period=args.min_period)),
+            ('adaptive, eigene Trigger', own, MeasureScheduler(own[2], SmartBox.SmartBox.trigger_ultrasonic,
+                                                               min_trigger_period=args.min_period)),
+        )
+        for name, (backend, scenario, boxes), scheduler in variants:
+            SmartBox.use_backend(backend)
+            total, rates, error, cpu = run(scenario, boxes, scheduler, args.seconds)
+            slots = len(scheduler.slots) if scheduler is not None else 1
+            print(f"{len(boxes):>5}  {name:<26}  {slots:>8}  {total:>8.0f}  "
+                  f"{min(rates):>5.1f}-{max(rates):<5.1f}  {error:>5.2f}cm  {cpu:>4.0f}%")
+    SmartBox.BOX_TRIGGER_PINS = {}
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Nachrichten an Scratch (Remote-Sensor-Protokoll)
+
+Gegen einen lokalen Testserver (fake_scratch_server.py) wird gemessen:
+- Durchsatz: --messages broadcasts so schnell wie möglich
+  - legacy: bisheriges ScratchSocket (zwei send() pro Nachricht, Nagle an)
+  - client: sidekick_scratch.ScratchClient (ein Block, Sende-Thread, Stapel)
+  jeweils Nachrichten/s bis zum Empfang beim Server, Dauer eines Aufrufs
+  und Nachrichten pro Schreibvorgang
+- Neuverbinden: alle 10 ms ein broadcast, der Server fällt für --downtime
+  Sekunden aus (wie Scratch beenden und neu starten). Gemessen wird die Zeit
+  vom Neustart bis zur ersten Nachricht und wie viele Nachrichten fehlen.
+
+Verwendung:
+    python3 bench_scratch.py
+    python3 bench_scratch.py --messages 50000 --downtime 3 --port 42002
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_scratch import ScratchClient, SCRATCH_PORT
+from fake_scratch_server import FakeScratchServer
+
+SEND_INTERVAL = 0.01  # Sekunden zwischen zwei broadcasts im Neuverbinden-Test
+
+
+class LegacyScratchSocket:
+    """Bisheriges testing/ScratchSocket.py"""
+
+    def __init__(self, port):
+        self.scratchSock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.scratchSock.connect(('127.0.0.1', port))
+
+    def sendScratchCommand(self, cmd):
+        sendString = 'broadcast "{}"'.format(cmd)
+        length = len(sendString)
+        self.scratchSock.send(length.to_bytes(4, 'big'))
+        self.scratchSock.send(bytes(sendString, 'UTF-8'))
+
+    def closeSocket(self):
+        self.scratchSock.close()
+
+
+def wait_for(server, count, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while len(server.messages) < count and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    return server.messages[count - 1][0] if len(server.messages) >= count else None
+
+
+def throughput(name, port, messages):
+    server = FakeScratchServer(port=port).start()
+    calls = []
+    if name == 'legacy':
+        sock = LegacyScratchSocket(port)
+        send, writes = sock.sendScratchCommand, lambda: 2 * messages
+    else:
+        client = ScratchClient('127.0.0.1', port).start()
+        client.wait_connected(2.0)
+        send, writes = client.broadcast, lambda: client.stats()['batches']
+
+    start = time.perf_counter()
+    for i in range(messages):
+        before = time.perf_counter()
+        send(f"hand{i % 9 + 1}")
+        calls.append(time.perf_counter() - before)
+    done = wait_for(server, messages)
+    received = len(server.messages)
+    write_count = writes()
+
+    if name == 'legacy':
+        sock.closeSocket()
+    else:
+        client.close()
+    server.stop()
+    rate = messages / (done - start) if done else float('nan')
+    print(f"{name:<7}  {rate:>10.0f}  {statistics.mean(calls) * 1e6:>8.1f}µs  {max(calls) * 1e3:>7.2f}ms  "
+          f"{received / max(write_count, 1):>12.1f}  {received:>10}")
+
+
+def reconnect(port, seconds, downtime):
+    server = FakeScratchServer(port=port).start()
+    client = ScratchClient('127.0.0.1', port).start()
+    client.wait_connected(2.0)
+    sent, stop_at, restart_at, restarted = 0, 1.0, 1.0 + downtime, None
+    start = time.perf_counter()
+    first = server
+    while time.perf_counter() - start < seconds:
+        elapsed = time.perf_counter() - start
+        if server is not None and server is first and elapsed >= stop_at:
+            server.stop()
+            server = None
+        if server is None and elapsed >= restart_at:
+            server = FakeScratchServer(port=port).start()
+            restarted = time.perf_counter()
+        client.broadcast(f"tick {sent}")
+        sent += 1
+        time.sleep(SEND_INTERVAL)
+    client.flush(2.0)
+    time.sleep(0.2)
+    stats = client.stats()
+    client.close()
+    server.stop()
+
+    received = {message for _, message in first.messages} | {message for _, message in server.messages}
+    recovery = server.messages[0][0] - restarted if server.messages else None
+    print(f"\nNeuverbinden: Server {downtime:.1f}s weg, {sent} broadcasts gesendet")
+    print(f"Erste Nachricht nach Neustart: {recovery * 1000:.0f} ms" if recovery is not None else
+          "Erste Nachricht nach Neustart: keine")
+    print(f"Angekommen: {len(received)} von {sent} (fehlen {sent - len(received)}, "
+          f"verworfen {stats['dropped']}, erneut gesendet {stats['resent']}, Verbindungen {stats['connects']})")
+    print("legacy: nach dem Abbruch wirft send() eine Exception - keine Wiederherstellung")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Nachrichten an Scratch (Testserver)')
+    parser.add_argument('--port', type=int, default=SCRATCH_PORT)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--seconds', type=float, default=4.0, help='Dauer des Neuverbinden-Tests')
+    parser.add_argument('--downtime', type=float, default=1.5, help='Sekunden ohne Server')
+    args = parser.parse_args()
+
+    print(f"{args.messages} broadcasts an 127.0.0.1:{args.port}")
+    print(f"{'Variante':<7}  {'Nachr./s':>10}  {'Aufruf Ø':>10}  {'max':>9}  {'pro Schreiben':>12}  {'empfangen':>10}")
+    for name in ('legacy', 'client'):
+        throughput(name, args.port, args.messages)
+    reconnect(args.port, args.seconds, args.downtime)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SmartBox-Hauptschleife auf simulierter Hardware
+
+Betreibt SmartBox.py mit sidekick_gpio.SimulatedBackend (läuft auf jedem
+Linux, kein Pi nötig) und misst für die Echo-Zeitmessung poll und edge:
+- Schleifenrate: Durchläufe von SmartBox.run_cycle pro Sekunde und CPU-Last
+- Erkennungs-Latenz: Hand greift in eine Box -> handDetected
+- Publish-Latenz: Hand verlässt die Box -> MQTT-Publish von .../hand
+  (mit --broker zusätzlich: Publish -> Nachricht beim Broker-Abonnenten)
+
+Das Szenario ist fest: Hand in Box 3 bei t=1.2s, Box 7 bei t=3.0s, Box 1 bei t=5.0s,
+jeweils 1.2s lang.
+
+Verwendung:
+    python3 bench_smartbox.py
+    python3 bench_smartbox.py --boxes 9 --seconds 5 --broker localhost
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_gpio import SimulatedBackend, Scenario
+
+HAND_EVENTS = [(3, 1.2), (7, 3.0), (1, 5.0)]  # (Box, t) - Hand bleibt HAND_DURATION in der Box
+HAND_DURATION = 1.2
+
+
+class RecordingClient:
+    """Ersatz für paho.mqtt.client.Client: merkt sich jeden Publish mit Zeitstempel"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.published = []
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append((self.clock(), topic, payload))
+
+
+class BrokerClient(RecordingClient):
+    """Echter paho-Client; ein zweiter Client abonniert die Hand-Topics und stempelt den Empfang"""
+
+    def __init__(self, clock, host):
+        super().__init__(clock)
+        import paho.mqtt.client as mqtt
+        self.received = []
+        self.client = mqtt.Client()
+        self.client.connect(host, SmartBox.MQTT_PORT, 60)
+        self.client.loop_start()
+        self.listener = mqtt.Client()
+        self.listener.on_message = lambda client, userdata, msg: self.received.append((self.clock(), msg.topic))
+        self.listener.connect(host, SmartBox.MQTT_PORT, 60)
+        self.listener.subscribe(f"{SmartBox.MQTT_TOPIC_BOX}/+/hand")
+        self.listener.loop_start()
+        time.sleep(0.5)
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        super().publish(topic, payload, qos, retain)
+        self.client.publish(topic, payload, qos, retain)
+
+    def close(self):
+        time.sleep(0.5)
+        for client in (self.client, self.listener):
+            client.loop_stop()
+            client.disconnect()
+
+
+def setup(mode, box_count):
+    backend = SimulatedBackend()
+    pins = SmartBox.BOX_PINS[:box_count]
+    echo_pins = {nr: echo for echo, nr, _ in pins}
+    # Während der Initialisierung (Kalibrierung) sind alle Boxen leer
+    backend.play(Scenario(), SmartBox.GPIO_US_TRIGGER, echo_pins, SmartBox.BUTTON_PINS)
+    SmartBox.use_backend(backend)
+    SmartBox.ECHO_TIMING = mode
+    boxes = [SmartBox.SmartBox(echo, nr, led) for echo, nr, led in pins]
+    SmartBox.init_buttons()
+    strip = backend.led_strip(70, 12)
+    return backend, echo_pins, boxes, strip
+
+
+def loop_rate(boxes, strip, seconds):
+    cycles = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    end = wall + seconds
+    while time.perf_counter() < end:
+        SmartBox.run_cycle(boxes, strip)
+        cycles += 1
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return cycles / wall, cpu / wall * 100
+
+
+def latencies(backend, echo_pins, boxes, strip, broker):
+    scenario = Scenario()
+    for box, at in HAND_EVENTS:
+        if box in echo_pins:
+            scenario.hand_enters(box, at).hand_leaves(box, at + HAND_DURATION)
+    client = BrokerClient(scenario.time, broker) if broker else RecordingClient(scenario.time)
+    SmartBox.mqtt_client = client
+
+    backend.play(scenario, SmartBox.GPIO_US_TRIGGER, echo_pins, SmartBox.BUTTON_PINS)
+    detected = {box.box_nr: [] for box in boxes}  # Zeitpunkte, an denen handDetected True wurde
+    previous = {box.box_nr: box.handDetected for box in boxes}
+    end = max(at for _, at in HAND_EVENTS) + HAND_DURATION + 1.5
+    while scenario.time() < end:
+        SmartBox.run_cycle(boxes, strip)
+        for box in boxes:
+            if box.handDetected and not previous[box.box_nr]:
+                detected[box.box_nr].append(scenario.time())
+            previous[box.box_nr] = box.handDetected
+    if broker:
+        client.close()
+    SmartBox.mqtt_client = None
+
+    detect, publish, delivery = [], [], []
+    for box, at in HAND_EVENTS:
+        if box not in echo_pins:
+            continue
+        topic = f"{SmartBox.MQTT_TOPIC_BOX}/{box}/hand"
+        hits = [t for t in detected[box] if t >= at]
+        if hits:
+            detect.append(hits[0] - at)
+        left = at + HAND_DURATION
+        sent = [t for t, published_topic, _ in client.published if published_topic == topic and t >= left]
+        if sent:
+            publish.append(sent[0] - left)
+            if broker:
+                got = [t for t, received_topic in client.received if received_topic == topic and t >= sent[0]]
+                if got:
+                    delivery.append(got[0] - sent[0])
+    return detect, publish, delivery
+
+
+def ms(values):
+    if not values:
+        return f"{'-':>8}"
+    return f"{statistics.mean(values) * 1000:>6.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SmartBox-Hauptschleife auf simulierter Hardware')
+    parser.add_argument('--boxes', type=int, default=9, help='Anzahl Boxen (1-9)')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Dauer der Schleifenraten-Messung')
+    parser.add_argument('--broker', help='MQTT-Broker für die Zustell-Latenz (sonst nur lokaler Publish)')
+    args = parser.parse_args()
+    SmartBox.MQTT_ENABLED = True
+    # Der Simulator ist ein Python-Thread und soll seine Pegel pünktlich setzen (siehe bench_echo_timing.py)
+    sys.setswitchinterval(0.00005)
+
+    results = []
+    for mode in ('poll', 'edge'):
+        backend, echo_pins, boxes, strip = setup(mode, args.boxes)
+        rate, load = loop_rate(boxes, strip, args.seconds)
+        detect, publish, delivery = latencies(backend, echo_pins, boxes, strip, args.broker)
+        results.append((mode, rate, load, detect, publish, delivery))
+
+    print()
+    print(f"{args.boxes} Boxen, simulierte Hardware")
+    print(f"{'Modus':<5}  {'Durchläufe/s':>12}  {'CPU':>7}  {'Erkennung':>9}  {'Publish':>8}  {'Broker':>8}")
+    for mode, rate, load, detect, publish, delivery in results:
+        print(f"{mode:<5}  {rate:>12.1f}  {load:>6.1f}%  {ms(detect):>9}  {ms(publish)}  {ms(delivery)}")
+
+
+if __name__ == '__main__':
+    main()
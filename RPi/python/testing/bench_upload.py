@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Speicherbedarf des Streaming-Uploads (sidekick_upload)
+
+Erzeugt einen synthetischen multipart/form-data Body der gewünschten Größe
+(ohne ihn im Speicher zu halten), parst ihn mit parse_multipart_stream()
+und misst den Spitzen-Speicherverbrauch. Jede Größe läuft in einem eigenen
+Prozess, damit ru_maxrss nicht von vorherigen Läufen verfälscht wird.
+
+Verwendung:
+    python3 bench_upload.py                 # 100 MB, 1 GB, 4 GB
+    python3 bench_upload.py 50M 500M        # eigene Größen
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_upload import parse_multipart_stream
+
+BOUNDARY = b'----SidekickBenchBoundary7MA4YWxkTrZu0gW'
+DEFAULT_SIZES = ['100M', '1G', '4G']
+
+
+def parse_size(text):
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class SyntheticBody:
+    """Datei-ähnliches Objekt, das einen multipart Body on-the-fly erzeugt"""
+
+    def __init__(self, file_size):
+        self.head = (b'--' + BOUNDARY + b'\r\n'
+                     b'Content-Disposition: form-data; name="customName"\r\n\r\n'
+                     b'benchmark\r\n'
+                     b'--' + BOUNDARY + b'\r\n'
+                     b'Content-Disposition: form-data; name="file"; filename="bench.mp4"\r\n'
+                     b'Content-Type: video/mp4\r\n\r\n')
+        self.tail = b'\r\n--' + BOUNDARY + b'--\r\n'
+        self.file_size = file_size
+        self.length = len(self.head) + file_size + len(self.tail)
+        self.pos = 0
+        self.pattern = bytes(range(256)) * 4096  # 1 MiB Füllmuster
+
+    def read(self, n):
+        out = bytearray()
+        while n > 0 and self.pos < self.length:
+            if self.pos < len(self.head):
+                piece = self.head[self.pos:self.pos + n]
+            elif self.pos < len(self.head) + self.file_size:
+                offset = self.pos - len(self.head)
+                count = min(n, self.file_size - offset, len(self.pattern))
+                piece = self.pattern[:count]
+            else:
+                offset = self.pos - len(self.head) - self.file_size
+                piece = self.tail[offset:offset + n]
+            out += piece
+            self.pos += len(piece)
+            n -= len(piece)
+        return bytes(out)
+
+
+def run_single(size):
+    body = SyntheticBody(size)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracemalloc.start()
+        start = time.perf_counter()
+        fields, files = parse_multipart_stream(body, body.length, BOUNDARY, temp_dir)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert fields.get('customName') == 'benchmark'
+        assert files[0].size == size, (files[0].size, size)
+        for f in files:
+            f.discard()
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{size / 1024 ** 2:>10.0f} MB  {elapsed:>8.2f} s  {size / elapsed / 1024 ** 2:>8.1f} MB/s  "
+          f"Python-Peak {peak / 1024 ** 2:>6.2f} MB  RSS-Peak {max_rss_kb / 1024:>6.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--single':
+        run_single(parse_size(sys.argv[2]))
+        return
+
+    sizes = sys.argv[1:] or DEFAULT_SIZES
+    print(f"{'Upload':>13}  {'Zeit':>10}  {'Durchsatz':>10}  Speicher")
+    for size in sizes:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--single', size], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Zeit vom Einhängen eines Sticks bis zum Kopierbeginn
+
+Simuliert USB-Sticks per Bind-Mount temporärer Ordner (benötigt root) und
+startet sidekick-usb-daemon.py mit temporärem HOME auf eine eigene
+Mount-Wurzel. Gemessen wird die Zeit vom Ende des mount-Aufrufs bis die
+erste Datei (Temp- oder Zieldatei) im Video-Ordner auftaucht.
+Zum Vergleich: sidekick-usb-import.sh wartet fest 3 s vor der Suche.
+
+Danach werden --sticks Sticks gleichzeitig eingehängt; alle müssen
+vollständig importiert werden (pro Gerät eine Warteschlange).
+
+Verwendung (als root):
+    python3 bench_usb_detection.py
+    python3 bench_usb_detection.py --rounds 20 --sticks 4 --size-mb 16
+"""
+
+import os
+import sys
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sidekick-usb-daemon.py')
+LEGACY_DELAY_MS = 3000
+
+
+def make_stick(path, name, size_mb):
+    """Stick-Inhalt mit Ordner für diesen Host"""
+    videos = os.path.join(path, socket.gethostname(), 'videos')
+    os.makedirs(videos)
+    with open(os.path.join(videos, f'{name}.mp4'), 'wb') as f:
+        f.write(os.urandom(size_mb * 1024 * 1024))
+
+
+def wait_for_file(directory, prefix, timeout=10):
+    """Wartet, bis eine Datei mit prefix (auch als .import-Temp-Datei) existiert"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if any(prefix in name for name in os.listdir(directory)):
+                return time.perf_counter()
+        except FileNotFoundError:
+            pass
+        time.sleep(0.001)
+    raise RuntimeError(f'{prefix} wurde nicht importiert')
+
+
+def wait_for_complete(path, size, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f'{path} unvollständig')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mount bis Kopierbeginn')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--sticks', type=int, default=3, help='Gleichzeitig eingehängte Sticks')
+    parser.add_argument('--size-mb', type=int, default=8)
+    args = parser.parse_args()
+    if os.geteuid() != 0:
+        print('Bind-Mounts benötigen root - bitte mit sudo starten.')
+        sys.exit(1)
+
+    temp_dir = tempfile.mkdtemp(prefix='sidekick-usb-')
+    home = os.path.join(temp_dir, 'home')
+    media = os.path.join(temp_dir, 'media')
+    os.makedirs(home)
+    os.makedirs(media)
+    videos_dir = os.path.join(home, 'Sidekick', 'sidekick', 'videos')
+    mounted = []
+
+    def mount(source, name):
+        target = os.path.join(media, name)
+        os.makedirs(target, exist_ok=True)
+        subprocess.run(['mount', '--bind', source, target], check=True)
+        mounted.append(target)
+        return time.perf_counter()
+
+    daemon = subprocess.Popen([sys.executable, DAEMON_SCRIPT, '--roots', media, '--fstypes', ''],
+                              env=dict(os.environ, HOME=home),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)  # Daemon-Start (Python + Imports) nicht mitmessen
+        latencies = []
+        for i in range(args.rounds):
+            source = os.path.join(temp_dir, f'stick-{i}')
+            make_stick(source, f'runde-{i}', 1)
+            mounted_at = mount(source, f'STICK-{i}')
+            latencies.append((wait_for_file(videos_dir, f'runde-{i}') - mounted_at) * 1000)
+            wait_for_complete(os.path.join(videos_dir, f'runde-{i}.mp4'), 1024 * 1024)
+            subprocess.run(['umount', mounted.pop()], check=True)
+        latencies.sort()
+        print(f"Mount bis Kopierbeginn ({args.rounds} Runden): "
+              f"p50 {statistics.median(latencies):.1f} ms, max {latencies[-1]:.1f} ms "
+              f"(bisher: >= {LEGACY_DELAY_MS} ms)")
+
+        sources = []
+        for i in range(args.sticks):
+            source = os.path.join(temp_dir, f'parallel-{i}')
+            make_stick(source, f'parallel-{i}', args.size_mb)
+            sources.append(source)
+        start = time.perf_counter()
+        for i, source in enumerate(sources):
+            mount(source, f'PARALLEL-{i}')
+        for i in range(args.sticks):
+            wait_for_complete(os.path.join(videos_dir, f'parallel-{i}.mp4'), args.size_mb * 1024 * 1024)
+        print(f"{args.sticks} Sticks gleichzeitig ({args.size_mb} MB je Stick): "
+              f"alle importiert nach {time.perf_counter() - start:.2f} s")
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        for target in mounted:
+            subprocess.run(['umount', target])
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Testserver: spielt Scratch 1.4 mit aktivierten Remote-Sensoren (Port 42001)
+
+Nimmt Verbindungen an, zerlegt die Nachrichten (4 Byte Länge + Text) und
+merkt sich jede mit Empfangszeit. Ohne Scratch lassen sich so SmartBox,
+ScratchSocket.py und sidekick_scratch.ScratchClient testen.
+
+Als Modul (siehe bench_scratch.py):
+    server = FakeScratchServer(port=42001).start()
+    ...
+    server.messages   # [(perf_counter, Text)]
+    server.stop()     # trennt alle Verbindungen, Port wird frei
+
+Verwendung:
+    python3 fake_scratch_server.py              # gibt empfangene Nachrichten aus
+    python3 fake_scratch_server.py --port 42002
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_scratch import SCRATCH_PORT, frame, read_frames
+
+
+class FakeScratchServer:
+
+    def __init__(self, host='127.0.0.1', port=SCRATCH_PORT, on_message=None):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.messages = []
+        self.connections = 0
+        self._clients = []
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def start(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.host, self.port))
+        listener.listen(8)
+        self._listener = listener
+        threading.Thread(target=self._accept, args=(listener,), daemon=True, name='fake-scratch').start()
+        return self
+
+    def stop(self):
+        """Schließt den Port und alle Verbindungen (wie Scratch beenden)"""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            try:
+                listener.shutdown(socket.SHUT_RDWR)  # weckt accept() im Server-Thread
+            except OSError:
+                pass
+            listener.close()
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def broadcast(self, name):
+        """Schickt allen Teilnehmern einen broadcast (wie ein Scratch-Skript)"""
+        data = frame(f'broadcast "{name}"')
+        with self._lock:
+            clients = list(self._clients)
+        for sock in clients:
+            try:
+                sock.sendall(data)
+            except OSError:
+                pass
+
+    def _accept(self, listener):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._clients.append(sock)
+                self.connections += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True, name='fake-scratch-client').start()
+
+    def _serve(self, sock):
+        def handle(message):
+            self.messages.append((time.perf_counter(), message))
+            if self.on_message is not None:
+                self.on_message(message)
+        try:
+            read_frames(sock, handle)
+        except OSError:
+            pass
+        with self._lock:
+            if sock in self._clients:
+                self._clients.remove(sock)
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scratch-Remote-Sensor-Testserver')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=SCRATCH_PORT)
+    args = parser.parse_args()
+
+    FakeScratchServer(args.host, args.port, on_message=print).start()
+    print(f"Scratch-Testserver auf {args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Lasttest für das SIDEKICK Dashboard
+
+Simuliert N Tablets, die gleichzeitig das Dashboard laden, während optional
+ein weiterer Client ein großes Video hochlädt. Gibt p50/p99-Latenzen aus.
+
+Ohne --url wird eine lokale Dashboard-Instanz mit temporärem HOME gestartet.
+
+Verwendung:
+    python3 loadtest_dashboard.py --clients 30 --requests 20
+    python3 loadtest_dashboard.py --clients 30 --upload-mb 200 --workers 1
+    python3 loadtest_dashboard.py --url http://10.42.0.1:5000 --clients 30
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import http.client
+import urllib.parse
+
+DASHBOARD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sidekick-dashboard.py')
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_local_dashboard(workers, home=None):
+    """Startet das Dashboard mit (temporärem) HOME und wartet bis es antwortet"""
+    home = home or tempfile.mkdtemp(prefix='sidekick-loadtest-')
+    port = free_port()
+    env = dict(os.environ, HOME=home)
+    proc = subprocess.Popen([sys.executable, DASHBOARD_SCRIPT, '--port', str(port), '--workers', str(workers)],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError('Dashboard startet nicht')
+
+
+def client_worker(host, port, path, count, latencies, errors):
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status >= 400:
+                errors.append(response.status)
+                continue
+        except OSError as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def upload_worker(host, port, size_mb, stop_event):
+    """Lädt ein großes Video langsam hoch (wie ein Tablet im WLAN)"""
+    boundary = 'SidekickLoadtest'
+    head = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="loadtest.mp4"\r\n'
+            f'Content-Type: video/mp4\r\n\r\n').encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+    size = size_mb * 1024 * 1024
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    conn.putrequest('POST', '/upload-video')
+    conn.putheader('Content-Type', f'multipart/form-data; boundary={boundary}')
+    conn.putheader('Content-Length', str(len(head) + size + len(tail)))
+    conn.endheaders()
+    conn.send(head)
+    block = b'\0' * (256 * 1024)
+    sent = 0
+    while sent < size and not stop_event.is_set():
+        piece = block[:min(len(block), size - sent)]
+        conn.send(piece)
+        sent += len(piece)
+        time.sleep(0.005)
+    if sent == size:
+        conn.send(tail)
+        conn.getresponse().read()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lasttest für das SIDEKICK Dashboard')
+    parser.add_argument('--url', help='Dashboard-URL (ohne: lokale Instanz starten)')
+    parser.add_argument('--clients', type=int, default=30, help='Anzahl simulierter Clients')
+    parser.add_argument('--requests', type=int, default=20, help='Requests pro Client')
+    parser.add_argument('--path', default='/', help='Abgefragter Pfad')
+    parser.add_argument('--upload-mb', type=int, default=0, help='Parallel laufender Upload (MB)')
+    parser.add_argument('--workers', type=int, default=8, help='Worker-Threads der lokalen Instanz')
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_local_dashboard(args.workers)
+    parsed = urllib.parse.urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+
+    stop_event = threading.Event()
+    uploader = None
+    try:
+        if args.upload_mb:
+            uploader = threading.Thread(target=upload_worker, args=(host, port, args.upload_mb, stop_event))
+            uploader.start()
+            time.sleep(0.5)
+
+        latencies, errors = [], []
+        threads = [threading.Thread(target=client_worker,
+                                    args=(host, port, args.path, args.requests, latencies, errors))
+                   for _ in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duration = time.perf_counter() - start
+    finally:
+        stop_event.set()
+        if uploader is not None:
+            uploader.join()
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"Ziel:      {url}{args.path}")
+    print(f"Clients:   {args.clients} x {args.requests} Requests"
+          + (f" (parallel {args.upload_mb} MB Upload)" if args.upload_mb else ''))
+    print(f"Erfolg:    {len(latencies)}   Fehler: {len(errors)}")
+    print(f"Dauer:     {duration:.2f} s   ({len(latencies) / duration:.1f} Requests/s)")
+    if latencies:
+        print(f"p50:       {percentile(latencies, 50) * 1000:.1f} ms")
+        print(f"p99:       {percentile(latencies, 99) * 1000:.1f} ms")
+        print(f"Mittel:    {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Stresstest: Master-Import an mehrere Pis (sidekick_fanout.py)
+
+Startet mehrere lokale Dashboards (je ein temporäres HOME) als Stellvertreter
+für die Pis im LAN und einen synthetischen Stick mit rpi-ws1..N/ Ordnern.
+Geprüft wird in drei Runden:
+1. Erstbefüllung - alle Dateien landen vollständig und identisch auf allen Pis
+2. Wiederholung  - nichts wird übertragen (Abgleich über Größe + Hash)
+3. Eine Datei pro Pi geändert - nur diese wird übertragen
+Ausgegeben werden Laufzeit, gesendete Bytes pro Pi und - mit --limit-mbit -
+ob die Bandbreiten-Grenze eingehalten wird.
+
+Verwendung:
+    python3 stress_fanout_import.py
+    python3 stress_fanout_import.py --hosts 6 --files 4 --size-mb 16 --limit-mbit 80
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import filecmp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_fanout import fan_out
+from loadtest_dashboard import start_local_dashboard
+
+
+def make_stick(stick, hosts, files, size_mb):
+    """Gemeinsame Videos für alle Pis plus ein eigenes Projekt pro Pi"""
+    shared = os.path.join(stick, '.shared')
+    os.makedirs(shared)
+    for i in range(files):
+        with open(os.path.join(shared, f'video-{i}.mp4'), 'wb') as f:
+            f.write(os.urandom(size_mb * 1024 * 1024 + i))
+    for host in hosts:
+        os.makedirs(os.path.join(stick, host, 'videos'))
+        os.makedirs(os.path.join(stick, host, 'projects'))
+        for name in os.listdir(shared):
+            shutil.copy(os.path.join(shared, name), os.path.join(stick, host, 'videos', name))
+        with open(os.path.join(stick, host, 'projects', f'{host}.sb3'), 'wb') as f:
+            f.write(os.urandom(200 * 1024))
+    shutil.rmtree(shared)
+
+
+def verify(stick, homes):
+    """Alle Dateien des Sticks liegen identisch auf dem jeweiligen Pi"""
+    for host, home in homes.items():
+        for folder in ('videos', 'projects'):
+            source = os.path.join(stick, host, folder)
+            target = os.path.join(home, 'Sidekick', 'sidekick', folder)
+            for name in os.listdir(source):
+                assert filecmp.cmp(os.path.join(source, name), os.path.join(target, name), shallow=False), \
+                    f'{host}/{folder}/{name} unterschiedlich'
+
+
+def run_round(label, stick, overrides, rate_limit, expect_sent=None):
+    start = time.perf_counter()
+    results = fan_out(stick, overrides=overrides, rate_limit=rate_limit)
+    elapsed = time.perf_counter() - start
+    sent = sum(r.bytes_sent for r in results)
+    errors = [f'{r.host}: {r.error}' for r in results if r.error]
+    assert not errors, errors
+    print(f"{label:<22} {elapsed:>7.2f} s   {sent / 1024 ** 2:>8.1f} MB gesendet   "
+          f"{sum(len(r.copied) for r in results):>3} übertragen, {sum(len(r.skipped) for r in results):>3} identisch")
+    if rate_limit:
+        for r in results:
+            if r.bytes_sent > rate_limit:
+                print(f"    {r.host}: {r.bytes_sent / r.seconds / 1024 ** 2:.1f} MB/s "
+                      f"(Grenze {rate_limit / 1024 ** 2:.1f} MB/s)")
+    if expect_sent is not None:
+        assert sent == expect_sent, (sent, expect_sent)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Master-Import an mehrere lokale Dashboards')
+    parser.add_argument('--hosts', type=int, default=4)
+    parser.add_argument('--files', type=int, default=3)
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--limit-mbit', type=float, default=None, help='Bandbreiten-Grenze pro Pi')
+    args = parser.parse_args()
+    rate_limit = args.limit_mbit * 1000 * 1000 / 8 if args.limit_mbit else None
+
+    hosts = [f'rpi-ws{i + 1}' for i in range(args.hosts)]
+    temp_dir = tempfile.mkdtemp(prefix='sidekick-fanout-')
+    stick = os.path.join(temp_dir, 'stick')
+    make_stick(stick, hosts, args.files, args.size_mb)
+
+    processes, overrides, homes = [], {}, {}
+    try:
+        for host in hosts:
+            homes[host] = os.path.join(temp_dir, host)
+            os.makedirs(homes[host])
+            proc, url = start_local_dashboard(workers=4, home=homes[host])
+            processes.append(proc)
+            overrides[host] = url
+
+        run_round('1. Erstbefüllung', stick, overrides, rate_limit)
+        verify(stick, homes)
+        run_round('2. Wiederholung', stick, overrides, rate_limit, expect_sent=0)
+
+        changed = 0
+        for host in hosts:
+            path = os.path.join(stick, host, 'videos', 'video-0.mp4')
+            with open(path, 'r+b') as f:
+                f.write(os.urandom(4096))
+            changed += os.path.getsize(path)
+        run_round('3. Je 1 Datei geändert', stick, overrides, rate_limit, expect_sent=changed)
+        verify(stick, homes)
+        print("OK - alle Pis aktuell, unveränderte Dateien wurden nicht erneut gesendet")
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Stresstest: Atomares Schreiben der JSON-Listen (ListWriter)
+
+Ein Schreib-Prozess aktualisiert die Liste so schnell wie möglich mit
+Listen wechselnder Länge, ein Lese-Prozess (wie die Scratch-Extension bzw.
+der Kiosk) liest die Datei parallel und prüft jedes gelesene JSON.
+
+Mit --legacy wird zum Vergleich das bisherige open('w') + json.dump benutzt,
+das dem Leser halbe Dateien zeigt.
+
+Verwendung:
+    python3 stress_list_writer.py
+    python3 stress_list_writer.py --seconds 10 --delay 0.05
+    python3 stress_list_writer.py --legacy
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sidekick_files import ListWriter
+
+
+def make_list(i):
+    return [f'video-{i}-{n:04d}.mp4' for n in range(random.randint(0, 400))]
+
+
+def writer_process(path, seconds, delay, legacy, result):
+    writer = ListWriter(path, delay=delay)
+    submits = 0
+    end = time.time() + seconds
+    while time.time() < end:
+        data = make_list(submits)
+        if legacy:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        else:
+            writer.submit(data)
+        submits += 1
+    writer.flush()
+    result['submits'] = submits
+    result['writes'] = submits if legacy else writer.generation
+
+
+def reader_process(path, stop, result):
+    reads = errors = 0
+    while not stop.is_set():
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, list):
+                errors += 1
+        except ValueError:
+            errors += 1
+        except FileNotFoundError:
+            continue
+        reads += 1
+    result['reads'] = reads
+    result['errors'] = errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stresstest für ListWriter')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--delay', type=float, default=0.0, help='Bündelungs-Fenster des ListWriters')
+    parser.add_argument('--legacy', action='store_true', help='Bisheriges nicht-atomares Schreiben')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'video-list.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([], f)
+
+        manager = multiprocessing.Manager()
+        result = manager.dict()
+        stop = multiprocessing.Event()
+        reader = multiprocessing.Process(target=reader_process, args=(path, stop, result))
+        writer = multiprocessing.Process(target=writer_process,
+                                         args=(path, args.seconds, args.delay, args.legacy, result))
+        reader.start()
+        writer.start()
+        writer.join()
+        stop.set()
+        reader.join()
+
+        leftovers = [f for f in os.listdir(temp_dir) if f != 'video-list.json']
+        print(f"Modus:           {'legacy (open w)' if args.legacy else f'ListWriter (delay {args.delay}s)'}")
+        print(f"Änderungen:      {result['submits']}")
+        print(f"Schreibvorgänge: {result['writes']}")
+        print(f"Gelesen:         {result['reads']}")
+        print(f"Ungültiges JSON: {result['errors']}")
+        print(f"Temp-Reste:      {len(leftovers)}")
+        sys.exit(1 if result['errors'] or leftovers else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Stresstest: LED-Nachrichten über MQTT (SmartBox.on_mqtt_message)
+
+Ein Thread spielt den Netzwerk-Thread von paho und ruft den Callback so
+schnell wie möglich mit --messages LED-Nachrichten auf (einzelne Boxen,
+"all" und Animationen gemischt). Der LED-Streifen ist der simulierte
+Streifen aus bench_led_frames.py mit den Kosten eines echten Streifens.
+
+Geprüft wird:
+- wie lange der Callback den Netzwerk-Thread blockiert (Ø / p99 / max)
+- Warteschlange: maximale Tiefe, zusammengefasste und verworfene Befehle
+- dass am Ende jede Box die Farbe ihrer letzten Nachricht zeigt
+
+Mit --legacy wird jeder Befehl wie bisher direkt im Callback ausgeführt.
+
+Verwendung:
+    python3 stress_mqtt_leds.py
+    python3 stress_mqtt_leds.py --messages 10000 --legacy
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SmartBox
+from sidekick_gpio import Color
+from sidekick_leds import LEDController
+from bench_led_frames import TimedStrip, LED_COUNT
+
+COLORS = ['red', 'green', 'blue', 'yellow', 'off', '#123456', '#abcdef']
+ANIMATIONS = ['blink red 0.5', 'pulse blue 1', 'chase green 0.3']
+
+
+class Message:
+    """Wie paho.mqtt.client.MQTTMessage (topic, payload als Bytes)"""
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload.encode('utf-8')
+
+
+def make_messages(count, seed):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        box_id = 'all' if rng.random() < 0.05 else str(rng.randint(1, 9))
+        if rng.random() < 0.1:
+            messages.append(Message(f"{SmartBox.MQTT_TOPIC_BOX}/{box_id}/led/anim", rng.choice(ANIMATIONS)))
+        else:
+            messages.append(Message(f"{SmartBox.MQTT_TOPIC_BOX}/{box_id}/led", rng.choice(COLORS)))
+    return messages
+
+
+def expected_colors(messages):
+    """Box -> erwartete Farbe nach der letzten Nachricht (None = Animation, nicht geprüft)"""
+    expected = {}
+    for msg in messages:
+        box_id = msg.topic.split('/')[2]
+        boxes = range(1, 10) if box_id == 'all' else [int(box_id)]
+        for box_nr in boxes:
+            if msg.topic.endswith('/anim'):
+                expected[box_nr] = None
+            else:
+                r, g, b = SmartBox.parse_color(msg.payload.decode('utf-8'))
+                expected[box_nr] = Color(g, r, b)
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stresstest für LED-Nachrichten über MQTT')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--legacy', action='store_true', help='Befehle direkt im Callback ausführen')
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.seed)
+    strip = TimedStrip(LED_COUNT)
+    leds = LEDController(strip, leds_per_box=SmartBox.SimpleLED.LED_COUNT)
+    if not args.legacy:
+        leds.start()
+    SmartBox.led_strip = leds
+
+    durations = []
+
+    def network_thread():
+        for msg in messages:
+            start = time.perf_counter()
+            SmartBox.on_mqtt_message(None, None, msg)
+            durations.append(time.perf_counter() - start)
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # Jede ausgeführte Änderung wird gemeldet
+    try:
+        start = time.perf_counter()
+        thread = threading.Thread(target=network_thread, name='fake-paho')
+        thread.start()
+        thread.join()
+        flood = time.perf_counter() - start
+        leds.stop()
+        total = time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    # Laufende Animationen beeinflussen nur ihre eigene Box
+    expected = expected_colors(messages)
+    wrong = []
+    for box_nr, color in sorted(expected.items()):
+        first, end = leds.box_range(box_nr)
+        if color is not None and any(strip.shown[i] != color for i in range(first, end)):
+            wrong.append(box_nr)
+
+    stats = leds.commands.stats()
+    durations.sort()
+    print(f"Modus:             {'legacy (direkt im Callback)' if args.legacy else 'Warteschlange + Render-Thread'}")
+    print(f"Nachrichten:       {len(messages)} in {flood:.2f}s ({len(messages) / flood:.0f}/s), fertig nach {total:.2f}s")
+    print(f"Callback:          Ø {statistics.mean(durations) * 1e6:.0f} µs, "
+          f"p99 {durations[int(len(durations) * 0.99)] * 1e6:.0f} µs, max {durations[-1] * 1e3:.2f} ms")
+    print(f"Frames (Renders):  {leds.renders}")
+    print(f"Warteschlange:     max. Tiefe {stats['max_depth']}, zusammengefasst {stats['collapsed']}, "
+          f"verworfen {stats['dropped']}, ausgeführt {stats['applied']}")
+    print(f"Falsche Endfarbe:  {wrong or 'keine'}")
+    sys.exit(1 if wrong else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test: Fortsetzbarer Upload mit Verbindungsabbrüchen
+
+Startet ein lokales Dashboard (temporäres HOME), lädt eine Zufallsdatei
+über /api/uploads hoch und trennt die Verbindung dabei immer wieder an
+zufälligen Stellen mitten in einem Teil. Nach jedem Abbruch werden die
+fehlenden Bereiche abgefragt und nur diese erneut gesendet.
+
+Am Ende wird geprüft, dass die fertige Datei identisch ist und in der
+video-list.json steht. Ausgegeben werden die gesendeten Bytes im Vergleich
+zu einem Neustart bei jedem Abbruch (bisheriges Formular-Upload).
+
+Verwendung:
+    python3 stress_resumable_upload.py
+    python3 stress_resumable_upload.py --size-mb 200 --disconnects 20 --seed 1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import hashlib
+import argparse
+import tempfile
+import http.client
+
+from loadtest_dashboard import start_local_dashboard
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def api(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    data = json.loads(response.read() or b'null')
+    conn.close()
+    return response.status, data
+
+
+def send_chunk(port, upload_id, data, start, total, cut_after=None):
+    """Sendet einen Teil - mit cut_after wird die Verbindung nach so vielen Bytes getrennt"""
+    head = (f'PUT /api/uploads/{upload_id} HTTP/1.1\r\n'
+            f'Host: 127.0.0.1\r\n'
+            f'Content-Range: bytes {start}-{start + len(data) - 1}/{total}\r\n'
+            f'Content-Length: {len(data)}\r\n\r\n').encode()
+    sock = socket.create_connection(('127.0.0.1', port))
+    try:
+        sock.sendall(head)
+        if cut_after is not None:
+            sock.sendall(data[:cut_after])
+            return cut_after, None
+        sock.sendall(data)
+        response = b''
+        while True:
+            block = sock.recv(65536)
+            if not block:
+                break
+            response += block
+        return len(data), json.loads(response.split(b'\r\n\r\n', 1)[1])
+    finally:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fortsetzbarer Upload mit Abbrüchen')
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--disconnects', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    size = args.size_mb * 1024 * 1024
+    payload = rng.randbytes(size)
+    home = tempfile.mkdtemp(prefix='sidekick-resume-')
+    proc, url = start_local_dashboard(workers=4, home=home)
+    port = int(url.rsplit(':', 1)[1])
+    try:
+        status, session = api(port, 'POST', '/api/uploads',
+                              json.dumps({'type': 'video', 'filename': 'resume-test.mp4', 'size': size}),
+                              {'Content-Type': 'application/json'})
+        assert status == 201, (status, session)
+        upload_id = session['id']
+
+        # Abbruchstellen zufällig über die Datei verteilt
+        cut_offsets = sorted(rng.sample(range(1, size), args.disconnects))
+        sent = 0
+        restart_bytes = 0  # Was ein Neustart bei jedem Abbruch gekostet hätte
+        while session['missing']:
+            start = session['missing'][0][0]
+            end = min(session['missing'][0][1], start + CHUNK_SIZE)
+            cut = next((c for c in cut_offsets if start < c < end), None)
+            if cut is not None:
+                cut_offsets.remove(cut)
+                sent += send_chunk(port, upload_id, payload[start:end], start, size, cut - start)[0]
+                restart_bytes += cut
+                time.sleep(0.05)
+                status, session = api(port, 'GET', f'/api/uploads/{upload_id}')
+                assert status == 200, (status, session)
+                continue
+            count, session = send_chunk(port, upload_id, payload[start:end], start, size)
+            sent += count
+
+        status, result = api(port, 'POST', f'/api/uploads/{upload_id}/finalize')
+        assert status == 200, (status, result)
+        restart_bytes += size
+
+        status, listing = api(port, 'GET', '/api/videos?prefix=resume-test')
+        assert [item['name'] for item in listing['items']] == ['resume-test.mp4'], listing
+        assert listing['items'][0]['size'] == size
+
+        # Die JSON-Liste wird gebündelt geschrieben - kurz darauf warten
+        videos_dir = os.path.join(home, 'Sidekick', 'sidekick', 'videos')
+        deadline = time.time() + 5
+        listed = False
+        while not listed and time.time() < deadline:
+            time.sleep(0.2)
+            try:
+                with open(os.path.join(videos_dir, 'video-list.json'), encoding='utf-8') as f:
+                    text = f.read()
+            except FileNotFoundError:
+                # Noch nicht geschrieben - weiter warten
+                continue
+            # Die Liste wird atomar ersetzt: halbe Dateien dürfen nie sichtbar sein
+            try:
+                listed = 'resume-test.mp4' in json.loads(text)
+            except ValueError as e:
+                raise AssertionError(f'video-list.json unvollständig gelesen: {e}') from e
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    with open(os.path.join(videos_dir, 'resume-test.mp4'), 'rb') as f:
+        identical = hashlib.sha256(f.read()).digest() == hashlib.sha256(payload).digest()
+    leftovers = os.listdir(os.path.join(videos_dir, '.uploads'))
+
+    print(f"Dateigröße:            {size / 1024 ** 2:.1f} MB")
+    print(f"Abbrüche:              {args.disconnects}")
+    print(f"Gesendet (fortsetzb.): {sent / 1024 ** 2:.1f} MB  ({sent / size * 100:.1f} %)")
+    print(f"Gesendet (Neustart):   {restart_bytes / 1024 ** 2:.1f} MB  ({restart_bytes / size * 100:.1f} %)")
+    print(f"Datei identisch:       {'ja' if identical else 'NEIN'}")
+    print(f"In video-list.json:    {'ja' if listed else 'NEIN'}")
+    print(f"Reste in .uploads:     {len(leftovers)}")
+    sys.exit(0 if identical and listed and not leftovers else 1)
+
+
+if __name__ == '__main__':
+    main()
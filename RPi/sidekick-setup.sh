@@ -267,6 +267,7 @@ KNOWN_SERVICES=(
     "sidekick-webapp"
     "sidekick-sensors"
     "sidekick-dashboard"
+    "sidekick-usb-import"
     "sidekick-kiosk"
     "sidekick-http"
     "sidekick-scratch"
@@ -455,13 +456,14 @@ print_step "7/9" "Bereite Installation vor..."
 
 mkdir -p "$SIDEKICK_DIR"
 
-# Backup von Benutzer-Dateien (Projekte, Videos)
+# Backup von Benutzer-Dateien (Projekte, Videos, Hub-Konfiguration)
 BACKUP_DIR="$SIDEKICK_DIR/.backup_temp"
-if [ -d "$WEBAPP_DIR/projects" ] || [ -d "$WEBAPP_DIR/videos" ]; then
+if [ -d "$WEBAPP_DIR/projects" ] || [ -d "$WEBAPP_DIR/videos" ] || [ -f "$PYTHON_DIR/sidekick-hub.json" ]; then
     print_info "Sichere Projekt- und Videodateien..."
     mkdir -p "$BACKUP_DIR"
     [ -d "$WEBAPP_DIR/projects" ] && cp -r "$WEBAPP_DIR/projects" "$BACKUP_DIR/"
     [ -d "$WEBAPP_DIR/videos" ] && cp -r "$WEBAPP_DIR/videos" "$BACKUP_DIR/"
+    [ -f "$PYTHON_DIR/sidekick-hub.json" ] && cp "$PYTHON_DIR/sidekick-hub.json" "$BACKUP_DIR/"
 fi
 
 print_success "Vorbereitung abgeschlossen"
@@ -521,6 +523,12 @@ if [ -d "$BACKUP_DIR" ]; then
     print_info "Stelle Projekt- und Videodateien wieder her..."
     [ -d "$BACKUP_DIR/projects" ] && cp -r "$BACKUP_DIR/projects" "$WEBAPP_DIR/"
     [ -d "$BACKUP_DIR/videos" ] && cp -r "$BACKUP_DIR/videos" "$WEBAPP_DIR/"
+    # Angepasste Hub-Konfiguration (Pins) behalten, die neue Vorlage daneben legen
+    if [ -f "$BACKUP_DIR/sidekick-hub.json" ] && ! cmp -s "$BACKUP_DIR/sidekick-hub.json" "$PYTHON_DIR/sidekick-hub.json"; then
+        [ -f "$PYTHON_DIR/sidekick-hub.json" ] && mv "$PYTHON_DIR/sidekick-hub.json" "$PYTHON_DIR/sidekick-hub.json.new"
+        cp "$BACKUP_DIR/sidekick-hub.json" "$PYTHON_DIR/"
+        print_info "Eigene sidekick-hub.json behalten, neue Vorlage: sidekick-hub.json.new"
+    fi
     rm -rf "$BACKUP_DIR"
 fi
 
@@ -544,6 +552,30 @@ print_step "9/9" "Konfiguriere Services..."
 PYTHON_SCRIPT="$PYTHON_DIR/ScratchConnect.py"
 DASHBOARD_SCRIPT="$PYTHON_DIR/sidekick-dashboard.py"
 
+# USB-Import: systemd-Service für den Daemon; entfernt die alte udev-Rule
+# (sidekick-usb-import.sh mit sleep 3 + Suche in /media)
+install_usb_import_service() {
+    rm -f /etc/udev/rules.d/99-sidekick-usb-import.rules
+    udevadm control --reload-rules 2>/dev/null || true
+
+    cat > /etc/systemd/system/sidekick-usb-import.service << EOF
+[Unit]
+Description=SIDEKICK USB Import Daemon
+After=local-fs.target
+
+[Service]
+Type=simple
+User=$ACTUAL_USER
+WorkingDirectory=$PYTHON_DIR
+ExecStart=/usr/bin/python3 $PYTHON_DIR/sidekick-usb-daemon.py
+Restart=always
+RestartSec=5
+
+[Install]
+WantedBy=multi-user.target
+EOF
+}
+
 if [ "$IS_UPDATE" = false ]; then
     # ERSTINSTALLATION: Services erstellen
 
@@ -605,22 +637,18 @@ RestartSec=5
 WantedBy=multi-user.target
 EOF
 
-    # USB-Import udev-Rule (triggert bei USB-Einstecken)
-    cat > /etc/udev/rules.d/99-sidekick-usb-import.rules << EOF
-# SIDEKICK USB-Import: Startet Import wenn USB-Stick eingesteckt wird
-ACTION=="add", SUBSYSTEM=="block", ENV{ID_FS_USAGE}=="filesystem", RUN+="/bin/bash $PYTHON_DIR/sidekick-usb-import.sh"
-EOF
-
-    # udev-Regeln neu laden
-    udevadm control --reload-rules 2>/dev/null || true
+    # USB-Import Daemon (erkennt neue Mounts sofort, ersetzt die alte udev-Rule)
+    install_usb_import_service
 
     systemctl daemon-reload
     systemctl enable sidekick-webapp.service
     systemctl enable sidekick-sensors.service
     systemctl enable sidekick-dashboard.service
+    systemctl enable sidekick-usb-import.service
     systemctl start sidekick-webapp.service
     systemctl start sidekick-sensors.service
     systemctl start sidekick-dashboard.service
+    systemctl start sidekick-usb-import.service
 
     print_success "Services erstellt und gestartet (inkl. USB-Import)"
 
@@ -644,12 +672,11 @@ else
         print_success "sidekick-dashboard gestartet"
     fi
     
-    # USB-Import udev-Rule auch bei Update installieren/aktualisieren
-    cat > /etc/udev/rules.d/99-sidekick-usb-import.rules << EOF
-# SIDEKICK USB-Import: Startet Import wenn USB-Stick eingesteckt wird
-ACTION=="add", SUBSYSTEM=="block", ENV{ID_FS_USAGE}=="filesystem", RUN+="/bin/bash $PYTHON_DIR/sidekick-usb-import.sh"
-EOF
-    udevadm control --reload-rules 2>/dev/null || true
+    # USB-Import Daemon auch bei Update installieren/aktualisieren
+    install_usb_import_service
+    systemctl daemon-reload
+    systemctl enable sidekick-usb-import.service
+    systemctl restart sidekick-usb-import.service
     print_success "USB-Import aktualisiert"
 fi
 
@@ -829,6 +829,40 @@ class Scratch3SidekickBlocks {
                         }
                     }
                 },
+                {
+                    opcode: 'setLedAnimation',
+                    text: 'Lasse LED von Box [BOX] [ANIMATION] in [COLOR]',
+                    blockType: BlockType.COMMAND,
+                    arguments: {
+                        BOX: {
+                            type: ArgumentType.STRING,
+                            menu: 'boxNumberWithAll',
+                            defaultValue: '1'
+                        },
+                        ANIMATION: {
+                            type: ArgumentType.STRING,
+                            menu: 'ledAnimationMenu',
+                            defaultValue: 'blink'
+                        },
+                        COLOR: {
+                            type: ArgumentType.STRING,
+                            menu: 'colorMenu',
+                            defaultValue: 'green'
+                        }
+                    }
+                },
+                {
+                    opcode: 'stopLedAnimation',
+                    text: 'Stoppe LED-Animation von Box [BOX]',
+                    blockType: BlockType.COMMAND,
+                    arguments: {
+                        BOX: {
+                            type: ArgumentType.STRING,
+                            menu: 'boxNumberWithAll',
+                            defaultValue: '1'
+                        }
+                    }
+                },
 
                 // ==========================================
                 // Multimedia: Video
@@ -1110,6 +1144,15 @@ class Scratch3SidekickBlocks {
                         { text: 'Pink', value: 'pink' }
                     ]
                 },
+                ledAnimationMenu: {
+                    acceptReporters: false,
+                    items: [
+                        { text: 'blinken', value: 'blink' },
+                        { text: 'pulsieren', value: 'pulse' },
+                        { text: 'laufen', value: 'chase' },
+                        { text: 'einblenden', value: 'fade' }
+                    ]
+                },
                 videoShowActionMenu: {
                     acceptReporters: false,
                     items: [
@@ -1296,6 +1339,23 @@ class Scratch3SidekickBlocks {
         }
     }
 
+    // Animationen laufen auf dem Pi (SmartBox.py) - eine Nachricht statt einer pro Farbwechsel
+    setLedAnimation({ BOX, ANIMATION, COLOR }) {
+        if (this._mqttConnection) {
+            const animTopic = `sidekick/box/${BOX}/led/anim`;
+            this._mqttConnection.mqttPublish(animTopic, `${ANIMATION} ${COLOR}`);
+            console.log('[sidekick] LED-Animation:', animTopic, ANIMATION, COLOR);
+        }
+    }
+
+    stopLedAnimation({ BOX }) {
+        if (this._mqttConnection) {
+            const animTopic = `sidekick/box/${BOX}/led/anim`;
+            this._mqttConnection.mqttPublish(animTopic, 'stop');
+            console.log('[sidekick] LED-Animation stoppen:', animTopic);
+        }
+    }
+
     // ========== Button Steuerung ==========
 
     whenButtonAction({ BUTTON, ACTION }) {